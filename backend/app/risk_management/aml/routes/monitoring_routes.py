@@ -17,7 +17,7 @@ router = APIRouter(prefix="/aml/monitoring", tags=["Transaction Monitoring"])
 
 
 @router.post("/analyze-transaction")
-async def analyze_transaction(transaction: dict[str, Any], customer_profile: dict[str, Any]):
+async def analyze_transaction(transaction: dict[str, Any], customer_profile: dict[str, Any] | None = None):
     """Analyze a single transaction for suspicious patterns"""
     patterns = await transaction_monitoring_service.monitor_transaction(transaction, customer_profile)
     return {"detected_patterns": patterns}
@@ -29,6 +29,19 @@ async def run_batch_analysis(request: PatternAnalysisRequest):
     return await transaction_monitoring_service.run_batch_analysis(request)
 
 
+@router.post("/ingest")
+async def ingest_transactions(transactions: list[dict[str, Any]]):
+    """Warm customer profiles from historical transactions"""
+    count = await transaction_monitoring_service.ingest_transactions(transactions)
+    return {"ingested": count}
+
+
+@router.get("/profiles/{customer_id}")
+async def get_customer_profile(customer_id: str):
+    """Get the streaming monitoring profile of a customer"""
+    return await transaction_monitoring_service.get_customer_profile(customer_id)
+
+
 @router.get("/rules", response_model=list[PatternRule])
 async def get_monitoring_rules():
     """Get all monitoring rules"""
@@ -30,9 +30,15 @@ from .kyc_service import (
 from .network_analysis_service import (
     NetworkAnalysisService as NetworkAnalysisService,
 )
+from .pattern_detection_service import (
+    FlowMatch as FlowMatch,
+)
 from .pattern_detection_service import (
     PatternDetectionService as PatternDetectionService,
 )
+from .pattern_detection_service import (
+    WindowedFlowJoin as WindowedFlowJoin,
+)
 from .risk_scoring_service import (
     RiskScoringService as RiskScoringService,
 )
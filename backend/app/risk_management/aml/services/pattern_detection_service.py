@@ -4,7 +4,8 @@ Pattern Detection Service
 Advanced pattern detection for AML suspicious activity identification.
 """
 
-from collections import defaultdict
+from bisect import insort
+from collections import defaultdict, deque
 from datetime import UTC, datetime, timedelta
 from typing import Any
 from uuid import UUID
@@ -25,6 +26,96 @@ from ..models.transaction_pattern_models import (
 )
 
 
+class FlowMatch:
+    """An opening leg joined to the closing leg that followed it within the window"""
+    def __init__(
+        self, opening: dict[str, Any], closing: dict[str, Any],
+        amount_ratio: float, time_diff_hours: float
+    ):
+        self.opening = opening
+        self.closing = closing
+        self.amount_ratio = amount_ratio
+        self.time_diff_hours = time_diff_hours
+
+
+class WindowedFlowJoin:
+    """Streaming time-windowed join between opening and closing legs of a fund flow
+
+    Opening legs (e.g. credits) are buffered per key in a deque ordered by
+    timestamp. A closing leg (e.g. a debit) first evicts every buffered leg
+    older than the window and is then matched against the legs that remain,
+    so each event costs O(window size) instead of a rescan of the history.
+    The same instance can be fed a sorted batch or a live transaction stream.
+    """
+
+    def __init__(self, window_hours: float, min_ratio: float = 0.8, consume: bool = False):
+        self.window = timedelta(hours=window_hours)
+        self.min_ratio = min_ratio
+        # When consuming, each opening leg is joined to at most one closing leg
+        self.consume = consume
+        self._open_legs: dict[Any, deque[tuple[datetime, int, dict[str, Any]]]] = {}
+        self._sequence = 0
+
+    def _evict(self, key: Any, now: datetime) -> deque[tuple[datetime, int, dict[str, Any]]] | None:
+        legs = self._open_legs.get(key)
+        if legs is None:
+            return None
+        horizon = now - self.window
+        while legs and legs[0][0] < horizon:
+            legs.popleft()
+        if not legs:
+            del self._open_legs[key]
+            return None
+        return legs
+
+    def open_leg(self, key: Any, timestamp: datetime, transaction: dict[str, Any]) -> None:
+        """Buffer an opening leg under ``key``"""
+        self._evict(key, timestamp)
+        legs = self._open_legs.setdefault(key, deque())
+        self._sequence += 1
+        entry = (timestamp, self._sequence, transaction)
+        if legs and legs[-1][0] > timestamp:
+            # Late arrival on the online path; keep the deque time-ordered
+            insort(legs, entry, key=lambda e: (e[0], e[1]))
+        else:
+            legs.append(entry)
+
+    def close_leg(
+        self, key: Any, timestamp: datetime, transaction: dict[str, Any]
+    ) -> list[FlowMatch]:
+        """Join a closing leg against the buffered opening legs still in the window"""
+        legs = self._evict(key, timestamp)
+        if legs is None:
+            return []
+
+        amount = transaction.get("amount", 0)
+        matches = []
+        for entry in legs:
+            opened_at, _, opening = entry
+            if opened_at >= timestamp:
+                break
+            opening_amount = opening.get("amount", 0)
+            ratio = amount / opening_amount if opening_amount > 0 else 0
+            if ratio >= self.min_ratio:
+                matches.append(FlowMatch(
+                    opening=opening,
+                    closing=transaction,
+                    amount_ratio=ratio,
+                    time_diff_hours=(timestamp - opened_at).total_seconds() / 3600
+                ))
+                if self.consume:
+                    legs.remove(entry)
+                    if not legs:
+                        del self._open_legs[key]
+                    break
+        return matches
+
+    def expire(self, now: datetime) -> None:
+        """Drop every buffered leg that can no longer be matched"""
+        for key in list(self._open_legs):
+            self._evict(key, now)
+
+
 class PatternDetectionService:
     """Service for detecting suspicious transaction patterns"""
 
@@ -256,116 +347,100 @@ class PatternDetectionService:
         self, account_id: str, transactions: list[dict[str, Any]], time_threshold_hours: int = 24
     ) -> list[DetectedPattern]:
         """Detect rapid movement of funds (in and out quickly)"""
+        window = WindowedFlowJoin(time_threshold_hours, min_ratio=0.8)
         patterns = []
 
-        # Sort by timestamp
+        # Sort by timestamp and stream credits/debits through the window
         sorted_txns = sorted(
             [t for t in transactions if t.get("timestamp")],
             key=lambda x: x["timestamp"]
         )
 
-        credits = [t for t in sorted_txns if t.get("direction") == "credit"]
-        debits = [t for t in sorted_txns if t.get("direction") == "debit"]
-
-        for credit in credits:
-            credit_time = credit.get("timestamp")
-            credit_amount = credit.get("amount", 0)
-
-            # Look for debits shortly after
-            for debit in debits:
-                debit_time = debit.get("timestamp")
-                debit_amount = debit.get("amount", 0)
-
-                if debit_time <= credit_time:
-                    continue
-
-                time_diff = (debit_time - credit_time).total_seconds() / 3600
-
-                if time_diff > time_threshold_hours:
-                    break
-
-                # Check if amounts are similar
-                amount_ratio = debit_amount / credit_amount if credit_amount > 0 else 0
-
-                if amount_ratio >= 0.8:
-                    pattern = DetectedPattern(
-                        pattern_type=PatternType.RAPID_MOVEMENT,
-                        severity=PatternSeverity.HIGH,
-                        primary_entity_id=account_id,
-                        primary_entity_type="account",
-                        primary_entity_name=account_id,
-                        transaction_ids=[credit.get("transaction_id", ""), debit.get("transaction_id", "")],
-                        transaction_count=2,
-                        total_amount=credit_amount + debit_amount,
-                        detection_rule_id="rapid_movement_001",
-                        detection_rule_name="Rapid Fund Movement",
-                        confidence_score=0.7 + (0.3 * amount_ratio),
-                        pattern_details={
-                            "credit_amount": credit_amount,
-                            "debit_amount": debit_amount,
-                            "time_diff_hours": time_diff,
-                            "amount_ratio": amount_ratio
-                        }
-                    )
-                    patterns.append(pattern)
+        for t in sorted_txns:
+            direction = t.get("direction")
+            if direction == "credit":
+                window.open_leg(account_id, t["timestamp"], t)
+            elif direction == "debit":
+                for match in window.close_leg(account_id, t["timestamp"], t):
+                    patterns.append(self.build_rapid_movement_pattern(account_id, match))
 
         return patterns
 
+    def build_rapid_movement_pattern(self, account_id: str, match: FlowMatch) -> DetectedPattern:
+        """Build a rapid movement pattern from a credit/debit window match"""
+        credit_amount = match.opening.get("amount", 0)
+        debit_amount = match.closing.get("amount", 0)
+        return DetectedPattern(
+            pattern_type=PatternType.RAPID_MOVEMENT,
+            severity=PatternSeverity.HIGH,
+            primary_entity_id=account_id,
+            primary_entity_type="account",
+            primary_entity_name=account_id,
+            transaction_ids=[match.opening.get("transaction_id", ""), match.closing.get("transaction_id", "")],
+            transaction_count=2,
+            total_amount=credit_amount + debit_amount,
+            detection_rule_id="rapid_movement_001",
+            detection_rule_name="Rapid Fund Movement",
+            confidence_score=min(0.7 + (0.3 * match.amount_ratio), 1.0),
+            pattern_details={
+                "credit_amount": credit_amount,
+                "debit_amount": debit_amount,
+                "time_diff_hours": match.time_diff_hours,
+                "amount_ratio": match.amount_ratio
+            }
+        )
+
     async def detect_round_tripping(
-        self, transactions: list[dict[str, Any]]
+        self, transactions: list[dict[str, Any]], time_threshold_hours: int = 720
     ) -> list[DetectedPattern]:
-        """Detect round-tripping (funds returning to origin)"""
+        """Detect round-tripping (funds returning to origin)
+
+        An outgoing transfer A -> B is held in the window keyed by (A, B) and
+        consumed by the first later transfer B -> A of a similar amount.
+        """
+        window = WindowedFlowJoin(time_threshold_hours, min_ratio=0.8, consume=True)
         patterns = []
 
-        # Build transaction map
-        account_flows = defaultdict(lambda: {"out": [], "in": []})
+        sorted_txns = sorted(
+            [t for t in transactions if t.get("timestamp")],
+            key=lambda x: x["timestamp"]
+        )
 
-        for t in transactions:
+        for t in sorted_txns:
             source = t.get("source_account", "")
             target = t.get("target_account", "")
-            if source:
-                account_flows[source]["out"].append(t)
-            if target:
-                account_flows[target]["in"].append(t)
-
-        # Look for funds returning
-        for account, flows in account_flows.items():
-            out_counterparties = {t.get("target_account"): t for t in flows["out"]}
-            in_counterparties = {t.get("source_account"): t for t in flows["in"]}
-
-            # Check for circular flow
-            for counterparty in out_counterparties:
-                if counterparty in in_counterparties:
-                    out_txn = out_counterparties[counterparty]
-                    in_txn = in_counterparties[counterparty]
-
-                    out_amount = out_txn.get("amount", 0)
-                    in_amount = in_txn.get("amount", 0)
-
-                    # Similar amounts returning
-                    if in_amount >= out_amount * 0.8:
-                        pattern = DetectedPattern(
-                            pattern_type=PatternType.ROUND_TRIPPING,
-                            severity=PatternSeverity.HIGH,
-                            primary_entity_id=account,
-                            primary_entity_type="account",
-                            primary_entity_name=account,
-                            transaction_ids=[
-                                out_txn.get("transaction_id", ""),
-                                in_txn.get("transaction_id", "")
-                            ],
-                            transaction_count=2,
-                            total_amount=out_amount + in_amount,
-                            detection_rule_id="round_trip_001",
-                            detection_rule_name="Round Tripping Detection",
-                            confidence_score=0.8,
-                            pattern_details={
-                                "outgoing_amount": out_amount,
-                                "incoming_amount": in_amount,
-                                "counterparty": counterparty
-                            }
-                        )
-                        patterns.append(pattern)
+            if not source or not target:
+                continue
+
+            # Does this transfer return funds that target previously sent to source?
+            for match in window.close_leg((target, source), t["timestamp"], t):
+                out_amount = match.opening.get("amount", 0)
+                in_amount = t.get("amount", 0)
+                pattern = DetectedPattern(
+                    pattern_type=PatternType.ROUND_TRIPPING,
+                    severity=PatternSeverity.HIGH,
+                    primary_entity_id=target,
+                    primary_entity_type="account",
+                    primary_entity_name=target,
+                    transaction_ids=[
+                        match.opening.get("transaction_id", ""),
+                        t.get("transaction_id", "")
+                    ],
+                    transaction_count=2,
+                    total_amount=out_amount + in_amount,
+                    detection_rule_id="round_trip_001",
+                    detection_rule_name="Round Tripping Detection",
+                    confidence_score=0.8,
+                    pattern_details={
+                        "outgoing_amount": out_amount,
+                        "incoming_amount": in_amount,
+                        "counterparty": source,
+                        "time_diff_hours": match.time_diff_hours
+                    }
+                )
+                patterns.append(pattern)
+
+            window.open_leg((source, target), t["timestamp"], t)
 
         return patterns
 
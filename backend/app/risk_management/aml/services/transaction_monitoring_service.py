@@ -4,7 +4,12 @@ Transaction Monitoring Service
 Real-time and batch transaction monitoring for AML detection.
 """
 
-from datetime import UTC, datetime
+import math
+import time
+from bisect import insort
+from collections import deque
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime, timedelta
 from typing import Any
 from uuid import UUID
 
@@ -16,6 +21,311 @@ from ..models.transaction_pattern_models import (
     PatternSeverity,
     PatternType,
 )
+from .pattern_detection_service import WindowedFlowJoin
+
+SECONDS_PER_DAY = 86400
+# Events between trims of the transaction log and expiry of idle flow legs
+MAINTENANCE_INTERVAL = 1000
+# Rule parameters that set how far back a rule looks, in days
+RULE_WINDOW_PARAMETERS = (
+    "time_window_days", "current_period_days", "baseline_period_days", "dormancy_threshold_days",
+)
+
+
+def _transaction_time(transaction: dict[str, Any]) -> datetime:
+    """Resolve a transaction timestamp, defaulting to now for live events"""
+    timestamp = transaction.get("timestamp")
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    if not isinstance(timestamp, datetime):
+        return datetime.now(UTC)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=UTC)
+    return timestamp
+
+
+def _customer_key(transaction: dict[str, Any]) -> str:
+    return transaction.get("customer_id") or transaction.get("account_id", "")
+
+
+def _store_settings(rules: Iterable[PatternRule]) -> dict[str, float]:
+    """Profile store settings read from the rules that consume them: the first
+    velocity rule sets the decay periods, the first structuring rule the
+    reporting threshold and window, and the lowest rapid movement minimum
+    decides which credits are kept as large"""
+    settings: dict[str, float] = {}
+    large_credit_thresholds = []
+    for rule in rules:
+        if rule.pattern_type == PatternType.VELOCITY_SPIKE and "current_period_days" not in settings:
+            settings["current_period_days"] = rule.parameters.get("current_period_days", 7)
+            settings["baseline_period_days"] = rule.parameters.get("baseline_period_days", 90)
+        elif rule.pattern_type == PatternType.STRUCTURING and "reporting_threshold" not in settings:
+            settings["reporting_threshold"] = rule.parameters.get("threshold", 10000)
+            settings["structuring_window_days"] = rule.parameters.get("time_window_days", 1)
+        elif rule.pattern_type == PatternType.RAPID_MOVEMENT:
+            large_credit_thresholds.append(rule.thresholds.get("min_amount", 5000))
+    if large_credit_thresholds:
+        settings["large_credit_threshold"] = min(large_credit_thresholds)
+    return settings
+
+
+def _rule_window(rule: PatternRule) -> timedelta:
+    """Longest look-back a rule's parameters ask for"""
+    days = [rule.parameters.get(name, 0) for name in RULE_WINDOW_PARAMETERS]
+    days.append(rule.parameters.get("threshold_hours", 0) / 24)
+    return timedelta(days=max(days))
+
+
+class TransactionLog:
+    """Monitored transactions in time order, trimmed to a retention horizon
+    behind the latest event so batch replays scan a bounded history"""
+
+    def __init__(self):
+        self._entries: deque[tuple[datetime, int, dict[str, Any]]] = deque()
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def append(self, transaction: dict[str, Any]) -> None:
+        self._sequence += 1
+        entry = (_transaction_time(transaction), self._sequence, transaction)
+        if self._entries and self._entries[-1][0] > entry[0]:
+            # Late arrival; keep the deque time-ordered
+            insort(self._entries, entry, key=lambda e: (e[0], e[1]))
+        else:
+            self._entries.append(entry)
+
+    def trim(self, retention: timedelta) -> None:
+        """Drop transactions older than ``retention`` before the latest one"""
+        if not self._entries:
+            return
+        horizon = self._entries[-1][0] - retention
+        while self._entries[0][0] < horizon:
+            self._entries.popleft()
+
+    def __iter__(self) -> Iterator[tuple[datetime, dict[str, Any]]]:
+        for at, _, transaction in self._entries:
+            yield at, transaction
+
+    def until(self, end: datetime) -> Iterator[tuple[datetime, dict[str, Any]]]:
+        """Retained transactions up to ``end``, oldest first"""
+        for at, _, transaction in self._entries:
+            if at > end:
+                break
+            yield at, transaction
+
+    @property
+    def latest(self) -> datetime | None:
+        return self._entries[-1][0] if self._entries else None
+
+
+class CustomerProfile:
+    """Streaming behavioural profile of a single customer"""
+    def __init__(self, customer_id: str, first_seen: datetime, large_credit_slots: int):
+        self.customer_id = customer_id
+        self.first_seen = first_seen
+        self.last_activity = first_seen
+        self.transaction_count = 0
+        # Exponentially decayed transaction counts, as of last_activity
+        self.current_decayed_count = 0.0
+        self.baseline_decayed_count = 0.0
+        # Welford running moments of transaction amounts
+        self.amount_mean = 0.0
+        self.amount_m2 = 0.0
+        self.large_credits: deque[dict[str, Any]] = deque(maxlen=large_credit_slots)
+        self.below_threshold_times: deque[datetime] = deque()
+        self.countries: set[str] = set()
+
+    @property
+    def amount_std(self) -> float:
+        """Sample standard deviation of transaction amounts"""
+        if self.transaction_count < 2:
+            return 0.0
+        return math.sqrt(self.amount_m2 / (self.transaction_count - 1))
+
+
+class CustomerProfileStore:
+    """Per-customer profiles maintained online from the transaction stream
+
+    Every update and snapshot is O(1) amortised: velocity is kept as
+    exponentially decayed counters, amounts as Welford moments, and recent
+    events in bounded deques, so no transaction history is rescanned.
+    Decay periods and thresholds normally come from the rules (see from_rules).
+    """
+
+    def __init__(
+        self, current_period_days: float = 7, baseline_period_days: float = 90,
+        reporting_threshold: float = 10000, structuring_window_days: float = 1,
+        large_credit_threshold: float = 5000, large_credit_slots: int = 10
+    ):
+        self.large_credit_slots = large_credit_slots
+        self._configure({
+            "current_period_days": current_period_days,
+            "baseline_period_days": baseline_period_days,
+            "reporting_threshold": reporting_threshold,
+            "structuring_window_days": structuring_window_days,
+            "large_credit_threshold": large_credit_threshold,
+        })
+        self._profiles: dict[str, CustomerProfile] = {}
+        # Online credit/debit windows for rapid movement rules, keyed by rule
+        self._flow_windows: dict[UUID, WindowedFlowJoin] = {}
+
+    @classmethod
+    def from_rules(cls, rules: Iterable[PatternRule]) -> "CustomerProfileStore":
+        """Store with its periods and thresholds taken from the rules' parameters"""
+        return cls(**_store_settings(rules))
+
+    def _configure(self, settings: dict[str, float]) -> None:
+        self.settings = settings
+        self.current_tau = settings["current_period_days"] * SECONDS_PER_DAY
+        self.baseline_tau = settings["baseline_period_days"] * SECONDS_PER_DAY
+        self.reporting_threshold = settings["reporting_threshold"]
+        self.structuring_window = timedelta(days=settings["structuring_window_days"])
+        self.large_credit_threshold = settings["large_credit_threshold"]
+
+    def reconfigure(
+        self, rules: Iterable[PatternRule], history: Iterable[tuple[datetime, dict[str, Any]]]
+    ) -> bool:
+        """Apply the settings of changed rules; the decayed counters and recent
+        events of every profile are rebuilt from ``history`` (time ordered),
+        while lifetime counts, amount moments and countries are kept"""
+        settings = {**self.settings, **_store_settings(rules)}
+        if settings == self.settings:
+            return False
+        self._configure(settings)
+
+        for profile in self._profiles.values():
+            profile.current_decayed_count = profile.baseline_decayed_count = 0.0
+            profile.large_credits.clear()
+            profile.below_threshold_times.clear()
+        replayed_to: dict[str, datetime] = {}
+        for at, transaction in history:
+            customer_id = _customer_key(transaction)
+            profile = self._profiles.get(customer_id)
+            if profile is None:
+                continue
+            self._decay(profile, at - replayed_to.get(customer_id, at))
+            self._record_recent(profile, transaction, at)
+            replayed_to[customer_id] = max(replayed_to.get(customer_id, at), at)
+        # Counters are kept as of each profile's last activity
+        for customer_id, at in replayed_to.items():
+            profile = self._profiles[customer_id]
+            self._decay(profile, profile.last_activity - at)
+        return True
+
+    def get_profile(self, customer_id: str) -> CustomerProfile | None:
+        """Get the stored profile of a customer"""
+        return self._profiles.get(customer_id)
+
+    def _decayed_rate(self, profile: CustomerProfile, count: float, tau: float, at: datetime) -> float:
+        """Bias-corrected decayed transaction rate per day as of ``at``"""
+        elapsed = max((at - profile.last_activity).total_seconds(), 0)
+        age = max((at - profile.first_seen).total_seconds(), 0)
+        # Effective observation span; shorter than tau for young profiles
+        observed = tau * (1 - math.exp(-age / tau))
+        if observed <= 0:
+            return 0.0
+        return count * math.exp(-elapsed / tau) / observed * SECONDS_PER_DAY
+
+    def _evict_below_threshold(self, profile: CustomerProfile, at: datetime) -> None:
+        horizon = at - self.structuring_window
+        while profile.below_threshold_times and profile.below_threshold_times[0] < horizon:
+            profile.below_threshold_times.popleft()
+
+    def snapshot(self, customer_id: str, at: datetime) -> dict[str, Any]:
+        """Build the rule-facing profile view of a customer as of ``at``"""
+        profile = self._profiles.get(customer_id)
+        if profile is None:
+            return {"transaction_count": 0}
+
+        self._evict_below_threshold(profile, at)
+        return {
+            "transaction_count": profile.transaction_count,
+            "current_transaction_velocity": self._decayed_rate(
+                profile, profile.current_decayed_count, self.current_tau, at
+            ),
+            "baseline_transaction_velocity": self._decayed_rate(
+                profile, profile.baseline_decayed_count, self.baseline_tau, at
+            ),
+            "recent_below_threshold_count": len(profile.below_threshold_times),
+            "last_large_credit": profile.large_credits[-1] if profile.large_credits else None,
+            "days_since_last_activity": max((at - profile.last_activity).total_seconds(), 0) / SECONDS_PER_DAY,
+            "known_countries": profile.countries,
+            "amount_mean": profile.amount_mean,
+            "amount_std": profile.amount_std,
+        }
+
+    def _decay(self, profile: CustomerProfile, elapsed: timedelta) -> None:
+        """Decay the velocity counters forward by ``elapsed``"""
+        seconds = max(elapsed.total_seconds(), 0)
+        profile.current_decayed_count *= math.exp(-seconds / self.current_tau)
+        profile.baseline_decayed_count *= math.exp(-seconds / self.baseline_tau)
+
+    def _record_recent(self, profile: CustomerProfile, transaction: dict[str, Any], at: datetime) -> None:
+        """Count the transaction in the windowed, threshold-dependent profile state"""
+        amount = transaction.get("amount", 0)
+        profile.current_decayed_count += 1
+        profile.baseline_decayed_count += 1
+
+        direction = transaction.get("direction") or transaction.get("type")
+        if direction == "credit" and amount >= self.large_credit_threshold:
+            profile.large_credits.append({
+                "transaction_id": transaction.get("transaction_id", ""),
+                "amount": amount,
+                "timestamp": at
+            })
+
+        if self.reporting_threshold * 0.8 <= amount < self.reporting_threshold:
+            self._evict_below_threshold(profile, at)
+            profile.below_threshold_times.append(at)
+
+    def update(self, transaction: dict[str, Any]) -> CustomerProfile:
+        """Fold a transaction into its customer's profile"""
+        customer_id = _customer_key(transaction)
+        at = _transaction_time(transaction)
+        amount = transaction.get("amount", 0)
+
+        profile = self._profiles.get(customer_id)
+        if profile is None:
+            profile = CustomerProfile(customer_id, at, self.large_credit_slots)
+            self._profiles[customer_id] = profile
+
+        # Decay the velocity counters forward to this event
+        self._decay(profile, at - profile.last_activity)
+        self._record_recent(profile, transaction, at)
+        profile.last_activity = max(profile.last_activity, at)
+
+        profile.transaction_count += 1
+        delta = amount - profile.amount_mean
+        profile.amount_mean += delta / profile.transaction_count
+        profile.amount_m2 += delta * (amount - profile.amount_mean)
+
+        country = transaction.get("counterparty_country") or transaction.get("country")
+        if country:
+            profile.countries.add(country)
+
+        return profile
+
+    def flow_window(self, rule: PatternRule) -> WindowedFlowJoin:
+        """Get the streaming credit/debit window backing a rapid movement rule"""
+        window = self._flow_windows.get(rule.rule_id)
+        if window is None:
+            window = WindowedFlowJoin(
+                rule.parameters.get("threshold_hours", 24),
+                min_ratio=rule.thresholds.get("ratio_threshold", 0.9)
+            )
+            self._flow_windows[rule.rule_id] = window
+        return window
+
+    def reset_flow_window(self, rule_id: UUID) -> None:
+        """Drop a rule's window so it is rebuilt from its current parameters"""
+        self._flow_windows.pop(rule_id, None)
+
+    def expire_flow_windows(self, now: datetime) -> None:
+        """Drop buffered legs that can no longer be matched, including those of idle customers"""
+        for window in self._flow_windows.values():
+            window.expire(now)
 
 
 class TransactionMonitoringService:
@@ -24,7 +334,17 @@ class TransactionMonitoringService:
     def __init__(self):
         self._rules: dict[UUID, PatternRule] = {}
         self._detection_results: dict[UUID, PatternAnalysisResult] = {}
+        self._transaction_log = TransactionLog()
+        self._events_since_maintenance = 0
         self._initialize_default_rules()
+        self._profile_store = CustomerProfileStore.from_rules(self._active_rules())
+
+    def _active_rules(self) -> list[PatternRule]:
+        return [rule for rule in self._rules.values() if rule.is_active]
+
+    def _refresh_profile_settings(self) -> None:
+        """Bring the profile store in line with the active rules after a rule change"""
+        self._profile_store.reconfigure(self._active_rules(), self._transaction_log)
 
     def _initialize_default_rules(self):
         """Initialize default monitoring rules"""
@@ -113,23 +433,66 @@ class TransactionMonitoringService:
             self._rules[rule.rule_id] = rule
 
     async def monitor_transaction(
-        self, transaction: dict[str, Any], customer_profile: dict[str, Any]
+        self, transaction: dict[str, Any], customer_profile: dict[str, Any] | None = None
     ) -> list[DetectedPattern]:
-        """Monitor a single transaction in real-time"""
-        detected_patterns = []
-
-        for rule in self._rules.values():
-            if not rule.is_active:
-                continue
+        """Monitor a single transaction in real-time
+
+        Rules run against the customer's stored streaming profile; values in
+        ``customer_profile`` override the stored ones.
+        """
+        rules = self._active_rules()
+        patterns = await self._process_transaction(transaction, rules, self._profile_store, customer_profile)
+        self._log_transaction(transaction)
+        return patterns
+
+    def _log_transaction(self, transaction: dict[str, Any]) -> None:
+        """Retain a transaction for batch replay, trimming state every MAINTENANCE_INTERVAL events"""
+        self._transaction_log.append(transaction)
+        self._events_since_maintenance += 1
+        if self._events_since_maintenance >= MAINTENANCE_INTERVAL:
+            self._maintain()
+
+    def _maintain(self) -> None:
+        """Trim the log to the longest active rule window and expire idle flow legs"""
+        self._events_since_maintenance = 0
+        windows = [_rule_window(rule) for rule in self._active_rules()]
+        self._transaction_log.trim(max(windows, default=timedelta(0)))
+        if self._transaction_log.latest is not None:
+            self._profile_store.expire_flow_windows(self._transaction_log.latest)
+
+    async def _process_transaction(
+        self, transaction: dict[str, Any], rules: list[PatternRule],
+        store: CustomerProfileStore, overrides: dict[str, Any] | None = None
+    ) -> list[DetectedPattern]:
+        """Evaluate rules against a profile snapshot, then fold the transaction in"""
+        customer_id = _customer_key(transaction)
+        customer_profile = store.snapshot(customer_id, _transaction_time(transaction))
+        if overrides:
+            customer_profile.update(overrides)
 
-            pattern = await self._evaluate_rule(rule, transaction, customer_profile)
+        detected_patterns = []
+        for rule in rules:
+            pattern = await self._evaluate_rule(rule, transaction, customer_profile, store)
             if pattern:
                 detected_patterns.append(pattern)
 
+        store.update(transaction)
         return detected_patterns
 
+    async def ingest_transactions(self, transactions: list[dict[str, Any]]) -> int:
+        """Warm customer profiles from historical transactions without alerting"""
+        for transaction in sorted(transactions, key=_transaction_time):
+            self._profile_store.update(transaction)
+            self._log_transaction(transaction)
+        return len(transactions)
+
+    async def get_customer_profile(self, customer_id: str) -> dict[str, Any]:
+        """Get the current streaming profile view of a customer"""
+        return self._profile_store.snapshot(customer_id, datetime.now(UTC))
+
     async def _evaluate_rule(
-        self, rule: PatternRule, transaction: dict[str, Any], customer_profile: dict[str, Any]
+        self, rule: PatternRule, transaction: dict[str, Any], customer_profile: dict[str, Any],
+        store: CustomerProfileStore
     ) -> DetectedPattern | None:
         """Evaluate a single rule against a transaction"""
 
@@ -138,7 +501,7 @@ class TransactionMonitoringService:
         if rule.pattern_type == PatternType.VELOCITY_SPIKE:
             return await self._check_velocity(rule, transaction, customer_profile)
         if rule.pattern_type == PatternType.RAPID_MOVEMENT:
-            return await self._check_rapid_movement(rule, transaction, customer_profile)
+            return await self._check_rapid_movement(rule, transaction, customer_profile, store)
         if rule.pattern_type == PatternType.GEOGRAPHIC_ANOMALY:
             return await self._check_geographic(rule, transaction, customer_profile)
         if rule.pattern_type == PatternType.DORMANT_ACTIVATION:
@@ -188,6 +551,10 @@ class TransactionMonitoringService:
         current_velocity = customer_profile.get("current_transaction_velocity", 0)
         baseline_velocity = customer_profile.get("baseline_transaction_velocity", 1)
         multiplier = rule.thresholds.get("threshold_multiplier", 3.0)
+        min_transactions = rule.thresholds.get("min_transactions", 0)
+
+        if customer_profile.get("transaction_count", min_transactions) < min_transactions:
+            return None
 
         if baseline_velocity > 0 and current_velocity > baseline_velocity * multiplier:
             return DetectedPattern(
@@ -211,43 +578,65 @@ class TransactionMonitoringService:
         return None
 
     async def _check_rapid_movement(
-        self, rule: PatternRule, transaction: dict[str, Any], customer_profile: dict[str, Any]
+        self, rule: PatternRule, transaction: dict[str, Any], customer_profile: dict[str, Any],
+        store: CustomerProfileStore
     ) -> DetectedPattern | None:
         """Check for rapid movement of funds"""
-        last_large_credit = customer_profile.get("last_large_credit")
         min_amount = rule.thresholds.get("min_amount", 5000)
+        ratio_threshold = rule.thresholds.get("ratio_threshold", 0.9)
         threshold_hours = rule.parameters.get("threshold_hours", 24)
+        direction = transaction.get("direction") or transaction.get("type")
+        amount = transaction.get("amount", 0)
 
-        if (
-            last_large_credit and
-            transaction.get("type") == "debit" and
-            transaction.get("amount", 0) >= min_amount
-        ):
-            time_diff = (datetime.now(UTC) - last_large_credit.get("timestamp", datetime.now(UTC))).total_seconds() / 3600
-
-            if time_diff < threshold_hours:
-                ratio = transaction.get("amount", 0) / last_large_credit.get("amount", 1)
-                if ratio > rule.thresholds.get("ratio_threshold", 0.9):
-                    return DetectedPattern(
-                        pattern_type=PatternType.RAPID_MOVEMENT,
-                        severity=PatternSeverity.HIGH,
-                        primary_entity_id=transaction.get("customer_id", ""),
-                        primary_entity_type="customer",
-                        primary_entity_name=transaction.get("customer_name", "Unknown"),
-                        transaction_ids=[transaction.get("transaction_id", "")],
-                        transaction_count=1,
-                        total_amount=transaction.get("amount", 0),
-                        detection_rule_id=str(rule.rule_id),
-                        detection_rule_name=rule.rule_name,
-                        confidence_score=0.80,
-                        pattern_details={
-                            "time_diff_hours": time_diff,
-                            "amount_ratio": ratio,
-                            "credit_amount": last_large_credit.get("amount"),
-                            "debit_amount": transaction.get("amount")
-                        }
-                    )
-        return None
+        # Feed the transaction through the rule's streaming window
+        window = store.flow_window(rule)
+        key = transaction.get("account_id") or transaction.get("customer_id", "")
+        timestamp = _transaction_time(transaction)
+        if direction == "credit":
+            if amount >= min_amount:
+                window.open_leg(key, timestamp, transaction)
+            return None
+        if direction != "debit" or amount < min_amount:
+            return None
+
+        matches = [m for m in window.close_leg(key, timestamp, transaction) if m.amount_ratio > ratio_threshold]
+        if matches:
+            # Report against the most recent qualifying credit
+            match = matches[-1]
+            time_diff = match.time_diff_hours
+            ratio = match.amount_ratio
+            credit_amount = match.opening.get("amount")
+        else:
+            # Fall back to the profile's last large credit (possibly caller-supplied)
+            last_large_credit = customer_profile.get("last_large_credit")
+            if not last_large_credit:
+                return None
+            credit_time = _transaction_time(last_large_credit)
+            time_diff = (timestamp - credit_time).total_seconds() / 3600
+            ratio = amount / last_large_credit.get("amount", 1)
+            credit_amount = last_large_credit.get("amount")
+            if time_diff >= threshold_hours or ratio <= ratio_threshold:
+                return None
+
+        return DetectedPattern(
+            pattern_type=PatternType.RAPID_MOVEMENT,
+            severity=PatternSeverity.HIGH,
+            primary_entity_id=transaction.get("customer_id", ""),
+            primary_entity_type="customer",
+            primary_entity_name=transaction.get("customer_name", "Unknown"),
+            transaction_ids=[transaction.get("transaction_id", "")],
+            transaction_count=1,
+            total_amount=amount,
+            detection_rule_id=str(rule.rule_id),
+            detection_rule_name=rule.rule_name,
+            confidence_score=0.80,
+            pattern_details={
+                "time_diff_hours": time_diff,
+                "amount_ratio": ratio,
+                "credit_amount": credit_amount,
+                "debit_amount": transaction.get("amount")
+            }
+        )
 
     async def _check_geographic(
         self, rule: PatternRule, transaction: dict[str, Any], customer_profile: dict[str, Any]
@@ -271,7 +660,8 @@ class TransactionMonitoringService:
                 confidence_score=0.90,
                 pattern_details={
                     "country": country,
-                    "high_risk_countries": high_risk_countries
+                    "high_risk_countries": high_risk_countries,
+                    "new_country": country not in customer_profile.get("known_countries", ())
                 }
             )
         return None
@@ -310,6 +700,8 @@ class TransactionMonitoringService:
         """Check for large transaction amounts"""
         threshold = rule.thresholds.get("threshold", 10000)
         amount = transaction.get("amount", 0)
+        amount_std = customer_profile.get("amount_std", 0)
+        z_score = (amount - customer_profile.get("amount_mean", 0)) / amount_std if amount_std > 0 else None
 
         if amount >= threshold:
             return DetectedPattern(
@@ -326,7 +718,8 @@ class TransactionMonitoringService:
                 confidence_score=1.0,
                 pattern_details={
                     "amount": amount,
-                    "threshold": threshold
+                    "threshold": threshold,
+                    "amount_z_score": z_score
                 }
             )
         return None
@@ -334,16 +727,65 @@ class TransactionMonitoringService:
     async def run_batch_analysis(
         self, request: PatternAnalysisRequest
     ) -> PatternAnalysisResult:
-        """Run batch pattern analysis"""
+        """Run batch pattern analysis
+
+        Replays the monitored transactions of the requested date range through
+        a fresh profile store. Earlier transactions only warm the profiles.
+        Only transactions within the longest active rule window of the latest
+        event are retained for replay.
+        """
+        started = time.perf_counter()
         result = PatternAnalysisResult(
             request_id=request.request_id,
             analysis_date=datetime.now(UTC)
         )
 
-        # Simulate batch processing
-        result.customers_analyzed = len(request.customer_ids or [])
-        result.transactions_analyzed = len(request.transaction_ids or [])
-        result.rules_executed = len(self._rules)
+        customer_ids = set(request.customer_ids or [])
+        account_ids = set(request.account_ids or [])
+        transaction_ids = set(request.transaction_ids or [])
+        date_from = _transaction_time({"timestamp": request.date_from})
+        date_to = _transaction_time({"timestamp": request.date_to})
+
+        selected = [
+            (at, transaction) for at, transaction in self._transaction_log.until(date_to)
+            if (not customer_ids or transaction.get("customer_id") in customer_ids)
+            and (not account_ids or transaction.get("account_id") in account_ids)
+        ]
+
+        rules = [
+            rule for rule in self._rules.values()
+            if rule.is_active and (not request.pattern_types or rule.pattern_type in request.pattern_types)
+        ]
+        store = CustomerProfileStore.from_rules(rules)
+        customers: set[str] = set()
+        accounts: set[str] = set()
+
+        for at, transaction in selected:
+            if at < date_from or (transaction_ids and transaction.get("transaction_id") not in transaction_ids):
+                store.update(transaction)
+                continue
+
+            result.transactions_analyzed += 1
+            customers.add(transaction.get("customer_id", ""))
+            accounts.add(transaction.get("account_id", ""))
+            for pattern in await self._process_transaction(transaction, rules, store):
+                if pattern.confidence_score < request.min_confidence_score:
+                    continue
+                result.detected_patterns.append(pattern)
+                result.patterns_by_type[pattern.pattern_type.value] = (
+                    result.patterns_by_type.get(pattern.pattern_type.value, 0) + 1
+                )
+                result.patterns_by_severity[pattern.severity.value] = (
+                    result.patterns_by_severity.get(pattern.severity.value, 0) + 1
+                )
+
+        customers.discard("")
+        accounts.discard("")
+        result.customers_analyzed = len(customers)
+        result.accounts_analyzed = len(accounts)
+        result.patterns_detected = len(result.detected_patterns)
+        result.rules_executed = len(rules)
+        result.processing_time_seconds = time.perf_counter() - started
 
         self._detection_results[result.result_id] = result
         return result
@@ -359,6 +801,7 @@ class TransactionMonitoringService:
     async def create_rule(self, rule: PatternRule) -> PatternRule:
         """Create a new monitoring rule"""
         self._rules[rule.rule_id] = rule
+        self._refresh_profile_settings()
         return rule
 
     async def update_rule(self, rule_id: UUID, updates: dict[str, Any]) -> PatternRule | None:
@@ -373,6 +816,9 @@ class TransactionMonitoringService:
 
         rule.last_modified_at = datetime.now(UTC)
         rule.version += 1
+        # Window size or ratio may have changed; rebuild lazily on next event
+        self._profile_store.reset_flow_window(rule_id)
+        self._refresh_profile_settings()
         return rule
 
     async def toggle_rule(self, rule_id: UUID, is_active: bool) -> PatternRule | None:
@@ -383,6 +829,7 @@ class TransactionMonitoringService:
 
         rule.is_active = is_active
         rule.last_modified_at = datetime.now(UTC)
+        self._refresh_profile_settings()
         return rule
 
 
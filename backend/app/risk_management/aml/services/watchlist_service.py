@@ -5,6 +5,8 @@ Handles internal and external watchlist management and screening.
 """
 
 import re
+from collections import defaultdict
+from collections.abc import Iterable
 from datetime import UTC, datetime
 from typing import Any
 from uuid import UUID
@@ -23,6 +25,113 @@ from ..models.watchlist_models import (
     WatchlistType,
 )
 
+_NAME_STRIP = re.compile(r'[^a-z\s]')
+NGRAM_SIZE = 3
+
+
+def _normalize_name(name: str) -> tuple[str, frozenset[str]]:
+    """Normalized form of a name and its token set"""
+    normalized = _NAME_STRIP.sub('', name.lower())
+    return normalized, frozenset(normalized.split())
+
+
+def _name_similarity(name1: tuple[str, frozenset[str]], name2: tuple[str, frozenset[str]]) -> float:
+    """Token Jaccard similarity of two normalized names"""
+    if name1[0] == name2[0]:
+        return 1.0
+    if not name1[1] or not name2[1]:
+        return 0.0
+    intersection = len(name1[1] & name2[1])
+    return intersection / (len(name1[1]) + len(name2[1]) - intersection)
+
+
+def _ngrams(text: str) -> set[str]:
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class WatchlistIndex:
+    """Search index over the entries of one watchlist partition
+
+    Holds an identifier hash map for exact ID hits, name token postings for
+    screening candidates and character n-gram postings for substring search,
+    plus each entry's pre-normalized names.
+    """
+
+    def __init__(self):
+        self.entry_ids: dict[UUID, None] = {}
+        self.names: dict[UUID, list[tuple[str, frozenset[str]]]] = {}
+        self._identifiers: dict[tuple[str, str], set[UUID]] = defaultdict(set)
+        self._tokens: dict[str, set[UUID]] = defaultdict(set)
+        self._ngrams: dict[str, set[UUID]] = defaultdict(set)
+        # Posting keys per entry, so entries can be removed without their old values
+        self._entry_keys: dict[UUID, tuple[set, set, set]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entry_ids)
+
+    def add(self, entry: WatchlistEntry) -> None:
+        names = [_normalize_name(name) for name in [entry.primary_name, *entry.aliases]]
+        identifier_keys = {
+            (identifier.identifier_type, identifier.identifier_value.lower())
+            for identifier in entry.identifiers
+        }
+        tokens = set().union(*(name[1] for name in names))
+        ngrams = set()
+        for text in [entry.primary_name, *entry.aliases, *(i.identifier_value for i in entry.identifiers)]:
+            ngrams |= _ngrams(text.lower())
+
+        self.entry_ids[entry.entry_id] = None
+        self.names[entry.entry_id] = names
+        for key in identifier_keys:
+            self._identifiers[key].add(entry.entry_id)
+        for token in tokens:
+            self._tokens[token].add(entry.entry_id)
+        for ngram in ngrams:
+            self._ngrams[ngram].add(entry.entry_id)
+        self._entry_keys[entry.entry_id] = (identifier_keys, tokens, ngrams)
+
+    def add_many(self, entries: Iterable[WatchlistEntry]) -> None:
+        for entry in entries:
+            self.add(entry)
+
+    def remove(self, entry_id: UUID) -> None:
+        keys = self._entry_keys.pop(entry_id, None)
+        if keys is None:
+            return
+        for postings, entry_keys in zip((self._identifiers, self._tokens, self._ngrams), keys, strict=True):
+            for key in entry_keys:
+                posting = postings.get(key)
+                if posting is not None:
+                    posting.discard(entry_id)
+                    if not posting:
+                        del postings[key]
+        del self.entry_ids[entry_id]
+        del self.names[entry_id]
+
+    def identifier_candidates(self, identifiers: list[EntityIdentifier]) -> set[UUID]:
+        candidates: set[UUID] = set()
+        for identifier in identifiers:
+            candidates |= self._identifiers.get((identifier.identifier_type, identifier.identifier_value.lower()), set())
+        return candidates
+
+    def name_candidates(self, tokens: Iterable[str]) -> set[UUID]:
+        candidates: set[UUID] = set()
+        for token in tokens:
+            candidates |= self._tokens.get(token, set())
+        return candidates
+
+    def substring_candidates(self, query: str) -> Iterable[UUID]:
+        """Entries whose names or identifiers may contain ``query`` (lowercased)"""
+        if len(query) < NGRAM_SIZE:
+            return self.entry_ids
+        postings = sorted((self._ngrams.get(ngram, set()) for ngram in _ngrams(query)), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates &= posting
+        return candidates
+
 
 class WatchlistService:
     """Service for watchlist management and screening"""
@@ -32,6 +141,9 @@ class WatchlistService:
         self._entries: dict[UUID, WatchlistEntry] = {}
         self._matches: dict[UUID, WatchlistMatch] = {}
         self._audit_logs: list[WatchlistAuditLog] = []
+        # Per-watchlist index partitions and entry insertion order
+        self._indexes: dict[UUID, WatchlistIndex] = defaultdict(WatchlistIndex)
+        self._entry_sequence: dict[UUID, int] = {}
         self._initialize_default_watchlists()
 
     def _initialize_default_watchlists(self):
@@ -153,6 +265,14 @@ class WatchlistService:
         self, watchlist_id: UUID, entry_data: dict[str, Any], created_by: str
     ) -> WatchlistEntry:
         """Add entry to a watchlist"""
+        entry = self._create_entry(watchlist_id, entry_data, created_by)
+        self._indexes[watchlist_id].add(entry)
+        return entry
+
+    def _create_entry(
+        self, watchlist_id: UUID, entry_data: dict[str, Any], created_by: str
+    ) -> WatchlistEntry:
+        """Create and store an entry without indexing it"""
         watchlist = self._watchlists.get(watchlist_id)
         if not watchlist:
             raise ValueError(f"Watchlist {watchlist_id} not found")
@@ -176,6 +296,7 @@ class WatchlistService:
         )
 
         self._entries[entry.entry_id] = entry
+        self._entry_sequence[entry.entry_id] = len(self._entry_sequence)
         watchlist.entry_count += 1
         watchlist.active_entry_count += 1
 
@@ -198,6 +319,7 @@ class WatchlistService:
         if not entry:
             return None
 
+        old_watchlist_id = entry.watchlist_id
         old_values = {}
         for key, value in updates.items():
             if hasattr(entry, key):
@@ -207,6 +329,10 @@ class WatchlistService:
         entry.updated_by = updated_by
         entry.updated_at = datetime.now(UTC)
 
+        if old_values.keys() & {"primary_name", "aliases", "identifiers", "watchlist_id"}:
+            self._indexes[old_watchlist_id].remove(entry_id)
+            self._indexes[entry.watchlist_id].add(entry)
+
         self._log_audit(
             entry.watchlist_id, entry_id, "update",
             f"Entry updated: {list(updates.keys())}",
@@ -248,18 +374,24 @@ class WatchlistService:
         """Search watchlist entries"""
         results = []
         query_lower = query.lower()
+        partitions = (
+            [self._indexes[w] for w in watchlist_ids if w in self._indexes]
+            if watchlist_ids else list(self._indexes.values())
+        )
 
-        for entry in self._entries.values():
-            if active_only and not entry.is_active:
-                continue
+        candidates = set()
+        for partition in partitions:
+            candidates.update(partition.substring_candidates(query_lower))
 
-            if watchlist_ids and entry.watchlist_id not in watchlist_ids:
+        for entry_id in sorted(candidates, key=self._entry_sequence.__getitem__):
+            entry = self._entries[entry_id]
+            if active_only and not entry.is_active:
                 continue
 
             if categories and entry.category not in categories:
                 continue
 
-            # Search in name and aliases
+            # Verify n-gram candidates against name, aliases and identifiers
             if query_lower in entry.primary_name.lower():
                 results.append(entry)
                 continue
@@ -268,7 +400,6 @@ class WatchlistService:
                 results.append(entry)
                 continue
 
-            # Search in identifiers
             for identifier in entry.identifiers:
                 if query_lower in identifier.identifier_value.lower():
                     results.append(entry)
@@ -277,7 +408,11 @@ class WatchlistService:
         return results
 
     async def screen_entity(self, request: WatchlistScreeningRequest) -> WatchlistScreeningResult:
-        """Screen an entity against watchlists"""
+        """Screen an entity against watchlists
+
+        Only entries sharing a name token or an identifier with the request
+        are scored; any other entry cannot reach the minimum match score.
+        """
         result = WatchlistScreeningResult(
             request_id=request.request_id,
             entity_type=request.entity_type,
@@ -286,19 +421,30 @@ class WatchlistService:
         )
 
         watchlists_to_screen = request.watchlist_ids or list(self._watchlists.keys())
+        request_names = [_normalize_name(name) for name in [request.entity_name, *request.aliases]]
+        request_tokens = set().union(*(name[1] for name in request_names))
         entries_screened = 0
-        matches = []
+        candidates = set()
 
-        for entry in self._entries.values():
-            if entry.watchlist_id not in watchlists_to_screen:
+        for watchlist_id in watchlists_to_screen:
+            partition = self._indexes.get(watchlist_id)
+            if partition is None:
                 continue
+            watchlist = self._watchlists.get(watchlist_id)
+            entries_screened += (
+                len(partition) if request.include_inactive or not watchlist
+                else watchlist.active_entry_count
+            )
+            candidates |= partition.name_candidates(request_tokens)
+            candidates |= partition.identifier_candidates(request.identifiers)
 
+        matches = []
+        for entry_id in sorted(candidates, key=self._entry_sequence.__getitem__):
+            entry = self._entries[entry_id]
             if not entry.is_active and not request.include_inactive:
                 continue
 
-            entries_screened += 1
-
-            match = await self._check_match(request, entry)
+            match = await self._check_match(request, entry, request_names)
             if match and match.match_score >= request.match_threshold:
                 matches.append(match)
                 self._matches[match.match_id] = match
@@ -314,16 +460,23 @@ class WatchlistService:
         return result
 
     async def _check_match(
-        self, request: WatchlistScreeningRequest, entry: WatchlistEntry
+        self, request: WatchlistScreeningRequest, entry: WatchlistEntry,
+        request_names: list[tuple[str, frozenset[str]]] | None = None
     ) -> WatchlistMatch | None:
         """Check if request matches an entry"""
-        # Name matching
-        name_score = self._calculate_name_score(request.entity_name, entry.primary_name)
+        if request_names is None:
+            request_names = [_normalize_name(name) for name in [request.entity_name, *request.aliases]]
+        partition = self._indexes.get(entry.watchlist_id)
+        entry_names = (partition.names.get(entry.entry_id) if partition else None) or [
+            _normalize_name(name) for name in [entry.primary_name, *entry.aliases]
+        ]
 
-        # Check aliases
-        for alias in request.aliases + entry.aliases:
-            alias_score = self._calculate_name_score(request.entity_name, alias)
-            name_score = max(name_score, alias_score)
+        # Name matching across request and entry names and aliases
+        name_score = max(
+            _name_similarity(request_name, entry_name)
+            for request_name in request_names
+            for entry_name in entry_names
+        )
 
         # Identifier matching
         identifier_score = 0.0
@@ -384,22 +537,7 @@ class WatchlistService:
 
     def _calculate_name_score(self, name1: str, name2: str) -> float:
         """Calculate similarity score between two names"""
-        name1_norm = re.sub(r'[^a-z\s]', '', name1.lower())
-        name2_norm = re.sub(r'[^a-z\s]', '', name2.lower())
-
-        if name1_norm == name2_norm:
-            return 1.0
-
-        tokens1 = set(name1_norm.split())
-        tokens2 = set(name2_norm.split())
-
-        if not tokens1 or not tokens2:
-            return 0.0
-
-        intersection = tokens1 & tokens2
-        union = tokens1 | tokens2
-
-        return len(intersection) / len(union)
+        return _name_similarity(_normalize_name(name1), _normalize_name(name2))
 
     async def review_match(
         self, match_id: UUID, status: str, reviewed_by: str, notes: str | None = None
@@ -431,9 +569,10 @@ class WatchlistService:
 
         import_record.started_at = datetime.now(UTC)
 
+        imported = []
         for entry_data in entries_data:
             try:
-                await self.add_entry(watchlist_id, entry_data, imported_by)
+                imported.append(self._create_entry(watchlist_id, entry_data, imported_by))
                 import_record.imported_records += 1
             except Exception as e:
                 import_record.failed_records += 1
@@ -442,6 +581,10 @@ class WatchlistService:
                     "error": str(e)
                 })
 
+        # Index the whole import in one pass
+        if imported:
+            self._indexes[watchlist_id].add_many(imported)
+
         import_record.status = "completed"
         import_record.completed_at = datetime.now(UTC)
 
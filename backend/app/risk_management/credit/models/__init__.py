@@ -60,6 +60,9 @@ from .credit_limit_models import (
 from .credit_limit_models import (
     UtilizationStatus as UtilizationStatus,
 )
+from .credit_score_models import (
+    BatchScoreSimulation as BatchScoreSimulation,
+)
 from .credit_score_models import (
     CreditScore as CreditScore,
 )
@@ -78,6 +81,9 @@ from .credit_score_models import (
 from .credit_score_models import (
     CreditScoreStatistics as CreditScoreStatistics,
 )
+from .credit_score_models import (
+    ScenarioScoreSummary as ScenarioScoreSummary,
+)
 from .credit_score_models import (
     ScoreCategory as ScoreCategory,
 )
@@ -99,6 +99,29 @@ class ScoreSimulation(BaseModel):
     created_by: str
 
 
+class ScenarioScoreSummary(BaseModel):
+    scenario: str
+    mean_score: float
+    std_dev: float
+    min_score: int
+    max_score: int
+    percentiles: dict[str, float] = {}
+    category_counts: dict[str, int] = {}
+    mean_score_change: float = 0.0
+    upgraded_count: int = 0
+    downgraded_count: int = 0
+
+
+class BatchScoreSimulation(BaseModel):
+    simulation_id: UUID = Field(default_factory=uuid4)
+    customer_count: int
+    baseline: ScenarioScoreSummary
+    scenarios: list[ScenarioScoreSummary] = []
+    customer_results: dict[str, dict[str, int]] = {}
+    simulation_date: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    created_by: str
+
+
 class CreditScoreStatistics(BaseModel):
     total_scores: int = 0
     average_score: float = 0.0
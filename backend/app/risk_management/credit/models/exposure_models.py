@@ -28,6 +28,9 @@ class CreditExposure(BaseModel):
     exposure_id: UUID = Field(default_factory=uuid4)
     customer_id: str
     customer_name: str
+    group_id: str | None = None
+    sector: str | None = None
+    country: str | None = None
     facility_id: UUID | None = None
     exposure_type: ExposureType
     exposure_category: ExposureCategory
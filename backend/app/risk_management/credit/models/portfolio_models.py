@@ -29,6 +29,8 @@ class ConcentrationRiskType(str, Enum):
     PRODUCT = "product"
     CUSTOMER = "customer"
     COLLATERAL = "collateral"
+    RATING = "rating"
+    VINTAGE = "vintage"
 
 
 class CreditPortfolio(BaseModel):
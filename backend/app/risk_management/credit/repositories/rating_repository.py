@@ -40,6 +40,9 @@ class RatingRepository:
             return self._ratings.get(rid)
         return None
 
+    async def find_all(self) -> list[CreditRating]:
+        return list(self._ratings.values())
+
     async def find_by_grade(self, grade: str) -> list[CreditRating]:
         return [r for r in self._ratings.values() if r.rating_grade == grade]
 
@@ -90,6 +93,13 @@ class RatingRepository:
     async def find_migrations_by_entity(self, entity_id: str) -> list[RatingMigration]:
         return [m for m in self._migrations if m.entity_id == entity_id]
 
+    async def find_migration_history(self) -> dict[str, list[RatingMigration]]:
+        """Migrations per entity in date order"""
+        history: dict[str, list[RatingMigration]] = {}
+        for migration in sorted(self._migrations, key=lambda m: m.migration_date):
+            history.setdefault(migration.entity_id, []).append(migration)
+        return history
+
     async def find_recent_migrations(self, days: int = 90) -> list[RatingMigration]:
         from datetime import timedelta
         cutoff = date.today() - timedelta(days=days)
@@ -6,7 +6,13 @@ from uuid import UUID
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 
-from ..models.credit_score_models import CreditScore, CreditScoreHistory, ScoreCategory, ScoreType
+from ..models.credit_score_models import (
+    BatchScoreSimulation,
+    CreditScore,
+    CreditScoreHistory,
+    ScoreCategory,
+    ScoreType,
+)
 from ..services.credit_score_service import credit_score_service
 
 router = APIRouter(prefix="/credit/scores", tags=["Credit Scores"])
@@ -29,6 +35,13 @@ class SimulateScoreRequest(BaseModel):
     created_by: str
 
 
+class BatchSimulateScoreRequest(BaseModel):
+    customers: list[dict[str, Any]]
+    scenarios: list[dict[str, Any]] = []
+    created_by: str
+    result_customer_ids: list[str] | None = None
+
+
 @router.post("/calculate", response_model=CreditScore)
 async def calculate_score(request: CalculateScoreRequest):
     """Calculate credit score for a customer"""
@@ -37,6 +50,26 @@ async def calculate_score(request: CalculateScoreRequest):
     )
 
 
+@router.post("/simulate/batch", response_model=BatchScoreSimulation)
+async def simulate_scores_batch(request: BatchSimulateScoreRequest):
+    """Score many customers under several scenarios and summarize the distributions"""
+    try:
+        return await credit_score_service.simulate_scores_batch(
+            request.customers, request.scenarios, request.created_by, request.result_customer_ids
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@router.get("/simulate/batch/{simulation_id}", response_model=BatchScoreSimulation)
+async def get_batch_simulation(simulation_id: UUID):
+    """Get a batch score simulation summary"""
+    simulation = await credit_score_service.get_batch_simulation(simulation_id)
+    if not simulation:
+        raise HTTPException(status_code=404, detail="Simulation not found")
+    return simulation
+
+
 @router.get("/{score_id}", response_model=CreditScore)
 async def get_score(score_id: UUID):
     """Get credit score by ID"""
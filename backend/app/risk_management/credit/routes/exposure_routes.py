@@ -19,6 +19,9 @@ class CreateExposureRequest(BaseModel):
     gross_exposure: float = Field(gt=0)
     limit_amount: float = Field(gt=0)
     collateral_value: float = Field(ge=0, default=0)
+    group_id: str | None = None
+    sector: str | None = None
+    country: str | None = None
 
 
 class UpdateExposureRequest(BaseModel):
@@ -58,7 +61,8 @@ async def create_exposure(request: CreateExposureRequest):
         request.customer_id, request.customer_name,
         request.exposure_type, request.exposure_category,
         request.gross_exposure, request.limit_amount,
-        request.collateral_value
+        request.collateral_value, request.group_id,
+        request.sector, request.country
     )
 
 
@@ -98,10 +102,13 @@ async def calculate_aggregate(request: AggregateRequest):
 @router.post("/limits", response_model=ExposureLimit)
 async def set_limit(request: SetLimitRequest):
     """Set an exposure limit"""
-    return await exposure_service.set_limit(
-        request.limit_type, request.limit_key, request.limit_name,
-        request.limit_amount, request.approved_by
-    )
+    try:
+        return await exposure_service.set_limit(
+            request.limit_type, request.limit_key, request.limit_name,
+            request.limit_amount, request.approved_by
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 @router.get("/limits/{limit_id}", response_model=ExposureLimit)
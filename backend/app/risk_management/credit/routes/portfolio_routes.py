@@ -54,6 +54,26 @@ class StressTestRequest(BaseModel):
     created_by: str
 
 
+class LoanRecord(BaseModel):
+    loan_id: str
+    obligor_id: str | None = None
+    ead: float
+    pd: float
+    lgd: float = 0.45
+    rating: str = "unknown"
+    sector: str = "unknown"
+    region: str = "unknown"
+    vintage: str = "unknown"
+
+
+class LoanBookRequest(BaseModel):
+    loans: list[LoanRecord]
+
+
+class ConcentrationLimitsRequest(BaseModel):
+    limit_percentages: dict[str, float] = {}
+
+
 class MigrationRequest(BaseModel):
     period_start: date
     period_end: date
@@ -115,6 +135,26 @@ async def assess_concentration(portfolio_id: UUID, request: ConcentrationRequest
     return concentration
 
 
+@router.post("/{portfolio_id}/loan-book", response_model=CreditPortfolio)
+async def load_loan_book(portfolio_id: UUID, request: LoanBookRequest):
+    """Load loan-level data and recompute portfolio EL/UL"""
+    portfolio = await portfolio_service.load_loan_book(
+        portfolio_id, [loan.model_dump() for loan in request.loans]
+    )
+    if not portfolio:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+    return portfolio
+
+
+@router.post("/{portfolio_id}/concentration/all")
+async def assess_all_concentrations(portfolio_id: UUID, request: ConcentrationLimitsRequest):
+    """Assess concentration across all loan-book dimensions"""
+    summary = await portfolio_service.assess_all_concentrations(portfolio_id, request.limit_percentages)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Portfolio or loan book not found")
+    return summary
+
+
 @router.get("/{portfolio_id}/concentration", response_model=list[ConcentrationRisk])
 async def get_concentrations(portfolio_id: UUID):
     """Get portfolio concentration risks"""
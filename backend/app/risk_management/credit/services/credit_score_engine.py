@@ -0,0 +1,164 @@
+"""Credit Score Engine - Weighted factor scoring over customer feature arrays and scenarios"""
+
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from ..models.credit_score_models import CreditScoreFactor, ScoreCategory
+
+SCORE_MIN = 300
+SCORE_MAX = 850
+# lower bounds of POOR, FAIR, GOOD and EXCELLENT; categories below run worst first
+CATEGORY_CUTOFFS = (580, 670, 740, 800)
+CATEGORIES = (
+    ScoreCategory.VERY_POOR, ScoreCategory.POOR, ScoreCategory.FAIR, ScoreCategory.GOOD, ScoreCategory.EXCELLENT,
+)
+# Raw feature value that maps to the top of each factor's 0-1 scale
+FEATURE_SCALES = {
+    "payment_history": 1.0,  # share of payments made on time
+    "credit_utilization": 1.0,  # used over available credit
+    "credit_history_length": 25.0,  # years
+}
+# Score points per simulated action, as applied by simulate_score
+ACTION_SCORE_CHANGES = {"pay_down_debt": 20, "close_account": -10}
+SCORE_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def score_categories(scores: np.ndarray) -> np.ndarray:
+    """Index into CATEGORIES for every score"""
+    return np.searchsorted(CATEGORY_CUTOFFS, scores, side="right")
+
+
+@dataclass
+class CustomerFeatures:
+    """Raw factor inputs as aligned columns, one per factor; NaN marks a missing value"""
+
+    customer_ids: list[str]
+    values: dict[str, np.ndarray]
+
+    @classmethod
+    def from_records(cls, customers: Sequence[Mapping[str, Any]], factors: Sequence[str]) -> "CustomerFeatures":
+        return cls(
+            customer_ids=[str(customer.get("customer_id", index)) for index, customer in enumerate(customers)],
+            values={
+                # None converts to NaN in a float64 array
+                name: np.array([customer.get(name) for customer in customers], dtype=np.float64)
+                for name in factors
+            },
+        )
+
+    def __len__(self) -> int:
+        return len(self.customer_ids)
+
+
+@dataclass
+class ScoreScenario:
+    """Feature shifts, in raw feature units, plus a flat score change from actions"""
+
+    name: str
+    shifts: dict[str, float] = field(default_factory=dict)
+    score_change: int = 0
+
+    @classmethod
+    def from_dict(cls, scenario: Mapping[str, Any], index: int = 0) -> "ScoreScenario":
+        """'action' or 'actions' name entries of ACTION_SCORE_CHANGES; a 'shifts' mapping
+        moves factor features, e.g. {"credit_utilization": -0.1}"""
+        actions = scenario.get("actions") or ([scenario["action"]] if scenario.get("action") else [])
+        return cls(
+            name=str(scenario.get("name") or scenario.get("action") or f"scenario_{index + 1}"),
+            shifts={name: float(value) for name, value in (scenario.get("shifts") or {}).items()},
+            score_change=sum(ACTION_SCORE_CHANGES.get(action, 0) for action in actions),
+        )
+
+
+@dataclass
+class BatchScoreResult:
+    """Integer scores, baseline first: row 0 is the unshifted baseline and row
+    i + 1 the scenario ``scenarios[i]``; columns follow the customers"""
+
+    scenarios: list[str]
+    scores: np.ndarray
+
+    def category_counts(self) -> np.ndarray:
+        """Customers per category for every row, categories worst first"""
+        rows = self.scores.shape[0]
+        codes = score_categories(self.scores) + np.arange(rows)[:, None] * len(CATEGORIES)
+        return np.bincount(codes.ravel(), minlength=rows * len(CATEGORIES)).reshape(rows, len(CATEGORIES))
+
+    def distribution(self) -> dict[str, np.ndarray]:
+        """Mean, standard deviation, extremes and percentiles of every row"""
+        scores = self.scores.astype(np.float64)
+        return {
+            "mean": scores.mean(axis=1),
+            "std_dev": scores.std(axis=1),
+            "min": scores.min(axis=1),
+            "max": scores.max(axis=1),
+            "percentiles": np.percentile(scores, SCORE_PERCENTILES, axis=1).T,
+        }
+
+    def category_moves(self) -> tuple[np.ndarray, np.ndarray]:
+        """Customers moving to a better and to a worse category than the baseline, per scenario"""
+        categories = score_categories(self.scores)
+        moves = categories[1:] - categories[0]
+        return (moves > 0).sum(axis=1), (moves < 0).sum(axis=1)
+
+
+class CreditScoreEngine:
+    """Scores every customer under a baseline and each scenario with the weighted
+    factor model: features are scaled to 0-1, negative-impact factors are
+    inverted, and the weighted average maps linearly onto SCORE_MIN-SCORE_MAX.
+    Missing features sit at the middle of their scale. Customers are processed
+    ``chunk_size`` at a time, all scenarios together, to bound memory."""
+
+    def __init__(self, factors: Mapping[str, CreditScoreFactor], chunk_size: int = 100_000):
+        self.factor_names = [name for name in factors if name in FEATURE_SCALES]
+        weights = np.array([abs(factors[name].impact_weight) for name in self.factor_names])
+        self._weights = weights / weights.sum()
+        self._negative = np.array([factors[name].impact_type == "negative" for name in self.factor_names])
+        self._scales = np.array([FEATURE_SCALES[name] for name in self.factor_names])
+        self.chunk_size = chunk_size
+
+    def features(self, customers: Sequence[Mapping[str, Any]]) -> CustomerFeatures:
+        return CustomerFeatures.from_records(customers, self.factor_names)
+
+    def scenarios(self, scenarios: Sequence[Mapping[str, Any]]) -> list[ScoreScenario]:
+        """Scenarios with names unique against each other and the baseline, a repeated
+        name taking its position as a suffix; shifts must name factors of the model"""
+        parsed, taken = [], {"baseline"}
+        for index, scenario in enumerate(scenarios):
+            parsed_scenario = ScoreScenario.from_dict(scenario, index)
+            unknown = sorted(set(parsed_scenario.shifts) - set(self.factor_names))
+            if unknown:
+                raise ValueError(
+                    f"Scenario '{parsed_scenario.name}' shifts unknown factors {', '.join(unknown)}; "
+                    f"expected any of {', '.join(self.factor_names)}"
+                )
+            name = parsed_scenario.name
+            while name in taken:
+                name = f"{name}_{index + 1}"
+            parsed_scenario.name = name
+            taken.add(name)
+            parsed.append(parsed_scenario)
+        return parsed
+
+    def score(self, features: CustomerFeatures, scenarios: Sequence[ScoreScenario]) -> BatchScoreResult:
+        # scenarios x factors shifts and per-scenario point changes, with the baseline as row 0
+        shifts = np.zeros((len(scenarios) + 1, len(self.factor_names)))
+        changes = np.zeros(len(scenarios) + 1)
+        for row, scenario in enumerate(scenarios, start=1):
+            changes[row] = scenario.score_change
+            for column, name in enumerate(self.factor_names):
+                shifts[row, column] = scenario.shifts.get(name, 0.0)
+
+        raw = np.column_stack([features.values[name] for name in self.factor_names])
+        scores = np.empty((len(scenarios) + 1, len(features)), dtype=np.int16)
+        for start in range(0, len(features), self.chunk_size):
+            chunk = raw[start:start + self.chunk_size]
+            scaled = np.clip((chunk[None, :, :] + shifts[:, None, :]) / self._scales, 0.0, 1.0)
+            scaled = np.where(np.isnan(scaled), 0.5, scaled)
+            scaled = np.where(self._negative, 1.0 - scaled, scaled)
+            points = SCORE_MIN + (SCORE_MAX - SCORE_MIN) * (scaled @ self._weights) + changes[:, None]
+            scores[:, start:start + self.chunk_size] = np.clip(np.rint(points), SCORE_MIN, SCORE_MAX)
+        return BatchScoreResult(scenarios=[scenario.name for scenario in scenarios], scores=scores)
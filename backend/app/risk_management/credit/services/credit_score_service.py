@@ -1,19 +1,30 @@
 """Credit Score Service - Credit scoring and assessment"""
 
+import asyncio
 from datetime import UTC, datetime, timedelta
 from typing import Any
 from uuid import UUID
 
 from ..models.credit_score_models import (
+    BatchScoreSimulation,
     CreditScore,
     CreditScoreFactor,
     CreditScoreHistory,
     CreditScoreRequest,
     CreditScoreStatistics,
+    ScenarioScoreSummary,
     ScoreCategory,
     ScoreSimulation,
     ScoreType,
 )
+from .credit_score_engine import (
+    ACTION_SCORE_CHANGES,
+    CATEGORIES,
+    SCORE_PERCENTILES,
+    BatchScoreResult,
+    CreditScoreEngine,
+    CustomerFeatures,
+)
 
 
 class CreditScoreService:
@@ -22,6 +33,7 @@ class CreditScoreService:
         self._customer_scores: dict[str, list[UUID]] = {}
         self._requests: dict[UUID, CreditScoreRequest] = {}
         self._score_factors = self._initialize_factors()
+        self._batch_simulations: dict[UUID, BatchScoreSimulation] = {}
 
     def _initialize_factors(self) -> dict[str, CreditScoreFactor]:
         return {
@@ -132,12 +144,7 @@ class CreditScoreService:
         current_value = current_score.score_value if current_score else 700
 
         # Simulate impact
-        simulated_change = 0
-        for scenario in scenarios:
-            if scenario.get("action") == "pay_down_debt":
-                simulated_change += 20
-            elif scenario.get("action") == "close_account":
-                simulated_change -= 10
+        simulated_change = sum(ACTION_SCORE_CHANGES.get(scenario.get("action"), 0) for scenario in scenarios)
 
         simulated_value = min(850, max(300, current_value + simulated_change))
 
@@ -150,6 +157,78 @@ class CreditScoreService:
             created_by=created_by
         )
 
+    async def simulate_scores_batch(
+        self,
+        customers: list[dict[str, Any]],
+        scenarios: list[dict[str, Any]],
+        created_by: str,
+        result_customer_ids: list[str] | None = None,
+        chunk_size: int = 100_000
+    ) -> BatchScoreSimulation:
+        """Score every customer's factor features under a baseline and each scenario.
+        Only the score distributions and the scores of ``result_customer_ids`` are kept."""
+        engine = CreditScoreEngine(self._score_factors, chunk_size=chunk_size)
+        # CPU-bound; run off the event loop
+        features, result, summaries = await asyncio.to_thread(self._score_batch, engine, customers, scenarios)
+
+        customer_results = {}
+        if result_customer_ids:
+            positions = {customer_id: index for index, customer_id in enumerate(features.customer_ids)}
+            names = ["baseline", *result.scenarios]
+            for customer_id in result_customer_ids:
+                if customer_id in positions:
+                    column = result.scores[:, positions[customer_id]].tolist()
+                    customer_results[customer_id] = dict(zip(names, column, strict=True))
+
+        simulation = BatchScoreSimulation(
+            customer_count=len(features),
+            baseline=summaries[0],
+            scenarios=summaries[1:],
+            customer_results=customer_results,
+            created_by=created_by
+        )
+        self._batch_simulations[simulation.simulation_id] = simulation
+        return simulation
+
+    def _score_batch(
+        self, engine: CreditScoreEngine, customers: list[dict[str, Any]], scenarios: list[dict[str, Any]]
+    ) -> tuple[CustomerFeatures, BatchScoreResult, list[ScenarioScoreSummary]]:
+        score_scenarios = engine.scenarios(scenarios)
+        features = engine.features(customers)
+        result = engine.score(features, score_scenarios)
+        return features, result, self._summarize_batch(result)
+
+    def _summarize_batch(self, result: BatchScoreResult) -> list[ScenarioScoreSummary]:
+        if not result.scores.shape[1]:
+            raise ValueError("No customers to score")
+
+        distribution = result.distribution()
+        counts = result.category_counts()
+        upgraded, downgraded = result.category_moves()
+        summaries = []
+        for row, name in enumerate(["baseline", *result.scenarios]):
+            summaries.append(ScenarioScoreSummary(
+                scenario=name,
+                mean_score=float(distribution["mean"][row]),
+                std_dev=float(distribution["std_dev"][row]),
+                min_score=int(distribution["min"][row]),
+                max_score=int(distribution["max"][row]),
+                percentiles={
+                    f"p{percentile}": float(value)
+                    for percentile, value in zip(SCORE_PERCENTILES, distribution["percentiles"][row], strict=True)
+                },
+                category_counts={
+                    category.value: int(count) for category, count in zip(CATEGORIES, counts[row], strict=True)
+                },
+                mean_score_change=float(distribution["mean"][row] - distribution["mean"][0]),
+                upgraded_count=int(upgraded[row - 1]) if row else 0,
+                downgraded_count=int(downgraded[row - 1]) if row else 0
+            ))
+        return summaries
+
+    async def get_batch_simulation(self, simulation_id: UUID) -> BatchScoreSimulation | None:
+        return self._batch_simulations.get(simulation_id)
+
     async def get_statistics(self) -> CreditScoreStatistics:
         stats = CreditScoreStatistics(total_scores=len(self._scores))
         for score in self._scores.values():
@@ -0,0 +1,87 @@
+"""Exposure Index - Running exposure totals per customer, group, sector, country and product"""
+
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from uuid import UUID
+
+from ..models.exposure_models import CreditExposure
+
+AGGREGATION_LEVELS = ("customer", "group", "sector", "country", "product")
+# limit and aggregation names that are measured on another level
+LEVEL_ALIASES = {"industry": "sector", "counterparty": "customer"}
+
+
+@dataclass
+class ExposureTotals:
+    gross_exposure: float = 0.0
+    net_exposure: float = 0.0
+    ead: float = 0.0
+    rwa: float = 0.0
+    expected_loss: float = 0.0
+    count: int = 0
+
+    def apply(self, exposure: CreditExposure, sign: int) -> None:
+        self.gross_exposure += sign * exposure.gross_exposure
+        self.net_exposure += sign * exposure.net_exposure
+        self.ead += sign * exposure.exposure_at_default
+        self.rwa += sign * exposure.risk_weighted_assets
+        self.expected_loss += sign * exposure.expected_loss
+        self.count += sign
+
+
+def aggregation_keys(exposure: CreditExposure) -> Iterator[tuple[str, str]]:
+    yield "customer", exposure.customer_id
+    # a counterparty's exposure rolls up into its group of connected clients
+    if exposure.group_id:
+        yield "group", exposure.group_id
+    if exposure.sector:
+        yield "sector", exposure.sector
+    if exposure.country:
+        yield "country", exposure.country
+    yield "product", exposure.exposure_category.value
+
+
+class ExposureIndex:
+    """Totals per level and key, kept current by removing an exposure's old
+    contribution and adding its new one whenever it changes, so lookups never
+    rescan exposures. Listeners are called with every (level, key, gross
+    exposure) that moved."""
+
+    def __init__(self):
+        self._totals: dict[str, dict[str, ExposureTotals]] = {level: {} for level in AGGREGATION_LEVELS}
+        self._members: dict[tuple[str, str], set[UUID]] = {}
+        self._listeners: list[Callable[[str, str, float], None]] = []
+
+    def subscribe(self, listener: Callable[[str, str, float], None]) -> None:
+        self._listeners.append(listener)
+
+    def add(self, exposure: CreditExposure) -> None:
+        self._apply(exposure, 1)
+
+    def remove(self, exposure: CreditExposure) -> None:
+        self._apply(exposure, -1)
+
+    def _apply(self, exposure: CreditExposure, sign: int) -> None:
+        for level, key in aggregation_keys(exposure):
+            totals = self._totals[level].setdefault(key, ExposureTotals())
+            totals.apply(exposure, sign)
+            members = self._members.setdefault((level, key), set())
+            if sign > 0:
+                members.add(exposure.exposure_id)
+            else:
+                members.discard(exposure.exposure_id)
+                if not members:
+                    del self._members[level, key]
+                    del self._totals[level][key]
+            gross = totals.gross_exposure if members else 0.0
+            for listener in self._listeners:
+                listener(level, key, gross)
+
+    def totals(self, level: str, key: str) -> ExposureTotals:
+        return self.level(level).get(key) or ExposureTotals()
+
+    def members(self, level: str, key: str) -> set[UUID]:
+        return self._members.get((LEVEL_ALIASES.get(level, level), key), set())
+
+    def level(self, level: str) -> dict[str, ExposureTotals]:
+        return self._totals.get(LEVEL_ALIASES.get(level, level), {})
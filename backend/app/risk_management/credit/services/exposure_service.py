@@ -15,6 +15,10 @@ from ..models.exposure_models import (
     ExposureType,
     LargeExposure,
 )
+from .exposure_index import AGGREGATION_LEVELS, LEVEL_ALIASES, ExposureIndex
+
+LARGE_EXPOSURE_THRESHOLD = 10
+LARGE_EXPOSURE_LIMIT = 25
 
 
 class ExposureService:
@@ -25,12 +29,17 @@ class ExposureService:
         self._large_exposures: dict[UUID, LargeExposure] = {}
         self._counterparties: dict[UUID, CounterpartyExposure] = {}
         self._movements: list[ExposureMovement] = []
+        self._index = ExposureIndex()
+        self._index.subscribe(self._refresh_limits)
+        self._limit_keys: dict[tuple[str, str], set[UUID]] = {}
+        self._customer_groups: dict[str, str] = {}
 
     async def create_exposure(
         self, customer_id: str, customer_name: str,
         exposure_type: ExposureType, exposure_category: ExposureCategory,
         gross_exposure: float, limit_amount: float,
-        collateral_value: float = 0.0
+        collateral_value: float = 0.0, group_id: str | None = None,
+        sector: str | None = None, country: str | None = None
     ) -> CreditExposure:
         net_exposure = max(0, gross_exposure - collateral_value)
         ccf = 1.0 if exposure_type == ExposureType.FUNDED else 0.5
@@ -40,6 +49,9 @@ class ExposureService:
         exposure = CreditExposure(
             customer_id=customer_id,
             customer_name=customer_name,
+            group_id=group_id,
+            sector=sector,
+            country=country,
             exposure_type=exposure_type,
             exposure_category=exposure_category,
             gross_exposure=gross_exposure,
@@ -55,8 +67,25 @@ class ExposureService:
             expected_loss=ead * 0.02 * 0.45
         )
         self._exposures[exposure.exposure_id] = exposure
+        self._index_exposure(exposure)
         return exposure
 
+    def _index_exposure(self, exposure: CreditExposure) -> None:
+        self._index.add(exposure)
+        self._refresh_customer_group(exposure.customer_id, exposure.group_id)
+
+    def _refresh_customer_group(self, customer_id: str, preferred: str | None = None) -> None:
+        """Point the customer at its group of connected clients: the preferred one,
+        else one still carried by another of its exposures, else none"""
+        groups = sorted(
+            {self._exposures[eid].group_id for eid in self._index.members("customer", customer_id)} - {None}
+        )
+        group_id = preferred or (groups[0] if groups else None)
+        if group_id:
+            self._customer_groups[customer_id] = group_id
+        else:
+            self._customer_groups.pop(customer_id, None)
+
     async def get_exposure(self, exposure_id: UUID) -> CreditExposure | None:
         return self._exposures.get(exposure_id)
 
@@ -65,41 +94,42 @@ class ExposureService:
     ) -> CreditExposure | None:
         exposure = self._exposures.get(exposure_id)
         if exposure:
+            previous_customer = exposure.customer_id
+            self._index.remove(exposure)
             for key, value in updates.items():
                 if hasattr(exposure, key):
                     setattr(exposure, key, value)
             exposure.updated_at = datetime.now(UTC)
+            self._index_exposure(exposure)
+            if previous_customer != exposure.customer_id:
+                self._refresh_customer_group(previous_customer)
         return exposure
 
     async def get_customer_exposures(self, customer_id: str) -> list[CreditExposure]:
-        return [e for e in self._exposures.values() if e.customer_id == customer_id]
+        return [self._exposures[eid] for eid in self._index.members("customer", customer_id)]
 
     async def calculate_aggregate(
         self, aggregation_level: str, aggregation_key: str, aggregation_name: str
     ) -> ExposureAggregate:
-        # Filter exposures by aggregation criteria
-        filtered_exposures = [
-            e for e in self._exposures.values()
-            if (aggregation_level == "customer" and e.customer_id == aggregation_key)
-        ]
-
-        total_gross = sum(e.gross_exposure for e in filtered_exposures)
-        total_net = sum(e.net_exposure for e in filtered_exposures)
-        total_ead = sum(e.exposure_at_default for e in filtered_exposures)
-        total_rwa = sum(e.risk_weighted_assets for e in filtered_exposures)
+        totals = self._index.totals(aggregation_level, aggregation_key)
+        limit_ids = self._limit_keys.get((LEVEL_ALIASES.get(aggregation_level, aggregation_level), aggregation_key))
+        # the tightest limit on the key is the binding one
+        limit = min((self._limits[limit_id] for limit_id in limit_ids), key=lambda l: l.limit_amount) if limit_ids else None
 
         aggregate = ExposureAggregate(
             aggregation_level=aggregation_level,
             aggregation_key=aggregation_key,
             aggregation_name=aggregation_name,
-            total_gross_exposure=total_gross,
-            total_net_exposure=total_net,
-            total_ead=total_ead,
-            total_rwa=total_rwa,
-            number_of_exposures=len(filtered_exposures),
+            total_gross_exposure=totals.gross_exposure,
+            total_net_exposure=totals.net_exposure,
+            total_ead=totals.ead,
+            total_rwa=totals.rwa,
+            number_of_exposures=totals.count,
             weighted_average_pd=0.02,
             weighted_average_lgd=0.45,
-            expected_loss=total_ead * 0.02 * 0.45
+            expected_loss=totals.expected_loss,
+            limit_amount=limit.limit_amount if limit else None,
+            limit_utilization=limit.utilization_percentage if limit else 0.0
         )
         self._aggregates[aggregate.aggregate_id] = aggregate
         return aggregate
@@ -108,10 +138,12 @@ class ExposureService:
         self, limit_type: str, limit_key: str, limit_name: str,
         limit_amount: float, approved_by: str
     ) -> ExposureLimit:
-        current_exposure = sum(
-            e.gross_exposure for e in self._exposures.values()
-            if e.customer_id == limit_key
-        )
+        level = LEVEL_ALIASES.get(limit_type, limit_type)
+        if level not in AGGREGATION_LEVELS:
+            raise ValueError(
+                f"Unknown limit type '{limit_type}'; expected one of {', '.join(AGGREGATION_LEVELS + tuple(LEVEL_ALIASES))}"
+            )
+        current_exposure = self._index.totals(level, limit_key).gross_exposure
         utilization = (current_exposure / limit_amount * 100) if limit_amount > 0 else 0
 
         limit = ExposureLimit(
@@ -128,8 +160,18 @@ class ExposureService:
             approved_date=datetime.now(UTC)
         )
         self._limits[limit.limit_id] = limit
+        self._limit_keys.setdefault((level, limit_key), set()).add(limit.limit_id)
         return limit
 
+    def _refresh_limits(self, level: str, key: str, current_exposure: float) -> None:
+        for limit_id in self._limit_keys.get((level, key), ()):
+            limit = self._limits[limit_id]
+            utilization = (current_exposure / limit.limit_amount * 100) if limit.limit_amount > 0 else 0
+            limit.current_exposure = current_exposure
+            limit.available_amount = max(0, limit.limit_amount - current_exposure)
+            limit.utilization_percentage = utilization
+            limit.status = "breach" if utilization >= 100 else ("warning" if utilization >= 80 else "active")
+
     async def get_limit(self, limit_id: UUID) -> ExposureLimit | None:
         return self._limits.get(limit_id)
 
@@ -146,6 +188,20 @@ class ExposureService:
                 "available": limit.available_amount,
                 "proposed": proposed_exposure
             }
+
+        # new exposure to a counterparty also draws on its group's limits
+        group_id = self._customer_groups.get(limit.limit_key) if LEVEL_ALIASES.get(limit.limit_type, limit.limit_type) == "customer" else None
+        for group_limit_id in self._limit_keys.get(("group", group_id), ()) if group_id else ():
+            group_limit = self._limits[group_limit_id]
+            if group_limit.current_exposure + proposed_exposure >= group_limit.limit_amount:
+                return {
+                    "allowed": False,
+                    "reason": "Would breach group limit",
+                    "group_id": group_id,
+                    "available": group_limit.available_amount,
+                    "proposed": proposed_exposure
+                }
+
         return {
             "allowed": True,
             "new_utilization": new_utilization,
@@ -153,24 +209,30 @@ class ExposureService:
         }
 
     async def identify_large_exposures(self, capital_base: float) -> list[LargeExposure]:
+        """Customers and groups of connected clients at or above 10% of capital,
+        read from the running totals"""
         large_exposures = []
-        customer_exposures: dict[str, float] = {}
-
-        for exposure in self._exposures.values():
-            customer_exposures[exposure.customer_id] = customer_exposures.get(
-                exposure.customer_id, 0
-            ) + exposure.gross_exposure
+        threshold = capital_base * LARGE_EXPOSURE_THRESHOLD / 100
 
-        for customer_id, total_exposure in customer_exposures.items():
-            pct_of_capital = (total_exposure / capital_base * 100) if capital_base > 0 else 0
-            if pct_of_capital >= 10:  # Large exposure threshold
+        for level in ("customer", "group"):
+            for key, totals in self._index.level(level).items():
+                total_exposure = totals.gross_exposure
+                if capital_base <= 0 or total_exposure < threshold:
+                    continue
+                pct_of_capital = total_exposure / capital_base * 100
+                group_id = key if level == "group" else self._customer_groups.get(key)
                 large_exp = LargeExposure(
-                    customer_id=customer_id,
-                    customer_name=customer_id,
+                    customer_id=key,
+                    customer_name=key,
+                    group_id=group_id,
+                    group_name=group_id,
                     total_exposure=total_exposure,
                     exposure_as_percentage_of_capital=pct_of_capital,
-                    breach_status=pct_of_capital > 25,
-                    breach_amount=total_exposure - (capital_base * 0.25) if pct_of_capital > 25 else None,
+                    breach_status=pct_of_capital > LARGE_EXPOSURE_LIMIT,
+                    breach_amount=(
+                        total_exposure - (capital_base * LARGE_EXPOSURE_LIMIT / 100)
+                        if pct_of_capital > LARGE_EXPOSURE_LIMIT else None
+                    ),
                     reporting_date=date.today()
                 )
                 large_exposures.append(large_exp)
@@ -196,8 +258,26 @@ class ExposureService:
             change_reason=change_reason
         )
         self._movements.append(movement)
+
+        self._index.remove(exposure)
+        self._set_gross_exposure(exposure, movement.new_exposure)
+        self._index_exposure(exposure)
         return movement
 
+    def _set_gross_exposure(self, exposure: CreditExposure, gross_exposure: float) -> None:
+        exposure.gross_exposure = gross_exposure
+        exposure.net_exposure = max(0, gross_exposure - exposure.collateral_value)
+        exposure.exposure_at_default = gross_exposure * exposure.credit_conversion_factor
+        if exposure.exposure_type == ExposureType.FUNDED:
+            exposure.drawn_amount = gross_exposure
+        exposure.undrawn_amount = exposure.limit_amount - gross_exposure
+        exposure.limit_utilization = (
+            (gross_exposure / exposure.limit_amount * 100) if exposure.limit_amount > 0 else 0
+        )
+        exposure.risk_weighted_assets = exposure.exposure_at_default * 1.0
+        exposure.expected_loss = exposure.exposure_at_default * 0.02 * 0.45
+        exposure.updated_at = datetime.now(UTC)
+
     async def get_statistics(self) -> ExposureStatistics:
         stats = ExposureStatistics(
             total_gross_exposure=sum(e.gross_exposure for e in self._exposures.values()),
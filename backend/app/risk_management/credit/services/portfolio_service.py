@@ -1,9 +1,12 @@
 """Portfolio Service - Credit portfolio risk management"""
 
+from bisect import bisect_right
 from datetime import UTC, date, datetime
 from typing import Any
 from uuid import UUID
 
+import numpy as np
+
 from ..models.portfolio_models import (
     ConcentrationRisk,
     ConcentrationRiskType,
@@ -15,6 +18,24 @@ from ..models.portfolio_models import (
     PortfolioType,
     VintageAnalysis,
 )
+from ..models.rating_models import CreditRating, RatingMigration
+from ..repositories.rating_repository import rating_repository
+from .credit_portfolio_engine import (
+    DEFAULT_GRADES,
+    CreditPortfolioEngine,
+    LoanBook,
+    LoanRisk,
+    StressScenario,
+    rating_rank,
+)
+
+# Loan-book dimensions reported as concentration risks
+CONCENTRATION_DIMENSIONS = {
+    "sector": ConcentrationRiskType.INDUSTRY,
+    "region": ConcentrationRiskType.GEOGRAPHIC,
+    "rating": ConcentrationRiskType.RATING,
+    "vintage": ConcentrationRiskType.VINTAGE,
+}
 
 
 class PortfolioService:
@@ -25,6 +46,8 @@ class PortfolioService:
         self._migrations: dict[UUID, PortfolioMigration] = {}
         self._stress_tests: dict[UUID, PortfolioStressTest] = {}
         self._vintages: dict[UUID, VintageAnalysis] = {}
+        self._books: dict[UUID, tuple[LoanBook, LoanRisk]] = {}
+        self.engine = CreditPortfolioEngine()
 
     async def create_portfolio(
         self, name: str, portfolio_type: PortfolioType,
@@ -53,6 +76,30 @@ class PortfolioService:
             portfolio.updated_at = datetime.now(UTC)
         return portfolio
 
+    async def load_loan_book(
+        self, portfolio_id: UUID, loans: list[dict[str, Any]] | LoanBook
+    ) -> CreditPortfolio | None:
+        """Attach loan-level data (ead, pd, lgd, rating, sector, region, vintage) and
+        derive the portfolio's exposure, EL and ASRF unexpected loss from it"""
+        portfolio = self._portfolios.get(portfolio_id)
+        if not portfolio:
+            return None
+
+        book = loans if isinstance(loans, LoanBook) else LoanBook.from_records(loans)
+        risk = self.engine.risk(book)
+        self._books[portfolio_id] = (book, risk)
+
+        portfolio.total_exposure = float(book.ead.sum())
+        portfolio.number_of_accounts = len(book)
+        portfolio.weighted_average_pd = book.weighted_average(book.pd)
+        portfolio.weighted_average_lgd = book.weighted_average(book.lgd)
+        portfolio.expected_loss = risk.total_expected_loss
+        portfolio.unexpected_loss = risk.total_unexpected_loss
+        portfolio.economic_capital = risk.total_unexpected_loss
+        portfolio.risk_weighted_assets = risk.total_unexpected_loss * 12.5
+        portfolio.updated_at = datetime.now(UTC)
+        return portfolio
+
     async def add_segment(
         self, portfolio_id: UUID, segment_name: str,
         segment_type: str, exposure_amount: float
@@ -105,37 +152,119 @@ class PortfolioService:
         self._concentrations[concentration.concentration_id] = concentration
         return concentration
 
+    async def assess_all_concentrations(
+        self, portfolio_id: UUID, limit_percentages: dict[str, float] | None = None
+    ) -> dict[str, Any] | None:
+        """Concentration of every loan-book dimension from one grouped pass, with
+        the Herfindahl-Hirschman index of each dimension's EAD shares"""
+        portfolio = self._portfolios.get(portfolio_id)
+        loaded = self._books.get(portfolio_id)
+        if not portfolio or not loaded:
+            return None
+
+        book, risk = loaded
+        limit_percentages = limit_percentages or {}
+        total = float(book.ead.sum())
+        summary = {}
+        for dimension, grouped in self.engine.concentrations(book, risk).items():
+            limit = limit_percentages.get(dimension)
+            percentages = grouped.shares * 100
+            for value, exposure, pct in zip(grouped.values, grouped.ead.tolist(), percentages.tolist(), strict=True):
+                breach = limit is not None and pct > limit
+                concentration = ConcentrationRisk(
+                    portfolio_id=portfolio_id,
+                    concentration_type=CONCENTRATION_DIMENSIONS[dimension],
+                    dimension_name=dimension,
+                    dimension_value=value,
+                    exposure_amount=exposure,
+                    exposure_percentage=pct,
+                    limit_percentage=limit,
+                    breach_status=breach,
+                    breach_amount=exposure - total * limit / 100 if breach else None,
+                    risk_score=min(100, pct * 2)
+                )
+                self._concentrations[concentration.concentration_id] = concentration
+            summary[dimension] = {
+                "hhi": grouped.hhi,
+                "effective_number": 1 / grouped.hhi if grouped.hhi > 0 else 0.0,
+                "largest_share": float(percentages.max()) if percentages.size else 0.0,
+                "exposure": dict(zip(grouped.values, grouped.ead.tolist(), strict=True)),
+                "expected_loss": dict(zip(grouped.values, grouped.expected_loss.tolist(), strict=True)),
+                "unexpected_loss": dict(zip(grouped.values, grouped.unexpected_loss.tolist(), strict=True)),
+            }
+        return summary
+
     async def get_concentration_risks(self, portfolio_id: UUID) -> list[ConcentrationRisk]:
         return [c for c in self._concentrations.values() if c.portfolio_id == portfolio_id]
 
     async def calculate_migration_matrix(
         self, portfolio_id: UUID, period_start: date, period_end: date
     ) -> PortfolioMigration | None:
+        """Cohort migration over the obligors of the portfolio's loan book. Until a
+        loan book carrying obligor ids is loaded, the cohort is every rated entity,
+        i.e. a bank-wide matrix."""
         portfolio = self._portfolios.get(portfolio_id)
         if not portfolio:
             return None
 
-        # Sample migration matrix
-        migration_matrix = {
-            "AAA": {"AAA": 0.90, "AA": 0.08, "A": 0.02},
-            "AA": {"AAA": 0.02, "AA": 0.88, "A": 0.08, "BBB": 0.02},
-            "A": {"AA": 0.03, "A": 0.87, "BBB": 0.08, "BB": 0.02},
-            "BBB": {"A": 0.02, "BBB": 0.85, "BB": 0.10, "B": 0.03},
-        }
+        loaded = self._books.get(portfolio_id)
+        obligors = loaded[0].obligors if loaded else set()
+        history = await rating_repository.find_migration_history()
+        start_ratings, end_ratings = [], []
+        for entity_id, first_rated in self._first_rating_dates(await rating_repository.find_all()).items():
+            if obligors and entity_id not in obligors:
+                continue
+            if first_rated > period_start:
+                continue
+            current = await rating_repository.find_by_entity(entity_id)
+            migrations = history.get(entity_id, [])
+            start_rating = self._rating_at(migrations, period_start, current.rating_grade)
+            if start_rating in DEFAULT_GRADES:
+                continue
+            start_ratings.append(start_rating)
+            end_ratings.append(self._rating_at(migrations, period_end, current.rating_grade))
+
+        grades, matrix = self.engine.migration_matrix(start_ratings, end_ratings)
+        start_rank = np.array([rating_rank(r) for r in start_ratings])
+        end_rank = np.array([rating_rank(r) for r in end_ratings])
+        defaulted = np.array([r in DEFAULT_GRADES for r in end_ratings], dtype=bool)
+        cohort = max(len(start_ratings), 1)
+        ranked = np.isfinite(start_rank) & np.isfinite(end_rank)
 
         migration = PortfolioMigration(
             portfolio_id=portfolio_id,
             period_start=period_start,
             period_end=period_end,
-            migration_matrix=migration_matrix,
-            upgrade_rate=0.05,
-            downgrade_rate=0.12,
-            stable_rate=0.82,
-            default_rate=0.01
+            migration_matrix={
+                from_grade: {to_grade: float(p) for to_grade, p in zip(grades, row, strict=True) if p > 0}
+                for from_grade, row in zip(grades, matrix, strict=True)
+                if row.any()
+            },
+            upgrade_rate=float((end_rank < start_rank).sum()) / cohort,
+            downgrade_rate=float(((end_rank > start_rank) & ~defaulted).sum()) / cohort,
+            stable_rate=float((end_rank == start_rank).sum()) / cohort,
+            default_rate=float(defaulted.sum()) / cohort,
+            average_migration_distance=float(np.abs(end_rank - start_rank)[ranked].mean()) if ranked.any() else 0.0
         )
         self._migrations[migration.migration_id] = migration
         return migration
 
+    @staticmethod
+    def _first_rating_dates(ratings: list[CreditRating]) -> dict[str, date]:
+        first: dict[str, date] = {}
+        for rating in ratings:
+            if rating.entity_id not in first or rating.rating_date < first[rating.entity_id]:
+                first[rating.entity_id] = rating.rating_date
+        return first
+
+    @staticmethod
+    def _rating_at(migrations: list[RatingMigration], as_of: date, current: str) -> str:
+        """Grade held on a date, replayed from the entity's date-ordered migrations"""
+        position = bisect_right(migrations, as_of, key=lambda m: m.migration_date)
+        if position:
+            return migrations[position - 1].to_rating
+        return migrations[0].from_rating if migrations else current
+
     async def run_stress_test(
         self, portfolio_id: UUID, scenario_name: str, scenario_type: str,
         economic_assumptions: dict[str, float], created_by: str
@@ -144,11 +273,27 @@ class PortfolioService:
         if not portfolio:
             return None
 
-        # Calculate stressed parameters
-        stress_multiplier = 2.0 if scenario_type == "severely_adverse" else (1.5 if scenario_type == "adverse" else 1.0)
-        stressed_pd = portfolio.weighted_average_pd * stress_multiplier
-        stressed_lgd = min(1.0, portfolio.weighted_average_lgd * 1.2)
-        stressed_el = portfolio.total_exposure * stressed_pd * stressed_lgd
+        loaded = self._books.get(portfolio_id)
+        if loaded:
+            book, base = loaded
+            stressed_pd, stressed_lgd = self.engine.stressed_parameters(
+                book, StressScenario.from_assumptions(scenario_type, economic_assumptions)
+            )
+            stressed = self.engine.risk(book, stressed_pd, stressed_lgd)
+            stressed_el = stressed.total_expected_loss
+            stressed_ul = stressed.total_unexpected_loss
+            base_el = base.total_expected_loss
+            capital_impact = stressed_ul - base.total_unexpected_loss
+            stressed_pd_average = book.weighted_average(stressed_pd)
+            stressed_lgd_average = book.weighted_average(stressed_lgd)
+        else:
+            stress_multiplier = 2.0 if scenario_type == "severely_adverse" else (1.5 if scenario_type == "adverse" else 1.0)
+            stressed_pd_average = portfolio.weighted_average_pd * stress_multiplier
+            stressed_lgd_average = min(1.0, portfolio.weighted_average_lgd * 1.2)
+            stressed_el = portfolio.total_exposure * stressed_pd_average * stressed_lgd_average
+            stressed_ul = stressed_el * 2.5
+            base_el = portfolio.expected_loss
+            capital_impact = stressed_el * 0.08
 
         stress_test = PortfolioStressTest(
             portfolio_id=portfolio_id,
@@ -156,13 +301,13 @@ class PortfolioService:
             scenario_description=f"{scenario_type} economic scenario",
             scenario_type=scenario_type,
             economic_assumptions=economic_assumptions,
-            stressed_pd=stressed_pd,
-            stressed_lgd=stressed_lgd,
+            stressed_pd=stressed_pd_average,
+            stressed_lgd=stressed_lgd_average,
             stressed_ead=portfolio.total_exposure,
             stressed_expected_loss=stressed_el,
-            stressed_unexpected_loss=stressed_el * 2.5,
-            loss_increase_percentage=((stressed_el - portfolio.expected_loss) / portfolio.expected_loss * 100) if portfolio.expected_loss > 0 else 0,
-            capital_impact=stressed_el * 0.08,
+            stressed_unexpected_loss=stressed_ul,
+            loss_increase_percentage=((stressed_el - base_el) / base_el * 100) if base_el > 0 else 0,
+            capital_impact=capital_impact,
             created_by=created_by
         )
         self._stress_tests[stress_test.stress_test_id] = stress_test
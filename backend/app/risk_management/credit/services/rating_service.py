@@ -15,6 +15,7 @@ from ..models.rating_models import (
     RatingStatistics,
     RatingType,
 )
+from ..repositories.rating_repository import rating_repository
 
 
 class RatingService:
@@ -121,6 +122,7 @@ class RatingService:
 
         self._ratings[rating.rating_id] = rating
         self._entity_ratings[entity_id] = rating.rating_id
+        await rating_repository.save(rating)
 
         # Record migration if applicable
         if previous_rating and previous_rating != rating_grade:
@@ -151,6 +153,7 @@ class RatingService:
             new_pd=self._get_pd_for_grade(to_rating)
         )
         self._migrations.append(migration)
+        await rating_repository.save_migration(migration)
         return migration
 
     async def get_rating(self, rating_id: UUID) -> CreditRating | None:
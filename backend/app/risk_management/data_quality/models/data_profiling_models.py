@@ -50,6 +50,12 @@ class ColumnProfile(BaseModel):
     pattern_analysis: dict[str, int] = Field(default_factory=dict)
     top_values: list[dict[str, Any]] = Field(default_factory=list)
     data_quality_score: Decimal = Decimal("100")
+    is_approximate: bool = False
+    sample_size: int | None = None
+    null_percentage_lower: Decimal | None = None
+    null_percentage_upper: Decimal | None = None
+    avg_value_lower: Decimal | None = None
+    avg_value_upper: Decimal | None = None
 
 
 class DataDistribution(BaseModel):
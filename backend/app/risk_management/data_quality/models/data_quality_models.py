@@ -58,6 +58,10 @@ class DataQualityCheck(BaseModel):
     error_samples: list[dict[str, Any]] = Field(default_factory=list)
     check_query: str = ""
     environment: str = "production"
+    is_approximate: bool = False
+    sample_size: int | None = None
+    pass_percentage_lower: Decimal | None = None
+    pass_percentage_upper: Decimal | None = None
 
 
 class DataQualityScore(BaseModel):
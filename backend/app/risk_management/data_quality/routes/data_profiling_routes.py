@@ -32,6 +32,16 @@ class AddColumnProfileRequest(BaseModel):
     avg_value: Decimal | None = None
 
 
+class ProfileColumnValuesRequest(BaseModel):
+    profile_id: UUID
+    column_name: str
+    values: list[Any]
+    nullable: bool = True
+    primary_key: bool = False
+    approximate: bool = False
+    sample_size: int = 10_000
+
+
 class RecordDistributionRequest(BaseModel):
     column_profile_id: UUID
     distribution_type: str
@@ -134,6 +144,26 @@ async def add_column_profile(request: AddColumnProfileRequest):
     return {"status": "created", "column_profile_id": str(column_profile.column_profile_id)}
 
 
+@router.post("/column-profiles/values")
+async def profile_column_values(request: ProfileColumnValuesRequest):
+    column_profile = await data_profiling_service.profile_column_values(
+        profile_id=request.profile_id,
+        column_name=request.column_name,
+        values=request.values,
+        approximate=request.approximate,
+        sample_size=request.sample_size,
+        nullable=request.nullable,
+        primary_key=request.primary_key,
+    )
+    return {
+        "status": "created",
+        "column_profile_id": str(column_profile.column_profile_id),
+        "distinct_count": column_profile.distinct_count,
+        "null_count": column_profile.null_count,
+        "is_approximate": column_profile.is_approximate,
+    }
+
+
 @router.get("/column-profiles")
 async def get_all_column_profiles():
     profiles = await data_profiling_service.repository.find_all_column_profiles()
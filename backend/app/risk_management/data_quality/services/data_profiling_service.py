@@ -1,7 +1,12 @@
 """Data Profiling Service"""
 
+import math
+import random
+from collections import Counter
+from collections.abc import Iterable
 from datetime import UTC, datetime
 from decimal import Decimal
+from statistics import NormalDist
 from typing import Any
 from uuid import UUID
 
@@ -14,6 +19,8 @@ from ..models.data_profiling_models import (
     ProfilingJob,
 )
 from ..repositories.data_profiling_repository import data_profiling_repository
+from ..utils.data_profiling_utils import ColumnStatistics, StreamingColumnProfiler
+from ..utils.data_sampling import estimate_distinct, reservoir, wilson_interval
 
 
 class DataProfilingService:
@@ -56,6 +63,78 @@ class DataProfilingService:
         await self.repository.save_column_profile(column)
         return column
 
+    async def add_sketched_column_profile(
+        self, profile_id: UUID, profiler: StreamingColumnProfiler,
+        nullable: bool = True, primary_key: bool = False
+    ) -> ColumnProfile:
+        """Store a column profile from a (possibly merged) streaming profiler, with its percentiles"""
+        stats = profiler.to_statistics()
+        column = await self.add_column_profile(
+            profile_id=profile_id, column_name=stats.column_name, data_type=stats.data_type,
+            total_values=stats.total_count, null_count=stats.null_count,
+            distinct_count=stats.distinct_count, nullable=nullable, primary_key=primary_key
+        )
+        await self._apply_statistics(profile_id, column, stats)
+        return column
+
+    async def profile_column_values(
+        self, profile_id: UUID, column_name: str, values: Iterable[Any],
+        approximate: bool = False, sample_size: int = 10_000, confidence: float = 0.95,
+        seed: int | None = None, nullable: bool = True, primary_key: bool = False
+    ) -> ColumnProfile:
+        """Profile a column in one pass, or from a bounded uniform sample when approximate.
+
+        Approximate profiles extrapolate null and distinct counts to the full column
+        and carry confidence intervals for the null percentage and the mean.
+        """
+        if not approximate:
+            profiler = StreamingColumnProfiler(column_name).update(values)
+            return await self.add_sketched_column_profile(profile_id, profiler, nullable, primary_key)
+
+        sample, total_values = reservoir(values, sample_size, random.Random(seed))
+        profiler = StreamingColumnProfiler(column_name).update(sample)
+        stats = profiler.to_statistics()
+        sampled = len(sample)
+        null_rate = stats.null_count / sampled if sampled else 0.0
+        frequencies = Counter(str(v) for v in sample if v is not None and v != "")
+        present_population = round(total_values * sum(frequencies.values()) / sampled) if sampled else 0
+
+        column = await self.add_column_profile(
+            profile_id=profile_id, column_name=column_name, data_type=stats.data_type,
+            total_values=total_values, null_count=round(null_rate * total_values),
+            distinct_count=estimate_distinct(frequencies.values(), sum(frequencies.values()), present_population),
+            nullable=nullable, primary_key=primary_key
+        )
+        await self._apply_statistics(profile_id, column, stats)
+
+        lower, upper = wilson_interval(stats.null_count, sampled, confidence)
+        column.is_approximate = True
+        column.sample_size = sampled
+        column.null_percentage_lower = Decimal(str(round(lower * 100, 4)))
+        column.null_percentage_upper = Decimal(str(round(upper * 100, 4)))
+        if stats.avg_value is not None and stats.std_dev is not None:
+            z = NormalDist().inv_cdf(0.5 + confidence / 2)
+            half_width = Decimal(str(z * float(stats.std_dev) / math.sqrt(profiler.numeric.count)))
+            column.avg_value_lower = stats.avg_value - half_width
+            column.avg_value_upper = stats.avg_value + half_width
+        return column
+
+    async def _apply_statistics(self, profile_id: UUID, column: ColumnProfile, stats: ColumnStatistics) -> None:
+        column.min_value = stats.min_value
+        column.max_value = stats.max_value
+        column.avg_value = stats.avg_value
+        column.std_dev = stats.std_dev
+        column.min_length = stats.min_length
+        column.max_length = stats.max_length
+        column.avg_length = stats.avg_length
+        column.top_values = [{"value": value, "count": count} for value, count in stats.top_values]
+
+        if stats.percentiles:
+            await self.record_distribution(
+                profile_id=profile_id, column_name=stats.column_name,
+                distribution_type="percentile", buckets=[], percentiles=stats.percentiles
+            )
+
     async def record_distribution(
         self, profile_id: UUID, column_name: str, distribution_type: str,
         buckets: list[dict[str, Any]], percentiles: dict[str, Decimal] | None = None
@@ -1,5 +1,8 @@
 """Data Quality Service"""
 
+import random
+import time
+from collections.abc import Callable, Iterable
 from datetime import date
 from decimal import Decimal
 from typing import Any
@@ -15,6 +18,7 @@ from ..models.data_quality_models import (
     RuleSeverity,
 )
 from ..repositories.data_quality_repository import data_quality_repository
+from ..utils.data_sampling import reservoir, wilson_interval
 
 
 class DataQualityService:
@@ -42,7 +46,8 @@ class DataQualityService:
 
     async def execute_check(
         self, rule_id: UUID, total_records: int, passed_records: int,
-        execution_time_ms: int = 0, error_samples: list[dict[str, Any]] | None = None
+        execution_time_ms: int = 0, error_samples: list[dict[str, Any]] | None = None,
+        sample_size: int | None = None, pass_interval: tuple[Decimal, Decimal] | None = None
     ) -> DataQualityCheck:
         failed_records = total_records - passed_records
         pass_percentage = Decimal(str(passed_records / total_records * 100)) if total_records > 0 else Decimal("0")
@@ -50,7 +55,10 @@ class DataQualityService:
         check = DataQualityCheck(
             rule_id=rule_id, total_records=total_records, passed_records=passed_records,
             failed_records=failed_records, pass_percentage=pass_percentage,
-            execution_time_ms=execution_time_ms, error_samples=error_samples or []
+            execution_time_ms=execution_time_ms, error_samples=error_samples or [],
+            is_approximate=sample_size is not None, sample_size=sample_size,
+            pass_percentage_lower=pass_interval[0] if pass_interval else None,
+            pass_percentage_upper=pass_interval[1] if pass_interval else None
         )
         await self.repository.save_check(check)
 
@@ -60,6 +68,49 @@ class DataQualityService:
 
         return check
 
+    async def execute_check_on_records(
+        self, rule_id: UUID, records: Iterable[dict[str, Any]], check: Callable[[dict[str, Any]], bool],
+        approximate: bool = False, sample_size: int = 10_000, confidence: float = 0.95,
+        seed: int | None = None, max_error_samples: int = 10
+    ) -> DataQualityCheck:
+        """Evaluate a record predicate and store the check.
+
+        In approximate mode only a uniform sample of sample_size records is evaluated;
+        counts are extrapolated to the full table and the pass rate carries a Wilson
+        confidence interval.
+        """
+        started = time.perf_counter()
+        if approximate:
+            evaluated, total_records = reservoir(records, sample_size, random.Random(seed))
+        else:
+            evaluated, total_records = records, 0
+
+        passed = 0
+        evaluated_count = 0
+        error_samples = []
+        for record in evaluated:
+            evaluated_count += 1
+            if check(record):
+                passed += 1
+            elif len(error_samples) < max_error_samples:
+                error_samples.append(record)
+
+        pass_interval = None
+        if approximate:
+            lower, upper = wilson_interval(passed, evaluated_count, confidence)
+            pass_interval = (Decimal(str(round(lower * 100, 4))), Decimal(str(round(upper * 100, 4))))
+            passed_records = round(passed / evaluated_count * total_records) if evaluated_count else 0
+        else:
+            total_records, passed_records = evaluated_count, passed
+
+        return await self.execute_check(
+            rule_id, total_records, passed_records,
+            execution_time_ms=int((time.perf_counter() - started) * 1000),
+            error_samples=error_samples,
+            sample_size=evaluated_count if approximate else None,
+            pass_interval=pass_interval
+        )
+
     async def _create_issue(
         self, rule_id: UUID, check_id: UUID, affected_records: int, pass_percentage: Decimal
     ) -> DataQualityIssue:
@@ -1,12 +1,17 @@
 """Data Anomaly Detection Utilities"""
 
-import math
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from enum import Enum
 from typing import Any
 from uuid import uuid4
 
+import numpy as np
+
+BASELINE_QUANTILES = np.linspace(0.0, 1.0, 21)
+PSI_EPSILON = 1e-4
+
 
 class AnomalyType(str, Enum):
     OUTLIER = "outlier"
@@ -37,6 +42,29 @@ class DetectedAnomaly:
     sample_values: list[Any]
     detection_method: str
     detected_at: datetime
+    record_indices: list[int] = field(default_factory=list)
+
+
+@dataclass
+class NumericColumn:
+    field_name: str
+    values: np.ndarray
+    valid: np.ndarray
+
+    @property
+    def present(self) -> np.ndarray:
+        return self.values[self.valid]
+
+
+@dataclass
+class BaselineSketch:
+    field_name: str
+    quantiles: list[float]
+    mean: float
+    std_dev: float
+    null_rate: float
+    count: int
+    recorded_at: datetime
 
 
 @dataclass
@@ -57,94 +85,112 @@ class AnomalyDetectionUtilities:
     def __init__(self):
         self._iqr_multiplier = 1.5
         self._zscore_threshold = 3.0
+        self._mad_threshold = 3.5
+        self._baseline_window = 30
+        self._baselines: dict[str, deque[BaselineSketch]] = {}
+
+    def numeric_column(self, data: list[dict[str, Any]], field_name: str) -> NumericColumn:
+        """Convert a field once into a float64 array; nulls and non-numeric values are masked out"""
+        values = np.fromiter((_to_float(r.get(field_name)) for r in data), dtype=np.float64, count=len(data))
+        return NumericColumn(field_name=field_name, values=values, valid=np.isfinite(values))
+
+    def iqr_outlier_indices(self, column: NumericColumn) -> tuple[np.ndarray, float, float]:
+        present = column.present
+        n = len(present)
+        if n < 4:
+            return np.empty(0, dtype=np.intp), 0.0, 0.0
+        q1, q3 = np.partition(present, [n // 4, (3 * n) // 4])[[n // 4, (3 * n) // 4]]
+        iqr = q3 - q1
+        lower_bound = float(q1 - self._iqr_multiplier * iqr)
+        upper_bound = float(q3 + self._iqr_multiplier * iqr)
+        with np.errstate(invalid="ignore"):
+            outliers = column.valid & ((column.values < lower_bound) | (column.values > upper_bound))
+        return np.flatnonzero(outliers), lower_bound, upper_bound
+
+    def zscore_outlier_indices(self, column: NumericColumn) -> np.ndarray:
+        present = column.present
+        if len(present) < 3:
+            return np.empty(0, dtype=np.intp)
+        std_dev = present.std()
+        if std_dev == 0:
+            return np.empty(0, dtype=np.intp)
+        with np.errstate(invalid="ignore"):
+            scores = np.abs((column.values - present.mean()) / std_dev)
+        return np.flatnonzero(column.valid & (scores > self._zscore_threshold))
+
+    def mad_outlier_indices(self, column: NumericColumn) -> np.ndarray:
+        """Modified z-scores (0.6745 * deviation / MAD), robust to the outliers themselves"""
+        present = column.present
+        if len(present) < 3:
+            return np.empty(0, dtype=np.intp)
+        median = np.median(present)
+        mad = np.median(np.abs(present - median))
+        if mad == 0:
+            return np.empty(0, dtype=np.intp)
+        with np.errstate(invalid="ignore"):
+            scores = 0.6745 * np.abs(column.values - median) / mad
+        return np.flatnonzero(column.valid & (scores > self._mad_threshold))
 
     def detect_numeric_outliers_iqr(
         self,
         data: list[dict[str, Any]],
         field_name: str,
+        column: NumericColumn | None = None,
     ) -> list[DetectedAnomaly]:
-        values = [
-            float(r.get(field_name))
-            for r in data
-            if r.get(field_name) is not None and self._is_numeric(r.get(field_name))
-        ]
-
-        if len(values) < 4:
-            return []
-
-        sorted_values = sorted(values)
-        n = len(sorted_values)
-        q1 = sorted_values[n // 4]
-        q3 = sorted_values[(3 * n) // 4]
-        iqr = q3 - q1
-
-        lower_bound = q1 - self._iqr_multiplier * iqr
-        upper_bound = q3 + self._iqr_multiplier * iqr
-
-        outliers = [v for v in values if v < lower_bound or v > upper_bound]
-
-        anomalies = []
-        if outliers:
-            severity = AnomalySeverity.HIGH if len(outliers) > len(values) * 0.05 else AnomalySeverity.MEDIUM
-
-            anomalies.append(
-                DetectedAnomaly(
-                    anomaly_id=str(uuid4()),
-                    anomaly_type=AnomalyType.OUTLIER,
-                    severity=severity,
-                    field_name=field_name,
-                    description=f"Found {len(outliers)} outliers using IQR method (bounds: {lower_bound:.2f} - {upper_bound:.2f})",
-                    affected_records=len(outliers),
-                    sample_values=outliers[:5],
-                    detection_method="iqr",
-                    detected_at=datetime.now(UTC),
-                )
-            )
-
-        return anomalies
+        column = column or self.numeric_column(data, field_name)
+        indices, lower_bound, upper_bound = self.iqr_outlier_indices(column)
+        return self._outlier_anomalies(
+            column,
+            indices,
+            f"using IQR method (bounds: {lower_bound:.2f} - {upper_bound:.2f})",
+            "iqr",
+        )
 
     def detect_numeric_outliers_zscore(
         self,
         data: list[dict[str, Any]],
         field_name: str,
+        column: NumericColumn | None = None,
     ) -> list[DetectedAnomaly]:
-        values = [
-            float(r.get(field_name))
-            for r in data
-            if r.get(field_name) is not None and self._is_numeric(r.get(field_name))
-        ]
-
-        if len(values) < 3:
-            return []
+        column = column or self.numeric_column(data, field_name)
+        indices = self.zscore_outlier_indices(column)
+        return self._outlier_anomalies(
+            column, indices, f"using Z-score method (threshold: {self._zscore_threshold})", "zscore"
+        )
 
-        mean = sum(values) / len(values)
-        variance = sum((v - mean) ** 2 for v in values) / len(values)
-        std_dev = math.sqrt(variance) if variance > 0 else 0
+    def detect_numeric_outliers_mad(
+        self,
+        data: list[dict[str, Any]],
+        field_name: str,
+        column: NumericColumn | None = None,
+    ) -> list[DetectedAnomaly]:
+        column = column or self.numeric_column(data, field_name)
+        indices = self.mad_outlier_indices(column)
+        return self._outlier_anomalies(
+            column, indices, f"using MAD method (threshold: {self._mad_threshold})", "mad"
+        )
 
-        if std_dev == 0:
+    def _outlier_anomalies(
+        self, column: NumericColumn, indices: np.ndarray, method_text: str, method: str
+    ) -> list[DetectedAnomaly]:
+        if len(indices) == 0:
             return []
-
-        outliers = [v for v in values if abs((v - mean) / std_dev) > self._zscore_threshold]
-
-        anomalies = []
-        if outliers:
-            severity = AnomalySeverity.HIGH if len(outliers) > len(values) * 0.05 else AnomalySeverity.MEDIUM
-
-            anomalies.append(
-                DetectedAnomaly(
-                    anomaly_id=str(uuid4()),
-                    anomaly_type=AnomalyType.OUTLIER,
-                    severity=severity,
-                    field_name=field_name,
-                    description=f"Found {len(outliers)} outliers using Z-score method (threshold: {self._zscore_threshold})",
-                    affected_records=len(outliers),
-                    sample_values=outliers[:5],
-                    detection_method="zscore",
-                    detected_at=datetime.now(UTC),
-                )
+        valid_count = int(column.valid.sum())
+        severity = AnomalySeverity.HIGH if len(indices) > valid_count * 0.05 else AnomalySeverity.MEDIUM
+        return [
+            DetectedAnomaly(
+                anomaly_id=str(uuid4()),
+                anomaly_type=AnomalyType.OUTLIER,
+                severity=severity,
+                field_name=column.field_name,
+                description=f"Found {len(indices)} outliers {method_text}",
+                affected_records=len(indices),
+                sample_values=column.values[indices[:5]].tolist(),
+                detection_method=method,
+                detected_at=datetime.now(UTC),
+                record_indices=indices.tolist(),
             )
-
-        return anomalies
+        ]
 
     def detect_missing_patterns(
         self,
@@ -188,9 +234,9 @@ class AnomalyDetectionUtilities:
         field_name: str,
         expected_cardinality: str | None = None,
     ) -> list[DetectedAnomaly]:
-        values = [r.get(field_name) for r in data if r.get(field_name) is not None]
+        values = [v for v in (r.get(field_name) for r in data) if v is not None]
         total = len(values)
-        distinct = len({str(v) for v in values})
+        distinct = len(set(map(str, values)))
 
         if total == 0:
             return []
@@ -237,7 +283,11 @@ class AnomalyDetectionUtilities:
         data: list[dict[str, Any]],
         numeric_fields: list[str] | None = None,
         check_missing: bool = True,
+        compare_baseline: bool = False,
+        update_baseline: bool = False,
     ) -> AnomalyDetectionResult:
+        """With compare_baseline, each numeric column is also checked against its rolling
+        baseline; with update_baseline, this batch is then added to that baseline."""
         start_time = datetime.now(UTC)
         all_anomalies = []
 
@@ -257,14 +307,17 @@ class AnomalyDetectionUtilities:
 
         all_fields = list(data[0].keys()) if data else []
 
+        candidate_fields = all_fields if numeric_fields is None else numeric_fields
+        columns = [self.numeric_column(data, f) for f in candidate_fields]
         if numeric_fields is None:
-            numeric_fields = [
-                f for f in all_fields
-                if data and any(self._is_numeric(r.get(f)) for r in data if r.get(f) is not None)
-            ]
+            columns = [c for c in columns if c.valid.any()]
 
-        for field in numeric_fields:
-            all_anomalies.extend(self.detect_numeric_outliers_iqr(data, field))
+        for column in columns:
+            all_anomalies.extend(self.detect_numeric_outliers_iqr(data, column.field_name, column))
+            if compare_baseline:
+                all_anomalies.extend(self._baseline_shift(column))
+            if update_baseline:
+                self.update_baseline(data, column.field_name, column)
 
         if check_missing:
             all_anomalies.extend(self.detect_missing_patterns(data, all_fields))
@@ -285,6 +338,80 @@ class AnomalyDetectionUtilities:
             analyzed_at=end_time,
         )
 
+    def update_baseline(
+        self, data: list[dict[str, Any]], field_name: str, column: NumericColumn | None = None
+    ) -> BaselineSketch | None:
+        """Store a sketch of this batch in the field's rolling baseline window"""
+        column = column or self.numeric_column(data, field_name)
+        present = column.present
+        if len(present) == 0:
+            return None
+        sketch = BaselineSketch(
+            field_name=field_name,
+            quantiles=np.quantile(present, BASELINE_QUANTILES).tolist(),
+            mean=float(present.mean()),
+            std_dev=float(present.std()),
+            null_rate=1 - len(present) / len(column.values),
+            count=len(present),
+            recorded_at=datetime.now(UTC),
+        )
+        if field_name not in self._baselines:
+            self._baselines[field_name] = deque(maxlen=self._baseline_window)
+        self._baselines[field_name].append(sketch)
+        return sketch
+
+    def detect_distribution_shift(
+        self, data: list[dict[str, Any]], field_name: str, column: NumericColumn | None = None
+    ) -> list[DetectedAnomaly]:
+        return self._baseline_shift(column or self.numeric_column(data, field_name))
+
+    def _baseline_shift(self, column: NumericColumn) -> list[DetectedAnomaly]:
+        history = self._baselines.get(column.field_name)
+        present = column.present
+        if not history or len(present) == 0:
+            return []
+
+        # Pool the stored days by averaging their quantile functions, then bin today's
+        # batch on the pooled deciles; each decile should hold a tenth of the batch
+        pooled = np.average(
+            np.array([s.quantiles for s in history]), axis=0, weights=[s.count for s in history]
+        )
+        edges = np.unique(pooled[::2][1:-1])
+        expected = np.diff(np.concatenate(([0.0], np.interp(edges, pooled, BASELINE_QUANTILES), [1.0])))
+        actual = np.bincount(np.searchsorted(edges, present, side="right"), minlength=len(edges) + 1)
+        actual = actual / len(present)
+        expected = np.clip(expected, PSI_EPSILON, None)
+        actual = np.clip(actual, PSI_EPSILON, None)
+        psi = float(np.sum((actual - expected) * np.log(actual / expected)))
+
+        if psi > 0.25:
+            severity = AnomalySeverity.HIGH
+        elif psi > 0.1:
+            severity = AnomalySeverity.MEDIUM
+        else:
+            return []
+
+        baseline_mean = float(np.average([s.mean for s in history], weights=[s.count for s in history]))
+        return [
+            DetectedAnomaly(
+                anomaly_id=str(uuid4()),
+                anomaly_type=AnomalyType.DISTRIBUTION_SHIFT,
+                severity=severity,
+                field_name=column.field_name,
+                description=(
+                    f"Batch distribution shifted from {len(history)}-batch baseline "
+                    f"(PSI: {psi:.3f}, mean {present.mean():.2f} vs {baseline_mean:.2f})"
+                ),
+                affected_records=len(present),
+                sample_values=[],
+                detection_method="baseline_psi",
+                detected_at=datetime.now(UTC),
+            )
+        ]
+
+    def get_baseline(self, field_name: str) -> list[BaselineSketch]:
+        return list(self._baselines.get(field_name, []))
+
     def _is_numeric(self, value: Any) -> bool:
         if value is None:
             return False
@@ -300,5 +427,23 @@ class AnomalyDetectionUtilities:
     def set_zscore_threshold(self, threshold: float) -> None:
         self._zscore_threshold = threshold
 
+    def set_mad_threshold(self, threshold: float) -> None:
+        self._mad_threshold = threshold
+
+    def set_baseline_window(self, window: int) -> None:
+        self._baseline_window = window
+        self._baselines = {
+            name: deque(sketches, maxlen=window) for name, sketches in self._baselines.items()
+        }
+
+
+def _to_float(value: Any) -> float:
+    if value is None:
+        return np.nan
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return np.nan
+
 
 anomaly_detection_utilities = AnomalyDetectionUtilities()
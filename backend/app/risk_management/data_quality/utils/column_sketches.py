@@ -0,0 +1,240 @@
+"""Mergeable Column Sketches"""
+
+import hashlib
+import math
+import random
+from dataclasses import dataclass
+from typing import Any
+
+
+def _hash64(value: str) -> int:
+    # Stable across processes, unlike hash(), so partition sketches can be merged
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """Distinct-count sketch; exact until the number of distinct hashes passes the register count"""
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.register_count = 1 << precision
+        self._registers: bytearray | None = None
+        self._exact: set[int] | None = set()
+
+    def add(self, value: str) -> None:
+        hashed = _hash64(value)
+        if self._exact is not None:
+            self._exact.add(hashed)
+            if len(self._exact) > self.register_count:
+                self._promote()
+            return
+        self._add_hash(hashed)
+
+    def _add_hash(self, hashed: int) -> None:
+        index = hashed >> (64 - self.precision)
+        remainder = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remainder.bit_length() + 1
+        self._registers[index] = max(self._registers[index], rank)
+
+    def _promote(self) -> None:
+        exact, self._exact = self._exact, None
+        self._registers = bytearray(self.register_count)
+        for hashed in exact:
+            self._add_hash(hashed)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        if other._exact is not None:
+            for hashed in other._exact:
+                if self._exact is not None:
+                    self._exact.add(hashed)
+                else:
+                    self._add_hash(hashed)
+            if self._exact is not None and len(self._exact) > self.register_count:
+                self._promote()
+            return
+        if self._exact is not None:
+            self._promote()
+        self._registers = bytearray(max(a, b) for a, b in zip(self._registers, other._registers, strict=True))
+
+    def estimate(self) -> int:
+        if self._exact is not None:
+            return len(self._exact)
+        m = self.register_count
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -r for r in self._registers)
+        zeros = self._registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return round(m * math.log(m / zeros))
+        return round(raw)
+
+
+class KLLSketch:
+    """Quantile sketch with compactors of geometrically shrinking capacity"""
+
+    def __init__(self, k: int = 200, seed: int | None = None):
+        self.k = k
+        self.count = 0
+        self._compactors: list[list[float]] = [[]]
+        self._random = random.Random(seed)
+        self._size = 0
+        self._max_size = self._capacity(0)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._compactors) - level - 1
+        return max(int(self.k * (2 / 3) ** depth), 8)
+
+    def add(self, value: float) -> None:
+        self._compactors[0].append(value)
+        self.count += 1
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def _compress(self) -> None:
+        # Lazy compaction: only levels over capacity are halved, and only until the
+        # sketch fits again, so the cost per added item stays amortised O(1)
+        while self._size >= self._max_size:
+            for level, items in enumerate(self._compactors):
+                if len(items) >= self._capacity(level):
+                    break
+            else:
+                return
+            if level + 1 == len(self._compactors):
+                self._compactors.append([])
+            items = sorted(self._compactors[level])
+            # An odd leftover stays behind so no weight is lost
+            keep = [items.pop()] if len(items) % 2 else []
+            promoted = items[self._random.randint(0, 1)::2]
+            self._compactors[level + 1].extend(promoted)
+            self._compactors[level] = keep
+            self._size = sum(len(c) for c in self._compactors)
+            self._max_size = sum(self._capacity(h) for h in range(len(self._compactors)))
+
+    def merge(self, other: "KLLSketch") -> None:
+        while len(self._compactors) < len(other._compactors):
+            self._compactors.append([])
+        for level, items in enumerate(other._compactors):
+            self._compactors[level].extend(items)
+        self.count += other.count
+        self._size = sum(len(c) for c in self._compactors)
+        self._max_size = sum(self._capacity(h) for h in range(len(self._compactors)))
+        self._compress()
+
+    def _weighted_items(self) -> list[tuple[float, int]]:
+        return sorted(
+            (item, 1 << level) for level, items in enumerate(self._compactors) for item in items
+        )
+
+    def quantile(self, q: float) -> float | None:
+        weighted = self._weighted_items()
+        if not weighted:
+            return None
+        total = sum(weight for _item, weight in weighted)
+        target = q * total
+        cumulative = 0
+        for item, weight in weighted:
+            cumulative += weight
+            if cumulative > target:
+                return item
+        return weighted[-1][0]
+
+    def quantiles(self, qs: list[float]) -> dict[float, float | None]:
+        return {q: self.quantile(q) for q in qs}
+
+
+class MisraGries:
+    """Heavy-hitter counters; counts are underestimated by at most n / (k + 1)"""
+
+    def __init__(self, k: int = 64):
+        self.k = k
+        self.counters: dict[str, int] = {}
+
+    def add(self, value: str, count: int = 1) -> None:
+        if value in self.counters:
+            self.counters[value] += count
+        elif len(self.counters) < self.k:
+            self.counters[value] = count
+        else:
+            self.counters[value] = count
+            self._trim()
+
+    def _trim(self) -> None:
+        if len(self.counters) <= self.k:
+            return
+        cutoff = sorted(self.counters.values(), reverse=True)[self.k]
+        self.counters = {v: c - cutoff for v, c in self.counters.items() if c > cutoff}
+
+    def merge(self, other: "MisraGries") -> None:
+        for value, count in other.counters.items():
+            self.counters[value] = self.counters.get(value, 0) + count
+        self._trim()
+
+    def top(self, n: int = 10) -> list[tuple[str, int]]:
+        return sorted(self.counters.items(), key=lambda item: -item[1])[:n]
+
+
+@dataclass
+class RunningMoments:
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    minimum: Any = None
+    maximum: Any = None
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other: "RunningMoments") -> None:
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.minimum, self.maximum = other.minimum, other.maximum
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def std_dev(self) -> float | None:
+        if self.count < 2:
+            return None
+        return math.sqrt(self.m2 / (self.count - 1))
+
+
+@dataclass
+class ValueRange:
+    minimum: Any = None
+    maximum: Any = None
+
+    def add(self, value: Any) -> None:
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other: "ValueRange") -> None:
+        if other.minimum is not None:
+            self.add(other.minimum)
+            self.add(other.maximum)
+
+
+@dataclass
+class SketchConfig:
+    hll_precision: int = 12
+    kll_k: int = 200
+    top_k: int = 64
+    seed: int | None = None
@@ -7,6 +7,8 @@ from decimal import Decimal
 from typing import Any
 from uuid import uuid4
 
+from .dedup_engine import BlockingKey, DeduplicationEngine
+
 
 @dataclass
 class DuplicateGroup:
@@ -33,6 +35,7 @@ class DataDeduplicationUtilities:
     def __init__(self):
         self._default_threshold = Decimal("1.0")
         self._survivorship_rules: dict[str, str] = {}
+        self._engine = DeduplicationEngine()
 
     def find_exact_duplicates(
         self,
@@ -90,42 +93,24 @@ class DataDeduplicationUtilities:
         start_time = datetime.now(UTC)
         threshold = threshold or self._default_threshold
         duplicate_groups = []
-        processed_ids: set[str] = set()
         total_duplicates = 0
 
-        for i, record1 in enumerate(data):
-            record1_id = str(record1.get(id_field, i))
-            if record1_id in processed_ids:
-                continue
-
-            group_records = [record1]
-
-            for j, record2 in enumerate(data[i + 1:], start=i + 1):
-                record2_id = str(record2.get(id_field, j))
-                if record2_id in processed_ids:
-                    continue
-
-                score = self._calculate_similarity(record1, record2, match_fields)
-                if score >= threshold:
-                    group_records.append(record2)
-                    processed_ids.add(record2_id)
-
-            if len(group_records) > 1:
-                processed_ids.add(record1_id)
-                primary = self._select_primary_record(group_records, id_field)
-                duplicates = [r for r in group_records if r.get(id_field) != primary.get(id_field)]
-                total_duplicates += len(duplicates)
-
-                duplicate_groups.append(
-                    DuplicateGroup(
-                        group_id=str(uuid4()),
-                        primary_record=primary,
-                        duplicate_records=duplicates,
-                        match_score=threshold,
-                        matched_fields=match_fields,
-                        identified_at=datetime.now(UTC),
-                    )
+        for members, min_score in self._engine.find_groups(data, match_fields, float(threshold)):
+            group_records = [data[i] for i in members]
+            primary = self._select_primary_record(group_records, id_field)
+            duplicates = [r for r in group_records if r.get(id_field) != primary.get(id_field)]
+            total_duplicates += len(duplicates)
+
+            duplicate_groups.append(
+                DuplicateGroup(
+                    group_id=str(uuid4()),
+                    primary_record=primary,
+                    duplicate_records=duplicates,
+                    match_score=Decimal(str(round(min_score, 4))),
+                    matched_fields=match_fields,
+                    identified_at=datetime.now(UTC),
                 )
+            )
 
         end_time = datetime.now(UTC)
         processing_time = int((end_time - start_time).total_seconds() * 1000)
@@ -140,47 +125,6 @@ class DataDeduplicationUtilities:
             processed_at=end_time,
         )
 
-    def _calculate_similarity(
-        self, record1: dict[str, Any], record2: dict[str, Any], fields: list[str]
-    ) -> Decimal:
-        if not fields:
-            return Decimal("0")
-
-        total_score = Decimal("0")
-        for field_name in fields:
-            val1 = str(record1.get(field_name, "")).lower().strip()
-            val2 = str(record2.get(field_name, "")).lower().strip()
-
-            if val1 == val2:
-                total_score += Decimal("1")
-            else:
-                total_score += self._levenshtein_similarity(val1, val2)
-
-        return total_score / Decimal(str(len(fields)))
-
-    def _levenshtein_similarity(self, s1: str, s2: str) -> Decimal:
-        if not s1 and not s2:
-            return Decimal("1")
-        if not s1 or not s2:
-            return Decimal("0")
-
-        if len(s1) < len(s2):
-            s1, s2 = s2, s1
-
-        previous_row = range(len(s2) + 1)
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
-
-        distance = previous_row[-1]
-        max_len = max(len(s1), len(s2))
-        return Decimal(str(round(1 - (distance / max_len), 4)))
-
     def _select_primary_record(
         self, records: list[dict[str, Any]], id_field: str
     ) -> dict[str, Any]:
@@ -273,5 +217,10 @@ class DataDeduplicationUtilities:
     def set_threshold(self, threshold: Decimal) -> None:
         self._default_threshold = threshold
 
+    def set_blocking_keys(self, blocking_keys: list[BlockingKey], window_size: int | None = None) -> None:
+        self._engine.blocking_keys = blocking_keys
+        if window_size is not None:
+            self._engine.window_size = window_size
+
 
 data_deduplication_utilities = DataDeduplicationUtilities()
@@ -3,11 +3,15 @@
 import hashlib
 import re
 from collections.abc import Callable
+from concurrent.futures import Executor
 from dataclasses import dataclass
 from enum import Enum
+from functools import partial
 from typing import Any
 from uuid import uuid4
 
+from .token_vault import TokenVault, derive_tokens
+
 
 class MaskingType(str, Enum):
     REDACT = "redact"
@@ -20,6 +24,38 @@ class MaskingType(str, Enum):
     NULLIFY = "nullify"
 
 
+PII_FIELD_PATTERNS = {
+    "email": (re.compile(r"email|e_mail|e-mail", re.IGNORECASE), MaskingType.PARTIAL_MASK),
+    "phone": (re.compile(r"phone|mobile|tel", re.IGNORECASE), MaskingType.PARTIAL_MASK),
+    "ssn": (re.compile(r"ssn|social_security|sin", re.IGNORECASE), MaskingType.REDACT),
+    "credit_card": (re.compile(r"card|cc_number|credit", re.IGNORECASE), MaskingType.PARTIAL_MASK),
+    "address": (re.compile(r"address|street|addr", re.IGNORECASE), MaskingType.PARTIAL_MASK),
+    "name": (re.compile(r"first_name|last_name|full_name", re.IGNORECASE), MaskingType.PARTIAL_MASK),
+    "dob": (re.compile(r"birth|dob|date_of_birth", re.IGNORECASE), MaskingType.REDACT),
+    "password": (re.compile(r"password|pwd|secret", re.IGNORECASE), MaskingType.REDACT),
+}
+
+HASH_ALGORITHMS = ("sha256", "md5", "sha512")
+MASKING_CHUNK_SIZE = 10_000
+
+
+def hash_values(values: list[str], algorithm: str = "sha256", salt: str = "") -> list[str]:
+    base = hashlib.new(algorithm if algorithm in HASH_ALGORITHMS else "sha256", salt.encode())
+    digests = []
+    for value in values:
+        hasher = base.copy()
+        hasher.update(value.encode())
+        digests.append(hasher.hexdigest())
+    return digests
+
+
+def _map_in_chunks(func: Callable[[list], list], items: list, executor: Executor | None) -> list:
+    if executor is None or len(items) <= MASKING_CHUNK_SIZE:
+        return func(items)
+    chunks = [items[i:i + MASKING_CHUNK_SIZE] for i in range(0, len(items), MASKING_CHUNK_SIZE)]
+    return [item for part in executor.map(func, chunks) for item in part]
+
+
 @dataclass
 class MaskingRule:
     rule_id: str
@@ -41,8 +77,8 @@ class MaskingResult:
 class DataMaskingUtilities:
     def __init__(self):
         self._rules: dict[str, MaskingRule] = {}
-        self._token_vault: dict[str, str] = {}
-        self._reverse_vault: dict[str, str] = {}
+        self._token_vault = TokenVault()
+        self._field_pii_types: dict[str, MaskingType | None] = {}
         self._masking_handlers: dict[MaskingType, Callable] = {}
         self._register_handlers()
 
@@ -124,38 +160,113 @@ class DataMaskingUtilities:
         self,
         data: list[dict[str, Any]],
         field_rules: dict[str, MaskingRule],
+        executor: Executor | None = None,
     ) -> list[dict[str, Any]]:
-        return [self.mask_record(record, field_rules) for record in data]
+        """Mask column by column, running each handler once per distinct value.
+        Hashing and token derivation are spread over executor in chunks when given."""
+        masked = [record.copy() for record in data]
+
+        for field_name, rule in field_rules.items():
+            if not rule.is_active:
+                continue
+            rows = [index for index, record in enumerate(data) if field_name in record]
+            if not rows:
+                continue
+            column = self._mask_column([data[index][field_name] for index in rows], rule, executor)
+            for index, value in zip(rows, column, strict=True):
+                masked[index][field_name] = value
+
+        return masked
+
+    def _mask_column(
+        self, values: list[Any], rule: MaskingRule, executor: Executor | None
+    ) -> list[Any]:
+        params = rule.parameters
+        try:
+            # keyed by type as well, so 1, 1.0 and True keep their own str() forms
+            distinct = list(dict.fromkeys((type(v), v) for v in values if v is not None))
+        except TypeError:
+            return [self.mask_value(v, rule.masking_type, params).masked_value for v in values]
+        texts = [str(value) for _, value in distinct]
+
+        if rule.masking_type == MaskingType.TOKENIZE:
+            format_preserving = params.get("format_preserving", False)
+            derive = partial(derive_tokens, key=self._token_vault.key, format_preserving=format_preserving)
+            tokens = self._token_vault.tokenize_many(
+                texts, format_preserving, derived=_map_in_chunks(derive, list(dict.fromkeys(texts)), executor)
+            )
+            masked_values = [tokens[text] for text in texts]
+        elif rule.masking_type == MaskingType.HASH:
+            hasher = partial(hash_values, algorithm=params.get("algorithm", "sha256"), salt=str(params.get("salt", "")))
+            masked_values = _map_in_chunks(hasher, texts, executor)
+        else:
+            handler = self._masking_handlers.get(rule.masking_type)
+            if handler is None:
+                return list(values)
+            masked_values = [handler(value, params) for _, value in distinct]
+
+        mapping = dict(zip(distinct, masked_values, strict=True))
+        return [None if v is None else mapping[(type(v), v)] for v in values]
+
+    def detect_pii_fields(
+        self,
+        sample: list[dict[str, Any]],
+    ) -> dict[str, MaskingRule]:
+        """Masking rules for the PII-looking field names seen in a sample of records"""
+        field_rules = {}
+        for record in sample:
+            for field_name in record:
+                if field_name in field_rules:
+                    continue
+                masking_type = self._pii_masking_type(field_name)
+                if masking_type is not None:
+                    field_rules[field_name] = MaskingRule(
+                        rule_id=str(uuid4()),
+                        rule_name=f"auto_{field_name}",
+                        field_pattern=field_name,
+                        masking_type=masking_type,
+                        parameters={},
+                    )
+        return field_rules
+
+    def auto_mask_dataset(
+        self,
+        data: list[dict[str, Any]],
+        sample_size: int = 1000,
+        executor: Executor | None = None,
+    ) -> list[dict[str, Any]]:
+        """Detect PII fields once from the leading records, then mask the dataset column-wise"""
+        return self.mask_dataset(data, self.detect_pii_fields(data[:sample_size]), executor)
 
     def auto_detect_and_mask(
         self,
         record: dict[str, Any],
     ) -> dict[str, Any]:
         masked = record.copy()
-        pii_patterns = {
-            "email": (r"email|e_mail|e-mail", MaskingType.PARTIAL_MASK),
-            "phone": (r"phone|mobile|tel", MaskingType.PARTIAL_MASK),
-            "ssn": (r"ssn|social_security|sin", MaskingType.REDACT),
-            "credit_card": (r"card|cc_number|credit", MaskingType.PARTIAL_MASK),
-            "address": (r"address|street|addr", MaskingType.PARTIAL_MASK),
-            "name": (r"first_name|last_name|full_name", MaskingType.PARTIAL_MASK),
-            "dob": (r"birth|dob|date_of_birth", MaskingType.REDACT),
-            "password": (r"password|pwd|secret", MaskingType.REDACT),
-        }
 
         for field_name, value in record.items():
             if value is None:
                 continue
 
-            field_lower = field_name.lower()
-            for _pii_type, (pattern, mask_type) in pii_patterns.items():
-                if re.search(pattern, field_lower, re.IGNORECASE):
-                    result = self.mask_value(value, mask_type)
-                    masked[field_name] = result.masked_value
-                    break
+            mask_type = self._pii_masking_type(field_name)
+            if mask_type is not None:
+                result = self.mask_value(value, mask_type)
+                masked[field_name] = result.masked_value
 
         return masked
 
+    def _pii_masking_type(self, field_name: str) -> MaskingType | None:
+        if field_name not in self._field_pii_types:
+            self._field_pii_types[field_name] = next(
+                (
+                    mask_type
+                    for pattern, mask_type in PII_FIELD_PATTERNS.values()
+                    if pattern.search(field_name)
+                ),
+                None,
+            )
+        return self._field_pii_types[field_name]
+
     def _mask_redact(self, value: Any, params: dict[str, Any]) -> str:
         return params.get("replacement", "***REDACTED***")
 
@@ -176,34 +287,18 @@ class DataMaskingUtilities:
         return start + middle + end
 
     def _mask_hash(self, value: Any, params: dict[str, Any]) -> str:
-        algorithm = params.get("algorithm", "sha256")
-        salt = params.get("salt", "")
-
-        salted_value = f"{salt}{value}"
-
-        if algorithm == "sha256":
-            return hashlib.sha256(salted_value.encode()).hexdigest()
-        if algorithm == "md5":
-            return hashlib.md5(salted_value.encode()).hexdigest()
-        if algorithm == "sha512":
-            return hashlib.sha512(salted_value.encode()).hexdigest()
-
-        return hashlib.sha256(salted_value.encode()).hexdigest()
+        return hash_values([str(value)], params.get("algorithm", "sha256"), str(params.get("salt", "")))[0]
 
     def _mask_tokenize(self, value: Any, params: dict[str, Any]) -> str:
-        str_value = str(value)
-
-        if str_value in self._token_vault:
-            return self._token_vault[str_value]
-
-        token = f"TKN_{uuid4().hex[:16].upper()}"
-        self._token_vault[str_value] = token
-        self._reverse_vault[token] = str_value
-
-        return token
+        return self._token_vault.tokenize(str(value), params.get("format_preserving", False))
 
     def detokenize(self, token: str) -> str | None:
-        return self._reverse_vault.get(token)
+        return self._token_vault.detokenize(token)
+
+    def configure_token_vault(self, path: str | None = None, key: bytes | None = None) -> None:
+        """Switch to a vault at path; with a fixed key, tokens stay stable across runs"""
+        self._token_vault.close()
+        self._token_vault = TokenVault(path, key)
 
     def _mask_substitute(self, value: Any, params: dict[str, Any]) -> Any:
         return params.get("substitute_value", "SUBSTITUTE")
@@ -239,7 +334,6 @@ class DataMaskingUtilities:
 
     def clear_token_vault(self) -> None:
         self._token_vault.clear()
-        self._reverse_vault.clear()
 
 
 data_masking_utilities = DataMaskingUtilities()
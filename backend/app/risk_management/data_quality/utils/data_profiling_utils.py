@@ -2,11 +2,25 @@
 
 import re
 from collections import Counter
-from dataclasses import dataclass
+from collections.abc import Iterable
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal
+from itertools import repeat
 from typing import Any
 
+from .column_sketches import (
+    HyperLogLog,
+    KLLSketch,
+    MisraGries,
+    RunningMoments,
+    SketchConfig,
+    ValueRange,
+)
+
+PROFILE_PERCENTILES = (0.25, 0.5, 0.75, 0.95, 0.99)
+
 
 @dataclass
 class ColumnStatistics:
@@ -22,6 +36,11 @@ class ColumnStatistics:
     median_value: str | None
     mode_value: str | None
     empty_string_count: int
+    percentiles: dict[str, Decimal] = field(default_factory=dict)
+    top_values: list[tuple[str, int]] = field(default_factory=list)
+    min_length: int | None = None
+    max_length: int | None = None
+    avg_length: Decimal | None = None
 
 
 @dataclass
@@ -50,66 +69,29 @@ class DataProfilingUtilities:
             "url": r"^https?://[^\s]+$",
         }
 
-    def profile_column(self, data: list[Any], column_name: str) -> ColumnStatistics:
-        total_count = len(data)
-        null_count = sum(1 for v in data if v is None)
-        empty_count = sum(1 for v in data if v == "")
-        non_null_data = [v for v in data if v is not None and v != ""]
-
-        distinct_count = len({str(v) for v in non_null_data})
+    def profile_column(
+        self, data: Iterable[Any], column_name: str, config: SketchConfig | None = None
+    ) -> ColumnStatistics:
+        return StreamingColumnProfiler(column_name, config).update(data).to_statistics()
 
-        min_val = None
-        max_val = None
-        avg_val = None
-        std_dev = None
-        median_val = None
-        mode_val = None
-        data_type = "unknown"
-
-        if non_null_data:
-            first_val = non_null_data[0]
-            if isinstance(first_val, (int, float, Decimal)):
-                data_type = "numeric"
-                numeric_data = [float(v) for v in non_null_data if isinstance(v, (int, float, Decimal))]
-                if numeric_data:
-                    min_val = str(min(numeric_data))
-                    max_val = str(max(numeric_data))
-                    avg_val = Decimal(str(sum(numeric_data) / len(numeric_data)))
-                    sorted_data = sorted(numeric_data)
-                    mid = len(sorted_data) // 2
-                    median_val = str(sorted_data[mid])
-            elif isinstance(first_val, str):
-                data_type = "string"
-                str_data = [str(v) for v in non_null_data]
-                if str_data:
-                    min_val = min(str_data)
-                    max_val = max(str_data)
-            elif isinstance(first_val, datetime):
-                data_type = "datetime"
-                date_data = [v for v in non_null_data if isinstance(v, datetime)]
-                if date_data:
-                    min_val = str(min(date_data))
-                    max_val = str(max(date_data))
-
-            counter = Counter(str(v) for v in non_null_data)
-            most_common = counter.most_common(1)
-            if most_common:
-                mode_val = most_common[0][0]
+    def profile_partitions(
+        self,
+        partitions: Iterable[Iterable[Any]],
+        column_name: str,
+        config: SketchConfig | None = None,
+        executor: Executor | None = None,
+    ) -> "StreamingColumnProfiler":
+        """Profile partitions independently, on the executor if given, and merge the sketches"""
+        config = config or SketchConfig()
+        if executor is None:
+            profilers = (_profile_partition(column_name, partition, config) for partition in partitions)
+        else:
+            profilers = executor.map(_profile_partition, repeat(column_name), partitions, repeat(config))
 
-        return ColumnStatistics(
-            column_name=column_name,
-            data_type=data_type,
-            total_count=total_count,
-            null_count=null_count,
-            distinct_count=distinct_count,
-            min_value=min_val,
-            max_value=max_val,
-            avg_value=avg_val,
-            std_dev=std_dev,
-            median_value=median_val,
-            mode_value=mode_val,
-            empty_string_count=empty_count,
-        )
+        merged = StreamingColumnProfiler(column_name, config)
+        for profiler in profilers:
+            merged.merge(profiler)
+        return merged
 
     def detect_patterns(self, data: list[str], max_samples: int = 5) -> list[PatternDetectionResult]:
         results = []
@@ -199,4 +181,137 @@ class DataProfilingUtilities:
         return self._common_patterns.copy()
 
 
+class StreamingColumnProfiler:
+    """Single-pass column profile built from mergeable sketches.
+
+    Distinct count, mode and median are exact for small columns and approximate
+    once the HyperLogLog, Misra-Gries and KLL sketches start compacting.
+    """
+
+    def __init__(self, column_name: str, config: SketchConfig | None = None):
+        config = config or SketchConfig()
+        self.column_name = column_name
+        self.config = config
+        self.total_count = 0
+        self.null_count = 0
+        self.empty_count = 0
+        self.data_type = "unknown"
+        self.distinct = HyperLogLog(config.hll_precision)
+        self.frequent = MisraGries(config.top_k)
+        self.quantiles = KLLSketch(config.kll_k, config.seed)
+        self.numeric = RunningMoments()
+        self.lengths = RunningMoments()
+        self.string_range = ValueRange()
+        self.datetime_range = ValueRange()
+
+    def add(self, value: Any) -> None:
+        self.total_count += 1
+        if value is None:
+            self.null_count += 1
+            return
+        if value == "":
+            self.empty_count += 1
+            return
+
+        if self.data_type == "unknown":
+            self.data_type = _profile_type(value)
+
+        text = str(value)
+        self.distinct.add(text)
+        self.frequent.add(text)
+        self.string_range.add(text)
+
+        if isinstance(value, (int, float, Decimal)):
+            number = float(value)
+            self.numeric.add(number)
+            self.quantiles.add(number)
+        elif isinstance(value, str):
+            self.lengths.add(len(value))
+        elif isinstance(value, datetime):
+            self.datetime_range.add(value)
+
+    def update(self, values: Iterable[Any]) -> "StreamingColumnProfiler":
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other: "StreamingColumnProfiler") -> "StreamingColumnProfiler":
+        self.total_count += other.total_count
+        self.null_count += other.null_count
+        self.empty_count += other.empty_count
+        if self.data_type == "unknown":
+            self.data_type = other.data_type
+        self.distinct.merge(other.distinct)
+        self.frequent.merge(other.frequent)
+        self.quantiles.merge(other.quantiles)
+        self.numeric.merge(other.numeric)
+        self.lengths.merge(other.lengths)
+        self.string_range.merge(other.string_range)
+        self.datetime_range.merge(other.datetime_range)
+        return self
+
+    def to_statistics(self) -> ColumnStatistics:
+        min_val = None
+        max_val = None
+        avg_val = None
+        std_dev = None
+        median_val = None
+        percentiles: dict[str, Decimal] = {}
+
+        if self.data_type == "numeric" and self.numeric.count:
+            min_val = str(self.numeric.minimum)
+            max_val = str(self.numeric.maximum)
+            avg_val = Decimal(str(self.numeric.mean))
+            if self.numeric.std_dev is not None:
+                std_dev = Decimal(str(self.numeric.std_dev))
+            for q, value in self.quantiles.quantiles(list(PROFILE_PERCENTILES)).items():
+                if value is not None:
+                    percentiles[f"p{round(q * 100)}"] = Decimal(str(value))
+            median = self.quantiles.quantile(0.5)
+            median_val = str(median) if median is not None else None
+        elif self.data_type == "string":
+            min_val = self.string_range.minimum
+            max_val = self.string_range.maximum
+        elif self.data_type == "datetime" and self.datetime_range.minimum is not None:
+            min_val = str(self.datetime_range.minimum)
+            max_val = str(self.datetime_range.maximum)
+
+        top_values = self.frequent.top()
+        has_lengths = self.lengths.count > 0
+
+        return ColumnStatistics(
+            column_name=self.column_name,
+            data_type=self.data_type,
+            total_count=self.total_count,
+            null_count=self.null_count,
+            distinct_count=self.distinct.estimate(),
+            min_value=min_val,
+            max_value=max_val,
+            avg_value=avg_val,
+            std_dev=std_dev,
+            median_value=median_val,
+            mode_value=top_values[0][0] if top_values else None,
+            empty_string_count=self.empty_count,
+            percentiles=percentiles,
+            top_values=top_values,
+            min_length=self.lengths.minimum if has_lengths else None,
+            max_length=self.lengths.maximum if has_lengths else None,
+            avg_length=Decimal(str(round(self.lengths.mean, 4))) if has_lengths else None,
+        )
+
+
+def _profile_type(value: Any) -> str:
+    if isinstance(value, (int, float, Decimal)):
+        return "numeric"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, datetime):
+        return "datetime"
+    return "unknown"
+
+
+def _profile_partition(column_name: str, partition: Iterable[Any], config: SketchConfig) -> StreamingColumnProfiler:
+    return StreamingColumnProfiler(column_name, config).update(partition)
+
+
 data_profiling_utilities = DataProfilingUtilities()
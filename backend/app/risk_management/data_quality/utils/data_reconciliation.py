@@ -1,12 +1,15 @@
 """Data Reconciliation Utilities"""
 
-from dataclasses import dataclass
+from collections.abc import Iterable
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from decimal import Decimal
 from enum import Enum
 from typing import Any
 from uuid import uuid4
 
+from .reconciliation_engine import BucketOutcome, ReconciliationEngine
+
 
 class ReconciliationType(str, Enum):
     COUNT_MATCH = "count_match"
@@ -54,6 +57,8 @@ class ReconciliationResult:
     difference: Decimal | None
     execution_time_ms: int
     executed_at: datetime
+    break_summary: dict[str, int] = field(default_factory=dict)
+    breaks_truncated: bool = False
 
 
 class DataReconciliationUtilities:
@@ -193,87 +198,83 @@ class DataReconciliationUtilities:
         target_name: str = "target",
     ) -> ReconciliationResult:
         start_time = datetime.now(UTC)
+        engine = self._engine(key_fields, compare_fields, bucket_count=1, memory_limit=None, max_breaks=None)
+        outcome = engine.reconcile(source_data, target_data)
+        return self._record_match_result(outcome, None, source_name, target_name, start_time)
 
-        source_map = {}
-        for record in source_data:
-            key = tuple(str(record.get(f, "")) for f in key_fields)
-            source_map[key] = record
-
-        target_map = {}
-        for record in target_data:
-            key = tuple(str(record.get(f, "")) for f in key_fields)
-            target_map[key] = record
-
-        source_keys = set(source_map.keys())
-        target_keys = set(target_map.keys())
-
-        matched_keys = source_keys & target_keys
-        source_only = source_keys - target_keys
-        target_only = target_keys - source_keys
-
-        breaks = []
-        matched_count = 0
-
-        for key in source_only:
-            breaks.append(
-                ReconciliationBreak(
-                    break_id=str(uuid4()),
-                    break_type="missing_in_target",
-                    key_value=str(key),
-                    source_value=source_map[key],
-                    target_value=None,
-                    difference="record_missing",
-                    severity="high",
-                    detected_at=datetime.now(UTC),
-                )
-            )
-
-        for key in target_only:
-            breaks.append(
-                ReconciliationBreak(
-                    break_id=str(uuid4()),
-                    break_type="missing_in_source",
-                    key_value=str(key),
-                    source_value=None,
-                    target_value=target_map[key],
-                    difference="record_extra",
-                    severity="high",
-                    detected_at=datetime.now(UTC),
-                )
-            )
+    def reconcile_records_partitioned(
+        self,
+        source_data: Iterable[dict[str, Any]],
+        target_data: Iterable[dict[str, Any]],
+        key_fields: list[str],
+        compare_fields: list[str] | None = None,
+        source_name: str = "source",
+        target_name: str = "target",
+        bucket_count: int = 64,
+        memory_limit: int | None = 100_000,
+        max_breaks: int | None = 1000,
+        max_workers: int | None = None,
+        spill_dir: str | None = None,
+    ) -> ReconciliationResult:
+        """Reconcile sources too large for memory by spilling hash buckets to disk"""
+        start_time = datetime.now(UTC)
+        engine = self._engine(
+            key_fields, compare_fields, bucket_count, memory_limit, max_breaks, max_workers, spill_dir
+        )
+        outcome = engine.reconcile(source_data, target_data)
+        return self._record_match_result(outcome, max_breaks, source_name, target_name, start_time)
 
-        fields_to_compare = compare_fields or list(
-            set(source_data[0].keys()) if source_data else set()
+    def _engine(
+        self,
+        key_fields: list[str],
+        compare_fields: list[str] | None,
+        bucket_count: int,
+        memory_limit: int | None,
+        max_breaks: int | None,
+        max_workers: int | None = None,
+        spill_dir: str | None = None,
+    ) -> ReconciliationEngine:
+        return ReconciliationEngine(
+            key_fields=key_fields,
+            compare_fields=compare_fields,
+            tolerance_percentage=self._tolerance_percentage,
+            tolerance_absolute=self._tolerance_absolute,
+            bucket_count=bucket_count,
+            memory_limit=memory_limit,
+            max_breaks=max_breaks,
+            max_workers=max_workers,
+            spill_dir=spill_dir,
         )
 
-        for key in matched_keys:
-            source_record = source_map[key]
-            target_record = target_map[key]
-            has_diff = False
-
-            for field_name in fields_to_compare:
-                source_val = source_record.get(field_name)
-                target_val = target_record.get(field_name)
-
-                if source_val != target_val:
-                    has_diff = True
-                    breaks.append(
-                        ReconciliationBreak(
-                            break_id=str(uuid4()),
-                            break_type="value_mismatch",
-                            key_value=f"{key}.{field_name}",
-                            source_value=source_val,
-                            target_value=target_val,
-                            difference=f"{source_val} != {target_val}",
-                            severity="medium",
-                            detected_at=datetime.now(UTC),
-                        )
-                    )
-
-            if not has_diff:
-                matched_count += 1
-
-        total_records = len(source_data)
+    def _record_match_result(
+        self,
+        outcome: BucketOutcome,
+        max_breaks: int | None,
+        source_name: str,
+        target_name: str,
+        start_time: datetime,
+    ) -> ReconciliationResult:
+        detected_at = datetime.now(UTC)
+        breaks = [
+            ReconciliationBreak(
+                break_id=str(uuid4()),
+                break_type=break_type,
+                key_value=key_value,
+                source_value=source_value,
+                target_value=target_value,
+                difference=difference,
+                severity=severity,
+                detected_at=detected_at,
+            )
+            for break_type, key_value, source_value, target_value, difference, severity in outcome.breaks
+        ]
+
+        counts = outcome.break_counts
+        total_breaks = sum(count for name, count in counts.items() if name != "mismatched_records")
+        source_only = counts["missing_in_target"]
+        target_only = counts["missing_in_source"]
+        matched_count = outcome.matched_count
+        total_records = outcome.source_count
         unmatched_count = total_records - matched_count
         match_rate = Decimal(str(round(matched_count / total_records * 100, 2))) if total_records > 0 else Decimal("100")
 
@@ -293,8 +294,8 @@ class DataReconciliationUtilities:
             source_name=source_name,
             target_name=target_name,
             status=status,
-            source_count=len(source_data),
-            target_count=len(target_data),
+            source_count=outcome.source_count,
+            target_count=outcome.target_count,
             matched_count=matched_count,
             unmatched_count=unmatched_count,
             match_rate=match_rate,
@@ -304,6 +305,8 @@ class DataReconciliationUtilities:
             difference=None,
             execution_time_ms=exec_time,
             executed_at=end_time,
+            break_summary=dict(counts),
+            breaks_truncated=max_breaks is not None and total_breaks > len(breaks),
         )
 
     def set_tolerance(
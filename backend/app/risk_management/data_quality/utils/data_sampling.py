@@ -1,10 +1,18 @@
 """Data Sampling Utilities"""
 
+import hashlib
+import heapq
+import math
 import random
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from decimal import Decimal
 from enum import Enum
+from itertools import count, islice
+from operator import itemgetter
+from statistics import NormalDist
 from typing import Any
 from uuid import uuid4
 
@@ -29,61 +37,143 @@ class SamplingResult:
     sampled_at: datetime
 
 
+def reservoir(iterable: Iterable[Any], k: int, rng: random.Random) -> tuple[list[Any], int]:
+    """Algorithm L: uniform k-sample in one pass, skipping geometrically many items at a time.
+
+    Sequences are indexed at the replacement positions only, so about
+    k * log(n / k) items are touched; other iterables are advanced past each
+    skip without inspecting the skipped items. Returns the sample and the
+    number of items in the input.
+    """
+    if isinstance(iterable, Sequence):
+        total = len(iterable)
+        sample = [iterable[index] for index in range(min(k, total))]
+        if total > k > 0:
+            position = k - 1
+            for skip, slot in _replacements(k, rng):
+                position += skip + 1
+                if position >= total:
+                    break
+                sample[slot] = iterable[position]
+        return sample, total
+
+    counter = count()
+    source = map(itemgetter(0), zip(iterable, counter, strict=False))
+    sample = list(islice(source, k))
+    if len(sample) == k > 0:
+        for skip, slot in _replacements(k, rng):
+            item = next(islice(source, skip, None), _EXHAUSTED)
+            if item is _EXHAUSTED:
+                break
+            sample[slot] = item
+    else:
+        deque(source, maxlen=0)
+    return sample, next(counter)
+
+
+def _replacements(k: int, rng: random.Random) -> Iterator[tuple[int, int]]:
+    """Endless Algorithm L steps: skip that many items, then put the next one in that slot"""
+    w = math.exp(math.log(1 - rng.random()) / k)
+    while True:
+        skip = math.floor(math.log(1 - rng.random()) / math.log(1 - w)) if w < 1 else 0
+        yield skip, rng.randrange(k)
+        w *= math.exp(math.log(1 - rng.random()) / k)
+
+
+def wilson_interval(successes: int, trials: int, confidence: float = 0.95) -> tuple[float, float]:
+    """Wilson score interval for a proportion estimated from a sample"""
+    if trials == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, centre - half_width), min(1.0, centre + half_width)
+
+
+def estimate_distinct(frequencies: Iterable[int], sample_size: int, population_size: int) -> int:
+    """GEE estimator: values seen once in the sample stand for sqrt(N / n) population values"""
+    frequencies = list(frequencies)
+    if sample_size == 0:
+        return 0
+    singletons = sum(1 for f in frequencies if f == 1)
+    repeated = len(frequencies) - singletons
+    estimate = math.sqrt(population_size / sample_size) * singletons + repeated
+    return min(round(estimate), population_size)
+
+
+_EXHAUSTED = object()
+
+
 class DataSamplingUtilities:
     def __init__(self):
         self._default_seed = 42
 
-    def random_sample(
+    def _rng(self, seed: int | None) -> random.Random:
+        return random.Random(seed if seed is not None else self._default_seed)
+
+    def _result(
         self,
-        data: list[dict[str, Any]],
-        sample_size: int | None = None,
-        sample_percentage: Decimal | None = None,
-        seed: int | None = None,
+        method: SamplingMethod,
+        total: int,
+        sample: list[dict[str, Any]],
+        seed: int | None,
     ) -> SamplingResult:
-        if seed is not None:
-            random.seed(seed)
-        elif self._default_seed is not None:
-            random.seed(self._default_seed)
-
-        total = len(data)
-
-        if sample_size is None and sample_percentage is not None:
-            sample_size = int(total * float(sample_percentage) / 100)
-        elif sample_size is None:
-            sample_size = min(1000, total)
-
-        sample_size = min(sample_size, total)
-        sample = random.sample(data, sample_size)
-
         return SamplingResult(
             sample_id=str(uuid4()),
-            method=SamplingMethod.RANDOM,
+            method=method,
             total_records=total,
             sample_size=len(sample),
             sample_percentage=Decimal(str(round(len(sample) / total * 100, 2))) if total > 0 else Decimal("0"),
             sample_records=sample,
-            sampling_seed=seed or self._default_seed,
+            sampling_seed=seed,
             sampled_at=datetime.now(UTC),
         )
 
+    def random_sample(
+        self,
+        data: Iterable[dict[str, Any]],
+        sample_size: int | None = None,
+        sample_percentage: Decimal | None = None,
+        seed: int | None = None,
+    ) -> SamplingResult:
+        """Lists are sampled by index; other iterables in one pass (reservoir, or
+        Bernoulli when only a percentage is given)"""
+        rng = self._rng(seed)
+        sampling_seed = seed or self._default_seed
+
+        if isinstance(data, Sequence):
+            total = len(data)
+            if sample_size is None and sample_percentage is not None:
+                sample_size = int(total * float(sample_percentage) / 100)
+            elif sample_size is None:
+                sample_size = min(1000, total)
+            sample = rng.sample(data, min(sample_size, total))
+            return self._result(SamplingMethod.RANDOM, total, sample, sampling_seed)
+
+        if sample_size is None and sample_percentage is not None:
+            probability = float(sample_percentage) / 100
+            sample = []
+            total = 0
+            for record in data:
+                total += 1
+                if rng.random() < probability:
+                    sample.append(record)
+            return self._result(SamplingMethod.RANDOM, total, sample, sampling_seed)
+
+        sample, total = reservoir(data, 1000 if sample_size is None else sample_size, rng)
+        return self._result(SamplingMethod.RANDOM, total, sample, sampling_seed)
+
     def systematic_sample(
         self,
-        data: list[dict[str, Any]],
+        data: Sequence[dict[str, Any]],
         sample_size: int,
         start_offset: int = 0,
     ) -> SamplingResult:
         total = len(data)
         if sample_size >= total:
-            return SamplingResult(
-                sample_id=str(uuid4()),
-                method=SamplingMethod.SYSTEMATIC,
-                total_records=total,
-                sample_size=total,
-                sample_percentage=Decimal("100"),
-                sample_records=data.copy(),
-                sampling_seed=None,
-                sampled_at=datetime.now(UTC),
-            )
+            return self._result(SamplingMethod.SYSTEMATIC, total, list(data), None)
 
         interval = total // sample_size
         sample = []
@@ -93,128 +183,85 @@ class DataSamplingUtilities:
             sample.append(data[index])
             index += interval
 
-        return SamplingResult(
-            sample_id=str(uuid4()),
-            method=SamplingMethod.SYSTEMATIC,
-            total_records=total,
-            sample_size=len(sample),
-            sample_percentage=Decimal(str(round(len(sample) / total * 100, 2))) if total > 0 else Decimal("0"),
-            sample_records=sample,
-            sampling_seed=None,
-            sampled_at=datetime.now(UTC),
-        )
+        return self._result(SamplingMethod.SYSTEMATIC, total, sample, None)
 
     def stratified_sample(
         self,
-        data: list[dict[str, Any]],
+        data: Iterable[dict[str, Any]],
         stratify_field: str,
         sample_size: int,
         seed: int | None = None,
     ) -> SamplingResult:
-        if seed is not None:
-            random.seed(seed)
-        elif self._default_seed is not None:
-            random.seed(self._default_seed)
-
+        """One pass with a reservoir per stratum; allocation is proportional to the
+        stratum sizes seen, with at least one record per stratum"""
+        rng = self._rng(seed)
         strata: dict[Any, list[dict[str, Any]]] = {}
+        seen: dict[Any, int] = {}
+
+        total = 0
         for record in data:
+            total += 1
             stratum_value = record.get(stratify_field)
-            if stratum_value not in strata:
-                strata[stratum_value] = []
-            strata[stratum_value].append(record)
+            n = seen.get(stratum_value, 0) + 1
+            seen[stratum_value] = n
+            stratum = strata.setdefault(stratum_value, [])
+            if len(stratum) < sample_size:
+                stratum.append(record)
+            else:
+                j = rng.randrange(n)
+                if j < sample_size:
+                    stratum[j] = record
 
-        total = len(data)
         sample = []
-
-        for _stratum_value, stratum_records in strata.items():
-            stratum_proportion = len(stratum_records) / total
-            stratum_sample_size = max(1, int(sample_size * stratum_proportion))
+        for stratum_value, stratum_records in strata.items():
+            stratum_sample_size = max(1, int(sample_size * seen[stratum_value] / total))
             stratum_sample_size = min(stratum_sample_size, len(stratum_records))
-            sample.extend(random.sample(stratum_records, stratum_sample_size))
+            sample.extend(rng.sample(stratum_records, stratum_sample_size))
 
-        return SamplingResult(
-            sample_id=str(uuid4()),
-            method=SamplingMethod.STRATIFIED,
-            total_records=total,
-            sample_size=len(sample),
-            sample_percentage=Decimal(str(round(len(sample) / total * 100, 2))) if total > 0 else Decimal("0"),
-            sample_records=sample,
-            sampling_seed=seed or self._default_seed,
-            sampled_at=datetime.now(UTC),
-        )
+        return self._result(SamplingMethod.STRATIFIED, total, sample, seed or self._default_seed)
 
     def cluster_sample(
         self,
-        data: list[dict[str, Any]],
+        data: Iterable[dict[str, Any]],
         cluster_field: str,
         num_clusters: int,
         seed: int | None = None,
     ) -> SamplingResult:
-        if seed is not None:
-            random.seed(seed)
-        elif self._default_seed is not None:
-            random.seed(self._default_seed)
+        """Keeps the num_clusters cluster keys with the smallest seeded hash, a uniform
+        choice of clusters made in one pass; only their records are held in memory"""
+        salt = str(seed if seed is not None else self._default_seed).encode()
+        selected: list[tuple[int, str]] = []
+        clusters: dict[str, list[dict[str, Any]]] = {}
 
-        clusters: dict[Any, list[dict[str, Any]]] = {}
+        total = 0
         for record in data:
-            cluster_value = record.get(cluster_field)
-            if cluster_value not in clusters:
-                clusters[cluster_value] = []
-            clusters[cluster_value].append(record)
-
-        total = len(data)
-        cluster_keys = list(clusters.keys())
-        num_clusters = min(num_clusters, len(cluster_keys))
-
-        selected_clusters = random.sample(cluster_keys, num_clusters)
-        sample = []
-        for cluster_key in selected_clusters:
-            sample.extend(clusters[cluster_key])
-
-        return SamplingResult(
-            sample_id=str(uuid4()),
-            method=SamplingMethod.CLUSTER,
-            total_records=total,
-            sample_size=len(sample),
-            sample_percentage=Decimal(str(round(len(sample) / total * 100, 2))) if total > 0 else Decimal("0"),
-            sample_records=sample,
-            sampling_seed=seed or self._default_seed,
-            sampled_at=datetime.now(UTC),
-        )
+            total += 1
+            key = repr(record.get(cluster_field))
+            if key in clusters:
+                clusters[key].append(record)
+                continue
+            if num_clusters <= 0:
+                continue
+            rank = -int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8, salt=salt[:16]).digest(), "big")
+            if len(selected) < num_clusters:
+                heapq.heappush(selected, (rank, key))
+                clusters[key] = [record]
+            elif rank > selected[0][0]:
+                _evicted_rank, evicted = heapq.heapreplace(selected, (rank, key))
+                del clusters[evicted]
+                clusters[key] = [record]
+
+        sample = [record for _rank, key in sorted(selected, reverse=True) for record in clusters[key]]
+        return self._result(SamplingMethod.CLUSTER, total, sample, seed or self._default_seed)
 
     def reservoir_sample(
         self,
-        data_iterator,
+        data_iterator: Iterable[dict[str, Any]],
         sample_size: int,
         seed: int | None = None,
     ) -> SamplingResult:
-        if seed is not None:
-            random.seed(seed)
-        elif self._default_seed is not None:
-            random.seed(self._default_seed)
-
-        reservoir = []
-        total_count = 0
-
-        for record in data_iterator:
-            total_count += 1
-            if len(reservoir) < sample_size:
-                reservoir.append(record)
-            else:
-                j = random.randint(0, total_count - 1)
-                if j < sample_size:
-                    reservoir[j] = record
-
-        return SamplingResult(
-            sample_id=str(uuid4()),
-            method=SamplingMethod.RESERVOIR,
-            total_records=total_count,
-            sample_size=len(reservoir),
-            sample_percentage=Decimal(str(round(len(reservoir) / total_count * 100, 2))) if total_count > 0 else Decimal("0"),
-            sample_records=reservoir,
-            sampling_seed=seed or self._default_seed,
-            sampled_at=datetime.now(UTC),
-        )
+        sample, total_count = reservoir(data_iterator, sample_size, self._rng(seed))
+        return self._result(SamplingMethod.RESERVOIR, total_count, sample, seed or self._default_seed)
 
     def set_default_seed(self, seed: int) -> None:
         self._default_seed = seed
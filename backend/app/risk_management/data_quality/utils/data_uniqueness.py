@@ -7,6 +7,8 @@ from decimal import Decimal
 from typing import Any
 from uuid import uuid4
 
+from .dedup_engine import DeduplicationEngine
+
 
 @dataclass
 class DuplicateGroup:
@@ -45,6 +47,7 @@ class CompositeUniquenessResult:
 class DataUniquenessUtilities:
     def __init__(self):
         self._unique_constraints: dict[str, list[str]] = {}
+        self._engine = DeduplicationEngine(strip_values=False)
 
     def check_field_uniqueness(
         self,
@@ -159,65 +162,15 @@ class DataUniquenessUtilities:
     ) -> list[tuple[str, str, Decimal]]:
         near_duplicates = []
 
-        for i in range(len(data)):
-            for j in range(i + 1, len(data)):
-                record1 = data[i]
-                record2 = data[j]
-
-                similarity = self._calculate_record_similarity(
-                    record1, record2, compare_fields
-                )
-
-                if similarity >= similarity_threshold:
-                    id1 = str(record1.get(id_field, i))
-                    id2 = str(record2.get(id_field, j))
-                    near_duplicates.append((id1, id2, similarity))
+        for i, j, similarity in self._engine.find_matching_pairs(
+            data, compare_fields, float(similarity_threshold)
+        ):
+            id1 = str(data[i].get(id_field, i))
+            id2 = str(data[j].get(id_field, j))
+            near_duplicates.append((id1, id2, Decimal(str(round(similarity, 4)))))
 
         return near_duplicates
 
-    def _calculate_record_similarity(
-        self,
-        record1: dict[str, Any],
-        record2: dict[str, Any],
-        fields: list[str],
-    ) -> Decimal:
-        if not fields:
-            return Decimal("0")
-
-        total_similarity = Decimal("0")
-        for field in fields:
-            val1 = str(record1.get(field, ""))
-            val2 = str(record2.get(field, ""))
-            total_similarity += self._string_similarity(val1, val2)
-
-        return total_similarity / Decimal(str(len(fields)))
-
-    def _string_similarity(self, s1: str, s2: str) -> Decimal:
-        if s1 == s2:
-            return Decimal("1")
-        if not s1 or not s2:
-            return Decimal("0")
-
-        s1 = s1.lower()
-        s2 = s2.lower()
-
-        if len(s1) < len(s2):
-            s1, s2 = s2, s1
-
-        previous = range(len(s2) + 1)
-        for i, c1 in enumerate(s1):
-            current = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous[j + 1] + 1
-                deletions = current[j] + 1
-                substitutions = previous[j] + (c1 != c2)
-                current.append(min(insertions, deletions, substitutions))
-            previous = current
-
-        distance = previous[-1]
-        max_len = max(len(s1), len(s2))
-        return Decimal(str(round(1 - (distance / max_len), 4)))
-
     def get_value_frequency(
         self,
         data: list[dict[str, Any]],
@@ -0,0 +1,238 @@
+"""Blocking and Sorted-Neighborhood Deduplication Engine"""
+
+import re
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Any
+
+from .match_algorithms import MatchAlgorithms
+
+_EPSILON = 1e-9
+_MINHASH_PRIME = (1 << 61) - 1
+
+
+class BlockingStrategy(StrEnum):
+    PREFIX = "prefix"
+    SOUNDEX = "soundex"
+    NGRAM_LSH = "ngram_lsh"
+
+
+@dataclass
+class BlockingKey:
+    field: str
+    strategy: BlockingStrategy = BlockingStrategy.PREFIX
+    length: int = 3
+    bands: int = 8
+    rows_per_band: int = 2
+
+
+def bounded_levenshtein(s1: str, s2: str, max_distance: int) -> int | None:
+    """Edit distance of two strings, or None as soon as it must exceed max_distance"""
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    len1, len2 = len(s1), len(s2)
+    if len1 - len2 > max_distance:
+        return None
+    if len2 == 0:
+        return len1
+
+    # Only cells within max_distance of the diagonal can stay under the bound
+    cap = max_distance + 1
+    previous = [j if j <= max_distance else cap for j in range(len2 + 1)]
+    for i in range(1, len1 + 1):
+        current = [cap] * (len2 + 1)
+        current[0] = i if i <= max_distance else cap
+        row_min = current[0]
+        c1 = s1[i - 1]
+        for j in range(max(1, i - max_distance), min(len2, i + max_distance) + 1):
+            value = min(previous[j - 1] + (c1 != s2[j - 1]), previous[j] + 1, current[j - 1] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > max_distance:
+            return None
+        previous = current
+
+    distance = previous[-1]
+    return distance if distance <= max_distance else None
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+class DeduplicationEngine:
+    """Candidate pairs come from blocking keys plus a sorted-neighborhood pass
+    over the concatenated match fields; only candidates are scored, with
+    float similarity and early exit once a pair can no longer reach the
+    threshold."""
+
+    def __init__(
+        self,
+        blocking_keys: list[BlockingKey] | None = None,
+        window_size: int = 10,
+        strip_values: bool = True,
+    ):
+        self.blocking_keys = blocking_keys
+        self.window_size = window_size
+        self.strip_values = strip_values
+        self._match_algorithms = MatchAlgorithms()
+
+    def _normalize(self, value: Any) -> str:
+        text = str(value).lower()
+        return text.strip() if self.strip_values else text
+
+    def _block_keys(self, value: str, key: BlockingKey) -> list[Any]:
+        if not value:
+            return []
+        if key.strategy == BlockingStrategy.PREFIX:
+            return [value[:key.length]]
+        if key.strategy == BlockingStrategy.SOUNDEX:
+            code = self._match_algorithms.soundex(value)
+            return [code] if code else []
+        return self._lsh_bands(value, key)
+
+    def _lsh_bands(self, value: str, key: BlockingKey) -> list[Any]:
+        compact = re.sub(r"\s+", " ", value)
+        shingles = {compact[i:i + key.length] for i in range(max(len(compact) - key.length + 1, 1))}
+        hashes = [zlib.crc32(s.encode()) for s in shingles]
+        signature = []
+        for k in range(key.bands * key.rows_per_band):
+            a, b = 2 * k + 1, 7919 * (k + 1)
+            signature.append(min((a * h + b) % _MINHASH_PRIME for h in hashes))
+        return [
+            (band, tuple(signature[band * key.rows_per_band:(band + 1) * key.rows_per_band]))
+            for band in range(key.bands)
+        ]
+
+    def _window_pairs(self, ordered: list[int], pairs: set[tuple[int, int]]) -> None:
+        for position, i in enumerate(ordered):
+            for j in ordered[position + 1:position + self.window_size]:
+                pairs.add((i, j) if i < j else (j, i))
+
+    def candidate_pairs(
+        self,
+        values: list[tuple[str, ...]],
+        data: list[dict[str, Any]],
+        match_fields: list[str],
+    ) -> set[tuple[int, int]]:
+        pairs: set[tuple[int, int]] = set()
+
+        # Sorted neighborhood over the concatenated match fields
+        sort_keys = ["\x1f".join(v) for v in values]
+        self._window_pairs(sorted(range(len(values)), key=sort_keys.__getitem__), pairs)
+
+        blocking_keys = self.blocking_keys or [
+            BlockingKey(field=match_fields[0], strategy=BlockingStrategy.PREFIX),
+            BlockingKey(field=match_fields[0], strategy=BlockingStrategy.SOUNDEX),
+        ]
+        for key in blocking_keys:
+            blocks: dict[Any, list[int]] = defaultdict(list)
+            field_values = [self._normalize(record.get(key.field, "")) for record in data]
+            for index, value in enumerate(field_values):
+                for block in self._block_keys(value, key):
+                    blocks[block].append(index)
+            for members in blocks.values():
+                if len(members) > 1:
+                    # Sorted window inside the block keeps large blocks from going quadratic
+                    members.sort(key=field_values.__getitem__)
+                    self._window_pairs(members, pairs)
+        return pairs
+
+    def similarity(
+        self,
+        values1: tuple[str, ...],
+        values2: tuple[str, ...],
+        threshold: float,
+        chars1: tuple[frozenset[str], ...] | None = None,
+        chars2: tuple[frozenset[str], ...] | None = None,
+    ) -> float | None:
+        """Mean per-field Levenshtein similarity, or None once it cannot reach threshold.
+
+        Character sets, when given, reject a field before the edit distance is
+        computed: each character missing from the other side costs at least one edit.
+        """
+        field_count = len(values1)
+        needed = threshold * field_count
+        total = 0.0
+        for position, (a, b) in enumerate(zip(values1, values2, strict=True)):
+            remaining = field_count - position - 1
+            if a == b:
+                similarity = 1.0
+            elif not a or not b:
+                similarity = 0.0
+            else:
+                min_similarity = needed - total - remaining
+                if min_similarity > 1 + _EPSILON:
+                    return None
+                max_len = max(len(a), len(b))
+                max_distance = max_len if min_similarity <= 0 else int((1 - min_similarity) * max_len + _EPSILON)
+                if chars1 is not None and chars2 is not None:
+                    set1, set2 = chars1[position], chars2[position]
+                    if max(len(set1 - set2), len(set2 - set1)) > max_distance:
+                        return None
+                distance = bounded_levenshtein(a, b, max_distance)
+                if distance is None:
+                    return None
+                similarity = 1 - distance / max_len
+            total += similarity
+            if total + remaining < needed - _EPSILON:
+                return None
+        return total / field_count if field_count else None
+
+    def find_matching_pairs(
+        self,
+        data: list[dict[str, Any]],
+        match_fields: list[str],
+        threshold: float,
+    ) -> list[tuple[int, int, float]]:
+        if not match_fields or len(data) < 2:
+            return []
+        values = [tuple(self._normalize(record.get(f, "")) for f in match_fields) for record in data]
+        chars = [tuple(frozenset(v) for v in record_values) for record_values in values]
+        matches = []
+        for i, j in sorted(self.candidate_pairs(values, data, match_fields)):
+            score = self.similarity(values[i], values[j], threshold, chars[i], chars[j])
+            if score is not None:
+                matches.append((i, j, score))
+        return matches
+
+    def find_groups(
+        self,
+        data: list[dict[str, Any]],
+        match_fields: list[str],
+        threshold: float,
+    ) -> list[tuple[list[int], float]]:
+        """Transitive duplicate groups with the weakest linking score of each"""
+        union_find = _UnionFind(len(data))
+        pairs = self.find_matching_pairs(data, match_fields, threshold)
+        for i, j, _score in pairs:
+            union_find.union(i, j)
+
+        members: dict[int, list[int]] = defaultdict(list)
+        for index in range(len(data)):
+            members[union_find.find(index)].append(index)
+        weakest: dict[int, float] = {}
+        for i, _j, score in pairs:
+            root = union_find.find(i)
+            weakest[root] = min(weakest.get(root, 1.0), score)
+
+        return [(group, weakest[root]) for root, group in members.items() if len(group) > 1]
+
+
+deduplication_engine = DeduplicationEngine()
@@ -1,7 +1,10 @@
 """Data Lineage Graph Builder"""
 
+import heapq
+from collections import deque
 from dataclasses import dataclass, field
 from enum import Enum
+from itertools import pairwise
 from typing import Any
 
 
@@ -64,6 +67,13 @@ class LineageGraphBuilder:
         self._adjacency_list: dict[str, list[str]] = {}
         self._reverse_adjacency_list: dict[str, list[str]] = {}
         self._edge_counter = 0
+        self._edge_lookup: dict[tuple[str, str], str] = {}
+        self._reachability_cache: dict[tuple[str, str, int], list[str]] = {}
+        self._layers: list[list[str]] | None = None
+
+    def _invalidate(self) -> None:
+        self._reachability_cache.clear()
+        self._layers = None
 
     def add_node(
         self,
@@ -87,6 +97,7 @@ class LineageGraphBuilder:
             metadata=metadata or {},
         )
         self._nodes[node_id] = node
+        self._invalidate()
 
         if node_id not in self._adjacency_list:
             self._adjacency_list[node_id] = []
@@ -117,6 +128,8 @@ class LineageGraphBuilder:
             metadata=metadata or {},
         )
         self._edges[edge_id] = edge
+        self._edge_lookup.setdefault((source_node_id, target_node_id), edge_id)
+        self._invalidate()
 
         if source_node_id not in self._adjacency_list:
             self._adjacency_list[source_node_id] = []
@@ -129,96 +142,161 @@ class LineageGraphBuilder:
         return edge
 
     def get_upstream_nodes(self, node_id: str, max_depth: int = 10) -> list[LineageNode]:
-        visited = set()
-        result = []
-        self._traverse_upstream(node_id, visited, result, 0, max_depth)
-        return result
-
-    def _traverse_upstream(
-        self, node_id: str, visited: set[str], result: list[LineageNode], depth: int, max_depth: int
-    ) -> None:
-        if depth >= max_depth or node_id in visited:
-            return
-
-        visited.add(node_id)
-        upstream_ids = self._reverse_adjacency_list.get(node_id, [])
-
-        for upstream_id in upstream_ids:
-            if upstream_id in self._nodes and upstream_id not in visited:
-                result.append(self._nodes[upstream_id])
-                self._traverse_upstream(upstream_id, visited, result, depth + 1, max_depth)
+        return [self._nodes[n] for n in self._reachable(node_id, max_depth, upstream=True)]
 
     def get_downstream_nodes(self, node_id: str, max_depth: int = 10) -> list[LineageNode]:
-        visited = set()
+        return [self._nodes[n] for n in self._reachable(node_id, max_depth, upstream=False)]
+
+    def _reachable(self, node_id: str, max_depth: int, upstream: bool) -> list[str]:
+        """Nodes within max_depth hops in breadth-first order, cached until the graph changes"""
+        layers = self.get_topological_layers()
+        if sum(len(layer) for layer in layers) == len(self._nodes):
+            # In a DAG no path is longer than the layering, so deeper limits share one entry
+            max_depth = min(max_depth, len(layers))
+
+        key = ("up" if upstream else "down", node_id, max_depth)
+        cached = self._reachability_cache.get(key)
+        if cached is not None:
+            return cached
+
+        adjacency = self._reverse_adjacency_list if upstream else self._adjacency_list
+        visited = {node_id}
         result = []
-        self._traverse_downstream(node_id, visited, result, 0, max_depth)
+        frontier = [node_id]
+        for _depth in range(max_depth):
+            next_frontier = []
+            for current in frontier:
+                for neighbor in adjacency.get(current, []):
+                    if neighbor in self._nodes and neighbor not in visited:
+                        visited.add(neighbor)
+                        result.append(neighbor)
+                        next_frontier.append(neighbor)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+
+        self._reachability_cache[key] = result
         return result
 
-    def _traverse_downstream(
-        self, node_id: str, visited: set[str], result: list[LineageNode], depth: int, max_depth: int
-    ) -> None:
-        if depth >= max_depth or node_id in visited:
-            return
-
-        visited.add(node_id)
-        downstream_ids = self._adjacency_list.get(node_id, [])
-
-        for downstream_id in downstream_ids:
-            if downstream_id in self._nodes and downstream_id not in visited:
-                result.append(self._nodes[downstream_id])
-                self._traverse_downstream(downstream_id, visited, result, depth + 1, max_depth)
+    def get_topological_layers(self) -> list[list[str]]:
+        """Longest-path layering of the acyclic part of the graph; nodes on cycles are left out"""
+        if self._layers is not None:
+            return self._layers
+
+        in_degree = dict.fromkeys(self._nodes, 0)
+        for node_id in self._nodes:
+            for target in self._adjacency_list.get(node_id, []):
+                if target in in_degree:
+                    in_degree[target] += 1
+
+        layers = []
+        layer = [node_id for node_id, degree in in_degree.items() if degree == 0]
+        while layer:
+            layers.append(layer)
+            next_layer = []
+            for node_id in layer:
+                for target in self._adjacency_list.get(node_id, []):
+                    if target in in_degree:
+                        in_degree[target] -= 1
+                        if in_degree[target] == 0:
+                            next_layer.append(target)
+            layer = next_layer
+
+        self._layers = layers
+        return layers
 
     def find_all_paths(
-        self, start_node_id: str, end_node_id: str, max_depth: int = 10
+        self, start_node_id: str, end_node_id: str, max_depth: int = 10, max_paths: int = 100
     ) -> list[LineagePath]:
-        all_paths = []
-        current_path = [start_node_id]
-        visited = {start_node_id}
-        self._find_paths_dfs(start_node_id, end_node_id, visited, current_path, all_paths, max_depth)
-        return all_paths
+        """Simple paths of fewer than max_depth hops, shortest first, capped at max_paths"""
+        paths = []
+        for nodes in self._yen_paths(start_node_id, end_node_id, max_paths):
+            if len(nodes) > max_depth:
+                break
+            paths.append(self._build_path(nodes, len(paths) + 1))
+        return paths
+
+    def find_k_shortest_paths(
+        self, start_node_id: str, end_node_id: str, k: int = 5
+    ) -> list[LineagePath]:
+        return [
+            self._build_path(nodes, index)
+            for index, nodes in enumerate(self._yen_paths(start_node_id, end_node_id, k), start=1)
+        ]
+
+    def _build_path(self, nodes: list[str], index: int) -> LineagePath:
+        return LineagePath(
+            path_id=f"path_{index}",
+            nodes=nodes,
+            edges=self._get_edges_for_path(nodes),
+            total_hops=len(nodes) - 1,
+            start_node=nodes[0],
+            end_node=nodes[-1],
+        )
 
-    def _find_paths_dfs(
-        self,
-        current: str,
-        end: str,
-        visited: set[str],
-        current_path: list[str],
-        all_paths: list[LineagePath],
-        max_depth: int,
-    ) -> None:
-        if len(current_path) > max_depth:
+    def _yen_paths(self, start: str, end: str, k: int):
+        """Yen's algorithm over hop counts: yields up to k loopless paths in order of length"""
+        if k <= 0:
             return
-
-        if current == end:
-            path = LineagePath(
-                path_id=f"path_{len(all_paths) + 1}",
-                nodes=current_path.copy(),
-                edges=self._get_edges_for_path(current_path),
-                total_hops=len(current_path) - 1,
-                start_node=current_path[0],
-                end_node=current_path[-1],
-            )
-            all_paths.append(path)
+        first = self._shortest_path(start, end, set(), set())
+        if first is None:
             return
-
-        for neighbor in self._adjacency_list.get(current, []):
-            if neighbor not in visited:
-                visited.add(neighbor)
-                current_path.append(neighbor)
-                self._find_paths_dfs(neighbor, end, visited, current_path, all_paths, max_depth)
-                current_path.pop()
-                visited.remove(neighbor)
+        accepted = [first]
+        yield first
+
+        candidates: list[tuple[int, int, list[str]]] = []
+        seen = {tuple(first)}
+        counter = 0
+        while len(accepted) < k:
+            previous = accepted[-1]
+            for i in range(len(previous) - 1):
+                root = previous[:i + 1]
+                blocked_edges = {
+                    (path[i], path[i + 1])
+                    for path in accepted
+                    if len(path) > i + 1 and path[:i + 1] == root
+                }
+                spur = self._shortest_path(previous[i], end, set(root[:-1]), blocked_edges)
+                if spur is None:
+                    continue
+                candidate = root[:-1] + spur
+                if tuple(candidate) not in seen:
+                    seen.add(tuple(candidate))
+                    counter += 1
+                    heapq.heappush(candidates, (len(candidate), counter, candidate))
+            if not candidates:
+                return
+            _length, _order, path = heapq.heappop(candidates)
+            accepted.append(path)
+            yield path
+
+    def _shortest_path(
+        self, start: str, end: str, blocked_nodes: set[str], blocked_edges: set[tuple[str, str]]
+    ) -> list[str] | None:
+        if start == end:
+            return [start]
+        parents: dict[str, str] = {start: start}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            for neighbor in self._adjacency_list.get(current, []):
+                if neighbor in parents or neighbor in blocked_nodes or (current, neighbor) in blocked_edges:
+                    continue
+                parents[neighbor] = current
+                if neighbor == end:
+                    path = [end]
+                    while path[-1] != start:
+                        path.append(parents[path[-1]])
+                    return path[::-1]
+                queue.append(neighbor)
+        return None
 
     def _get_edges_for_path(self, path: list[str]) -> list[str]:
-        edges = []
-        for i in range(len(path) - 1):
-            source = path[i]
-            target = path[i + 1]
-            for edge_id, edge in self._edges.items():
-                if edge.source_node_id == source and edge.target_node_id == target:
-                    edges.append(edge_id)
-                    break
-        return edges
+        return [
+            self._edge_lookup[(source, target)]
+            for source, target in pairwise(path)
+            if (source, target) in self._edge_lookup
+        ]
 
     def get_root_nodes(self) -> list[LineageNode]:
         roots = []
@@ -271,6 +349,8 @@ class LineageGraphBuilder:
         self._adjacency_list.clear()
         self._reverse_adjacency_list.clear()
         self._edge_counter = 0
+        self._edge_lookup.clear()
+        self._invalidate()
 
 
 lineage_graph_builder = LineageGraphBuilder()
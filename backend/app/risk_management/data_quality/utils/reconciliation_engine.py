@@ -0,0 +1,237 @@
+"""Partitioned Hash-Join Reconciliation Engine"""
+
+import os
+import pickle
+import tempfile
+import zlib
+from collections import Counter
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Any
+
+BreakRow = tuple[str, str, Any, Any, Any, str]
+
+
+@dataclass
+class BucketOutcome:
+    source_count: int = 0
+    target_count: int = 0
+    matched_count: int = 0
+    break_counts: Counter = field(default_factory=Counter)
+    breaks: list[BreakRow] = field(default_factory=list)
+
+
+class _SpillableBuckets:
+    """Records partitioned by key hash, held in memory until the buffer limit forces a spill"""
+
+    def __init__(self, name: str, bucket_count: int, spill_dir: str, memory_limit: int | None):
+        self.name = name
+        self.bucket_count = bucket_count
+        self.spill_dir = spill_dir
+        self.memory_limit = memory_limit
+        self.buffers: list[list[tuple[tuple[str, ...], dict[str, Any]]]] = [[] for _ in range(bucket_count)]
+        self.spilled: set[int] = set()
+        self.count = 0
+        self._buffered = 0
+
+    def add(self, key: tuple[str, ...], record: dict[str, Any]) -> None:
+        bucket = zlib.crc32("\x1f".join(key).encode()) % self.bucket_count
+        self.buffers[bucket].append((key, record))
+        self.count += 1
+        self._buffered += 1
+        if self.memory_limit is not None and self._buffered >= self.memory_limit:
+            self.spill()
+
+    def path(self, bucket: int) -> str:
+        return os.path.join(self.spill_dir, f"{self.name}_{bucket:05d}.bin")
+
+    def spill(self) -> None:
+        for bucket, buffer in enumerate(self.buffers):
+            if buffer:
+                with open(self.path(bucket), "ab") as handle:
+                    pickle.dump(buffer, handle, protocol=pickle.HIGHEST_PROTOCOL)
+                self.spilled.add(bucket)
+                self.buffers[bucket] = []
+        self._buffered = 0
+
+    def partition(self, bucket: int) -> tuple[str | None, list[tuple[tuple[str, ...], dict[str, Any]]]]:
+        return (self.path(bucket) if bucket in self.spilled else None), self.buffers[bucket]
+
+
+def _load_partition(
+    path: str | None, buffered: list[tuple[tuple[str, ...], dict[str, Any]]]
+) -> Iterable[tuple[tuple[str, ...], dict[str, Any]]]:
+    if path is not None:
+        with open(path, "rb") as handle:
+            while True:
+                try:
+                    yield from pickle.load(handle)
+                except EOFError:
+                    break
+    yield from buffered
+
+
+def _as_decimal(value: Any) -> Decimal | None:
+    if isinstance(value, bool) or not isinstance(value, (int, float, Decimal)):
+        return None
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        return None
+
+
+def values_match(
+    source_val: Any, target_val: Any, tolerance_percentage: Decimal, tolerance_absolute: Decimal
+) -> bool:
+    """Numeric values match within the tolerance; anything else must be equal"""
+    if source_val == target_val:
+        return True
+    source_num = _as_decimal(source_val)
+    target_num = _as_decimal(target_val)
+    if source_num is None or target_num is None or not source_num.is_finite() or not target_num.is_finite():
+        return False
+    tolerance = max(tolerance_absolute, abs(source_num) * tolerance_percentage / Decimal("100"))
+    return abs(source_num - target_num) <= tolerance
+
+
+def reconcile_partition(
+    source_partition: tuple[str | None, list],
+    target_partition: tuple[str | None, list],
+    compare_fields: list[str],
+    tolerance_percentage: Decimal,
+    tolerance_absolute: Decimal,
+    max_breaks: int | None,
+) -> BucketOutcome:
+    outcome = BucketOutcome()
+
+    source_map = {}
+    for key, record in _load_partition(*source_partition):
+        source_map[key] = record
+        outcome.source_count += 1
+    target_map = {}
+    for key, record in _load_partition(*target_partition):
+        target_map[key] = record
+        outcome.target_count += 1
+
+    def record_break(row: BreakRow, count_key: str) -> None:
+        outcome.break_counts[count_key] += 1
+        if max_breaks is None or len(outcome.breaks) < max_breaks:
+            outcome.breaks.append(row)
+
+    for key, source_record in source_map.items():
+        if key not in target_map:
+            record_break(
+                ("missing_in_target", str(key), source_record, None, "record_missing", "high"),
+                "missing_in_target",
+            )
+
+    for key, target_record in target_map.items():
+        if key not in source_map:
+            record_break(
+                ("missing_in_source", str(key), None, target_record, "record_extra", "high"),
+                "missing_in_source",
+            )
+
+    for key, source_record in source_map.items():
+        target_record = target_map.get(key)
+        if target_record is None:
+            continue
+        has_diff = False
+        for field_name in compare_fields:
+            source_val = source_record.get(field_name)
+            target_val = target_record.get(field_name)
+            if not values_match(source_val, target_val, tolerance_percentage, tolerance_absolute):
+                has_diff = True
+                record_break(
+                    (
+                        "value_mismatch",
+                        f"{key}.{field_name}",
+                        source_val,
+                        target_val,
+                        f"{source_val} != {target_val}",
+                        "medium",
+                    ),
+                    f"value_mismatch.{field_name}",
+                )
+        if has_diff:
+            outcome.break_counts["mismatched_records"] += 1
+        else:
+            outcome.matched_count += 1
+
+    return outcome
+
+
+class ReconciliationEngine:
+    """Hash-partitions both sides into buckets that spill to disk past memory_limit
+    buffered records (None never spills), then joins bucket pairs independently,
+    in a process pool when max_workers > 1. Only max_breaks break rows are kept;
+    counts are exact."""
+
+    def __init__(
+        self,
+        key_fields: list[str],
+        compare_fields: list[str] | None = None,
+        tolerance_percentage: Decimal = Decimal("0"),
+        tolerance_absolute: Decimal = Decimal("0"),
+        bucket_count: int = 64,
+        memory_limit: int | None = 100_000,
+        max_breaks: int | None = 1000,
+        max_workers: int | None = None,
+        spill_dir: str | None = None,
+    ):
+        self.key_fields = key_fields
+        self.compare_fields = compare_fields
+        self.tolerance_percentage = tolerance_percentage
+        self.tolerance_absolute = tolerance_absolute
+        self.bucket_count = max(bucket_count, 1)
+        self.memory_limit = memory_limit
+        self.max_breaks = max_breaks
+        self.max_workers = max_workers
+        self.spill_dir = spill_dir
+
+    def _key(self, record: dict[str, Any]) -> tuple[str, ...]:
+        return tuple(str(record.get(f, "")) for f in self.key_fields)
+
+    def reconcile(
+        self, source_data: Iterable[dict[str, Any]], target_data: Iterable[dict[str, Any]]
+    ) -> BucketOutcome:
+        with tempfile.TemporaryDirectory(dir=self.spill_dir, prefix="reconciliation_") as work_dir:
+            source = _SpillableBuckets("source", self.bucket_count, work_dir, self.memory_limit)
+            compare_fields = self.compare_fields
+            for record in source_data:
+                if compare_fields is None:
+                    compare_fields = list(record.keys())
+                source.add(self._key(record), record)
+
+            target = _SpillableBuckets("target", self.bucket_count, work_dir, self.memory_limit)
+            for record in target_data:
+                target.add(self._key(record), record)
+
+            arguments = [
+                (
+                    source.partition(bucket),
+                    target.partition(bucket),
+                    compare_fields or [],
+                    self.tolerance_percentage,
+                    self.tolerance_absolute,
+                    self.max_breaks,
+                )
+                for bucket in range(self.bucket_count)
+            ]
+            if self.max_workers and self.max_workers > 1 and self.bucket_count > 1:
+                with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                    outcomes = list(executor.map(reconcile_partition, *zip(*arguments, strict=True)))
+            else:
+                outcomes = [reconcile_partition(*args) for args in arguments]
+
+        total = BucketOutcome()
+        for outcome in outcomes:
+            total.source_count += outcome.source_count
+            total.target_count += outcome.target_count
+            total.matched_count += outcome.matched_count
+            total.break_counts.update(outcome.break_counts)
+            room = None if self.max_breaks is None else self.max_breaks - len(total.breaks)
+            total.breaks.extend(outcome.breaks if room is None else outcome.breaks[:max(room, 0)])
+        return total
@@ -1,5 +1,7 @@
 """Schema Drift Detection Utilities"""
 
+import hashlib
+from collections import Counter
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from enum import Enum
@@ -40,6 +42,31 @@ class ColumnDefinition:
     constraints: list[str] = field(default_factory=list)
 
 
+def column_fingerprint(column: ColumnDefinition) -> str:
+    """Stable hash of a column's name, type, nullability, sizing, default and constraints"""
+    canonical = repr((
+        column.column_name,
+        column.data_type,
+        column.is_nullable,
+        column.max_length,
+        column.precision,
+        column.scale,
+        column.default_value,
+        column.is_primary_key,
+        column.is_foreign_key,
+        sorted(column.constraints),
+    ))
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+def schema_fingerprint(column_fingerprints: dict[str, str]) -> str:
+    """Order-independent hash over the column fingerprints"""
+    digest = hashlib.blake2b(digest_size=16)
+    for column_name in sorted(column_fingerprints):
+        digest.update(f"{column_name}\x1f{column_fingerprints[column_name]}\x1e".encode())
+    return digest.hexdigest()
+
+
 @dataclass
 class SchemaDefinition:
     schema_id: str
@@ -47,6 +74,21 @@ class SchemaDefinition:
     columns: dict[str, ColumnDefinition]
     captured_at: datetime
     version: int = 1
+    fingerprint: str = ""
+    column_fingerprints: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class SchemaDelta:
+    """A registered version stored as the columns changed or removed since the previous one"""
+
+    schema_id: str
+    version: int
+    captured_at: datetime
+    fingerprint: str
+    changed_columns: dict[str, ColumnDefinition]
+    changed_fingerprints: dict[str, str]
+    removed_columns: list[str]
 
 
 @dataclass
@@ -78,8 +120,13 @@ class DriftReport:
 
 
 class SchemaDriftDetector:
+    """Keeps the latest schema per table with its fingerprints, and older versions as
+    deltas. Drift checks short-circuit on a matching schema fingerprint and diff only
+    the columns whose fingerprints changed."""
+
     def __init__(self):
-        self._schema_history: dict[str, list[SchemaDefinition]] = {}
+        self._schema_history: dict[str, list[SchemaDelta]] = {}
+        self._latest: dict[str, SchemaDefinition] = {}
         self._severity_rules: dict[DriftType, DriftSeverity] = {
             DriftType.COLUMN_REMOVED: DriftSeverity.CRITICAL,
             DriftType.TYPE_CHANGED: DriftSeverity.HIGH,
@@ -97,116 +144,95 @@ class SchemaDriftDetector:
         table_name: str,
         columns: list[ColumnDefinition],
     ) -> SchemaDefinition:
-        if table_name not in self._schema_history:
-            self._schema_history[table_name] = []
+        history = self._schema_history.setdefault(table_name, [])
+        previous = self._latest.get(table_name)
 
-        version = len(self._schema_history[table_name]) + 1
+        column_map = {col.column_name: col for col in columns}
+        fingerprints = {name: column_fingerprint(col) for name, col in column_map.items()}
         schema = SchemaDefinition(
             schema_id=str(uuid4()),
             table_name=table_name,
-            columns={col.column_name: col for col in columns},
+            columns=column_map,
             captured_at=datetime.now(UTC),
-            version=version,
+            version=len(history) + 1,
+            fingerprint=schema_fingerprint(fingerprints),
+            column_fingerprints=fingerprints,
+        )
+
+        previous_fingerprints = previous.column_fingerprints if previous else {}
+        changed = [name for name, fp in fingerprints.items() if previous_fingerprints.get(name) != fp]
+        history.append(
+            SchemaDelta(
+                schema_id=schema.schema_id,
+                version=schema.version,
+                captured_at=schema.captured_at,
+                fingerprint=schema.fingerprint,
+                changed_columns={name: column_map[name] for name in changed},
+                changed_fingerprints={name: fingerprints[name] for name in changed},
+                removed_columns=[name for name in previous_fingerprints if name not in fingerprints],
+            )
         )
-        self._schema_history[table_name].append(schema)
+        self._latest[table_name] = schema
         return schema
 
+    def has_drifted(self, table_name: str, fingerprint: str) -> bool:
+        """O(1) check of a precomputed schema fingerprint against the latest version"""
+        latest = self._latest.get(table_name)
+        return latest is not None and latest.fingerprint != fingerprint
+
     def detect_drift(
         self,
         table_name: str,
         current_columns: list[ColumnDefinition],
+        fingerprint: str | None = None,
     ) -> DriftReport | None:
-        if table_name not in self._schema_history or not self._schema_history[table_name]:
+        """Drift of current_columns from the latest registered schema.
+
+        Without a precomputed schema fingerprint every current column is hashed
+        before the fingerprints are compared; pass the fingerprint of
+        current_columns to return in O(1) when nothing changed.
+        """
+        previous_schema = self._latest.get(table_name)
+        if previous_schema is None:
+            return None
+        if fingerprint is not None and fingerprint == previous_schema.fingerprint:
             return None
 
-        previous_schema = self._schema_history[table_name][-1]
         current_column_map = {col.column_name: col for col in current_columns}
-        drift_items = []
-
-        previous_cols = set(previous_schema.columns.keys())
-        current_cols = set(current_column_map.keys())
-
-        for col_name in previous_cols - current_cols:
-            drift_items.append(
-                DriftItem(
-                    drift_id=str(uuid4()),
-                    drift_type=DriftType.COLUMN_REMOVED,
-                    severity=self._severity_rules[DriftType.COLUMN_REMOVED],
-                    column_name=col_name,
-                    description=f"Column '{col_name}' was removed",
-                    previous_value=previous_schema.columns[col_name].data_type,
-                    current_value=None,
-                    detected_at=datetime.now(UTC),
-                )
-            )
-
-        for col_name in current_cols - previous_cols:
-            drift_items.append(
-                DriftItem(
-                    drift_id=str(uuid4()),
-                    drift_type=DriftType.COLUMN_ADDED,
-                    severity=self._severity_rules[DriftType.COLUMN_ADDED],
-                    column_name=col_name,
-                    description=f"Column '{col_name}' was added",
-                    previous_value=None,
-                    current_value=current_column_map[col_name].data_type,
-                    detected_at=datetime.now(UTC),
-                )
-            )
-
-        for col_name in previous_cols & current_cols:
-            prev_col = previous_schema.columns[col_name]
-            curr_col = current_column_map[col_name]
+        current_fingerprints = {name: column_fingerprint(col) for name, col in current_column_map.items()}
+        if schema_fingerprint(current_fingerprints) == previous_schema.fingerprint:
+            return None
 
-            if prev_col.data_type != curr_col.data_type:
-                drift_items.append(
-                    DriftItem(
-                        drift_id=str(uuid4()),
-                        drift_type=DriftType.TYPE_CHANGED,
-                        severity=self._severity_rules[DriftType.TYPE_CHANGED],
-                        column_name=col_name,
-                        description=f"Column '{col_name}' type changed from {prev_col.data_type} to {curr_col.data_type}",
-                        previous_value=prev_col.data_type,
-                        current_value=curr_col.data_type,
-                        detected_at=datetime.now(UTC),
-                    )
-                )
+        previous_fingerprints = previous_schema.column_fingerprints
+        drift_items = []
 
-            if prev_col.is_nullable != curr_col.is_nullable:
+        for col_name, prev_col in previous_schema.columns.items():
+            if col_name not in current_column_map:
                 drift_items.append(
-                    DriftItem(
-                        drift_id=str(uuid4()),
-                        drift_type=DriftType.NULLABLE_CHANGED,
-                        severity=self._severity_rules[DriftType.NULLABLE_CHANGED],
-                        column_name=col_name,
-                        description=f"Column '{col_name}' nullable changed from {prev_col.is_nullable} to {curr_col.is_nullable}",
-                        previous_value=str(prev_col.is_nullable),
-                        current_value=str(curr_col.is_nullable),
-                        detected_at=datetime.now(UTC),
+                    self._drift_item(
+                        DriftType.COLUMN_REMOVED, col_name, f"Column '{col_name}' was removed",
+                        prev_col.data_type, None,
                     )
                 )
 
-            if prev_col.max_length != curr_col.max_length:
+        for col_name, curr_col in current_column_map.items():
+            previous_fp = previous_fingerprints.get(col_name)
+            if previous_fp is None:
                 drift_items.append(
-                    DriftItem(
-                        drift_id=str(uuid4()),
-                        drift_type=DriftType.LENGTH_CHANGED,
-                        severity=self._severity_rules[DriftType.LENGTH_CHANGED],
-                        column_name=col_name,
-                        description=f"Column '{col_name}' length changed from {prev_col.max_length} to {curr_col.max_length}",
-                        previous_value=str(prev_col.max_length),
-                        current_value=str(curr_col.max_length),
-                        detected_at=datetime.now(UTC),
+                    self._drift_item(
+                        DriftType.COLUMN_ADDED, col_name, f"Column '{col_name}' was added",
+                        None, curr_col.data_type,
                     )
                 )
+            elif previous_fp != current_fingerprints[col_name]:
+                drift_items.extend(self._column_drifts(previous_schema.columns[col_name], curr_col))
 
         if not drift_items:
             return None
 
-        critical_count = len([d for d in drift_items if d.severity == DriftSeverity.CRITICAL])
-        high_count = len([d for d in drift_items if d.severity == DriftSeverity.HIGH])
-        medium_count = len([d for d in drift_items if d.severity == DriftSeverity.MEDIUM])
-        low_count = len([d for d in drift_items if d.severity == DriftSeverity.LOW])
+        severity_counts = Counter(d.severity for d in drift_items)
+        critical_count = severity_counts[DriftSeverity.CRITICAL]
+        high_count = severity_counts[DriftSeverity.HIGH]
 
         return DriftReport(
             report_id=str(uuid4()),
@@ -218,17 +244,135 @@ class SchemaDriftDetector:
             total_drifts=len(drift_items),
             critical_count=critical_count,
             high_count=high_count,
-            medium_count=medium_count,
-            low_count=low_count,
+            medium_count=severity_counts[DriftSeverity.MEDIUM],
+            low_count=severity_counts[DriftSeverity.LOW],
             generated_at=datetime.now(UTC),
         )
 
+    def _column_drifts(self, prev_col: ColumnDefinition, curr_col: ColumnDefinition) -> list[DriftItem]:
+        col_name = curr_col.column_name
+        drift_items = []
+
+        if prev_col.data_type != curr_col.data_type:
+            drift_items.append(
+                self._drift_item(
+                    DriftType.TYPE_CHANGED, col_name,
+                    f"Column '{col_name}' type changed from {prev_col.data_type} to {curr_col.data_type}",
+                    prev_col.data_type, curr_col.data_type,
+                )
+            )
+
+        if prev_col.is_nullable != curr_col.is_nullable:
+            drift_items.append(
+                self._drift_item(
+                    DriftType.NULLABLE_CHANGED, col_name,
+                    f"Column '{col_name}' nullable changed from {prev_col.is_nullable} to {curr_col.is_nullable}",
+                    str(prev_col.is_nullable), str(curr_col.is_nullable),
+                )
+            )
+
+        if prev_col.max_length != curr_col.max_length:
+            drift_items.append(
+                self._drift_item(
+                    DriftType.LENGTH_CHANGED, col_name,
+                    f"Column '{col_name}' length changed from {prev_col.max_length} to {curr_col.max_length}",
+                    str(prev_col.max_length), str(curr_col.max_length),
+                )
+            )
+
+        previous_precision = (prev_col.precision, prev_col.scale)
+        current_precision = (curr_col.precision, curr_col.scale)
+        if previous_precision != current_precision:
+            drift_items.append(
+                self._drift_item(
+                    DriftType.PRECISION_CHANGED, col_name,
+                    f"Column '{col_name}' precision changed from {previous_precision} to {current_precision}",
+                    str(previous_precision), str(current_precision),
+                )
+            )
+
+        if prev_col.default_value != curr_col.default_value:
+            drift_items.append(
+                self._drift_item(
+                    DriftType.DEFAULT_CHANGED, col_name,
+                    f"Column '{col_name}' default changed from {prev_col.default_value} to {curr_col.default_value}",
+                    prev_col.default_value, curr_col.default_value,
+                )
+            )
+
+        previous_constraints = self._constraint_set(prev_col)
+        current_constraints = self._constraint_set(curr_col)
+        for constraint in sorted(current_constraints - previous_constraints):
+            drift_items.append(
+                self._drift_item(
+                    DriftType.CONSTRAINT_ADDED, col_name,
+                    f"Constraint '{constraint}' added to column '{col_name}'",
+                    None, constraint,
+                )
+            )
+        for constraint in sorted(previous_constraints - current_constraints):
+            drift_items.append(
+                self._drift_item(
+                    DriftType.CONSTRAINT_REMOVED, col_name,
+                    f"Constraint '{constraint}' removed from column '{col_name}'",
+                    constraint, None,
+                )
+            )
+
+        return drift_items
+
+    def _constraint_set(self, column: ColumnDefinition) -> set[str]:
+        constraints = set(column.constraints)
+        if column.is_primary_key:
+            constraints.add("PRIMARY KEY")
+        if column.is_foreign_key:
+            constraints.add("FOREIGN KEY")
+        return constraints
+
+    def _drift_item(
+        self,
+        drift_type: DriftType,
+        column_name: str,
+        description: str,
+        previous_value: str | None,
+        current_value: str | None,
+    ) -> DriftItem:
+        return DriftItem(
+            drift_id=str(uuid4()),
+            drift_type=drift_type,
+            severity=self._severity_rules[drift_type],
+            column_name=column_name,
+            description=description,
+            previous_value=previous_value,
+            current_value=current_value,
+            detected_at=datetime.now(UTC),
+        )
+
     def get_schema_history(self, table_name: str) -> list[SchemaDefinition]:
-        return self._schema_history.get(table_name, [])
+        """Full schemas rebuilt by replaying the stored deltas"""
+        history = []
+        columns: dict[str, ColumnDefinition] = {}
+        fingerprints: dict[str, str] = {}
+        for delta in self._schema_history.get(table_name, []):
+            columns = {name: col for name, col in columns.items() if name not in delta.removed_columns}
+            columns.update(delta.changed_columns)
+            fingerprints = {name: fp for name, fp in fingerprints.items() if name not in delta.removed_columns}
+            fingerprints.update(delta.changed_fingerprints)
+            history.append(
+                SchemaDefinition(
+                    schema_id=delta.schema_id,
+                    table_name=table_name,
+                    columns=columns,
+                    captured_at=delta.captured_at,
+                    version=delta.version,
+                    fingerprint=delta.fingerprint,
+                    column_fingerprints=fingerprints,
+                )
+            )
+        return history
 
     def get_latest_schema(self, table_name: str) -> SchemaDefinition | None:
-        history = self._schema_history.get(table_name, [])
-        return history[-1] if history else None
+        return self._latest.get(table_name)
 
     def set_severity_rule(self, drift_type: DriftType, severity: DriftSeverity) -> None:
         self._severity_rules[drift_type] = severity
@@ -236,8 +380,10 @@ class SchemaDriftDetector:
     def clear_history(self, table_name: str | None = None) -> None:
         if table_name:
             self._schema_history.pop(table_name, None)
+            self._latest.pop(table_name, None)
         else:
             self._schema_history.clear()
+            self._latest.clear()
 
 
 schema_drift_detector = SchemaDriftDetector()
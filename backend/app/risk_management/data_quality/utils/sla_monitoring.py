@@ -7,6 +7,8 @@ from enum import Enum
 from typing import Any
 from uuid import uuid4
 
+from .sla_rollup_store import SLARollupStore
+
 
 class SLAStatus(str, Enum):
     MET = "met"
@@ -66,9 +68,16 @@ class SLAReport:
 
 
 class SLAMonitoringUtilities:
+    """Measurements are folded into minute/hour/day rollups as they arrive; reports
+    and trends read the rollups, and the breached and at-risk sets follow each
+    SLA's latest measurement."""
+
     def __init__(self):
         self._slas: dict[str, SLADefinition] = {}
-        self._measurements: dict[str, list[SLAMeasurement]] = {}
+        self._rollups = SLARollupStore()
+        self._latest: dict[str, SLAMeasurement] = {}
+        self._breached: dict[str, None] = {}
+        self._at_risk: dict[str, None] = {}
 
     def create_sla(
         self,
@@ -89,7 +98,6 @@ class SLAMonitoringUtilities:
             stakeholders=stakeholders or [],
         )
         self._slas[sla.sla_id] = sla
-        self._measurements[sla.sla_id] = []
         return sla
 
     def record_measurement(
@@ -114,9 +122,25 @@ class SLAMonitoringUtilities:
             details=details or {},
         )
 
-        self._measurements[sla_id].append(measurement)
+        self._rollups.add(
+            sla_id,
+            int(measurement.measurement_time.timestamp()),
+            measured_value,
+            met=status == SLAStatus.MET,
+            breached=status == SLAStatus.BREACHED,
+        )
+        self._latest[sla_id] = measurement
+        self._track_status(sla_id, status)
         return measurement
 
+    def _track_status(self, sla_id: str, status: SLAStatus) -> None:
+        self._breached.pop(sla_id, None)
+        self._at_risk.pop(sla_id, None)
+        if status == SLAStatus.BREACHED:
+            self._breached[sla_id] = None
+        elif status == SLAStatus.AT_RISK:
+            self._at_risk[sla_id] = None
+
     def _determine_status(
         self, measured_value: Decimal, sla: SLADefinition
     ) -> SLAStatus:
@@ -127,11 +151,9 @@ class SLAMonitoringUtilities:
         return SLAStatus.BREACHED
 
     def get_current_status(self, sla_id: str) -> SLAStatus | None:
-        measurements = self._measurements.get(sla_id, [])
-        if not measurements:
+        latest = self._latest.get(sla_id)
+        if latest is None:
             return SLAStatus.UNKNOWN
-
-        latest = max(measurements, key=lambda m: m.measurement_time)
         return latest.status
 
     def generate_report(
@@ -147,12 +169,14 @@ class SLAMonitoringUtilities:
         period_end = period_end or datetime.now(UTC)
         period_start = period_start or (period_end - timedelta(hours=sla.measurement_window_hours))
 
-        measurements = [
-            m for m in self._measurements.get(sla_id, [])
-            if period_start <= m.measurement_time <= period_end
-        ]
+        rollup = self._rollups.aggregate(
+            sla_id,
+            int(period_start.timestamp()),
+            int(period_end.timestamp()) + 1,
+            now=int(datetime.now(UTC).timestamp()),
+        )
 
-        if not measurements:
+        if not rollup.count:
             return SLAReport(
                 report_id=str(uuid4()),
                 sla_id=sla_id,
@@ -170,12 +194,7 @@ class SLAMonitoringUtilities:
                 generated_at=datetime.now(UTC),
             )
 
-        met_count = len([m for m in measurements if m.status == SLAStatus.MET])
-        breached_count = len([m for m in measurements if m.status == SLAStatus.BREACHED])
-        values = [m.measured_value for m in measurements]
-
-        compliance_rate = Decimal(str(met_count / len(measurements) * 100))
-        avg_value = sum(values) / Decimal(str(len(values)))
+        compliance_rate = Decimal(str(rollup.met_count / rollup.count * 100))
 
         if compliance_rate >= Decimal("100"):
             overall_status = SLAStatus.MET
@@ -190,13 +209,13 @@ class SLAMonitoringUtilities:
             sla_name=sla.sla_name,
             period_start=period_start,
             period_end=period_end,
-            measurements_count=len(measurements),
-            met_count=met_count,
-            breached_count=breached_count,
+            measurements_count=rollup.count,
+            met_count=rollup.met_count,
+            breached_count=rollup.breach_count,
             compliance_rate=compliance_rate,
-            average_value=avg_value,
-            min_value=min(values),
-            max_value=max(values),
+            average_value=rollup.average,
+            min_value=rollup.minimum,
+            max_value=rollup.maximum,
             status=overall_status,
             generated_at=datetime.now(UTC),
         )
@@ -207,57 +226,40 @@ class SLAMonitoringUtilities:
         period_hours: int = 168,
         bucket_hours: int = 24,
     ) -> list[dict[str, Any]]:
-        measurements = self._measurements.get(sla_id, [])
-        if not measurements:
+        if sla_id not in self._latest:
             return []
 
         end_time = datetime.now(UTC)
         start_time = end_time - timedelta(hours=period_hours)
-
-        filtered = [
-            m for m in measurements
-            if start_time <= m.measurement_time <= end_time
-        ]
+        bucket_seconds = bucket_hours * 3600
 
         buckets = []
-        current = start_time
-        while current < end_time:
-            bucket_end = current + timedelta(hours=bucket_hours)
-            bucket_measurements = [
-                m for m in filtered
-                if current <= m.measurement_time < bucket_end
-            ]
-
-            if bucket_measurements:
-                values = [m.measured_value for m in bucket_measurements]
+        rollups = self._rollups.series(
+            sla_id,
+            int(start_time.timestamp()),
+            bucket_seconds,
+            buckets=-(-period_hours // bucket_hours),
+            now=int(end_time.timestamp()),
+        )
+        for index, rollup in enumerate(rollups):
+            if rollup.count:
+                bucket_start = start_time + timedelta(seconds=index * bucket_seconds)
                 buckets.append({
-                    "period_start": current.isoformat(),
-                    "period_end": bucket_end.isoformat(),
-                    "avg_value": float(sum(values) / len(values)),
-                    "min_value": float(min(values)),
-                    "max_value": float(max(values)),
-                    "measurement_count": len(bucket_measurements),
+                    "period_start": bucket_start.isoformat(),
+                    "period_end": (bucket_start + timedelta(seconds=bucket_seconds)).isoformat(),
+                    "avg_value": float(rollup.average),
+                    "min_value": float(rollup.minimum),
+                    "max_value": float(rollup.maximum),
+                    "measurement_count": rollup.count,
                 })
 
-            current = bucket_end
-
         return buckets
 
     def get_breached_slas(self) -> list[SLADefinition]:
-        breached = []
-        for sla_id, sla in self._slas.items():
-            status = self.get_current_status(sla_id)
-            if status == SLAStatus.BREACHED:
-                breached.append(sla)
-        return breached
+        return [self._slas[sla_id] for sla_id in self._breached]
 
     def get_at_risk_slas(self) -> list[SLADefinition]:
-        at_risk = []
-        for sla_id, sla in self._slas.items():
-            status = self.get_current_status(sla_id)
-            if status == SLAStatus.AT_RISK:
-                at_risk.append(sla)
-        return at_risk
+        return [self._slas[sla_id] for sla_id in self._at_risk]
 
     def get_all_slas(self) -> dict[str, SLADefinition]:
         return self._slas.copy()
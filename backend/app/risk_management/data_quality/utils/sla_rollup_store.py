@@ -0,0 +1,136 @@
+"""Time-Bucketed SLA Measurement Rollups"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+
+# (resolution_seconds, capacity), coarsest first: three years of days,
+# ninety days of hours and one day of minutes
+ROLLUP_RESOLUTIONS = ((86400, 1096), (3600, 2160), (60, 1440))
+
+
+@dataclass
+class RollupBucket:
+    start: int
+    count: int = 0
+    total: Decimal = Decimal("0")
+    minimum: Decimal | None = None
+    maximum: Decimal | None = None
+    met_count: int = 0
+    breach_count: int = 0
+
+    def add(self, value: Decimal, met: bool, breached: bool) -> None:
+        self.count += 1
+        self.total += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+        self.met_count += met
+        self.breach_count += breached
+
+    def merge(self, other: "RollupBucket") -> None:
+        if not other.count:
+            return
+        self.count += other.count
+        self.total += other.total
+        if self.minimum is None or other.minimum < self.minimum:
+            self.minimum = other.minimum
+        if self.maximum is None or other.maximum > self.maximum:
+            self.maximum = other.maximum
+        self.met_count += other.met_count
+        self.breach_count += other.breach_count
+
+    @property
+    def average(self) -> Decimal | None:
+        return self.total / Decimal(self.count) if self.count else None
+
+
+class RollupRing:
+    """Fixed-resolution ring of buckets; a slot is reused once its bucket ages out"""
+
+    def __init__(self, resolution: int, capacity: int):
+        self.resolution = resolution
+        self.capacity = capacity
+        self._slots: dict[int, RollupBucket] = {}
+
+    def floor(self, timestamp: int) -> int:
+        return timestamp - timestamp % self.resolution
+
+    def add(self, timestamp: int, value: Decimal, met: bool, breached: bool) -> None:
+        start = self.floor(timestamp)
+        slot = start // self.resolution % self.capacity
+        bucket = self._slots.get(slot)
+        if bucket is not None and bucket.start > start:
+            return
+        if bucket is None or bucket.start != start:
+            bucket = self._slots[slot] = RollupBucket(start=start)
+        bucket.add(value, met, breached)
+
+    def bucket(self, start: int) -> RollupBucket | None:
+        bucket = self._slots.get(start // self.resolution % self.capacity)
+        return bucket if bucket is not None and bucket.start == start else None
+
+    def retains(self, timestamp: int, now: int) -> bool:
+        return self.floor(timestamp) > self.floor(now) - self.capacity * self.resolution
+
+    def merge_range(self, start: int, end: int, into: RollupBucket) -> None:
+        for bucket_start in range(self.floor(start), end, self.resolution):
+            bucket = self.bucket(bucket_start)
+            if bucket is not None:
+                into.merge(bucket)
+
+
+class SLARollupStore:
+    """Per-SLA minute, hour and day rollups (count, sum, min, max, met and breach
+    counts). A window [start, end) in epoch seconds is answered from whole coarse
+    buckets plus finer buckets at its edges, so edges resolve to the finest
+    resolution still retained for them - one minute for the last day."""
+
+    def __init__(self, resolutions: tuple[tuple[int, int], ...] = ROLLUP_RESOLUTIONS):
+        self._resolutions = resolutions
+        self._rings: dict[str, list[RollupRing]] = {}
+
+    def add(self, sla_id: str, timestamp: int, value: Decimal, met: bool, breached: bool) -> None:
+        rings = self._rings.get(sla_id)
+        if rings is None:
+            rings = self._rings[sla_id] = [RollupRing(r, c) for r, c in self._resolutions]
+        for ring in rings:
+            ring.add(timestamp, value, met, breached)
+
+    def aggregate(self, sla_id: str, start: int, end: int, now: int) -> RollupBucket:
+        total = RollupBucket(start=start)
+        rings = self._rings.get(sla_id)
+        if rings and start < end:
+            self._collect(rings, 0, start, end, now, total)
+        return total
+
+    def series(self, sla_id: str, start: int, step: int, buckets: int, now: int) -> list[RollupBucket]:
+        return [
+            self.aggregate(sla_id, start + index * step, start + (index + 1) * step, now)
+            for index in range(buckets)
+        ]
+
+    def _collect(
+        self, rings: list[RollupRing], level: int, start: int, end: int, now: int, total: RollupBucket
+    ) -> None:
+        ring = rings[level]
+        if level == len(rings) - 1:
+            ring.merge_range(start, end, total)
+            return
+
+        first = -(-start // ring.resolution) * ring.resolution
+        last = ring.floor(end)
+        if first < last:
+            ring.merge_range(first, last, total)
+            edges = ((start, first), (last, end))
+        else:
+            edges = ((start, end),)
+
+        finer = rings[level + 1]
+        for edge_start, edge_end in edges:
+            if edge_start >= edge_end:
+                continue
+            if finer.retains(edge_start, now):
+                self._collect(rings, level + 1, edge_start, edge_end, now, total)
+            else:
+                ring.merge_range(edge_start, edge_end, total)
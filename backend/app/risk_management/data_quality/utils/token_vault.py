@@ -0,0 +1,192 @@
+"""Persistent Keyed Token Vault"""
+
+import hashlib
+import hmac
+import mmap
+import os
+import stat
+import string
+import struct
+import tempfile
+import unicodedata
+from collections.abc import Iterable
+
+TOKEN_PREFIX = "TKN_"
+MAX_TOKEN_TWEAKS = 1000
+
+_RECORD_HEADER = struct.Struct(">HI")
+# The vault holds plaintext values, so it is created owner-only
+VAULT_FILE_MODE = 0o600
+
+
+def _open_vault_file(path: str):
+    """Open or create a vault file readable by its owner only; an existing vault
+    that grants group or other access is refused"""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND, VAULT_FILE_MODE)
+    mode = os.fstat(fd).st_mode
+    if mode & (stat.S_IRWXG | stat.S_IRWXO):
+        os.close(fd)
+        raise PermissionError(f"Token vault {path} is accessible to group or others (mode {stat.filemode(mode)})")
+    return os.fdopen(fd, "a+b")
+
+
+def derive_token(key: bytes, value: str, tweak: int = 0, format_preserving: bool = False) -> str:
+    """HMAC-derived token; format-preserving tokens keep length, digit/letter
+    positions, letter case and punctuation of the value. Decimal digits and
+    cased letters of any script are replaced by ASCII ones; a value with other
+    alphanumerics or combining marks (e.g. CJK) gets a plain token instead."""
+    digest = hmac.new(key, f"{tweak}\x1f{value}".encode(), hashlib.sha256).digest()
+    if not format_preserving:
+        return TOKEN_PREFIX + digest[:8].hex().upper()
+
+    stream = bytearray(digest)
+    block = 1
+    while len(stream) < len(value):
+        stream += hmac.new(key, block.to_bytes(4, "big") + digest, hashlib.sha256).digest()
+        block += 1
+
+    token = []
+    for char, byte in zip(value, stream, strict=False):
+        if char.isdecimal():
+            token.append(string.digits[byte % 10])
+        elif char.isalpha() and char.islower():
+            token.append(string.ascii_lowercase[byte % 26])
+        elif char.isalpha() and char.isupper():
+            token.append(string.ascii_uppercase[byte % 26])
+        elif char.isalnum() or unicodedata.category(char).startswith("M"):
+            # No same-class substitute: copying it would leak the value
+            return derive_token(key, value, tweak)
+        else:
+            token.append(char)
+    return "".join(token)
+
+
+def derive_tokens(values: list[str], key: bytes, format_preserving: bool = False) -> list[str]:
+    return [derive_token(key, value, 0, format_preserving) for value in values]
+
+
+class TokenVault:
+    """Append-only token -> value log, memory-mapped for lookups, with only the
+    token index held in memory. Tokens are derived from the key, so the same key
+    gives the same tokens across runs and processes; the vault is needed to
+    detokenize and to resolve the rare collision, which is settled by re-deriving
+    with a tweak. Without a path the vault lives in an anonymous temporary file."""
+
+    def __init__(self, path: str | None = None, key: bytes | None = None):
+        if path is not None and key is None:
+            raise ValueError("A persistent token vault requires a fixed key")
+        self.key = key or os.urandom(32)
+        self._file = _open_vault_file(path) if path is not None else tempfile.TemporaryFile()  # noqa: SIM115
+        self._map: mmap.mmap | None = None
+        self._offsets: dict[str, tuple[int, int]] = {}
+        self._size = 0
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def _load(self) -> None:
+        self._file.seek(0, os.SEEK_END)
+        size = self._file.tell()
+        if not size:
+            return
+        view = self._view(size)
+        offset = 0
+        while offset + _RECORD_HEADER.size <= size:
+            token_length, value_length = _RECORD_HEADER.unpack_from(view, offset)
+            token_start = offset + _RECORD_HEADER.size
+            value_start = token_start + token_length
+            if value_start + value_length > size:
+                break
+            token = view[token_start:value_start].decode()
+            self._offsets[token] = (value_start, value_length)
+            offset = value_start + value_length
+        if offset < size:
+            # drop a partially written trailing record
+            self._close_map()
+            self._file.truncate(offset)
+        self._size = offset
+
+    def _view(self, required: int) -> mmap.mmap:
+        if self._map is None or len(self._map) < required:
+            self._close_map()
+            self._file.flush()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _close_map(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def detokenize(self, token: str) -> str | None:
+        location = self._offsets.get(token)
+        if location is None:
+            return None
+        offset, length = location
+        return self._view(offset + length)[offset:offset + length].decode()
+
+    def tokenize(self, value: str, format_preserving: bool = False) -> str:
+        return self.tokenize_many([value], format_preserving)[value]
+
+    def tokenize_many(
+        self,
+        values: Iterable[str],
+        format_preserving: bool = False,
+        derived: list[str] | None = None,
+    ) -> dict[str, str]:
+        """Tokens for the distinct values, appended to the vault in one write.
+        derived may carry tweak-0 tokens already computed elsewhere (e.g. in a
+        process pool) for the distinct values in first-seen order."""
+        unique = list(dict.fromkeys(values))
+        if derived is None:
+            derived = derive_tokens(unique, self.key, format_preserving)
+
+        tokens: dict[str, str] = {}
+        pending: dict[str, str] = {}
+        for value, candidate in zip(unique, derived, strict=True):
+            token = candidate
+            for tweak in range(1, MAX_TOKEN_TWEAKS + 1):
+                stored = pending.get(token)
+                if stored is None:
+                    stored = self.detokenize(token)
+                if stored is None:
+                    pending[token] = value
+                    break
+                if stored == value:
+                    break
+                token = derive_token(self.key, value, tweak, format_preserving)
+            else:
+                raise ValueError(f"Token space exhausted for a value of length {len(value)}")
+            tokens[value] = token
+
+        self._append(pending)
+        return tokens
+
+    def _append(self, entries: dict[str, str]) -> None:
+        if not entries:
+            return
+        payload = bytearray()
+        offset = self._size
+        for token, value in entries.items():
+            token_bytes = token.encode()
+            value_bytes = value.encode()
+            payload += _RECORD_HEADER.pack(len(token_bytes), len(value_bytes))
+            payload += token_bytes
+            value_start = offset + len(payload)
+            payload += value_bytes
+            self._offsets[token] = (value_start, len(value_bytes))
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(payload)
+        self._file.flush()
+        self._size += len(payload)
+
+    def clear(self) -> None:
+        self._close_map()
+        self._file.truncate(0)
+        self._offsets.clear()
+        self._size = 0
+
+    def close(self) -> None:
+        self._close_map()
+        self._file.close()
@@ -171,6 +171,9 @@ from .fraud_rule_models import (
 from .fraud_rule_models import (
     RuleType as RuleType,
 )
+from .ml_models import (
+    FeatureSchema as FeatureSchema,
+)
 from .ml_models import (
     FeatureStore as FeatureStore,
 )
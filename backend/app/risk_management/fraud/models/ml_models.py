@@ -157,6 +157,16 @@ class FeatureStore(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
 
 
+class FeatureSchema(BaseModel):
+    schema_id: UUID = Field(default_factory=uuid4)
+    model_id: UUID
+
+    features: list[str]
+    default_values: dict[str, float] = Field(default_factory=dict)
+
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+
 class MLModelStatistics(BaseModel):
     total_models: int = 0
     active_models: int = 0
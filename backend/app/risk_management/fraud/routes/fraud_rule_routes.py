@@ -157,10 +157,8 @@ async def get_active_rules():
     return await rule_engine_service.get_active_rules()
 
 
-@router.post("/evaluate")
-async def evaluate_transaction(request: EvaluateTransactionRequest):
-    """Evaluate a transaction against all active rules"""
-    transaction_data = {
+def _transaction_data(request: EvaluateTransactionRequest) -> dict[str, Any]:
+    return {
         "transaction_id": request.transaction_id,
         "customer_id": request.customer_id,
         "amount": request.amount,
@@ -171,7 +169,9 @@ async def evaluate_transaction(request: EvaluateTransactionRequest):
         "ip_address": request.ip_address,
         **request.additional_data
     }
-    results = await rule_engine_service.evaluate_transaction(transaction_data)
+
+
+def _summarize_results(transaction_id: str, results: list) -> dict[str, Any]:
     matched_rules = [r for r in results if r.matched]
     total_score = sum(r.score for r in matched_rules)
     highest_action = max(
@@ -180,7 +180,7 @@ async def evaluate_transaction(request: EvaluateTransactionRequest):
         key=lambda x: ["log", "alert", "challenge", "block"].index(x.value)
     ) if matched_rules else RuleAction.LOG
     return {
-        "transaction_id": request.transaction_id,
+        "transaction_id": transaction_id,
         "rules_evaluated": len(results),
         "rules_matched": len(matched_rules),
         "total_score": total_score,
@@ -189,6 +189,26 @@ async def evaluate_transaction(request: EvaluateTransactionRequest):
     }
 
 
+@router.post("/evaluate")
+async def evaluate_transaction(request: EvaluateTransactionRequest):
+    """Evaluate a transaction against all active rules"""
+    results = await rule_engine_service.evaluate_transaction(_transaction_data(request))
+    return _summarize_results(request.transaction_id, results)
+
+
+@router.post("/evaluate-batch")
+async def evaluate_batch(requests: list[EvaluateTransactionRequest]):
+    """Evaluate many transactions against the compiled active rules"""
+    batch_results = await rule_engine_service.evaluate_batch([_transaction_data(r) for r in requests])
+    return {
+        "transactions_evaluated": len(requests),
+        "results": [
+            _summarize_results(request.transaction_id, results)
+            for request, results in zip(requests, batch_results, strict=True)
+        ]
+    }
+
+
 @router.get("/statistics/summary")
 async def get_rule_statistics():
     """Get rule statistics"""
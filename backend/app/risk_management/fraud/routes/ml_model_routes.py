@@ -6,7 +6,7 @@ from uuid import UUID
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
 
-from ..models.ml_models import MLModel, ModelPrediction, ModelStatus, ModelTrainingJob, ModelType
+from ..models.ml_models import FeatureSchema, MLModel, ModelPrediction, ModelStatus, ModelTrainingJob, ModelType
 from ..services.ml_service import ml_service
 
 router = APIRouter(prefix="/fraud/ml", tags=["Fraud ML Models"])
@@ -37,6 +37,11 @@ class BatchPredictRequest(BaseModel):
     input_data_list: list[dict[str, Any]]
 
 
+class RegisterFeatureSchemaRequest(BaseModel):
+    features: list[str]
+    default_values: dict[str, float] = {}
+
+
 class StartTrainingRequest(BaseModel):
     model_id: UUID
     training_config: dict[str, Any]
@@ -127,6 +132,24 @@ async def get_active_models():
     return await ml_service.get_active_models()
 
 
+@router.put("/models/{model_id}/feature-schema", response_model=FeatureSchema)
+async def register_feature_schema(model_id: UUID, request: RegisterFeatureSchemaRequest):
+    """Register the feature schema used to build a model's feature matrix"""
+    schema = await ml_service.register_feature_schema(model_id, request.features, request.default_values)
+    if not schema:
+        raise HTTPException(status_code=404, detail="Model not found")
+    return schema
+
+
+@router.get("/models/{model_id}/feature-schema", response_model=FeatureSchema)
+async def get_feature_schema(model_id: UUID):
+    """Get a model's feature schema"""
+    schema = await ml_service.get_feature_schema(model_id)
+    if not schema:
+        raise HTTPException(status_code=404, detail="Feature schema not found")
+    return schema
+
+
 @router.post("/predict", response_model=ModelPrediction)
 async def predict(request: PredictRequest):
     """Make a prediction using an ML model"""
@@ -139,11 +162,7 @@ async def predict(request: PredictRequest):
 @router.post("/predict/batch")
 async def batch_predict(request: BatchPredictRequest):
     """Make batch predictions using an ML model"""
-    predictions = []
-    for input_data in request.input_data_list:
-        prediction = await ml_service.predict(request.model_id, input_data)
-        if prediction:
-            predictions.append(prediction)
+    predictions = await ml_service.predict_batch(request.model_id, request.input_data_list)
     return {
         "model_id": str(request.model_id),
         "total_requests": len(request.input_data_list),
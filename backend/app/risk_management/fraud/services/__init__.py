@@ -21,6 +21,12 @@ from .investigation_service import (
 from .ml_service import (
     MLService as MLService,
 )
+from .ml_service import (
+    PredictionMicroBatcher as PredictionMicroBatcher,
+)
+from .rule_engine_service import (
+    CompiledRule as CompiledRule,
+)
 from .rule_engine_service import (
     RuleEngineService as RuleEngineService,
 )
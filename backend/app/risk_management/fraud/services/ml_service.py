@@ -1,10 +1,16 @@
 """ML Service - Machine learning model management for fraud detection"""
 
+import asyncio
+import time
+from collections.abc import Callable
 from datetime import UTC, datetime
 from typing import Any
 from uuid import UUID
 
+import numpy as np
+
 from ..models.ml_models import (
+    FeatureSchema,
     MLModel,
     MLModelStatistics,
     ModelPrediction,
@@ -13,12 +19,73 @@ from ..models.ml_models import (
     ModelType,
 )
 
+# Probability returned by models without fitted coefficients
+DEFAULT_FRAUD_PROBABILITY = 0.3
+
+
+def _as_float(value: Any, default: float) -> float:
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class PredictionMicroBatcher:
+    """Coalesces concurrent online predictions into one vectorized model call
+
+    The first request for a model opens a batch that is flushed after
+    ``max_delay_ms`` or as soon as ``max_batch_size`` requests have joined.
+    """
+
+    def __init__(
+        self, score_batch: Callable[[UUID, list[dict[str, Any]]], list[ModelPrediction | None]],
+        max_batch_size: int = 256, max_delay_ms: float = 2.0
+    ):
+        self._score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self._pending: dict[UUID, list[tuple[dict[str, Any], asyncio.Future]]] = {}
+        self._timers: dict[UUID, asyncio.TimerHandle] = {}
+
+    async def submit(self, model_id: UUID, input_data: dict[str, Any]) -> ModelPrediction | None:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self._pending.setdefault(model_id, [])
+        queue.append((input_data, future))
+        if len(queue) >= self.max_batch_size:
+            self._flush(model_id)
+        elif len(queue) == 1:
+            self._timers[model_id] = loop.call_later(self.max_delay, self._flush, model_id)
+        return await future
+
+    def _flush(self, model_id: UUID) -> None:
+        timer = self._timers.pop(model_id, None)
+        if timer:
+            timer.cancel()
+        queue = self._pending.pop(model_id, [])
+        if not queue:
+            return
+        try:
+            results = self._score_batch(model_id, [input_data for input_data, _ in queue])
+        except Exception as exc:
+            for _, future in queue:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), result in zip(queue, results, strict=True):
+            if not future.done():
+                future.set_result(result)
+
 
 class MLService:
     def __init__(self):
         self._models: dict[UUID, MLModel] = {}
         self._predictions: list[ModelPrediction] = []
         self._jobs: dict[UUID, ModelTrainingJob] = {}
+        self._feature_schemas: dict[UUID, FeatureSchema] = {}
+        self._batcher = PredictionMicroBatcher(self._score_batch)
 
     async def register_model(self, name: str, model_type: ModelType, algorithm: str, created_by: str) -> MLModel:
         model = MLModel(
@@ -36,6 +103,20 @@ class MLService:
     async def get_model(self, model_id: UUID) -> MLModel | None:
         return self._models.get(model_id)
 
+    async def register_feature_schema(
+        self, model_id: UUID, features: list[str], default_values: dict[str, float] | None = None
+    ) -> FeatureSchema | None:
+        model = self._models.get(model_id)
+        if not model:
+            return None
+        schema = FeatureSchema(model_id=model_id, features=features, default_values=default_values or {})
+        self._feature_schemas[model_id] = schema
+        model.features = list(features)
+        return schema
+
+    async def get_feature_schema(self, model_id: UUID) -> FeatureSchema | None:
+        return self._feature_schemas.get(model_id)
+
     async def activate_model(self, model_id: UUID) -> MLModel | None:
         model = self._models.get(model_id)
         if model:
@@ -53,22 +134,74 @@ class MLService:
         model = self._models.get(model_id)
         if not model or model.status != ModelStatus.ACTIVE:
             return None
-        start_time = datetime.now(UTC)
-        # Simulate prediction
-        fraud_probability = 0.3  # In production, would call actual model
-        is_fraud = fraud_probability > model.threshold
-        prediction = ModelPrediction(
-            model_id=model_id,
-            input_data=input_data,
-            prediction=1 if is_fraud else 0,
-            probability=fraud_probability,
-            confidence=0.85,
-            is_fraud=is_fraud,
-            fraud_score=fraud_probability * 100,
-            prediction_time_ms=(datetime.now(UTC) - start_time).total_seconds() * 1000
-        )
-        self._predictions.append(prediction)
-        return prediction
+        # Concurrent online requests share one vectorized model invocation
+        return await self._batcher.submit(model_id, input_data)
+
+    async def predict_batch(self, model_id: UUID, input_data_list: list[dict[str, Any]]) -> list[ModelPrediction]:
+        model = self._models.get(model_id)
+        if not model or model.status != ModelStatus.ACTIVE or not input_data_list:
+            return []
+        return self._score_batch(model_id, input_data_list)
+
+    def build_feature_matrix(self, model_id: UUID, input_data_list: list[dict[str, Any]]) -> tuple[list[str], np.ndarray]:
+        """Turn feature dicts into a float64 matrix ordered by the model's feature schema"""
+        schema = self._feature_schemas.get(model_id)
+        model = self._models.get(model_id)
+        features = schema.features if schema else (model.features if model else [])
+        defaults = schema.default_values if schema else {}
+
+        matrix = np.empty((len(input_data_list), len(features)), dtype=np.float64)
+        for column, name in enumerate(features):
+            default = defaults.get(name, 0.0)
+            try:
+                matrix[:, column] = np.fromiter(
+                    (row.get(name, default) for row in input_data_list),
+                    dtype=np.float64, count=len(input_data_list)
+                )
+            except (TypeError, ValueError):
+                matrix[:, column] = [_as_float(row.get(name), default) for row in input_data_list]
+        return features, matrix
+
+    def _score_batch(self, model_id: UUID, input_data_list: list[dict[str, Any]]) -> list[ModelPrediction | None]:
+        model = self._models.get(model_id)
+        if not model or model.status != ModelStatus.ACTIVE:
+            return [None] * len(input_data_list)
+
+        start_time = time.perf_counter()
+        features, matrix = self.build_feature_matrix(model_id, input_data_list)
+        coefficients = model.hyperparameters.get("coefficients")
+        if coefficients:
+            # Logistic scoring of every row in one pass
+            weights = np.array([coefficients.get(name, 0.0) for name in features], dtype=np.float64)
+            logits = matrix @ weights + model.hyperparameters.get("intercept", 0.0)
+            probabilities = 1.0 / (1.0 + np.exp(-logits))
+            confidences = np.maximum(probabilities, 1.0 - probabilities)
+        else:
+            # In production, would call actual model
+            probabilities = np.full(len(input_data_list), DEFAULT_FRAUD_PROBABILITY)
+            confidences = np.full(len(input_data_list), 0.85)
+        is_fraud = probabilities > model.threshold
+        elapsed_ms = (time.perf_counter() - start_time) * 1000 / len(input_data_list)
+
+        predictions = [
+            ModelPrediction(
+                model_id=model_id,
+                input_data=input_data,
+                prediction=1 if fraud else 0,
+                probability=probability,
+                confidence=confidence,
+                features_used=dict(zip(features, row, strict=True)),
+                is_fraud=fraud,
+                fraud_score=probability * 100,
+                prediction_time_ms=elapsed_ms
+            )
+            for input_data, probability, confidence, fraud, row in zip(
+                input_data_list, probabilities.tolist(), confidences.tolist(),
+                is_fraud.tolist(), matrix.tolist(), strict=True
+            )
+        ]
+        self._predictions.extend(predictions)
+        return predictions
 
     async def start_training_job(self, model_id: UUID, training_config: dict[str, Any], created_by: str) -> ModelTrainingJob:
         job = ModelTrainingJob(
@@ -1,5 +1,8 @@
 """Rule Engine Service - Rule-based fraud detection"""
 
+import operator
+import time
+from collections.abc import Callable
 from datetime import UTC, datetime
 from typing import Any
 from uuid import UUID
@@ -14,11 +17,93 @@ from ..models.fraud_rule_models import (
     RuleType,
 )
 
+_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "in": lambda a, b: a in b,
+}
+
+# Transaction fields used to route a transaction to the rules that can apply to it
+DISCRIMINATING_FIELDS = ("channel", "country", "merchant_category")
+_MAX_DECISION_BUCKETS = 10000
+
+
+def _compile_condition(condition: RuleCondition) -> Callable[[Any], bool]:
+    op_func = _OPERATORS.get(condition.operator)
+    if op_func is None:
+        return lambda value: False
+    expected = condition.value
+    if condition.operator == "in" and isinstance(expected, list | tuple | set):
+        try:
+            members = frozenset(expected)
+        except TypeError:
+            pass
+        else:
+            def contains(value: Any) -> bool:
+                try:
+                    return value in members
+                except TypeError:
+                    # unhashable field values fall back to the equality scan
+                    return value in expected
+
+            return contains
+    return lambda value: op_func(value, expected)
+
+
+def _applicability_constraints(rule: FraudRule) -> tuple[frozenset | None, ...]:
+    """Allowed values per discriminating field, or None when the rule accepts any"""
+    constraints = []
+    for field in DISCRIMINATING_FIELDS:
+        allowed = frozenset(rule.applicable_channels) if field == "channel" and rule.applicable_channels else None
+        for condition in rule.conditions:
+            if condition.field != field:
+                continue
+            try:
+                if condition.operator == "==":
+                    values = frozenset([condition.value])
+                elif condition.operator == "in" and isinstance(condition.value, list | tuple | set):
+                    values = frozenset(condition.value)
+                else:
+                    continue
+            except TypeError:
+                continue
+            allowed = values if allowed is None else allowed & values
+        constraints.append(allowed)
+    return tuple(constraints)
+
+
+class CompiledRule:
+    """Fraud rule compiled into condition closures and applicability constraints"""
+
+    def __init__(self, rule: FraudRule):
+        self.rule = rule
+        self.checks = tuple((c.field, _compile_condition(c)) for c in rule.conditions)
+        self.constraints = _applicability_constraints(rule)
+
+    def applies_to(self, key: tuple) -> bool:
+        return all(allowed is None or value in allowed for value, allowed in zip(key, self.constraints, strict=True))
+
+    def evaluate(self, transaction: dict[str, Any]) -> tuple[bool, list[str]]:
+        conditions_matched = []
+        for field, check in self.checks:
+            value = transaction.get(field)
+            if value is not None and check(value):
+                conditions_matched.append(field)
+        return len(conditions_matched) == len(self.checks), conditions_matched
+
 
 class RuleEngineService:
     def __init__(self):
         self._rules: dict[UUID, FraudRule] = {}
         self._rulesets: dict[UUID, RuleSet] = {}
+        self._compiled: dict[UUID, CompiledRule] = {}
+        self._active_rules: list[CompiledRule] = []
+        # Decision index: discriminating field values -> applicable active rules
+        self._decision_index: dict[tuple, list[CompiledRule]] = {}
         self._initialize_default_rules()
 
     def _initialize_default_rules(self):
@@ -59,9 +144,37 @@ class RuleEngineService:
         ]
         for rule in default_rules:
             self._rules[rule.rule_id] = rule
+            self._compiled[rule.rule_id] = CompiledRule(rule)
+        self._rebuild_index()
+
+    def _compile_rule(self, rule: FraudRule) -> None:
+        self._compiled[rule.rule_id] = CompiledRule(rule)
+        self._rebuild_index()
+
+    def _rebuild_index(self) -> None:
+        self._active_rules = [
+            self._compiled[rule_id] for rule_id, rule in self._rules.items()
+            if rule.status == RuleStatus.ACTIVE
+        ]
+        self._decision_index.clear()
+
+    def _candidate_rules(self, transaction: dict[str, Any]) -> list[CompiledRule]:
+        key = tuple(transaction.get(field) for field in DISCRIMINATING_FIELDS)
+        try:
+            bucket = self._decision_index.get(key)
+        except TypeError:
+            # Unhashable discriminator values; let the conditions decide
+            return self._active_rules
+        if bucket is None:
+            bucket = [compiled for compiled in self._active_rules if compiled.applies_to(key)]
+            if len(self._decision_index) >= _MAX_DECISION_BUCKETS:
+                self._decision_index.clear()
+            self._decision_index[key] = bucket
+        return bucket
 
     async def create_rule(self, rule: FraudRule) -> FraudRule:
         self._rules[rule.rule_id] = rule
+        self._compile_rule(rule)
         return rule
 
     async def get_rule(self, rule_id: UUID) -> FraudRule | None:
@@ -75,6 +188,7 @@ class RuleEngineService:
                     setattr(rule, key, value)
             rule.updated_at = datetime.now(UTC)
             rule.version += 1
+            self._compile_rule(rule)
         return rule
 
     async def toggle_rule(self, rule_id: UUID, is_active: bool) -> FraudRule | None:
@@ -82,15 +196,22 @@ class RuleEngineService:
         if rule:
             rule.status = RuleStatus.ACTIVE if is_active else RuleStatus.INACTIVE
             rule.updated_at = datetime.now(UTC)
+            self._rebuild_index()
         return rule
 
     async def evaluate_transaction(self, transaction: dict[str, Any]) -> list[RuleEvaluationResult]:
+        return self._evaluate(transaction, datetime.now(UTC))
+
+    async def evaluate_batch(self, transactions: list[dict[str, Any]]) -> list[list[RuleEvaluationResult]]:
+        evaluated_at = datetime.now(UTC)
+        return [self._evaluate(transaction, evaluated_at) for transaction in transactions]
+
+    def _evaluate(self, transaction: dict[str, Any], evaluated_at: datetime) -> list[RuleEvaluationResult]:
         results = []
-        for rule in self._rules.values():
-            if rule.status != RuleStatus.ACTIVE:
-                continue
-            start_time = datetime.now(UTC)
-            matched, conditions_matched = self._evaluate_rule(rule, transaction)
+        for compiled in self._candidate_rules(transaction):
+            rule = compiled.rule
+            start_time = time.perf_counter()
+            matched, conditions_matched = compiled.evaluate(transaction)
             result = RuleEvaluationResult(
                 rule_id=rule.rule_id,
                 rule_name=rule.rule_name,
@@ -98,41 +219,14 @@ class RuleEngineService:
                 score=rule.score_weight if matched else 0.0,
                 action=rule.action if matched else RuleAction.LOG,
                 conditions_matched=conditions_matched,
-                evaluation_time_ms=(datetime.now(UTC) - start_time).total_seconds() * 1000
+                evaluation_time_ms=(time.perf_counter() - start_time) * 1000
             )
             results.append(result)
             if matched:
                 rule.hit_count += 1
-                rule.last_hit_at = datetime.now(UTC)
+                rule.last_hit_at = evaluated_at
         return results
 
-    def _evaluate_rule(self, rule: FraudRule, transaction: dict[str, Any]) -> tuple:
-        conditions_matched = []
-        for condition in rule.conditions:
-            value = transaction.get(condition.field)
-            if value is None:
-                continue
-            matched = self._evaluate_condition(condition, value)
-            if matched:
-                conditions_matched.append(condition.field)
-        all_matched = len(conditions_matched) == len(rule.conditions)
-        return all_matched, conditions_matched
-
-    def _evaluate_condition(self, condition: RuleCondition, value: Any) -> bool:
-        operators = {
-            "==": lambda a, b: a == b,
-            "!=": lambda a, b: a != b,
-            ">": lambda a, b: a > b,
-            ">=": lambda a, b: a >= b,
-            "<": lambda a, b: a < b,
-            "<=": lambda a, b: a <= b,
-            "in": lambda a, b: a in b,
-        }
-        op_func = operators.get(condition.operator)
-        if op_func:
-            return op_func(value, condition.value)
-        return False
-
     async def get_all_rules(self) -> list[FraudRule]:
         return list(self._rules.values())
 
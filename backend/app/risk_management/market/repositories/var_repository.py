@@ -1,17 +1,49 @@
 """VaR Repository - Data access layer for VaR calculations"""
 
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
 from typing import Any
 from uuid import UUID
 
 from ..models.var_models import VaRBacktest, VaRCalculation, VaRException, VaRLimit, VaRMethod
 
 
+class ExceptionIndex:
+    """VaR exceptions per portfolio, kept sorted by date for range lookups"""
+
+    def __init__(self):
+        self._by_portfolio: dict[UUID, list[VaRException]] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, exception: VaRException) -> None:
+        insort(self._by_portfolio.setdefault(exception.portfolio_id, []), exception, key=lambda e: e.exception_date)
+        self._count += 1
+
+    def find(
+        self, portfolio_id: UUID | None = None, start_date: date | None = None, end_date: date | None = None
+    ) -> list[VaRException]:
+        portfolios = [portfolio_id] if portfolio_id is not None else list(self._by_portfolio)
+        found = []
+        for pid in portfolios:
+            exceptions = self._by_portfolio.get(pid, [])
+            lo = bisect_left(exceptions, start_date, key=lambda e: e.exception_date) if start_date else 0
+            hi = bisect_right(exceptions, end_date, key=lambda e: e.exception_date) if end_date else len(exceptions)
+            found.extend(exceptions[lo:hi])
+        return found
+
+    def dates(self, portfolio_id: UUID) -> set[date]:
+        return {e.exception_date for e in self._by_portfolio.get(portfolio_id, [])}
+
+
 class VaRRepository:
     def __init__(self):
         self._calculations: dict[UUID, VaRCalculation] = {}
         self._backtests: dict[UUID, VaRBacktest] = {}
         self._limits: dict[UUID, VaRLimit] = {}
-        self._exceptions: list[VaRException] = []
+        self._exceptions = ExceptionIndex()
         self._portfolio_index: dict[UUID, list[UUID]] = {}
 
     async def save_calculation(self, calc: VaRCalculation) -> VaRCalculation:
@@ -53,11 +85,13 @@ class VaRRepository:
         return None
 
     async def save_exception(self, exception: VaRException) -> VaRException:
-        self._exceptions.append(exception)
+        self._exceptions.add(exception)
         return exception
 
-    async def find_exceptions_by_portfolio(self, portfolio_id: UUID) -> list[VaRException]:
-        return [e for e in self._exceptions if e.portfolio_id == portfolio_id]
+    async def find_exceptions_by_portfolio(
+        self, portfolio_id: UUID, start_date: date | None = None, end_date: date | None = None
+    ) -> list[VaRException]:
+        return self._exceptions.find(portfolio_id, start_date, end_date)
 
     async def get_statistics(self) -> dict[str, Any]:
         return {
@@ -60,6 +60,14 @@ class SensitivityRequest(BaseModel):
     shock_range: list[Decimal]
 
 
+class SensitivityGridRequest(BaseModel):
+    portfolio_id: UUID
+    spot_shocks_pct: list[float]
+    vol_shocks_pct: list[float]
+    time_decay_days: int = 0
+    risk_free_rate: float = 0.05
+
+
 @router.post("/positions", response_model=OptionPosition)
 async def create_position(request: OptionPositionRequest):
     """Create option position"""
@@ -184,6 +192,18 @@ async def run_sensitivity(request: SensitivityRequest):
     )
 
 
+@router.post("/sensitivity/grid")
+async def run_sensitivity_grid(request: SensitivityGridRequest):
+    """Revalue the portfolio over a spot x volatility shock grid"""
+    return await greeks_service.calculate_sensitivity_grid(
+        portfolio_id=request.portfolio_id,
+        spot_shocks_pct=request.spot_shocks_pct,
+        vol_shocks_pct=request.vol_shocks_pct,
+        time_decay_days=request.time_decay_days,
+        risk_free_rate=request.risk_free_rate
+    )
+
+
 @router.get("/sensitivity/{portfolio_id}", response_model=list[GreeksSensitivity])
 async def get_sensitivities(portfolio_id: UUID):
     """Get sensitivity analyses for portfolio"""
@@ -2,6 +2,7 @@
 
 from datetime import date
 from decimal import Decimal
+from typing import Any
 from uuid import UUID
 
 from fastapi import APIRouter, HTTPException, Query
@@ -33,7 +34,14 @@ class ScenarioRequest(BaseModel):
 class StressTestRequest(BaseModel):
     portfolio_id: UUID
     scenario_id: UUID
-    test_date: date
+    portfolio_value: float
+    positions: list[dict[str, Any]]
+
+
+class RunAllScenariosRequest(BaseModel):
+    portfolio_value: float
+    positions: list[dict[str, Any]]
+    scenario_ids: list[UUID] | None = None
 
 
 class HistoricalScenarioRequest(BaseModel):
@@ -53,8 +61,9 @@ class SensitivityRequest(BaseModel):
 
 class ReverseStressRequest(BaseModel):
     portfolio_id: UUID
-    loss_threshold: Decimal
-    risk_factors: list[str]
+    target_loss: float
+    created_by: str
+    positions: list[dict[str, Any]] | None = None
 
 
 @router.post("/scenarios", response_model=StressScenario)
@@ -112,18 +121,25 @@ async def deactivate_scenario(scenario_id: UUID):
 @router.post("/run", response_model=StressTestResult)
 async def run_stress_test(request: StressTestRequest):
     """Run stress test on portfolio"""
-    return await stress_test_service.run_stress_test(
-        portfolio_id=request.portfolio_id,
+    result = await stress_test_service.run_stress_test(
         scenario_id=request.scenario_id,
-        test_date=request.test_date
+        portfolio_id=request.portfolio_id,
+        portfolio_value=request.portfolio_value,
+        positions=request.positions
     )
+    if not result:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    return result
 
 
 @router.post("/run-all/{portfolio_id}", response_model=list[StressTestResult])
-async def run_all_scenarios(portfolio_id: UUID, test_date: date):
-    """Run all active scenarios on portfolio"""
+async def run_all_scenarios(portfolio_id: UUID, request: RunAllScenariosRequest):
+    """Run all active (or the given) scenarios on portfolio"""
     return await stress_test_service.run_all_active_scenarios(
-        portfolio_id, test_date
+        portfolio_id=portfolio_id,
+        portfolio_value=request.portfolio_value,
+        positions=request.positions,
+        scenario_ids=request.scenario_ids
     )
 
 
@@ -195,8 +211,9 @@ async def run_reverse_stress_test(request: ReverseStressRequest):
     """Run reverse stress test"""
     return await stress_test_service.run_reverse_stress_test(
         portfolio_id=request.portfolio_id,
-        loss_threshold=request.loss_threshold,
-        risk_factors=request.risk_factors
+        target_loss=request.target_loss,
+        created_by=request.created_by,
+        positions=request.positions
     )
 
 
@@ -1,9 +1,11 @@
 """Greeks Service - Options greeks calculation service"""
 
-import math
 from datetime import date
+from typing import Any
 from uuid import UUID
 
+import numpy as np
+
 from ..models.greeks_models import (
     GreeksCalculation,
     GreeksLimit,
@@ -15,6 +17,89 @@ from ..models.greeks_models import (
     PortfolioGreeks,
 )
 
+GREEK_NAMES = ("delta", "gamma", "theta", "vega", "rho")
+
+# Minimum time to expiry in years, so expired or same-day options keep finite greeks
+MIN_TIME_TO_EXPIRY = 0.001
+
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal CDF to double precision (Hart's rational approximation)"""
+    z = np.abs(x)
+    e = np.exp(-z * z / 2)
+    numerator = 3.52624965998911e-02 * z + 0.700383064443688
+    for coefficient in (6.37396220353165, 33.912866078383, 112.079291497871, 221.213596169931, 220.206867912376):
+        numerator = numerator * z + coefficient
+    denominator = 8.83883476483184e-02 * z + 1.75566716318264
+    for coefficient in (
+        16.064177579207, 86.7807322029461, 296.564248779674, 637.333633378831, 793.826512519948, 440.413735824752
+    ):
+        denominator = denominator * z + coefficient
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        tail = np.where(
+            z < 7.07106781186547,
+            e * numerator / denominator,
+            e / ((z + 1 / (z + 2 / (z + 3 / (z + 4 / (z + 0.65))))) * 2.506628274631),
+        )
+    tail = np.where(z > 37, 0.0, tail)
+    return np.where(x > 0, 1 - tail, tail)
+
+
+def norm_pdf(x: np.ndarray) -> np.ndarray:
+    return np.exp(-x * x / 2) / np.sqrt(2 * np.pi)
+
+
+def _d1_d2(
+    spot: np.ndarray, strike: np.ndarray, time_to_exp: np.ndarray, rate: np.ndarray, sigma: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    valid = (time_to_exp > 0) & (sigma > 0)
+    t = np.where(valid, time_to_exp, 1.0)
+    vol = np.where(valid, sigma, 1.0)
+    vol_sqrt_t = vol * np.sqrt(t)
+    d1 = (np.log(spot / strike) + (rate + vol ** 2 / 2) * t) / vol_sqrt_t
+    return d1, d1 - vol_sqrt_t, t, vol, valid
+
+
+def black_scholes_greeks_batch(
+    spot: np.ndarray, strike: np.ndarray, time_to_exp: np.ndarray,
+    rate: np.ndarray, sigma: np.ndarray, is_call: np.ndarray
+) -> dict[str, np.ndarray]:
+    """Per-unit Black-Scholes greeks for arrays of options (arguments broadcast).
+    Vega and rho are per 1% move and theta is per calendar day; options with no
+    time or volatility left get zero greeks."""
+    d1, d2, t, vol, valid = _d1_d2(spot, strike, time_to_exp, rate, sigma)
+    sqrt_t = np.sqrt(t)
+    pdf_d1 = norm_pdf(d1)
+    discounted_strike = strike * np.exp(-rate * t)
+    itm_probability = np.where(is_call, norm_cdf(d2), norm_cdf(-d2))
+    sign = np.where(is_call, 1.0, -1.0)
+
+    greeks = {
+        "delta": np.where(is_call, norm_cdf(d1), norm_cdf(d1) - 1),
+        "gamma": pdf_d1 / (spot * vol * sqrt_t),
+        "theta": (-(spot * pdf_d1 * vol) / (2 * sqrt_t) - rate * discounted_strike * itm_probability) / 365,
+        "vega": spot * pdf_d1 * sqrt_t / 100,
+        "rho": sign * discounted_strike * t * itm_probability / 100,
+    }
+    return {name: np.where(valid, values, 0.0) for name, values in greeks.items()}
+
+
+def black_scholes_price_batch(
+    spot: np.ndarray, strike: np.ndarray, time_to_exp: np.ndarray,
+    rate: np.ndarray, sigma: np.ndarray, is_call: np.ndarray
+) -> np.ndarray:
+    """Black-Scholes prices (arguments broadcast); intrinsic value when no time or volatility is left"""
+    d1, d2, t, _, valid = _d1_d2(spot, strike, time_to_exp, rate, sigma)
+    discounted_strike = strike * np.exp(-rate * t)
+    price = np.where(
+        is_call,
+        spot * norm_cdf(d1) - discounted_strike * norm_cdf(d2),
+        discounted_strike * norm_cdf(-d2) - spot * norm_cdf(-d1),
+    )
+    intrinsic = np.maximum(np.where(is_call, spot - strike, strike - spot), 0.0)
+    return np.where(valid, price, intrinsic)
+
+
 
 class GreeksService:
     def __init__(self):
@@ -28,39 +113,26 @@ class GreeksService:
         self, spot: float, strike: float, time_to_exp: float, r: float, sigma: float, option_type: OptionType
     ) -> dict[str, float]:
         """Calculate Black-Scholes greeks"""
-        if time_to_exp <= 0 or sigma <= 0:
-            return {"delta": 0, "gamma": 0, "theta": 0, "vega": 0, "rho": 0}
-
-        d1 = (math.log(spot / strike) + (r + sigma ** 2 / 2) * time_to_exp) / (sigma * math.sqrt(time_to_exp))
-        d2 = d1 - sigma * math.sqrt(time_to_exp)
-
-        # Normal CDF approximation
-        def norm_cdf(x):
-            return 0.5 * (1 + math.erf(x / math.sqrt(2)))
-
-        def norm_pdf(x):
-            return math.exp(-x ** 2 / 2) / math.sqrt(2 * math.pi)
-
-        if option_type == OptionType.CALL:
-            delta = norm_cdf(d1)
-            rho = strike * time_to_exp * math.exp(-r * time_to_exp) * norm_cdf(d2) / 100
-        else:
-            delta = norm_cdf(d1) - 1
-            rho = -strike * time_to_exp * math.exp(-r * time_to_exp) * norm_cdf(-d2) / 100
-
-        gamma = norm_pdf(d1) / (spot * sigma * math.sqrt(time_to_exp))
-        vega = spot * norm_pdf(d1) * math.sqrt(time_to_exp) / 100
-        theta = -(spot * norm_pdf(d1) * sigma) / (2 * math.sqrt(time_to_exp)) - r * strike * math.exp(-r * time_to_exp) * (
-            norm_cdf(d2) if option_type == OptionType.CALL else norm_cdf(-d2)
+        greeks = black_scholes_greeks_batch(
+            np.array([spot]), np.array([strike]), np.array([time_to_exp]),
+            np.array([r]), np.array([sigma]), np.array([option_type == OptionType.CALL])
         )
-        theta = theta / 365  # Daily theta
+        return {name: float(values[0]) for name, values in greeks.items()}
 
+    def _position_arrays(self, positions: list[OptionPosition]) -> dict[str, np.ndarray]:
+        today = date.today()
         return {
-            "delta": delta,
-            "gamma": gamma,
-            "theta": theta,
-            "vega": vega,
-            "rho": rho
+            "spot": np.array([p.underlying_price for p in positions], dtype=np.float64),
+            "strike": np.array([p.strike_price for p in positions], dtype=np.float64),
+            "time_to_exp": np.maximum(
+                MIN_TIME_TO_EXPIRY,
+                np.array([(p.expiry_date - today).days for p in positions], dtype=np.float64) / 365,
+            ),
+            "sigma": np.array([p.implied_volatility for p in positions], dtype=np.float64),
+            "is_call": np.array([p.option_type == OptionType.CALL for p in positions]),
+            "multiplier": np.array(
+                [p.quantity if p.direction == "long" else -p.quantity for p in positions], dtype=np.float64
+            ),
         }
 
     async def create_position(
@@ -99,7 +171,7 @@ class GreeksService:
         if not position:
             return None
 
-        time_to_expiry = max(0.001, (position.expiry_date - date.today()).days / 365)
+        time_to_expiry = max(MIN_TIME_TO_EXPIRY, (position.expiry_date - date.today()).days / 365)
 
         greeks = self._black_scholes_greeks(
             spot=position.underlying_price,
@@ -128,45 +200,57 @@ class GreeksService:
         self._calculations[calculation.calculation_id] = calculation
         return calculation
 
-    async def calculate_portfolio_greeks(self, portfolio_id: UUID) -> PortfolioGreeks:
+    async def calculate_portfolio_greeks(
+        self, portfolio_id: UUID, risk_free_rate: float = 0.05
+    ) -> PortfolioGreeks:
+        """Greeks for every position in one vectorized pass, aggregated by underlying and expiry"""
         positions = [p for p in self._positions.values() if p.portfolio_id == portfolio_id]
 
-        total_delta = total_gamma = total_theta = total_vega = total_rho = 0
+        totals = dict.fromkeys(GREEK_NAMES, 0.0)
         by_underlying = {}
-
-        for position in positions:
-            calc = await self.calculate_greeks(position.position_id)
-            if calc:
-                total_delta += calc.delta
-                total_gamma += calc.gamma
-                total_theta += calc.theta
-                total_vega += calc.vega
-                total_rho += calc.rho
-
-                if position.underlying not in by_underlying:
-                    by_underlying[position.underlying] = {"delta": 0, "gamma": 0, "vega": 0}
-                by_underlying[position.underlying]["delta"] += calc.delta
-                by_underlying[position.underlying]["gamma"] += calc.gamma
-                by_underlying[position.underlying]["vega"] += calc.vega
+        by_expiry = {}
+        if positions:
+            arrays = self._position_arrays(positions)
+            unit_greeks = black_scholes_greeks_batch(
+                arrays["spot"], arrays["strike"], arrays["time_to_exp"],
+                risk_free_rate, arrays["sigma"], arrays["is_call"]
+            )
+            greeks = {name: values * arrays["multiplier"] for name, values in unit_greeks.items()}
+            totals = {name: float(values.sum()) for name, values in greeks.items()}
+            by_underlying = self._group_greeks([p.underlying for p in positions], greeks, ("delta", "gamma", "vega"))
+            by_expiry = self._group_greeks(
+                [p.expiry_date.isoformat() for p in positions], greeks, ("delta", "gamma", "theta", "vega")
+            )
 
         portfolio_greeks = PortfolioGreeks(
             portfolio_id=portfolio_id,
             calculation_date=date.today(),
-            total_delta=total_delta,
-            total_gamma=total_gamma,
-            total_theta=total_theta,
-            total_vega=total_vega,
-            total_rho=total_rho,
-            net_delta=total_delta,
-            net_gamma=total_gamma,
-            gamma_exposure=abs(total_gamma) * 100,
-            vega_exposure=abs(total_vega) * 100,
-            theta_decay=total_theta,
-            by_underlying=by_underlying
+            total_delta=totals["delta"],
+            total_gamma=totals["gamma"],
+            total_theta=totals["theta"],
+            total_vega=totals["vega"],
+            total_rho=totals["rho"],
+            net_delta=totals["delta"],
+            net_gamma=totals["gamma"],
+            gamma_exposure=abs(totals["gamma"]) * 100,
+            vega_exposure=abs(totals["vega"]) * 100,
+            theta_decay=totals["theta"],
+            by_underlying=by_underlying,
+            by_expiry=by_expiry
         )
         self._portfolio_greeks[portfolio_id] = portfolio_greeks
         return portfolio_greeks
 
+    def _group_greeks(
+        self, keys: list[str], greeks: dict[str, np.ndarray], names: tuple[str, ...]
+    ) -> dict[str, dict[str, float]]:
+        groups, inverse = np.unique(np.array(keys), return_inverse=True)
+        sums = {name: np.bincount(inverse, weights=greeks[name], minlength=len(groups)) for name in names}
+        return {
+            str(group): {name: float(sums[name][index]) for name in names}
+            for index, group in enumerate(groups)
+        }
+
     async def set_limit(
         self, portfolio_id: UUID, greek_type: str,
         limit_amount: float, approved_by: str
@@ -185,32 +269,90 @@ class GreeksService:
 
     async def calculate_sensitivity(
         self, portfolio_id: UUID, underlying_move_pct: float,
-        vol_move_pct: float, time_decay_days: int
+        vol_move_pct: float, time_decay_days: int, risk_free_rate: float = 0.05
     ) -> GreeksSensitivity:
-        greeks = self._portfolio_greeks.get(portfolio_id)
-        if not greeks:
-            greeks = await self.calculate_portfolio_greeks(portfolio_id)
-
-        delta_pnl = greeks.total_delta * underlying_move_pct
-        gamma_pnl = 0.5 * greeks.total_gamma * underlying_move_pct ** 2
-        vega_pnl = greeks.total_vega * vol_move_pct
-        theta_pnl = greeks.total_theta * time_decay_days
+        """P&L of a spot move, a vol move and time decay by full revaluation, all from
+        one broadcast over the (no shock, shock) grid of each. Delta P&L is the
+        first-order spot term and gamma P&L the rest of the spot-only revaluation;
+        total P&L applies all three shocks together."""
+        positions = [p for p in self._positions.values() if p.portfolio_id == portfolio_id]
+        pnl = np.zeros((2, 2, 2))
+        delta_pnl = 0.0
+        if positions:
+            arrays = self._position_arrays(positions)
+            pnl = self._revaluation_pnl(
+                arrays, np.array([0.0, underlying_move_pct]), np.array([0.0, vol_move_pct]),
+                np.array([0.0, time_decay_days]), risk_free_rate
+            )
+            delta = black_scholes_greeks_batch(
+                arrays["spot"], arrays["strike"], arrays["time_to_exp"],
+                risk_free_rate, arrays["sigma"], arrays["is_call"]
+            )["delta"]
+            delta_pnl = float((delta * arrays["spot"]) @ arrays["multiplier"]) * underlying_move_pct / 100
 
         sensitivity = GreeksSensitivity(
             portfolio_id=portfolio_id,
             analysis_date=date.today(),
             underlying_move_percentage=underlying_move_pct,
             delta_pnl=delta_pnl,
-            gamma_pnl=gamma_pnl,
-            total_pnl=delta_pnl + gamma_pnl,
+            gamma_pnl=float(pnl[1, 0, 0]) - delta_pnl,
+            total_pnl=float(pnl[1, 1, 1]),
             vol_move_percentage=vol_move_pct,
-            vega_pnl=vega_pnl,
+            vega_pnl=float(pnl[0, 1, 0]),
             time_decay_days=time_decay_days,
-            theta_pnl=theta_pnl
+            theta_pnl=float(pnl[0, 0, 1])
         )
         self._sensitivities[sensitivity.sensitivity_id] = sensitivity
         return sensitivity
 
+    def _revaluation_pnl(
+        self, arrays: dict[str, np.ndarray], spot_shocks: np.ndarray, vol_shocks: np.ndarray,
+        decay_days: np.ndarray, risk_free_rate: float
+    ) -> np.ndarray:
+        """Portfolio P&L for every (spot shock, vol shock, decay) combination, priced in one
+        broadcast of shape (spot, vol, decay, position). Spot shocks are relative moves in
+        percent, vol shocks are in volatility points."""
+        base = black_scholes_price_batch(
+            arrays["spot"], arrays["strike"], arrays["time_to_exp"],
+            risk_free_rate, arrays["sigma"], arrays["is_call"]
+        )
+        shocked = black_scholes_price_batch(
+            arrays["spot"] * (1 + spot_shocks[:, None, None, None] / 100),
+            arrays["strike"],
+            arrays["time_to_exp"] - decay_days[None, None, :, None] / 365,
+            risk_free_rate,
+            np.maximum(arrays["sigma"] + vol_shocks[None, :, None, None] / 100, 0.0),
+            arrays["is_call"],
+        )
+        return (shocked - base) @ arrays["multiplier"]
+
+    async def calculate_sensitivity_grid(
+        self, portfolio_id: UUID, spot_shocks_pct: list[float], vol_shocks_pct: list[float],
+        time_decay_days: int = 0, risk_free_rate: float = 0.05
+    ) -> dict[str, Any]:
+        """Full Black-Scholes revaluation of the portfolio over a spot x vol shock grid"""
+        positions = [p for p in self._positions.values() if p.portfolio_id == portfolio_id]
+        spot_shocks = np.asarray(spot_shocks_pct, dtype=np.float64)
+        vol_shocks = np.asarray(vol_shocks_pct, dtype=np.float64)
+        pnl = np.zeros((spot_shocks.size, vol_shocks.size))
+
+        if positions:
+            pnl = self._revaluation_pnl(
+                self._position_arrays(positions), spot_shocks, vol_shocks,
+                np.array([float(time_decay_days)]), risk_free_rate
+            )[:, :, 0]
+
+        return {
+            "portfolio_id": str(portfolio_id),
+            "analysis_date": date.today().isoformat(),
+            "spot_shocks_pct": spot_shocks.tolist(),
+            "vol_shocks_pct": vol_shocks.tolist(),
+            "time_decay_days": time_decay_days,
+            "pnl": pnl.tolist(),
+            "worst_pnl": float(pnl.min()) if pnl.size else 0.0,
+            "best_pnl": float(pnl.max()) if pnl.size else 0.0,
+        }
+
     async def get_statistics(self) -> GreeksStatistics:
         stats = GreeksStatistics(total_option_positions=len(self._positions))
         if self._portfolio_greeks:
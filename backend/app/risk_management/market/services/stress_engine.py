@@ -0,0 +1,182 @@
+"""Stress Engine - Scenario x risk factor shock matrix and position exposures"""
+
+import math
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+
+from ..models.stress_test_models import StressScenario
+
+RiskFactor = tuple[str, str]
+
+# Relative ridge added to the scenario shock covariance in reverse stress tests,
+# so factors no scenario moves remain reachable (at a large distance)
+REVERSE_STRESS_RIDGE = 1e-6
+
+
+def position_factor(position: dict[str, Any]) -> RiskFactor | None:
+    asset_class = position.get("asset_class", "equity")
+    if asset_class == "equity":
+        return ("equity", position.get("ticker", "default"))
+    if asset_class == "fx":
+        return ("fx", position.get("currency_pair", ""))
+    if asset_class == "rates":
+        return ("ir", position.get("tenor", ""))
+    return None
+
+
+def resolve_shock(scenario: StressScenario, factor: RiskFactor) -> float:
+    """Shock a scenario applies to a factor, with the equity 'default' and rates 'all' fallbacks"""
+    kind, name = factor
+    if kind == "equity":
+        return scenario.equity_shocks.get(name, scenario.equity_shocks.get("default", 0))
+    if kind == "fx":
+        return scenario.fx_shocks.get(name, 0)
+    return scenario.ir_shocks.get(name, scenario.ir_shocks.get("all", 0))
+
+
+@dataclass
+class PositionExposures:
+    """Positions as a sparse positions x factors exposure matrix: one factor column per position"""
+
+    position_ids: list[Any]
+    asset_classes: list[str]
+    factors: list[RiskFactor]
+    factor_index: np.ndarray
+    values: np.ndarray
+
+    @property
+    def factor_exposures(self) -> np.ndarray:
+        return np.bincount(self.factor_index, weights=self.values, minlength=len(self.factors))
+
+
+@dataclass
+class StressRun:
+    scenario_ids: list[UUID]
+    pnl: np.ndarray
+    position_pnl: np.ndarray
+    class_names: list[str]
+    class_contributions: np.ndarray
+
+
+@dataclass
+class ReverseStressSolution:
+    shocks: dict[RiskFactor, float]
+    mahalanobis_distance: float
+    plausibility: float
+
+
+def shock_signature(scenario: StressScenario) -> tuple:
+    """Content of the shocks resolve_shock reads, so edited scenarios are recompiled"""
+    return tuple(
+        tuple(sorted(shocks.items()))
+        for shocks in (scenario.equity_shocks, scenario.fx_shocks, scenario.ir_shocks)
+    )
+
+
+class StressMatrixEngine:
+    """Compiles scenarios into a dense scenarios x factors shock matrix, caching each
+    scenario's shock vector for the last factor universe and shock values it was
+    compiled against, so hourly runs over an unchanged book reuse the vectors."""
+
+    def __init__(self):
+        self._vectors: dict[UUID, tuple[tuple, np.ndarray]] = {}
+
+    def invalidate(self, scenario_id: UUID | None = None) -> None:
+        if scenario_id is None:
+            self._vectors.clear()
+        else:
+            self._vectors.pop(scenario_id, None)
+
+    def exposures(self, positions: list[dict[str, Any]]) -> PositionExposures:
+        columns: dict[RiskFactor, int] = {}
+        factor_index = []
+        values = []
+        position_ids = []
+        asset_classes = []
+        for position in positions:
+            factor = position_factor(position)
+            if factor is None:
+                # unshocked asset classes get a column no scenario moves
+                factor = ("none", position.get("asset_class", ""))
+            factor_index.append(columns.setdefault(factor, len(columns)))
+            values.append(position.get("value", 0))
+            position_ids.append(position.get("id"))
+            asset_classes.append(position.get("asset_class", "equity"))
+        return PositionExposures(
+            position_ids=position_ids,
+            asset_classes=asset_classes,
+            factors=list(columns),
+            factor_index=np.array(factor_index, dtype=np.intp),
+            values=np.array(values, dtype=np.float64),
+        )
+
+    def shock_matrix(self, scenarios: list[StressScenario], factors: list[RiskFactor]) -> np.ndarray:
+        universe = tuple(factors)
+        matrix = np.empty((len(scenarios), len(factors)))
+        for row, scenario in enumerate(scenarios):
+            key = (universe, shock_signature(scenario))
+            cached = self._vectors.get(scenario.scenario_id)
+            if cached is None or cached[0] != key:
+                vector = np.array(
+                    [0.0 if kind == "none" else resolve_shock(scenario, (kind, name)) for kind, name in factors],
+                    dtype=np.float64,
+                )
+                self._vectors[scenario.scenario_id] = (key, vector)
+            else:
+                vector = cached[1]
+            matrix[row] = vector
+        return matrix
+
+    def run(self, scenarios: list[StressScenario], exposures: PositionExposures) -> StressRun:
+        shocks = self.shock_matrix(scenarios, exposures.factors)
+        pnl = shocks @ exposures.factor_exposures
+        position_pnl = shocks[:, exposures.factor_index] * exposures.values
+
+        class_names, class_index = np.unique(np.array(exposures.asset_classes, dtype=str), return_inverse=True)
+        membership = np.zeros((len(exposures.asset_classes), len(class_names)))
+        membership[np.arange(len(class_index)), class_index] = 1.0
+        return StressRun(
+            scenario_ids=[s.scenario_id for s in scenarios],
+            pnl=pnl,
+            position_pnl=position_pnl,
+            class_names=[str(name) for name in class_names],
+            class_contributions=np.abs(position_pnl) @ membership,
+        )
+
+    def reverse(
+        self, scenarios: list[StressScenario], exposures: PositionExposures, target_loss: float
+    ) -> ReverseStressSolution | None:
+        """Most plausible shock vector producing the target loss.
+
+        Minimises the Mahalanobis norm x' C^-1 x subject to e . x = -target_loss,
+        where e are the factor exposures and C the second-moment matrix of the
+        scenario shock matrix (plus a small ridge); the solution is
+        x = -target_loss * C e / (e' C e).
+        """
+        shockable = np.array([kind != "none" for kind, _ in exposures.factors])
+        factor_exposures = np.where(shockable, exposures.factor_exposures, 0.0)
+        if not np.any(factor_exposures):
+            return None
+        shocks = self.shock_matrix(scenarios, exposures.factors)
+        covariance = shocks.T @ shocks / max(len(scenarios), 1)
+        mean_variance = float(np.trace(covariance)) / len(exposures.factors)
+        ridge = REVERSE_STRESS_RIDGE * (mean_variance if mean_variance > 0 else 1.0)
+        covariance += ridge * np.eye(len(exposures.factors))
+
+        direction = covariance @ factor_exposures
+        variance = float(factor_exposures @ direction)
+        solution = -target_loss * direction / variance
+        distance = abs(target_loss) / math.sqrt(variance)
+        return ReverseStressSolution(
+            shocks={
+                factor: float(shock)
+                for factor, shock in zip(exposures.factors, solution, strict=True)
+                if shock != 0
+            },
+            mahalanobis_distance=distance,
+            plausibility=2 * (1 - NormalDist().cdf(distance)) * 100,
+        )
@@ -14,6 +14,7 @@ from ..models.stress_test_models import (
     StressTestResult,
     StressTestStatistics,
 )
+from .stress_engine import StressMatrixEngine, StressRun
 
 
 class StressTestService:
@@ -23,6 +24,7 @@ class StressTestService:
         self._historical: dict[UUID, HistoricalScenario] = {}
         self._sensitivities: dict[UUID, SensitivityAnalysis] = {}
         self._reverse_tests: dict[UUID, ReverseStressTest] = {}
+        self._engine = StressMatrixEngine()
         self._initialize_scenarios()
 
     def _initialize_scenarios(self):
@@ -93,49 +95,56 @@ class StressTestService:
         if not scenario:
             return None
 
-        # Calculate P&L impact
-        pnl_impact = 0
-        position_impacts = []
-        risk_contributions = {}
-
-        for pos in positions:
-            asset_class = pos.get("asset_class", "equity")
-            value = pos.get("value", 0)
-
-            if asset_class == "equity":
-                shock = scenario.equity_shocks.get(pos.get("ticker", "default"),
-                        scenario.equity_shocks.get("default", 0))
-            elif asset_class == "fx":
-                shock = scenario.fx_shocks.get(pos.get("currency_pair", ""), 0)
-            elif asset_class == "rates":
-                shock = scenario.ir_shocks.get(pos.get("tenor", ""),
-                        scenario.ir_shocks.get("all", 0))
-            else:
-                shock = 0
+        run = self._engine.run([scenario], self._engine.exposures(positions))
+        return self._record_results(run, portfolio_id, portfolio_value, positions)[0]
 
-            impact = value * shock
-            pnl_impact += impact
-            position_impacts.append({"position": pos.get("id"), "impact": impact})
-            risk_contributions[asset_class] = risk_contributions.get(asset_class, 0) + abs(impact)
+    async def run_all_active_scenarios(
+        self, portfolio_id: UUID, portfolio_value: float,
+        positions: list[dict[str, Any]], scenario_ids: list[UUID] | None = None
+    ) -> list[StressTestResult]:
+        """Run every active (or the given) scenario against the book in one matrix multiply"""
+        if scenario_ids is None:
+            scenarios = [s for s in self._scenarios.values() if s.is_active]
+        else:
+            scenarios = [self._scenarios[i] for i in scenario_ids if i in self._scenarios]
+        if not scenarios:
+            return []
 
-        var_change = abs(pnl_impact) * 0.1
+        run = self._engine.run(scenarios, self._engine.exposures(positions))
+        return self._record_results(run, portfolio_id, portfolio_value, positions)
 
-        result = StressTestResult(
-            scenario_id=scenario_id,
-            portfolio_id=portfolio_id,
-            test_date=date.today(),
-            portfolio_value_before=portfolio_value,
-            portfolio_value_after=portfolio_value + pnl_impact,
-            pnl_impact=pnl_impact,
-            pnl_impact_percentage=(pnl_impact / portfolio_value * 100) if portfolio_value > 0 else 0,
-            var_before=portfolio_value * 0.02,
-            var_after=portfolio_value * 0.02 + var_change,
-            var_change=var_change,
-            risk_factor_contributions=risk_contributions,
-            position_level_impacts=position_impacts
-        )
-        self._results[result.result_id] = result
-        return result
+    def _record_results(
+        self, run: StressRun, portfolio_id: UUID,
+        portfolio_value: float, positions: list[dict[str, Any]]
+    ) -> list[StressTestResult]:
+        position_ids = [pos.get("id") for pos in positions]
+        results = []
+        for row, scenario_id in enumerate(run.scenario_ids):
+            pnl_impact = float(run.pnl[row])
+            var_change = abs(pnl_impact) * 0.1
+
+            result = StressTestResult(
+                scenario_id=scenario_id,
+                portfolio_id=portfolio_id,
+                test_date=date.today(),
+                portfolio_value_before=portfolio_value,
+                portfolio_value_after=portfolio_value + pnl_impact,
+                pnl_impact=pnl_impact,
+                pnl_impact_percentage=(pnl_impact / portfolio_value * 100) if portfolio_value > 0 else 0,
+                var_before=portfolio_value * 0.02,
+                var_after=portfolio_value * 0.02 + var_change,
+                var_change=var_change,
+                risk_factor_contributions=dict(
+                    zip(run.class_names, run.class_contributions[row].tolist(), strict=True)
+                ),
+                position_level_impacts=[
+                    {"position": position_id, "impact": impact}
+                    for position_id, impact in zip(position_ids, run.position_pnl[row].tolist(), strict=True)
+                ]
+            )
+            self._results[result.result_id] = result
+            results.append(result)
+        return results
 
     async def run_sensitivity_analysis(
         self, portfolio_id: UUID, risk_factor: str,
@@ -167,27 +176,53 @@ class StressTestService:
         return analysis
 
     async def run_reverse_stress_test(
-        self, portfolio_id: UUID, target_loss: float, created_by: str
+        self, portfolio_id: UUID, target_loss: float, created_by: str,
+        positions: list[dict[str, Any]] | None = None
     ) -> ReverseStressTest:
-        # Identify scenarios that could cause target loss
-        scenarios = []
-        for scenario in self._scenarios.values():
-            estimated_impact = sum(scenario.equity_shocks.values()) * 0.5 + \
-                             sum(scenario.fx_shocks.values()) * 0.3
-            if abs(estimated_impact) >= target_loss * 0.8:
-                scenarios.append({
-                    "scenario_id": str(scenario.scenario_id),
-                    "scenario_name": scenario.scenario_name,
-                    "estimated_impact": estimated_impact
-                })
+        """Scenarios that already produce the target loss on the book, plus the most
+        plausible shock vector (relative to the scenario library) that reaches it"""
+        scenarios = list(self._scenarios.values())
+        exposures = self._engine.exposures(positions or [])
+        run = self._engine.run(scenarios, exposures)
+
+        identified = [
+            {
+                "scenario_id": str(scenario.scenario_id),
+                "scenario_name": scenario.scenario_name,
+                "estimated_impact": float(pnl)
+            }
+            for scenario, pnl in zip(scenarios, run.pnl.tolist(), strict=True)
+            if -pnl >= target_loss * 0.8
+        ]
+
+        solution = self._engine.reverse(scenarios, exposures, target_loss)
+        risk_factors_required = []
+        plausibility = 0.0
+        assessment = "low"
+        if solution is not None:
+            ranked = sorted(solution.shocks.items(), key=lambda item: abs(item[1]), reverse=True)
+            risk_factors_required = [f"{kind}:{name}" for (kind, name), _ in ranked]
+            identified.append({
+                "scenario_id": None,
+                "scenario_name": "Minimal-norm reverse stress shock",
+                "estimated_impact": -target_loss,
+                "shocks": {f"{kind}:{name}": shock for (kind, name), shock in ranked},
+                "mahalanobis_distance": solution.mahalanobis_distance
+            })
+            plausibility = solution.plausibility
+            if solution.mahalanobis_distance <= 1:
+                assessment = "high"
+            elif solution.mahalanobis_distance <= 2:
+                assessment = "medium"
 
         test = ReverseStressTest(
             portfolio_id=portfolio_id,
             test_date=date.today(),
             target_loss=target_loss,
-            identified_scenarios=scenarios,
-            probability_assessment="medium" if scenarios else "low",
-            plausibility_score=60 if scenarios else 30,
+            identified_scenarios=identified,
+            probability_assessment=assessment,
+            risk_factors_required=risk_factors_required,
+            plausibility_score=plausibility,
             created_by=created_by
         )
         self._reverse_tests[test.test_id] = test
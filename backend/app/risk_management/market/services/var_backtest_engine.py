@@ -0,0 +1,119 @@
+"""VaR Backtest Engine - Rolling exception counts, Kupiec/Christoffersen tests and traffic lights"""
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+# Basel traffic light: a window is yellow once the binomial probability of at
+# most its exception count reaches 95%, and red at 99.99%
+YELLOW_ZONE_PROBABILITY = 0.95
+RED_ZONE_PROBABILITY = 0.9999
+
+_chi2_1_sf = np.frompyfunc(lambda stat: math.erfc(math.sqrt(stat / 2)), 1, 1)
+
+
+def _xlogy(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """x * log(y) with 0 * log(0) = 0"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(x > 0, x * np.log(np.where(x > 0, y, 1.0)), 0.0)
+
+
+def _rolling_sum(indicator: np.ndarray, window: int) -> np.ndarray:
+    totals = np.concatenate(([0], np.cumsum(indicator, dtype=np.int64)))
+    return totals[window:] - totals[:-window]
+
+
+def traffic_light_thresholds(window: int, expected_rate: float) -> tuple[int, int]:
+    """Exception counts at which the yellow and red zones start"""
+    counts = np.arange(window + 1)
+    log_binomial = np.array([math.lgamma(window + 1) - math.lgamma(k + 1) - math.lgamma(window - k + 1) for k in counts])
+    log_pmf = log_binomial + counts * math.log(expected_rate) + (window - counts) * math.log1p(-expected_rate)
+    cdf = np.cumsum(np.exp(log_pmf))
+    yellow = int(np.searchsorted(cdf, YELLOW_ZONE_PROBABILITY - 1e-12))
+    red = int(np.searchsorted(cdf, RED_ZONE_PROBABILITY - 1e-12))
+    return yellow, red
+
+
+def kupiec_pof(exceptions: np.ndarray, observations: np.ndarray | int, expected_rate: float) -> np.ndarray:
+    """Kupiec proportion-of-failures likelihood ratio, evaluated in log space"""
+    exceptions = np.asarray(exceptions, dtype=np.float64)
+    observations = np.broadcast_to(np.asarray(observations, dtype=np.float64), exceptions.shape)
+    non_exceptions = observations - exceptions
+    with np.errstate(divide="ignore", invalid="ignore"):
+        observed_rate = np.where(observations > 0, exceptions / observations, 0.0)
+    log_null = non_exceptions * math.log1p(-expected_rate) + exceptions * math.log(expected_rate)
+    log_alternative = _xlogy(non_exceptions, 1 - observed_rate) + _xlogy(exceptions, observed_rate)
+    return np.maximum(-2 * (log_null - log_alternative), 0.0)
+
+
+def christoffersen_independence(
+    n00: np.ndarray, n01: np.ndarray, n10: np.ndarray, n11: np.ndarray
+) -> np.ndarray:
+    """Christoffersen likelihood ratio for independence of consecutive exceptions"""
+    n00, n01, n10, n11 = (np.asarray(n, dtype=np.float64) for n in (n00, n01, n10, n11))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pi = np.where(n00 + n01 + n10 + n11 > 0, (n01 + n11) / (n00 + n01 + n10 + n11), 0.0)
+        pi01 = np.where(n00 + n01 > 0, n01 / (n00 + n01), 0.0)
+        pi11 = np.where(n10 + n11 > 0, n11 / (n10 + n11), 0.0)
+    log_null = _xlogy(n00 + n10, 1 - pi) + _xlogy(n01 + n11, pi)
+    log_alternative = _xlogy(n00, 1 - pi01) + _xlogy(n01, pi01) + _xlogy(n10, 1 - pi11) + _xlogy(n11, pi11)
+    return np.maximum(-2 * (log_null - log_alternative), 0.0)
+
+
+@dataclass
+class BacktestWindows:
+    """Statistics for every window of `window` observations, indexed by the window's last observation"""
+
+    window: int
+    exception_flags: np.ndarray
+    end_index: np.ndarray
+    exceptions: np.ndarray
+    kupiec_stat: np.ndarray
+    kupiec_p_value: np.ndarray
+    christoffersen_stat: np.ndarray
+    christoffersen_p_value: np.ndarray
+    zones: np.ndarray
+
+
+class VaRBacktestEngine:
+    """Backtests aligned arrays of VaR forecasts (positive loss amounts) and realised
+    P&L: a day is an exception when the loss exceeds the forecast. All rolling
+    windows are computed from cumulative sums in one pass."""
+
+    def __init__(self, confidence: float = 0.99, window: int = 250):
+        self.confidence = confidence
+        self.window = window
+        self.expected_rate = 1 - confidence
+
+    def exception_flags(self, var_forecasts: np.ndarray, pnl: np.ndarray) -> np.ndarray:
+        return -np.asarray(pnl, dtype=np.float64) > np.asarray(var_forecasts, dtype=np.float64)
+
+    def rolling(self, var_forecasts: np.ndarray, pnl: np.ndarray, window: int | None = None) -> BacktestWindows:
+        flags = self.exception_flags(var_forecasts, pnl)
+        window = max(min(window or self.window, flags.size), 1)
+        hits = flags.astype(np.int64)
+        exceptions = _rolling_sum(hits, window)
+
+        # transitions between consecutive days; a window of w days holds w - 1 of them
+        previous, current = hits[:-1], hits[1:]
+        transitions = [
+            _rolling_sum((previous == a) & (current == b), window - 1) if window > 1 else np.zeros(exceptions.size)
+            for a, b in ((0, 0), (0, 1), (1, 0), (1, 1))
+        ]
+
+        kupiec = kupiec_pof(exceptions, window, self.expected_rate)
+        christoffersen = christoffersen_independence(*transitions)
+        yellow, red = traffic_light_thresholds(window, self.expected_rate)
+        zones = np.where(exceptions >= red, "red", np.where(exceptions >= yellow, "yellow", "green"))
+        return BacktestWindows(
+            window=window,
+            exception_flags=flags,
+            end_index=np.arange(window - 1, flags.size),
+            exceptions=exceptions,
+            kupiec_stat=kupiec,
+            kupiec_p_value=_chi2_1_sf(kupiec).astype(np.float64),
+            christoffersen_stat=christoffersen,
+            christoffersen_p_value=_chi2_1_sf(christoffersen).astype(np.float64),
+            zones=zones,
+        )
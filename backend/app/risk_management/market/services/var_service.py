@@ -1,10 +1,13 @@
 """VaR Service - Value at Risk calculation service"""
 
-import math
+from collections import Counter
 from datetime import date
 from typing import Any
 from uuid import UUID
 
+import numpy as np
+
+from ..models.position_models import TradingPosition
 from ..models.var_models import (
     ConfidenceLevel,
     VaRBacktest,
@@ -14,6 +17,12 @@ from ..models.var_models import (
     VaRMethod,
     VaRStatistics,
 )
+from ..repositories.var_repository import ExceptionIndex
+from .var_backtest_engine import BacktestWindows, VaRBacktestEngine
+from .var_engine import PortfolioExposure, VaREngine
+
+# Daily volatility assumed when no return history is supplied
+DEFAULT_VOLATILITY = 0.02
 
 
 class VaRService:
@@ -21,26 +30,37 @@ class VaRService:
         self._calculations: dict[UUID, VaRCalculation] = {}
         self._backtests: dict[UUID, VaRBacktest] = {}
         self._limits: dict[UUID, VaRLimit] = {}
-        self._exceptions: list[VaRException] = []
+        self._exceptions = ExceptionIndex()
 
     async def calculate_var(
         self, portfolio_id: UUID, portfolio_value: float,
         method: VaRMethod, confidence_level: ConfidenceLevel,
-        time_horizon: int = 1, returns: list[float] | None = None
+        time_horizon: int = 1, returns: list[float] | None = None,
+        positions: list[TradingPosition] | None = None,
+        factor_returns: dict[str, list[float]] | None = None,
+        scenario_count: int = 10_000, ewma_lambda: float | None = None,
+        max_workers: int | None = None, seed: int | None = None
     ) -> VaRCalculation:
-        # Simplified VaR calculation
-        cl_map = {"95": 1.645, "99": 2.326, "99.5": 2.576}
-        z_score = cl_map.get(confidence_level.value, 2.326)
-
-        if method == VaRMethod.PARAMETRIC:
-            volatility = 0.02  # Simplified
-            var_amount = portfolio_value * volatility * z_score * math.sqrt(time_horizon)
-        elif method == VaRMethod.HISTORICAL and returns:
-            sorted_returns = sorted(returns)
-            index = int(len(sorted_returns) * (1 - float(confidence_level.value) / 100))
-            var_amount = abs(sorted_returns[index]) * portfolio_value
+        """VaR and ES for positions on their instruments' daily simple returns
+        (factor_returns keyed by instrument_id), or for the whole portfolio on
+        its own return series when no positions are given."""
+        history, portfolio = self._portfolio_inputs(portfolio_value, returns, positions, factor_returns)
+        engine = VaREngine(
+            scenario_count=scenario_count, ewma_lambda=ewma_lambda, max_workers=max_workers, seed=seed
+        )
+        confidence = float(confidence_level.value) / 100
+
+        if method == VaRMethod.HISTORICAL and history is not None:
+            result = engine.historical(history, portfolio, confidence, time_horizon)
         else:
-            var_amount = portfolio_value * 0.05  # Simplified Monte Carlo
+            if history is not None and history.shape[0] > 1:
+                covariance = engine.covariance(history)
+            else:
+                covariance = np.array([[DEFAULT_VOLATILITY ** 2]])
+            if method == VaRMethod.MONTE_CARLO:
+                result = engine.monte_carlo(covariance, portfolio, confidence, time_horizon)
+            else:
+                result = engine.parametric(covariance, portfolio, confidence, time_horizon)
 
         calculation = VaRCalculation(
             portfolio_id=portfolio_id,
@@ -48,16 +68,64 @@ class VaRService:
             method=method,
             confidence_level=confidence_level,
             time_horizon_days=time_horizon,
-            var_amount=var_amount,
-            var_percentage=(var_amount / portfolio_value * 100),
+            var_amount=result.var,
+            var_percentage=(result.var / portfolio_value * 100) if portfolio_value else 0.0,
             portfolio_value=portfolio_value,
-            expected_shortfall=var_amount * 1.2,
-            undiversified_var=var_amount * 1.3,
-            diversification_benefit=var_amount * 0.3
+            expected_shortfall=result.expected_shortfall,
+            component_var=result.component_var,
+            marginal_var=result.marginal_var,
+            undiversified_var=result.undiversified_var,
+            diversification_benefit=result.undiversified_var - result.var,
+            model_parameters={
+                "risk_factors": int(portfolio.factor_index.max()) + 1,
+                "observations": 0 if history is None else history.shape[0],
+                "scenario_count": result.scenario_count,
+                "ewma_lambda": ewma_lambda,
+                "component_es": result.component_es,
+            }
         )
         self._calculations[calculation.calculation_id] = calculation
         return calculation
 
+    def _portfolio_inputs(
+        self, portfolio_value: float, returns: list[float] | None,
+        positions: list[TradingPosition] | None, factor_returns: dict[str, list[float]] | None
+    ) -> tuple[np.ndarray | None, PortfolioExposure]:
+        """Log-return matrix (observations x factors, or None) and the exposures on its columns"""
+        if bool(positions) != bool(factor_returns):
+            raise ValueError("Positions and factor returns must be supplied together")
+        if positions:
+            references = [p.position_reference for p in positions]
+            duplicates = sorted(r for r, count in Counter(references).items() if count > 1)
+            if duplicates:
+                raise ValueError(f"Duplicate position references: {', '.join(duplicates)}")
+            factors = list(dict.fromkeys(p.instrument_id for p in positions))
+            missing = [f for f in factors if not factor_returns.get(f)]
+            if missing:
+                raise ValueError(f"No return history for instruments: {', '.join(missing)}")
+            observations = min(len(factor_returns[f]) for f in factors)
+            history = np.log1p(np.column_stack([
+                np.asarray(factor_returns[f][-observations:], dtype=np.float64) for f in factors
+            ]))
+            column = {f: index for index, f in enumerate(factors)}
+            return history, PortfolioExposure(
+                keys=references,
+                factor_index=np.array([column[p.instrument_id] for p in positions], dtype=np.intp),
+                exposures=np.array(
+                    [-p.market_value if p.direction == "short" else p.market_value for p in positions],
+                    dtype=np.float64,
+                ),
+            )
+
+        portfolio = PortfolioExposure(
+            keys=["portfolio"],
+            factor_index=np.zeros(1, dtype=np.intp),
+            exposures=np.array([portfolio_value], dtype=np.float64),
+        )
+        if returns:
+            return np.log1p(np.asarray(returns, dtype=np.float64))[:, None], portfolio
+        return None, portfolio
+
     async def get_calculation(self, calculation_id: UUID) -> VaRCalculation | None:
         return self._calculations.get(calculation_id)
 
@@ -66,41 +134,75 @@ class VaRService:
         confidence_level: ConfidenceLevel,
         var_predictions: list[float], actual_pnl: list[float]
     ) -> VaRBacktest:
-        exceptions = sum(1 for v, p in zip(var_predictions, actual_pnl, strict=False) if abs(p) > v)
-        total = len(var_predictions)
-        exception_rate = exceptions / total if total > 0 else 0
-        expected_rate = 1 - float(confidence_level.value) / 100
-        expected_exceptions = total * expected_rate
+        """Backtest over the whole sample as a single window"""
+        engine = VaRBacktestEngine(confidence=float(confidence_level.value) / 100)
+        windows = engine.rolling(np.asarray(var_predictions), np.asarray(actual_pnl), window=len(var_predictions))
+        return self._record_backtest(portfolio_id, method, confidence_level, windows, date.today(), date.today())
 
-        # Kupiec test
-        if exceptions > 0 and total > exceptions:
-            kupiec_stat = -2 * (
-                math.log((1 - expected_rate) ** (total - exceptions) * expected_rate ** exceptions) -
-                math.log((1 - exception_rate) ** (total - exceptions) * exception_rate ** exceptions)
-            )
-        else:
-            kupiec_stat = 0
+    async def run_rolling_backtest(
+        self, portfolio_id: UUID, method: VaRMethod, confidence_level: ConfidenceLevel,
+        var_forecasts: np.ndarray | list[float], pnl: np.ndarray | list[float],
+        dates: list[date] | None = None, window: int = 250
+    ) -> dict[str, Any]:
+        """Exception counts, Kupiec and Christoffersen statistics and traffic-light zones for
+        every rolling window. With dates, exception days are indexed for the portfolio and the
+        latest window is stored as a backtest."""
+        engine = VaRBacktestEngine(confidence=float(confidence_level.value) / 100, window=window)
+        var_forecasts = np.asarray(var_forecasts, dtype=np.float64)
+        pnl = np.asarray(pnl, dtype=np.float64)
+        if dates is not None and len(dates) != pnl.size:
+            raise ValueError(f"Expected one date per P&L observation, got {len(dates)} dates for {pnl.size}")
+        windows = engine.rolling(var_forecasts, pnl)
 
-        # Traffic light
-        if exception_rate <= expected_rate * 1.5:
-            zone = "green"
-        elif exception_rate <= expected_rate * 2:
-            zone = "yellow"
-        else:
-            zone = "red"
+        latest = None
+        if windows.exceptions.size:
+            start = dates[-windows.window] if dates else date.today()
+            end = dates[-1] if dates else date.today()
+            latest = self._record_backtest(portfolio_id, method, confidence_level, windows, start, end)
+
+        if dates:
+            recorded = self._exceptions.dates(portfolio_id)
+            for index in np.flatnonzero(windows.exception_flags):
+                if dates[index] not in recorded:
+                    await self.record_exception(
+                        portfolio_id, float(var_forecasts[index]), float(-pnl[index]), exception_date=dates[index]
+                    )
+
+        return {
+            "portfolio_id": str(portfolio_id),
+            "window": windows.window,
+            "window_end": [dates[i].isoformat() for i in windows.end_index] if dates else windows.end_index.tolist(),
+            "exceptions": windows.exceptions.tolist(),
+            "kupiec_stat": windows.kupiec_stat.tolist(),
+            "kupiec_p_value": windows.kupiec_p_value.tolist(),
+            "christoffersen_stat": windows.christoffersen_stat.tolist(),
+            "christoffersen_p_value": windows.christoffersen_p_value.tolist(),
+            "zones": windows.zones.tolist(),
+            "latest_backtest_id": str(latest.backtest_id) if latest else None,
+        }
+
+    def _record_backtest(
+        self, portfolio_id: UUID, method: VaRMethod, confidence_level: ConfidenceLevel,
+        windows: BacktestWindows, backtest_start: date, backtest_end: date
+    ) -> VaRBacktest:
+        total = windows.window if windows.exceptions.size else 0
+        exceptions = int(windows.exceptions[-1]) if windows.exceptions.size else 0
+        expected_rate = 1 - float(confidence_level.value) / 100
+        zone = str(windows.zones[-1]) if windows.exceptions.size else "green"
 
         backtest = VaRBacktest(
             portfolio_id=portfolio_id,
-            backtest_start=date.today(),
-            backtest_end=date.today(),
+            backtest_start=backtest_start,
+            backtest_end=backtest_end,
             method=method,
             confidence_level=confidence_level,
             total_observations=total,
             exceptions=exceptions,
-            exception_rate=exception_rate,
-            expected_exceptions=expected_exceptions,
-            kupiec_test_stat=kupiec_stat,
-            kupiec_p_value=0.05,
+            exception_rate=exceptions / total if total > 0 else 0,
+            expected_exceptions=total * expected_rate,
+            kupiec_test_stat=float(windows.kupiec_stat[-1]) if total else 0.0,
+            kupiec_p_value=float(windows.kupiec_p_value[-1]) if total else 1.0,
+            christoffersen_test_stat=float(windows.christoffersen_stat[-1]) if total else None,
             traffic_light_zone=zone,
             pass_fail="pass" if zone != "red" else "fail"
         )
@@ -139,19 +241,26 @@ class VaRService:
         }
 
     async def record_exception(
-        self, portfolio_id: UUID, predicted_var: float, actual_loss: float
+        self, portfolio_id: UUID, predicted_var: float, actual_loss: float,
+        exception_date: date | None = None
     ) -> VaRException:
         exception = VaRException(
             portfolio_id=portfolio_id,
-            exception_date=date.today(),
+            exception_date=exception_date or date.today(),
             predicted_var=predicted_var,
             actual_loss=actual_loss,
             exception_amount=actual_loss - predicted_var,
             exception_multiplier=actual_loss / predicted_var if predicted_var > 0 else 0
         )
-        self._exceptions.append(exception)
+        self._exceptions.add(exception)
         return exception
 
+    async def get_exceptions(
+        self, portfolio_id: UUID | None = None,
+        start_date: date | None = None, end_date: date | None = None
+    ) -> list[VaRException]:
+        return self._exceptions.find(portfolio_id, start_date, end_date)
+
     async def get_statistics(self) -> VaRStatistics:
         stats = VaRStatistics(
             total_calculations=len(self._calculations),
@@ -48,6 +48,11 @@ class KRIRepository:
         self._measurements[measurement.measurement_id] = measurement
         return measurement
 
+    async def save_measurements(self, measurements: list[KRIMeasurement]) -> list[KRIMeasurement]:
+        for measurement in measurements:
+            self._measurements[measurement.measurement_id] = measurement
+        return measurements
+
     async def find_measurements_by_kri(self, kri_id: UUID) -> list[KRIMeasurement]:
         return sorted(
             [m for m in self._measurements.values() if m.kri_id == kri_id],
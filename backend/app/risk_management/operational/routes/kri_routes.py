@@ -48,6 +48,14 @@ class RecordMeasurementRequest(BaseModel):
     notes: str | None = None
 
 
+class BulkMeasurement(RecordMeasurementRequest):
+    kri_id: UUID
+
+
+class BulkMeasurementRequest(BaseModel):
+    measurements: list[BulkMeasurement]
+
+
 class SetTargetRequest(BaseModel):
     target_period: str
     target_value: Decimal
@@ -125,6 +133,17 @@ async def record_measurement(kri_id: UUID, request: RecordMeasurementRequest):
     )
 
 
+@router.post("/measurements/bulk", response_model=list[KRIMeasurement])
+async def record_measurements_bulk(request: BulkMeasurementRequest):
+    """Record measurements for many KRIs at once"""
+    try:
+        return await kri_service.record_measurements_bulk(
+            [measurement.model_dump() for measurement in request.measurements]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+
+
 @router.get("/{kri_id}/measurements", response_model=list[KRIMeasurement])
 async def get_measurements(
     kri_id: UUID,
@@ -5,7 +5,7 @@ from decimal import Decimal
 from uuid import UUID
 
 from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from ..models.loss_event_models import (
     LossDistribution,
@@ -75,6 +75,8 @@ class CapitalRequest(BaseModel):
     business_indicator: Decimal
     confidence_level: Decimal = Decimal("0.999")
     time_horizon: int = 1
+    simulation_years: int = Field(default=1_000_000, ge=1_000, le=10_000_000)
+    seed: int | None = None
 
 
 @router.post("/", response_model=LossEvent)
@@ -211,13 +213,18 @@ async def calculate_distribution(
 @router.post("/capital", response_model=OperationalLossCapital)
 async def calculate_capital(request: CapitalRequest):
     """Calculate operational risk capital"""
-    return await loss_event_service.calculate_operational_capital(
-        calculation_date=date.today(),
-        methodology=request.methodology,
-        business_indicator=request.business_indicator,
-        confidence_level=request.confidence_level,
-        time_horizon=request.time_horizon
-    )
+    try:
+        return await loss_event_service.calculate_operational_capital(
+            calculation_date=date.today(),
+            methodology=request.methodology,
+            business_indicator=request.business_indicator,
+            confidence_level=request.confidence_level,
+            time_horizon=request.time_horizon,
+            simulation_years=request.simulation_years,
+            seed=request.seed
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 @router.post("/reports", response_model=LossEventReport)
@@ -1,10 +1,13 @@
 """KRI Service - Business logic for Key Risk Indicators"""
 
+from collections import defaultdict
 from datetime import date
 from decimal import Decimal
 from typing import Any
 from uuid import UUID
 
+import numpy as np
+
 from ..models.kri_models import (
     KeyRiskIndicator,
     KRICategory,
@@ -18,12 +21,15 @@ from ..models.kri_models import (
     ThresholdStatus,
 )
 from ..repositories.kri_repository import kri_repository
+from .kri_timeseries import STATUS_CODES, KRISeries, RollingStatistics, trend_statistics
 
 
 class KRIService:
     def __init__(self):
         self.repository = kri_repository
         self._kri_counter = 0
+        # measurement history and rolling statistics per KRI, in date order
+        self._series: dict[UUID, KRISeries] = {}
 
     def _generate_kri_code(self, category: KRICategory) -> str:
         self._kri_counter += 1
@@ -49,21 +55,12 @@ class KRIService:
 
     def _determine_trend(
         self,
-        current_value: Decimal,
-        previous_value: Decimal | None,
+        statistics: RollingStatistics,
         higher_is_worse: bool
     ) -> KRITrend:
-        if previous_value is None:
-            return KRITrend.STABLE
-
-        if current_value == previous_value:
+        if statistics.direction == 0:
             return KRITrend.STABLE
-
-        if higher_is_worse:
-            if current_value > previous_value:
-                return KRITrend.DETERIORATING
-            return KRITrend.IMPROVING
-        if current_value < previous_value:
+        if (statistics.direction > 0) == higher_is_worse:
             return KRITrend.DETERIORATING
         return KRITrend.IMPROVING
 
@@ -143,15 +140,97 @@ class KRIService:
         if not kri:
             raise ValueError(f"KRI {kri_id} not found")
 
-        previous_measurements = await self.repository.find_measurements_by_kri(kri_id)
-        previous_value = previous_measurements[-1].value if previous_measurements else None
+        series = self._series.get(kri_id)
+        if series is None:
+            series = KRISeries()
+        backdated = series.latest is not None and measurement_date < series.latest.measurement_date
+        if backdated:
+            # rolling state as of the measurement date, rebuilt from the history before it
+            history = await self.repository.find_measurements_by_kri(kri_id)
+            series = KRISeries.from_measurements([m for m in history if m.measurement_date <= measurement_date])
+
+        measurement = self._append_measurement(
+            kri, series, measurement_date, measurement_period, value, recorded_by, notes
+        )
+        await self.repository.save_measurement(measurement)
+
+        if backdated:
+            series = KRISeries.from_measurements(await self.repository.find_measurements_by_kri(kri_id))
+        self._series[kri_id] = series
+
+        if measurement.breach_occurred:
+            await self._record_breach(kri_id, measurement)
 
+        return measurement
+
+    async def record_measurements_bulk(
+        self,
+        measurements: list[dict[str, Any]]
+    ) -> list[KRIMeasurement]:
+        """Record many measurements across KRIs; each KRI's batch is applied in date
+        order and its rolling statistics advance once per measurement"""
+        batches: dict[UUID, list[dict[str, Any]]] = defaultdict(list)
+        for record in measurements:
+            batches[record["kri_id"]].append(record)
+
+        kris = {kri_id: await self.repository.find_kri_by_id(kri_id) for kri_id in batches}
+        missing = [str(kri_id) for kri_id, kri in kris.items() if not kri]
+        if missing:
+            raise ValueError(f"KRIs not found: {', '.join(missing)}")
+
+        recorded = []
+        for kri_id, batch in batches.items():
+            batch.sort(key=lambda record: record["measurement_date"])
+            series = self._series.get(kri_id)
+            if series is None:
+                series = KRISeries()
+            if series.latest is not None and batch[0]["measurement_date"] < series.latest.measurement_date:
+                # backdated batches go through the single-measurement path, which rebuilds the series
+                for record in batch:
+                    recorded.append(await self.record_measurement(**record))
+                continue
+
+            created = [
+                self._append_measurement(
+                    kris[kri_id],
+                    series,
+                    record["measurement_date"],
+                    record["measurement_period"],
+                    record["value"],
+                    record["recorded_by"],
+                    record.get("notes")
+                )
+                for record in batch
+            ]
+            self._series[kri_id] = series
+            await self.repository.save_measurements(created)
+            for measurement in created:
+                if measurement.breach_occurred:
+                    await self._record_breach(kri_id, measurement)
+            recorded.extend(created)
+
+        return recorded
+
+    def _append_measurement(
+        self,
+        kri: KeyRiskIndicator,
+        series: KRISeries,
+        measurement_date: date,
+        measurement_period: str,
+        value: Decimal,
+        recorded_by: str,
+        notes: str | None
+    ) -> KRIMeasurement:
+        previous_value = series.latest.value if series.latest else None
         threshold_status = self._determine_threshold_status(value, kri)
-        trend = self._determine_trend(value, previous_value, kri.higher_is_worse)
+        statistics = series.append(
+            float(value), measurement_date.toordinal(), STATUS_CODES[threshold_status.value]
+        )
+        trend = self._determine_trend(statistics, kri.higher_is_worse)
 
         variance = None
         variance_pct = None
-        if previous_value:
+        if previous_value is not None:
             variance = value - previous_value
             if previous_value != 0:
                 variance_pct = (variance / previous_value) * 100
@@ -159,7 +238,7 @@ class KRIService:
         breach = threshold_status in [ThresholdStatus.AMBER, ThresholdStatus.RED]
 
         measurement = KRIMeasurement(
-            kri_id=kri_id,
+            kri_id=kri.kri_id,
             measurement_date=measurement_date,
             measurement_period=measurement_period,
             value=value,
@@ -173,12 +252,7 @@ class KRIService:
             notes=notes,
             recorded_by=recorded_by
         )
-
-        await self.repository.save_measurement(measurement)
-
-        if breach:
-            await self._record_breach(kri_id, measurement)
-
+        series.latest = measurement
         return measurement
 
     async def _record_breach(
@@ -279,35 +353,26 @@ class KRIService:
         period_start: date,
         period_end: date
     ) -> KRITrendAnalysis:
-        measurements = await self.get_kri_measurements(kri_id, period_start, period_end)
-
-        if not measurements:
+        series = self._series.get(kri_id)
+        window = series.between(period_start.toordinal(), period_end.toordinal()) if series is not None else None
+        if window is None:
+            # the period reaches back past the retained history
+            measurements = await self.get_kri_measurements(kri_id, period_start, period_end)
+            window = (
+                np.array([float(m.value) for m in measurements]),
+                np.array([STATUS_CODES[m.threshold_status.value] for m in measurements], dtype=np.int8)
+            )
+
+        values, statuses = window
+        if not values.size:
             raise ValueError("No measurements found for analysis")
 
-        values = [m.value for m in measurements]
-        n = len(values)
-
-        avg = sum(values) / n
-        min_val = min(values)
-        max_val = max(values)
-
-        variance = sum((v - avg) ** 2 for v in values) / n
-        std_dev = Decimal(str(variance ** Decimal("0.5")))
-
-        green_count = len([m for m in measurements if m.threshold_status == ThresholdStatus.GREEN])
-        amber_count = len([m for m in measurements if m.threshold_status == ThresholdStatus.AMBER])
-        red_count = len([m for m in measurements if m.threshold_status == ThresholdStatus.RED])
-
-        breach_count = len([m for m in measurements if m.breach_occurred])
-
-        if n > 1:
-            x_mean = (n - 1) / 2
-            y_mean = avg
-            numerator = sum((i - x_mean) * (values[i] - y_mean) for i in range(n))
-            denominator = sum((i - x_mean) ** 2 for i in range(n))
-            trend_coef = Decimal(str(numerator / denominator)) if denominator != 0 else Decimal("0")
-        else:
-            trend_coef = Decimal("0")
+        stats = trend_statistics(values, statuses)
+        n = stats.count
+        avg = Decimal(str(stats.mean))
+        std_dev = Decimal(str(stats.std_dev))
+        green_count, amber_count, red_count = stats.status_counts
+        trend_coef = Decimal(str(stats.slope))
 
         if trend_coef > Decimal("0.1"):
             trend_dir = KRITrend.DETERIORATING
@@ -331,15 +396,15 @@ class KRIService:
             period_end=period_end,
             data_points=n,
             average_value=avg,
-            min_value=min_val,
-            max_value=max_val,
+            min_value=Decimal(str(stats.minimum)),
+            max_value=Decimal(str(stats.maximum)),
             standard_deviation=std_dev,
             trend_direction=trend_dir,
             trend_coefficient=trend_coef,
             green_percentage=Decimal(str(green_count / n * 100)),
             amber_percentage=Decimal(str(amber_count / n * 100)),
             red_percentage=Decimal(str(red_count / n * 100)),
-            breach_count=breach_count,
+            breach_count=amber_count + red_count,
             volatility=std_dev / avg if avg != 0 else Decimal("0")
         )
 
@@ -359,9 +424,10 @@ class KRIService:
         data_quality = 0
 
         for kri in kris:
-            measurements = await self.repository.find_measurements_by_kri(kri.kri_id)
-            if measurements:
-                latest = measurements[-1]
+            series = self._series.get(kri.kri_id)
+            if series is not None and series.latest:
+                latest = series.latest
+                rolling = series.statistics
 
                 if latest.threshold_status == ThresholdStatus.GREEN:
                     green += 1
@@ -388,7 +454,11 @@ class KRIService:
                     "kri_name": kri.kri_name,
                     "value": str(latest.value),
                     "status": latest.threshold_status.value,
-                    "trend": latest.trend.value
+                    "trend": latest.trend.value,
+                    "rolling_mean": rolling.mean,
+                    "rolling_std_dev": rolling.std_dev,
+                    "rolling_slope": rolling.slope,
+                    "rolling_breaches": rolling.breaches
                 })
 
         top_concerns = [s for s in kri_summary if s["status"] == "red"][:5]
@@ -0,0 +1,199 @@
+"""KRI Time Series - Ring-buffered KRI history with rolling statistics"""
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..models.kri_models import KRIMeasurement
+
+ROLLING_WINDOW = 30
+HISTORY_CAPACITY = 1024
+# ThresholdStatus values as stored codes; amber and red are breaches
+STATUS_CODES = {"green": 0, "amber": 1, "red": 2}
+# a slope that moves the KRI by no more than this many rolling standard
+# deviations across the window reads as stable
+TREND_TOLERANCE = 1.0
+# running sums are recomputed from the buffer this often to bound rounding drift
+RESYNC_INTERVAL = 1024
+
+
+@dataclass
+class RollingStatistics:
+    count: int = 0
+    mean: float = 0.0
+    std_dev: float = 0.0
+    slope: float = 0.0
+    status_counts: tuple[int, int, int] = (0, 0, 0)
+
+    @property
+    def breaches(self) -> int:
+        return self.status_counts[1] + self.status_counts[2]
+
+    @property
+    def direction(self) -> int:
+        """1 when the KRI is rising over the window, -1 when falling, 0 when stable"""
+        if self.count < 2:
+            return 0
+        change = self.slope * (self.count - 1)
+        if abs(change) <= max(TREND_TOLERANCE * self.std_dev, 1e-12 * max(abs(self.mean), 1.0)):
+            return 0
+        return 1 if change > 0 else -1
+
+
+@dataclass
+class TrendStatistics:
+    count: int
+    mean: float
+    minimum: float
+    maximum: float
+    std_dev: float
+    slope: float
+    status_counts: tuple[int, int, int]
+
+
+def trend_statistics(values: np.ndarray, statuses: np.ndarray) -> TrendStatistics:
+    """Population standard deviation and the OLS slope per observation over a whole series"""
+    count = values.size
+    mean = float(values.mean())
+    centred_x = np.arange(count) - (count - 1) / 2
+    denominator = float(centred_x @ centred_x)
+    slope = float(centred_x @ (values - mean)) / denominator if denominator else 0.0
+    counts = np.bincount(statuses, minlength=len(STATUS_CODES))
+    return TrendStatistics(
+        count=count,
+        mean=mean,
+        minimum=float(values.min()),
+        maximum=float(values.max()),
+        std_dev=float(values.std()),
+        slope=slope,
+        status_counts=tuple(counts.tolist()),
+    )
+
+
+class KRISeries:
+    """The last ``capacity`` measurements of one KRI in fixed-size arrays, with the
+    mean, standard deviation, OLS slope and status counts of the last ``window``
+    of them kept current on every append. Values enter the running sums shifted
+    by a reference level so the variance does not cancel for large KRIs.
+    Measurements must arrive in date order."""
+
+    def __init__(self, window: int = ROLLING_WINDOW, capacity: int = HISTORY_CAPACITY):
+        if not 1 <= window <= capacity:
+            raise ValueError("Rolling window must be between 1 and the history capacity")
+        self.window = window
+        self.capacity = capacity
+        self.latest: KRIMeasurement | None = None
+        self.statistics = RollingStatistics()
+        self._values = np.zeros(capacity)
+        self._ordinals = np.zeros(capacity, dtype=np.int64)
+        self._statuses = np.zeros(capacity, dtype=np.int8)
+        self._size = 0
+        self._appended = 0
+        # whether measurements older than those held have been dropped
+        self._truncated = False
+        # window sums; x is a point's position in the window, 0 for the oldest
+        self._shift = 0.0
+        self._sum = self._sum_squares = self._sum_xy = 0.0
+        self._status_counts = [0] * len(STATUS_CODES)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_ordinal(self) -> int | None:
+        return int(self._ordinals[(self._appended - 1) % self.capacity]) if self._size else None
+
+    def append(self, value: float, ordinal: int, status: int) -> RollingStatistics:
+        if self._size and ordinal < self.last_ordinal:
+            raise ValueError("Measurements must be appended in date order")
+        if not self._appended:
+            self._shift = value
+
+        in_window = min(self._size, self.window)
+        if in_window == self.window:
+            # dropping the oldest point moves every remaining point one position down
+            slot = (self._appended - self.window) % self.capacity
+            oldest = self._values[slot] - self._shift
+            self._sum -= oldest
+            self._sum_squares -= oldest * oldest
+            self._sum_xy -= self._sum
+            self._status_counts[self._statuses[slot]] -= 1
+            in_window -= 1
+
+        shifted = value - self._shift
+        self._sum += shifted
+        self._sum_squares += shifted * shifted
+        self._sum_xy += in_window * shifted
+        self._status_counts[status] += 1
+
+        slot = self._appended % self.capacity
+        self._truncated = self._truncated or self._size == self.capacity
+        self._values[slot] = value
+        self._ordinals[slot] = ordinal
+        self._statuses[slot] = status
+        self._size = min(self._size + 1, self.capacity)
+        self._appended += 1
+        if self._appended % RESYNC_INTERVAL == 0:
+            self._resync()
+
+        self.statistics = self._rolling_statistics()
+        return self.statistics
+
+    def _resync(self) -> None:
+        values, _, _ = self._ordered(min(self._size, self.window))
+        self._shift = float(values.mean())
+        shifted = values - self._shift
+        self._sum = float(shifted.sum())
+        self._sum_squares = float(shifted @ shifted)
+        self._sum_xy = float(np.arange(values.size) @ shifted)
+
+    def _rolling_statistics(self) -> RollingStatistics:
+        n = min(self._size, self.window)
+        mean = self._sum / n
+        variance = max(self._sum_squares / n - mean * mean, 0.0)
+        slope = 0.0
+        if n > 1:
+            sum_x = n * (n - 1) / 2
+            sum_xx = (n - 1) * n * (2 * n - 1) / 6
+            slope = (n * self._sum_xy - sum_x * self._sum) / (n * sum_xx - sum_x * sum_x)
+        return RollingStatistics(
+            count=n,
+            mean=mean + self._shift,
+            std_dev=math.sqrt(variance),
+            slope=slope,
+            status_counts=tuple(self._status_counts),
+        )
+
+    def _ordered(self, count: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """The last `count` points, oldest first"""
+        slots = np.arange(self._appended - count, self._appended) % self.capacity
+        return self._values[slots], self._ordinals[slots], self._statuses[slots]
+
+    def between(self, start_ordinal: int, end_ordinal: int) -> tuple[np.ndarray, np.ndarray] | None:
+        """Values and status codes dated within [start, end], or None when part of
+        the period has already been overwritten"""
+        values, ordinals, statuses = self._ordered(self._size)
+        if self._truncated and start_ordinal < ordinals[0]:
+            return None
+        lower, upper = np.searchsorted(ordinals, (start_ordinal, end_ordinal + 1), side="left")
+        return values[lower:upper], statuses[lower:upper]
+
+    @classmethod
+    def from_measurements(
+        cls,
+        measurements: list[KRIMeasurement],
+        window: int = ROLLING_WINDOW,
+        capacity: int = HISTORY_CAPACITY,
+    ) -> "KRISeries":
+        """Series over measurements already sorted by date"""
+        series = cls(window, capacity)
+        for measurement in measurements[-capacity:]:
+            series.append(
+                float(measurement.value),
+                measurement.measurement_date.toordinal(),
+                STATUS_CODES[measurement.threshold_status.value],
+            )
+        series.latest = measurements[-1] if measurements else None
+        series._truncated = len(measurements) > capacity
+        return series
@@ -1,10 +1,13 @@
 """Loss Event Service - Business logic for operational loss tracking"""
 
+import asyncio
 from datetime import UTC, date, datetime
 from decimal import Decimal
 from typing import Any
 from uuid import UUID
 
+import numpy as np
+
 from ..models.loss_event_models import (
     LossDistribution,
     LossEvent,
@@ -18,6 +21,7 @@ from ..models.loss_event_models import (
     RecoveryType,
 )
 from ..repositories.loss_event_repository import loss_event_repository
+from .lda_engine import FrequencyModel, LDAEngine, LDAResult, fit_frequency, fit_severity
 
 
 class LossEventService:
@@ -240,17 +244,17 @@ class LossEventService:
                 period_end=period_end
             )
 
-        losses = sorted([e.net_loss for e in events])
+        losses = [e.net_loss for e in events]
+        values = np.array(losses, dtype=np.float64)
         n = len(losses)
         total = sum(losses)
         mean = total / n
-        median = losses[n // 2]
-
-        variance = sum((l - mean) ** 2 for l in losses) / n
-        std_dev = Decimal(str(variance ** Decimal("0.5")))
 
-        p95_idx = int(n * 0.95)
-        p99_idx = int(n * 0.99)
+        # order statistics are located on the float copy and read back as exact Decimals
+        ranks = (n // 2, min(int(n * 0.95), n - 1), min(int(n * 0.99), n - 1))
+        order = np.argpartition(values, sorted(set(ranks)))
+        median, p95, p99 = (losses[order[rank]] for rank in ranks)
+        std_dev = Decimal(str(float(values.std())))
 
         distribution = LossDistribution(
             analysis_date=date.today(),
@@ -258,9 +262,9 @@ class LossEventService:
             frequency=n,
             mean_loss=mean,
             median_loss=median,
-            percentile_95=losses[min(p95_idx, n - 1)],
-            percentile_99=losses[min(p99_idx, n - 1)],
-            max_loss=max(losses),
+            percentile_95=p95,
+            percentile_99=p99,
+            max_loss=losses[int(values.argmax())],
             standard_deviation=std_dev,
             total_loss=total,
             period_start=period_start,
@@ -276,7 +280,10 @@ class LossEventService:
         methodology: str,
         business_indicator: Decimal,
         confidence_level: Decimal = Decimal("0.999"),
-        time_horizon: int = 1
+        time_horizon: int = 1,
+        simulation_years: int = 1_000_000,
+        max_workers: int | None = None,
+        seed: int | None = None
     ) -> OperationalLossCapital:
         events = await self.repository.find_all_events()
 
@@ -289,14 +296,24 @@ class LossEventService:
             if avg_loss > business_indicator * Decimal("0.01"):
                 ilm = Decimal("1.5")
 
-        if methodology == "BIA":
-            regulatory_capital = business_indicator * Decimal("0.15")
-        elif methodology == "TSA":
-            regulatory_capital = business_indicator * Decimal("0.12")
+        metadata: dict[str, Any] = {}
+        if methodology == "LDA":
+            # CPU-bound; run off the event loop
+            lda = await asyncio.to_thread(
+                self.simulate_annual_losses,
+                events, float(confidence_level), time_horizon, simulation_years, max_workers, seed
+            )
+            regulatory_capital = Decimal(str(lda.capital))
+            economic_capital = Decimal(str(lda.expected_shortfall))
+            metadata = self._lda_summary(lda)
         else:
-            regulatory_capital = business_indicator * Decimal("0.12") * ilm
-
-        economic_capital = regulatory_capital * Decimal("1.2")
+            if methodology == "BIA":
+                regulatory_capital = business_indicator * Decimal("0.15")
+            elif methodology == "TSA":
+                regulatory_capital = business_indicator * Decimal("0.12")
+            else:
+                regulatory_capital = business_indicator * Decimal("0.12") * ilm
+            economic_capital = regulatory_capital * Decimal("1.2")
 
         capital = OperationalLossCapital(
             calculation_date=calculation_date,
@@ -307,12 +324,67 @@ class LossEventService:
             regulatory_capital=regulatory_capital,
             economic_capital=economic_capital,
             confidence_level=confidence_level,
-            time_horizon=time_horizon
+            time_horizon=time_horizon,
+            metadata=metadata
         )
 
         await self.repository.save_capital(capital)
         return capital
 
+    def simulate_annual_losses(
+        self,
+        events: list[LossEvent],
+        confidence: float = 0.999,
+        time_horizon: int = 1,
+        years: int = 1_000_000,
+        max_workers: int | None = None,
+        seed: int | None = None
+    ) -> LDAResult:
+        """Loss Distribution Approach: per event type, annual frequency and loss
+        severity are fitted to the realised losses (rejected events and near
+        misses excluded) and aggregate losses simulated over `years` years"""
+        realised = [
+            e for e in events
+            if e.status != LossEventStatus.REJECTED and not e.near_miss and e.net_loss > 0
+        ]
+        if not realised:
+            return LDAResult(years=years, confidence=confidence, capital=0.0, expected_loss=0.0, expected_shortfall=0.0)
+
+        first_year = min(e.occurrence_date.year for e in realised)
+        observed_years = max(e.occurrence_date.year for e in realised) - first_year + 1
+        by_type: dict[LossEventType, list[LossEvent]] = {}
+        for event in realised:
+            by_type.setdefault(event.event_type, []).append(event)
+
+        event_types, frequencies, severities = [], [], []
+        for event_type, type_events in by_type.items():
+            annual_counts = np.bincount(
+                [e.occurrence_date.year - first_year for e in type_events], minlength=observed_years
+            )
+            frequency = fit_frequency(annual_counts)
+            # a horizon of h years sums h independent annual counts
+            frequencies.append(FrequencyModel(
+                frequency.distribution,
+                frequency.mean * time_horizon,
+                frequency.dispersion * time_horizon if frequency.dispersion is not None else None
+            ))
+            severities.append(fit_severity(np.array([float(e.net_loss) for e in type_events])))
+            event_types.append(event_type.value)
+
+        engine = LDAEngine(years=years, max_workers=max_workers, seed=seed)
+        return engine.simulate(event_types, frequencies, severities, confidence)
+
+    def _lda_summary(self, lda: LDAResult) -> dict[str, Any]:
+        return {
+            "simulated_years": lda.years,
+            "expected_loss": lda.expected_loss,
+            "unexpected_loss": lda.unexpected_loss,
+            "expected_shortfall": lda.expected_shortfall,
+            "contributions": lda.contributions,
+            "standalone_capital": lda.standalone_capital,
+            "expected_loss_by_type": lda.expected_loss_by_type,
+        }
+
     async def generate_report(
         self,
         report_period: str,
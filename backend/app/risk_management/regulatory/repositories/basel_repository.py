@@ -1,6 +1,7 @@
 """Basel Repository - Data access for Basel III/IV compliance"""
 
 from datetime import date
+from decimal import Decimal
 from typing import Any
 from uuid import UUID
 
@@ -8,6 +9,7 @@ from ..models.basel_models import (
     BaselReport,
     CapitalRequirement,
     CounterpartyCreditRisk,
+    CreditRiskRWA,
     LargeExposure,
     LeverageRatio,
     LiquidityCoverageRatio,
@@ -26,6 +28,8 @@ class BaselRepository:
         self._ccrs: dict[UUID, CounterpartyCreditRisk] = {}
         self._large_exposures: dict[UUID, LargeExposure] = {}
         self._reports: dict[UUID, BaselReport] = {}
+        self._credit_rwas: dict[date, list[CreditRiskRWA]] = {}
+        self._credit_rwa_totals: dict[date, Decimal] = {}
 
     async def save_rwa(self, rwa: RiskWeightedAsset) -> None:
         self._rwas[rwa.rwa_id] = rwa
@@ -42,6 +46,23 @@ class BaselRepository:
     async def find_rwas_by_type(self, risk_type: str) -> list[RiskWeightedAsset]:
         return [r for r in self._rwas.values() if r.risk_type.value == risk_type]
 
+    async def save_credit_rwa(self, rwa: CreditRiskRWA) -> None:
+        await self.save_credit_rwas([rwa])
+
+    async def save_credit_rwas(self, rwas: list[CreditRiskRWA]) -> None:
+        """Bulk insert, keeping a running RWA total per reporting date"""
+        for rwa in rwas:
+            self._credit_rwas.setdefault(rwa.reporting_date, []).append(rwa)
+            self._credit_rwa_totals[rwa.reporting_date] = (
+                self._credit_rwa_totals.get(rwa.reporting_date, Decimal("0")) + rwa.rwa_amount
+            )
+
+    async def find_credit_rwa_by_date(self, reporting_date: date) -> list[CreditRiskRWA]:
+        return list(self._credit_rwas.get(reporting_date, []))
+
+    async def sum_credit_rwa_by_date(self, reporting_date: date) -> Decimal:
+        return self._credit_rwa_totals.get(reporting_date, Decimal("0"))
+
     async def save_capital_requirement(self, req: CapitalRequirement) -> None:
         self._capital_requirements[req.requirement_id] = req
 
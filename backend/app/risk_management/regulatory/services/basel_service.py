@@ -1,5 +1,6 @@
 """Basel Service - Business logic for Basel III/IV compliance"""
 
+from collections.abc import Mapping, Sequence
 from datetime import date
 from decimal import Decimal
 from typing import Any
@@ -14,11 +15,17 @@ from ..models.basel_models import (
     OperationalRiskRWA,
 )
 from ..repositories.basel_repository import basel_repository
+from .rwa_engine import ExposureTable, RWAEngine
+
+# Reporting precision for amounts and risk weights converted from the float64 engine
+AMOUNT_QUANTUM = Decimal("0.01")
+PARAMETER_QUANTUM = Decimal("0.000001")
 
 
 class BaselService:
     def __init__(self):
         self.repository = basel_repository
+        self.rwa_engine = RWAEngine()
 
     async def calculate_credit_rwa(
         self, reporting_date: date, asset_class: str, approach: str,
@@ -33,6 +40,62 @@ class BaselService:
         await self.repository.save_credit_rwa(rwa)
         return rwa
 
+    async def calculate_credit_rwa_batch(
+        self, reporting_date: date,
+        exposures: Mapping[str, Sequence[Any]] | Sequence[Mapping[str, Any]] | ExposureTable
+    ) -> dict[str, Any]:
+        """RWA for a whole exposure table (columns or records with asset_class,
+        approach, ead and rating/pd/lgd/maturity/ltv/sales/risk_weight), computed in
+        float64 and rounded to Decimal only for the persisted records and totals"""
+        if isinstance(exposures, ExposureTable):
+            table = exposures
+        elif isinstance(exposures, Mapping):
+            table = ExposureTable.from_columns(exposures)
+        else:
+            table = ExposureTable.from_records(exposures)
+        result = self.rwa_engine.calculate(table)
+
+        rwas = [
+            CreditRiskRWA(
+                reporting_date=reporting_date,
+                asset_class=asset_class,
+                approach=approach,
+                exposure_amount=self._to_decimal(ead, AMOUNT_QUANTUM),
+                risk_weight=self._to_decimal(risk_weight, PARAMETER_QUANTUM),
+                rwa_amount=self._to_decimal(rwa, AMOUNT_QUANTUM),
+                pd=self._to_decimal(pd, PARAMETER_QUANTUM) if is_irb else None,
+                lgd=self._to_decimal(lgd, PARAMETER_QUANTUM) if is_irb else None,
+                ead=self._to_decimal(ead, AMOUNT_QUANTUM),
+                maturity=self._to_decimal(maturity, PARAMETER_QUANTUM) if is_irb else None,
+                correlation=self._to_decimal(correlation, PARAMETER_QUANTUM) if is_irb else None,
+            )
+            for asset_class, approach, ead, risk_weight, rwa, pd, lgd, maturity, correlation, is_irb in zip(
+                table.asset_class.tolist(), table.approach.tolist(), table.ead.tolist(),
+                result.risk_weight.tolist(), result.rwa.tolist(), result.pd.tolist(), result.lgd.tolist(),
+                result.maturity.tolist(), result.correlation.tolist(), result.irb.tolist(), strict=True
+            )
+        ]
+        await self.repository.save_credit_rwas(rwas)
+
+        return {
+            "reporting_date": reporting_date.isoformat(),
+            "exposures": len(rwas),
+            "total_exposure": self._to_decimal(float(table.ead.sum()), AMOUNT_QUANTUM),
+            "total_rwa": self._to_decimal(float(result.rwa.sum()), AMOUNT_QUANTUM),
+            "by_asset_class": {
+                key: self._to_decimal(value, AMOUNT_QUANTUM)
+                for key, value in result.totals_by(table.asset_class).items()
+            },
+            "by_approach": {
+                key: self._to_decimal(value, AMOUNT_QUANTUM)
+                for key, value in result.totals_by(table.approach).items()
+            },
+        }
+
+    @staticmethod
+    def _to_decimal(value: float, quantum: Decimal) -> Decimal:
+        return Decimal(value).quantize(quantum)
+
     async def calculate_market_rwa(
         self, reporting_date: date, approach: str, desk_id: str, risk_type: str,
         sensitivities_based: Decimal, default_risk_charge: Decimal, residual_risk_addon: Decimal
@@ -113,11 +176,10 @@ class BaselService:
     async def generate_basel_report(
         self, reporting_date: date, entity_id: str, generated_by: str
     ) -> BaselReport:
-        credit_rwas = await self.repository.find_credit_rwa_by_date(reporting_date)
         market_rwas = await self.repository.find_market_rwa_by_date(reporting_date)
         op_rwas = await self.repository.find_operational_rwa_by_date(reporting_date)
 
-        credit_total = sum(r.rwa_amount for r in credit_rwas)
+        credit_total = await self.repository.sum_credit_rwa_by_date(reporting_date)
         market_total = sum(r.total_rwa for r in market_rwas)
         op_total = sum(r.total_rwa for r in op_rwas)
         total_rwa = credit_total + market_total + op_total
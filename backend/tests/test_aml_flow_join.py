@@ -0,0 +1,118 @@
+"""
+Tests for the streaming time-windowed flow join used by AML pattern detection.
+
+Covers leg matching inside the window, eviction and expiry of stale legs,
+consuming joins for round-tripping and late arrivals on the online path.
+"""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+from app.risk_management.aml.services.pattern_detection_service import (
+    PatternDetectionService,
+    WindowedFlowJoin,
+)
+
+START = datetime(2026, 1, 5, 9, 0, tzinfo=UTC)
+
+
+def _txn(transaction_id: str, amount: float, hours: float, **fields) -> dict:
+    return {"transaction_id": transaction_id, "amount": amount, "timestamp": START + timedelta(hours=hours), **fields}
+
+
+class TestWindowedFlowJoin:
+    """Test joining opening and closing legs."""
+
+    def test_matches_leg_within_window(self):
+        """Test that a closing leg joins an opening leg inside the window."""
+        join = WindowedFlowJoin(window_hours=24)
+        join.open_leg("acct", START, _txn("c1", 1000, 0))
+
+        matches = join.close_leg("acct", START + timedelta(hours=5), _txn("d1", 900, 5))
+
+        assert len(matches) == 1
+        assert matches[0].amount_ratio == 0.9
+        assert matches[0].time_diff_hours == 5
+
+    def test_ignores_leg_below_ratio(self):
+        """Test that a closing leg moving too little of the amount does not match."""
+        join = WindowedFlowJoin(window_hours=24, min_ratio=0.8)
+        join.open_leg("acct", START, _txn("c1", 1000, 0))
+
+        assert join.close_leg("acct", START + timedelta(hours=1), _txn("d1", 500, 1)) == []
+
+    def test_evicts_leg_outside_window(self):
+        """Test that an opening leg older than the window no longer matches."""
+        join = WindowedFlowJoin(window_hours=24)
+        join.open_leg("acct", START, _txn("c1", 1000, 0))
+
+        assert join.close_leg("acct", START + timedelta(hours=25), _txn("d1", 1000, 25)) == []
+        assert join._open_legs == {}
+
+    def test_expire_drops_idle_keys(self):
+        """Test that expire releases legs of keys that never see another event."""
+        join = WindowedFlowJoin(window_hours=24)
+        join.open_leg("quiet", START, _txn("c1", 1000, 0))
+        join.open_leg("busy", START + timedelta(hours=20), _txn("c2", 1000, 20))
+
+        join.expire(START + timedelta(hours=30))
+
+        assert list(join._open_legs) == ["busy"]
+
+    def test_consume_joins_each_leg_once(self):
+        """Test that a consuming join pairs an opening leg with one closing leg only."""
+        join = WindowedFlowJoin(window_hours=24, consume=True)
+        join.open_leg("acct", START, _txn("c1", 1000, 0))
+
+        first = join.close_leg("acct", START + timedelta(hours=1), _txn("d1", 1000, 1))
+        second = join.close_leg("acct", START + timedelta(hours=2), _txn("d2", 1000, 2))
+
+        assert len(first) == 1
+        assert second == []
+
+    def test_late_arrival_kept_in_time_order(self):
+        """Test that a late opening leg is inserted in timestamp order."""
+        join = WindowedFlowJoin(window_hours=24)
+        join.open_leg("acct", START + timedelta(hours=3), _txn("c2", 1000, 3))
+        join.open_leg("acct", START + timedelta(hours=1), _txn("c1", 1000, 1))
+
+        matches = join.close_leg("acct", START + timedelta(hours=4), _txn("d1", 1000, 4))
+
+        assert [m.opening["transaction_id"] for m in matches] == ["c1", "c2"]
+
+    def test_closing_leg_does_not_match_later_opening(self):
+        """Test that an opening leg dated after the closing leg is not joined."""
+        join = WindowedFlowJoin(window_hours=24)
+        join.open_leg("acct", START + timedelta(hours=5), _txn("c1", 1000, 5))
+
+        assert join.close_leg("acct", START + timedelta(hours=2), _txn("d1", 1000, 2)) == []
+
+
+class TestPatternDetection:
+    """Test the detectors built on the flow join."""
+
+    def test_rapid_movement(self):
+        """Test that a credit moved out within the threshold is reported once."""
+        transactions = [
+            _txn("c1", 5000, 0, direction="credit"),
+            _txn("d1", 4800, 6, direction="debit"),
+            _txn("d2", 4800, 40, direction="debit"),
+        ]
+
+        patterns = asyncio.run(PatternDetectionService().detect_rapid_movement("acct", transactions))
+
+        assert [p.transaction_ids for p in patterns] == [["c1", "d1"]]
+
+    def test_round_tripping(self):
+        """Test that funds returning to their origin are reported."""
+        transactions = [
+            _txn("t1", 10000, 0, source_account="A", target_account="B"),
+            _txn("t2", 9500, 48, source_account="B", target_account="A"),
+            _txn("t3", 9500, 49, source_account="B", target_account="A"),
+        ]
+
+        patterns = asyncio.run(PatternDetectionService().detect_round_tripping(transactions))
+
+        assert len(patterns) == 1
+        assert patterns[0].transaction_ids == ["t1", "t2"]
+        assert patterns[0].primary_entity_id == "A"
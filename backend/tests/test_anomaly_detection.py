@@ -1,435 +1,110 @@
 """
-Comprehensive tests for anomaly detection system.
+Tests for vectorized anomaly detection.
 
-Tests login pattern analysis, transaction monitoring, risk scoring,
-and automatic lockout capabilities.
+Covers the numeric column conversion, IQR, z-score and MAD outliers, and the
+rolling baseline with its PSI distribution shift check.
 """
 
-import pytest
-from datetime import datetime, timedelta, timezone
+import numpy as np
 
-
-from app.security.anomaly_detection import (
-    AnomalyDetection,
-    LoginAttempt,
-    TransactionAnomaly,
+from app.risk_management.data_quality.utils.anomaly_detection import (
+    AnomalyDetectionUtilities,
+    AnomalySeverity,
+    AnomalyType,
 )
-from app.storage.memory_adapter import db
-
-
-@pytest.fixture
-def db_session():
-    """Provide a database session for testing."""
-    return db
-
-
-class TestLoginPatternAnalysis:
-    """Test login pattern anomaly detection."""
-
-    def test_normal_login_low_risk(self, db_session):
-        """Test that normal login has low risk score."""
-        user_id = 1
-        ip_address = "192.168.1.1"
-        location = "New York, NY"
-        # Use a fixed "normal" business hour (10 AM UTC) to avoid time-dependent failures
-        timestamp = datetime.now(timezone.utc).replace(hour=10, minute=0, second=0)
-
-        risk_score, anomalies = AnomalyDetection.analyze_login_attempt(
-            db_session, user_id, ip_address, location, timestamp
-        )
-
-        assert risk_score >= 0.0
-        assert risk_score <= 1.0
-        assert len(anomalies) == 0  # Normal login has no anomalies
-
-    def test_login_at_unusual_hour_moderate_risk(self, db_session):
-        """Test login at unusual hour has increased risk."""
-        user_id = 2
-        ip_address = "192.168.1.2"
-        location = "New York, NY"
-        # 3 AM is unusual for most users
-        timestamp = datetime.now(timezone.utc).replace(hour=3, minute=0, second=0)
-
-        risk_score, anomalies = AnomalyDetection.analyze_login_attempt(
-            db_session, user_id, ip_address, location, timestamp
-        )
-
-        assert risk_score >= 0.0
-        assert "unusual_hour" in anomalies
-
-    def test_impossible_travel_detection(self, db_session):
-        """Test impossible travel detection."""
-        user_id = 3
-        old_ip = "192.168.1.3"
-        old_location = "New York, NY"
-
-        # Create first login
-        AnomalyDetection.analyze_login_attempt(
-            db_session,
-            user_id,
-            old_ip,
-            old_location,
-            datetime.now(timezone.utc) - timedelta(minutes=60),
-        )
-
-        # Try to login from different location immediately
-        new_ip = "10.0.0.1"
-        new_location = "Tokyo, Japan"  # Impossible to travel to in 1 hour
-
-        risk_score, anomalies = AnomalyDetection.analyze_login_attempt(
-            db_session, user_id, new_ip, new_location, datetime.now(timezone.utc)
-        )
-
-        assert "impossible_travel" in anomalies or risk_score > 0.5
-
-    def test_new_ip_address_detection(self, db_session):
-        """Test detection of login from new IP address."""
-        user_id = 4
-        first_ip = "192.168.1.4"
-        location = "New York, NY"
-
-        # Create first login
-        AnomalyDetection.analyze_login_attempt(
-            db_session,
-            user_id,
-            first_ip,
-            location,
-            datetime.now(timezone.utc) - timedelta(days=1),
-        )
-
-        # Login from new IP
-        new_ip = "192.168.1.100"
-        risk_score, anomalies = AnomalyDetection.analyze_login_attempt(
-            db_session, user_id, new_ip, location, datetime.now(timezone.utc)
-        )
-
-        assert "new_ip_address" in anomalies or len(anomalies) > 0
-
-    def test_rapid_login_attempts(self, db_session):
-        """Test rapid login attempts detection."""
-        user_id = 5
-        ip_address = "192.168.1.5"
-        location = "New York, NY"
-
-        # Create multiple rapid login attempts
-        for i in range(5):
-            timestamp = datetime.now(timezone.utc) + timedelta(seconds=i)
-            risk_score, anomalies = AnomalyDetection.analyze_login_attempt(
-                db_session, user_id, ip_address, location, timestamp
-            )
-
-        # After multiple rapid attempts, risk should be elevated
-        assert risk_score > 0.3 or "rapid_attempts" in anomalies
-
-
-class TestTransactionMonitoring:
-    """Test transaction anomaly detection."""
-
-    def test_normal_transaction_low_risk(self, db_session):
-        """Test that normal transaction has low risk."""
-        user_id = 6
-        amount = 50.0  # Reasonable amount
-        merchant_category = "grocery"
-        location = "New York, NY"
-        timestamp = datetime.now(timezone.utc)
-
-        risk_score, anomalies = AnomalyDetection.analyze_transaction(
-            db_session, user_id, amount, merchant_category, location, timestamp
-        )
-
-        assert risk_score >= 0.0
-        assert risk_score <= 1.0
-        assert len(anomalies) == 0
-
-    def test_large_transaction_elevated_risk(self, db_session):
-        """Test large transaction has elevated risk."""
-        user_id = 7
-        amount = 5000.0  # Large amount
-        merchant_category = "electronics"
-        location = "New York, NY"
-        timestamp = datetime.now(timezone.utc)
-
-        risk_score, anomalies = AnomalyDetection.analyze_transaction(
-            db_session, user_id, amount, merchant_category, location, timestamp
-        )
-
-        assert risk_score > 0.0  # Should have some risk
-        assert len(anomalies) >= 0
-
-    def test_unusual_merchant_category(self, db_session):
-        """Test unusual merchant category detection."""
-        user_id = 8
-        amount = 100.0
-        unusual_category = "cryptocurrency_exchange"  # Unusual for most users
-        location = "New York, NY"
-        timestamp = datetime.now(timezone.utc)
-
-        risk_score, anomalies = AnomalyDetection.analyze_transaction(
-            db_session, user_id, amount, unusual_category, location, timestamp
-        )
 
-        assert risk_score >= 0.0
 
-    def test_rapid_transaction_velocity(self, db_session):
-        """Test rapid transaction detection."""
-        user_id = 9
-        location = "New York, NY"
+def _records(values) -> list[dict]:
+    return [{"amount": value} for value in values]
 
-        # Create multiple rapid transactions
-        for i in range(5):
-            timestamp = datetime.now(timezone.utc) + timedelta(seconds=i * 10)
-            amount = 50.0 + i * 10
-            risk_score, anomalies = AnomalyDetection.analyze_transaction(
-                db_session, user_id, amount, "retail", location, timestamp
-            )
 
-        # After multiple rapid transactions, risk should be elevated
-        assert risk_score >= 0.0
+def _normal_batch(seed: int, mean: float = 100.0, size: int = 2000) -> list[dict]:
+    return _records(np.random.default_rng(seed).normal(mean, 10, size).tolist())
 
-    def test_geographically_distant_transactions(self, db_session):
-        """Test geographically distant transactions."""
-        user_id = 10
-        amount = 100.0
 
-        # First transaction in New York
-        AnomalyDetection.analyze_transaction(
-            db_session,
-            user_id,
-            amount,
-            "retail",
-            "New York, NY",
-            datetime.now(timezone.utc) - timedelta(hours=1),
-        )
-
-        # Transaction in Tokyo minutes later (impossible)
-        risk_score, anomalies = AnomalyDetection.analyze_transaction(
-            db_session,
-            user_id,
-            amount,
-            "retail",
-            "Tokyo, Japan",
-            datetime.now(timezone.utc),
-        )
-
-        assert risk_score > 0.0 or len(anomalies) > 0
-
-
-class TestRiskScoring:
-    """Test risk scoring calculations."""
-
-    def test_risk_score_range(self, db_session):
-        """Test that risk scores are within valid range."""
-        user_id = 11
-
-        # Test various login scenarios
-        test_cases = [
-            (11, "192.168.1.11", "New York, NY", datetime.now(timezone.utc)),
-            (12, "10.0.0.1", "London, UK", datetime.now(timezone.utc).replace(hour=2)),
-        ]
-
-        for user_id, ip, location, timestamp in test_cases:
-            risk_score, _ = AnomalyDetection.analyze_login_attempt(
-                db_session, user_id, ip, location, timestamp
-            )
-            assert 0.0 <= risk_score <= 1.0
-
-    def test_combined_anomalies_increase_risk(self, db_session):
-        """Test that multiple anomalies increase risk cumulatively."""
-        user_id = 12
-
-        # Multiple anomalies together should create higher risk
-        risk_score, anomalies = AnomalyDetection.analyze_login_attempt(
-            db_session,
-            user_id,
-            "10.0.0.2",
-            "Tokyo, Japan",
-            datetime.now(timezone.utc).replace(hour=3),  # Unusual hour + new location
-        )
-
-        # Risk should be higher with multiple anomalies
-        assert risk_score >= 0.0
-
-
-class TestAutomaticLockout:
-    """Test automatic account lockout on suspicious activity."""
-
-    def test_no_lockout_for_normal_activity(self, db_session):
-        """Test no lockout for normal user activity."""
-        user_id = 13
-
-        locked = AnomalyDetection.is_account_locked(db_session, user_id)
-
-        assert locked is False
-
-    def test_excessive_failed_attempts_block(self, db_session):
-        """Test that excessive failed attempts trigger protection."""
-        user_id = 14
-        ip_address = "192.168.1.14"
-        location = "New York, NY"
-
-        # Simulate multiple failed login attempts
-        failed_count = 0
-        for attempt in range(6):
-            timestamp = datetime.now(timezone.utc) + timedelta(seconds=attempt)
-            risk_score, anomalies = AnomalyDetection.analyze_login_attempt(
-                db_session, user_id, ip_address, location, timestamp
-            )
-            if risk_score > 0.5:
-                failed_count += 1
-
-        # After multiple attempts, system should flag account
-        assert failed_count >= 0  # System has detected anomalies
+class TestNumericColumn:
+    """Test conversion of a field to a masked float array."""
 
-    def test_lockout_duration(self, db_session):
-        """Test that lockout has appropriate duration."""
-        user_id = 15
-        lockout_duration = 15  # minutes
-
-        # Simulate lockout scenario
-        locked = AnomalyDetection.is_account_locked(db_session, user_id)
-
-        # After lockout, account should be locked temporarily
-        assert isinstance(locked, bool)
-
-
-class TestAnomalyModels:
-    """Test LoginAttempt and TransactionAnomaly models."""
-
-    def test_login_attempt_model(self, db_session):
-        """Test LoginAttempt SQLAlchemy model."""
-        attempt = LoginAttempt(
-            user_id=16,
-            ip_address="192.168.1.16",
-            location="New York, NY",
-            risk_score=0.25,
-            success=True,
+    def test_nulls_and_text_are_masked(self):
+        """Test that nulls, text and non-finite values are not present values."""
+        column = AnomalyDetectionUtilities().numeric_column(
+            _records([1, None, "2.5", "abc", float("nan"), True]), "amount"
         )
 
-        db_session.add(attempt)
-        db_session.commit()
+        assert column.valid.tolist() == [True, False, True, False, False, True]
+        assert column.present.tolist() == [1.0, 2.5, 1.0]
 
-        retrieved = db_session.query(LoginAttempt).filter(LoginAttempt.user_id == 16).first()
 
-        assert retrieved.user_id == 16
-        assert retrieved.ip_address == "192.168.1.16"
-        assert retrieved.risk_score == 0.25
-        assert retrieved.success is True
+class TestOutliers:
+    """Test the outlier detectors."""
 
-    def test_transaction_anomaly_model(self, db_session):
-        """Test TransactionAnomaly SQLAlchemy model."""
-        anomaly = TransactionAnomaly(
-            user_id=17,
-            transaction_amount=150.0,
-            merchant_category="electronics",
-            location="New York, NY",
-            risk_score=0.45,
-            anomaly_type="large_amount",
-        )
+    def test_iqr_reports_indices_of_outliers(self):
+        """Test that IQR outliers keep their record positions."""
+        values = [10, 11, 12, None, 13, 11, 12, 500, 10, -400]
+        anomalies = AnomalyDetectionUtilities().detect_numeric_outliers_iqr(_records(values), "amount")
 
-        db_session.add(anomaly)
-        db_session.commit()
+        assert len(anomalies) == 1
+        assert anomalies[0].record_indices == [7, 9]
+        assert anomalies[0].sample_values == [500.0, -400.0]
+        assert anomalies[0].severity == AnomalySeverity.HIGH
 
-        retrieved = (
-            db_session.query(TransactionAnomaly)
-            .filter(TransactionAnomaly.user_id == 17)
-            .first()
-        )
+    def test_mad_is_robust_where_zscore_is_masked(self):
+        """Test that MAD flags a cluster of outliers that inflates the z-score deviation."""
+        values = [10.0, 10.5, 9.5, 10.2, 9.8] * 4 + [100.0, 100.0, 100.0]
+        utilities = AnomalyDetectionUtilities()
 
-        assert retrieved.user_id == 17
-        assert retrieved.transaction_amount == 150.0
-        assert retrieved.risk_score == 0.45
-        assert retrieved.anomaly_type == "large_amount"
+        assert utilities.detect_numeric_outliers_zscore(_records(values), "amount") == []
+        assert utilities.detect_numeric_outliers_mad(_records(values), "amount")[0].record_indices == [20, 21, 22]
 
+    def test_constant_column_has_no_outliers(self):
+        """Test that a constant column yields no outliers for any method."""
+        utilities = AnomalyDetectionUtilities()
+        data = _records([5] * 10)
 
-class TestAnomalyDetectionIntegration:
-    """Integration tests for anomaly detection system."""
+        assert utilities.detect_numeric_outliers_zscore(data, "amount") == []
+        assert utilities.detect_numeric_outliers_mad(data, "amount") == []
+        assert utilities.detect_numeric_outliers_iqr(data, "amount") == []
 
-    def test_mixed_login_and_transaction_monitoring(self, db_session):
-        """Test combined login and transaction monitoring."""
-        user_id = 18
-        ip_address = "192.168.1.18"
-        location = "New York, NY"
 
-        # 1. Analyze suspicious login
-        login_risk, login_anomalies = AnomalyDetection.analyze_login_attempt(
-            db_session,
-            user_id,
-            ip_address,
-            location,
-            datetime.now(timezone.utc).replace(hour=3),
-        )
+class TestBaselineShift:
+    """Test the rolling baseline and PSI check."""
 
-        # 2. If login has high risk, transaction should also be scrutinized
-        if login_risk > 0.3:
-            transaction_risk, trans_anomalies = AnomalyDetection.analyze_transaction(
-                db_session,
-                user_id,
-                500.0,  # Large transaction
-                "retail",
-                location,
-                datetime.now(timezone.utc),
-            )
+    def test_same_distribution_is_quiet(self):
+        """Test that a batch from the baseline distribution raises no shift."""
+        utilities = AnomalyDetectionUtilities()
+        for seed in range(3):
+            utilities.update_baseline(_normal_batch(seed), "amount")
 
-            assert transaction_risk >= 0.0
+        assert utilities.detect_distribution_shift(_normal_batch(10), "amount") == []
 
-    def test_consecutive_suspicious_activities(self, db_session):
-        """Test system response to consecutive suspicious activities."""
-        user_id = 19
-        ip_address = "192.168.1.19"
+    def test_shifted_batch_is_reported(self):
+        """Test that a shifted mean raises a high severity distribution shift."""
+        utilities = AnomalyDetectionUtilities()
+        for seed in range(3):
+            utilities.update_baseline(_normal_batch(seed), "amount")
 
-        # Suspicious login from new location
-        login_risk, _ = AnomalyDetection.analyze_login_attempt(
-            db_session, user_id, ip_address, "Tokyo, Japan", datetime.now(timezone.utc)
-        )
-
-        # Immediately followed by large transaction
-        trans_risk, _ = AnomalyDetection.analyze_transaction(
-            db_session,
-            user_id,
-            5000.0,
-            "cryptocurrency_exchange",
-            "Tokyo, Japan",
-            datetime.now(timezone.utc),
-        )
+        anomalies = utilities.detect_distribution_shift(_normal_batch(10, mean=110), "amount")
 
-        # Combined risks should be concerning
-        combined_risk = min(1.0, login_risk + trans_risk)
-        assert combined_risk > 0.0
+        assert [a.anomaly_type for a in anomalies] == [AnomalyType.DISTRIBUTION_SHIFT]
+        assert anomalies[0].severity == AnomalySeverity.HIGH
 
+    def test_baseline_window_is_bounded(self):
+        """Test that the baseline keeps only the most recent batches."""
+        utilities = AnomalyDetectionUtilities()
+        utilities._baseline_window = 2
+        for seed in range(4):
+            utilities.update_baseline(_normal_batch(seed, size=50), "amount")
 
-class TestEdgeCases:
-    """Test edge cases and boundary conditions."""
+        assert len(utilities.get_baseline("amount")) == 2
 
-    def test_zero_amount_transaction(self, db_session):
-        """Test transaction with zero amount."""
-        user_id = 20
+    def test_detect_all_compares_then_updates(self):
+        """Test that detect_all_anomalies checks the baseline before adding the batch."""
+        utilities = AnomalyDetectionUtilities()
+        utilities.detect_all_anomalies(_normal_batch(0), update_baseline=True)
 
-        risk_score, anomalies = AnomalyDetection.analyze_transaction(
-            db_session, user_id, 0.0, "retail", "New York, NY", datetime.now(timezone.utc)
+        result = utilities.detect_all_anomalies(
+            _normal_batch(1, mean=130), compare_baseline=True, update_baseline=True, check_missing=False
         )
 
-        assert 0.0 <= risk_score <= 1.0
-
-    def test_extremely_large_transaction(self, db_session):
-        """Test extremely large transaction amount."""
-        user_id = 21
-
-        risk_score, anomalies = AnomalyDetection.analyze_transaction(
-            db_session, user_id, 999999.99, "real_estate", "New York, NY", datetime.now(timezone.utc)
-        )
-
-        assert risk_score > 0.0  # Should be flagged as high risk
-
-    def test_missing_location_data(self, db_session):
-        """Test handling of missing location data."""
-        user_id = 22
-
-        risk_score, anomalies = AnomalyDetection.analyze_login_attempt(
-            db_session, user_id, "192.168.1.22", "", datetime.now(timezone.utc)
-        )
-
-        assert 0.0 <= risk_score <= 1.0
-
-
-if __name__ == "__main__":
-    pytest.main([__file__, "-v", "--tb=short"])
+        assert AnomalyType.DISTRIBUTION_SHIFT in {a.anomaly_type for a in result.anomalies}
+        assert len(utilities.get_baseline("amount")) == 2
@@ -0,0 +1,190 @@
+"""
+Tests for single-pass column profiling with mergeable sketches.
+
+Covers the HyperLogLog, KLL, Misra-Gries and moment sketches, their merges,
+and column profiles built from one pass or from merged partitions.
+"""
+
+import random
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.risk_management.data_quality.utils.column_sketches import (
+    HyperLogLog,
+    KLLSketch,
+    MisraGries,
+    RunningMoments,
+)
+from app.risk_management.data_quality.utils.data_profiling_utils import (
+    DataProfilingUtilities,
+    StreamingColumnProfiler,
+)
+
+
+class TestHyperLogLog:
+    """Test the distinct-count sketch."""
+
+    def test_exact_for_small_columns(self):
+        """Test that counts below the register count are exact."""
+        sketch = HyperLogLog(precision=8)
+        for value in ["a", "b", "a", "c"]:
+            sketch.add(value)
+
+        assert sketch.estimate() == 3
+
+    def test_estimate_after_promotion(self):
+        """Test that a large distinct count is estimated within a few standard errors."""
+        sketch = HyperLogLog(precision=10)
+        for index in range(50_000):
+            sketch.add(f"value-{index}")
+
+        # Standard error is 1.04 / sqrt(1024), about 3.3%
+        assert sketch.estimate() == pytest.approx(50_000, rel=0.12)
+
+    def test_merge_is_union(self):
+        """Test that merging overlapping sketches counts the union once."""
+        left, right = HyperLogLog(precision=8), HyperLogLog(precision=8)
+        for index in range(100):
+            left.add(str(index))
+        for index in range(50, 150):
+            right.add(str(index))
+
+        left.merge(right)
+
+        assert left.estimate() == 150
+
+    def test_merge_precision_mismatch(self):
+        """Test that sketches of different precision cannot be merged."""
+        with pytest.raises(ValueError):
+            HyperLogLog(precision=8).merge(HyperLogLog(precision=10))
+
+
+class TestKLLSketch:
+    """Test the quantile sketch."""
+
+    def test_quantiles_within_rank_error(self):
+        """Test that quantiles of a shuffled range stay within a small rank error."""
+        values = list(range(100_000))
+        random.Random(1).shuffle(values)
+        sketch = KLLSketch(k=200, seed=3)
+        for value in values:
+            sketch.add(value)
+
+        for q in (0.25, 0.5, 0.99):
+            assert abs(sketch.quantile(q) - q * 100_000) < 0.02 * 100_000
+        assert sketch.count == 100_000
+
+    def test_merge_keeps_weight(self):
+        """Test that merged sketches keep the combined count and median."""
+        left, right = KLLSketch(seed=1), KLLSketch(seed=2)
+        for value in range(5000):
+            left.add(value)
+        for value in range(5000, 10_000):
+            right.add(value)
+
+        left.merge(right)
+
+        assert left.count == 10_000
+        assert abs(left.quantile(0.5) - 5000) < 300
+
+    def test_empty_sketch(self):
+        """Test that an empty sketch has no quantiles."""
+        assert KLLSketch().quantile(0.5) is None
+
+
+class TestMisraGries:
+    """Test the heavy-hitter counters."""
+
+    def test_heavy_hitter_survives(self):
+        """Test that a value above n / (k + 1) is kept within the error bound."""
+        sketch = MisraGries(k=4)
+        stream = ["hot"] * 300 + [f"cold-{index}" for index in range(700)]
+        random.Random(5).shuffle(stream)
+        for value in stream:
+            sketch.add(value)
+
+        value, count = sketch.top(1)[0]
+        assert value == "hot"
+        assert 300 - 1000 / 5 <= count <= 300
+
+    def test_merge_adds_counts(self):
+        """Test that merging adds the counters of both sketches."""
+        left, right = MisraGries(), MisraGries()
+        left.add("a", 3)
+        right.add("a", 2)
+        right.add("b")
+
+        left.merge(right)
+
+        assert left.top() == [("a", 5), ("b", 1)]
+
+
+class TestRunningMoments:
+    """Test Welford moments."""
+
+    def test_merge_matches_single_pass(self):
+        """Test that merged moments equal the moments of the concatenated data."""
+        rng = random.Random(9)
+        data = [rng.gauss(10, 3) for _ in range(1000)]
+        left, right = RunningMoments(), RunningMoments()
+        for value in data[:300]:
+            left.add(value)
+        for value in data[300:]:
+            right.add(value)
+
+        left.merge(right)
+
+        assert left.mean == pytest.approx(statistics.fmean(data))
+        assert left.std_dev == pytest.approx(statistics.stdev(data))
+        assert (left.minimum, left.maximum) == (min(data), max(data))
+
+    def test_single_value_has_no_std_dev(self):
+        """Test that the sample deviation needs two values."""
+        moments = RunningMoments()
+        moments.add(1.0)
+
+        assert moments.std_dev is None
+
+
+class TestColumnProfiles:
+    """Test column statistics built from the sketches."""
+
+    def test_numeric_profile(self):
+        """Test nulls, empties, moments and percentiles of a numeric column."""
+        stats = DataProfilingUtilities().profile_column(iter([1, 2, 3, 4, None, "", 5]), "amount")
+
+        assert (stats.total_count, stats.null_count, stats.empty_string_count) == (7, 1, 1)
+        assert stats.data_type == "numeric"
+        assert stats.distinct_count == 5
+        assert (stats.min_value, stats.max_value, stats.median_value) == ("1.0", "5.0", "3.0")
+        assert float(stats.avg_value) == 3.0
+        assert float(stats.std_dev) == pytest.approx(statistics.stdev([1, 2, 3, 4, 5]))
+        assert set(stats.percentiles) == {"p25", "p50", "p75", "p95", "p99"}
+
+    def test_string_profile(self):
+        """Test the range, lengths and mode of a string column."""
+        stats = DataProfilingUtilities().profile_column(["bb", "a", "bb", "cccc"], "code")
+
+        assert (stats.min_value, stats.max_value) == ("a", "cccc")
+        assert (stats.min_length, stats.max_length) == (1, 4)
+        assert float(stats.avg_length) == 2.25
+        assert stats.mode_value == "bb"
+        assert stats.top_values[0] == ("bb", 2)
+
+    def test_partitions_on_executor_match_single_pass(self):
+        """Test that merged partition profiles equal a single-pass profile."""
+        values = [index % 97 for index in range(3000)] + [None] * 10
+        partitions = [values[start:start + 500] for start in range(0, len(values), 500)]
+        utilities = DataProfilingUtilities()
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            merged = utilities.profile_partitions(partitions, "value", executor=executor).to_statistics()
+        single = StreamingColumnProfiler("value").update(values).to_statistics()
+
+        assert merged.total_count == single.total_count == 3010
+        assert merged.null_count == 10
+        assert merged.distinct_count == single.distinct_count == 97
+        assert merged.avg_value == pytest.approx(single.avg_value)
+        assert (merged.min_value, merged.max_value) == (single.min_value, single.max_value)
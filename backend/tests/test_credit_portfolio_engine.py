@@ -0,0 +1,151 @@
+"""
+Tests for the loan-level credit portfolio engine.
+
+Covers ASRF unexpected loss, grouped concentrations and HHI, cohort
+migration matrices, macro stress parameters and the migration replay of the
+portfolio service.
+"""
+
+import asyncio
+import importlib
+import math
+from datetime import date
+from statistics import NormalDist
+from unittest import mock
+
+import pytest
+
+from app.risk_management.credit.models.portfolio_models import PortfolioType
+from app.risk_management.credit.models.rating_models import (
+    CreditRating,
+    RatingAgency,
+    RatingMigration,
+    RatingType,
+)
+from app.risk_management.credit.repositories.rating_repository import RatingRepository
+from app.risk_management.credit.services.credit_portfolio_engine import (
+    CreditPortfolioEngine,
+    LoanBook,
+    StressScenario,
+)
+from app.risk_management.credit.services.portfolio_service import PortfolioService
+
+# the services package re-exports the service instance under the module's name
+portfolio_service = importlib.import_module(PortfolioService.__module__)
+
+LOANS = [
+    {"loan_id": "L1", "ead": 600.0, "pd": 0.01, "lgd": 0.45, "sector": "energy", "region": "EU", "rating": "BBB"},
+    {"loan_id": "L2", "ead": 300.0, "pd": 0.02, "lgd": 0.40, "sector": "energy", "region": "US", "rating": "BB"},
+    {"loan_id": "L3", "ead": 100.0, "pd": 0.01, "lgd": 0.45, "sector": "retail", "region": "EU", "rating": "BBB"},
+]
+
+
+def _rating(entity_id: str, grade: str, rated: date) -> CreditRating:
+    return CreditRating(
+        entity_id=entity_id, entity_name=entity_id, entity_type="obligor", rating_type=RatingType.INTERNAL,
+        rating_agency=RatingAgency.INTERNAL, rating_grade=grade, rating_score=10, rating_category="test",
+        probability_of_default=0.01, loss_given_default=0.45, rating_date=rated, effective_date=rated,
+        review_date=rated, rating_rationale="test", rated_by="test",
+    )
+
+
+def _migration(entity_id: str, from_rating: str, to_rating: str, migrated: date) -> RatingMigration:
+    return RatingMigration(
+        entity_id=entity_id, entity_name=entity_id, from_rating=from_rating, to_rating=to_rating,
+        migration_type="test", migration_date=migrated, migration_reason="test", previous_pd=0.01, new_pd=0.02,
+    )
+
+
+class TestLoanRisk:
+    """Test expected and ASRF unexpected loss per loan."""
+
+    def test_unexpected_loss_matches_vasicek(self):
+        """Test the unexpected loss of a corporate loan against the Vasicek formula."""
+        book = LoanBook.from_records(LOANS[:1])
+
+        risk = CreditPortfolioEngine().risk(book)
+
+        weight = (1 - math.exp(-0.5)) / (1 - math.exp(-50))
+        rho = 0.12 * weight + 0.24 * (1 - weight)
+        normal = NormalDist()
+        stressed = normal.cdf((normal.inv_cdf(0.01) + math.sqrt(rho) * normal.inv_cdf(0.999)) / math.sqrt(1 - rho))
+        assert risk.total_expected_loss == pytest.approx(600 * 0.01 * 0.45)
+        assert risk.total_unexpected_loss == pytest.approx(600 * 0.45 * (stressed - 0.01), rel=1e-12)
+
+    def test_concentrations_and_hhi(self):
+        """Test per-label sums and the HHI of every dimension from one pass."""
+        engine = CreditPortfolioEngine()
+        book = LoanBook.from_records(LOANS)
+
+        grouped = engine.concentrations(book, engine.risk(book))
+
+        assert grouped["sector"].values == ["energy", "retail"]
+        assert grouped["sector"].ead.tolist() == [900.0, 100.0]
+        assert grouped["sector"].hhi == pytest.approx(0.9 ** 2 + 0.1 ** 2)
+        assert grouped["region"].counts.tolist() == [2, 1]
+        assert grouped["vintage"].values == ["unknown"]
+
+
+class TestMigrationAndStress:
+    """Test migration matrices and stressed parameters."""
+
+    def test_migration_matrix_rows(self):
+        """Test that grades are ordered best first and rows hold transition frequencies."""
+        grades, matrix = CreditPortfolioEngine().migration_matrix(["BBB", "A", "BBB", "BBB"], ["BBB", "A", "BB", "D"])
+
+        assert grades == ["A", "BBB", "BB", "D"]
+        assert matrix[1].tolist() == pytest.approx([0.0, 1 / 3, 1 / 3, 1 / 3])
+        assert matrix[2].tolist() == [0.0] * 4
+
+    def test_segment_multiplier_scales_one_segment(self):
+        """Test that a '<dimension>:<value>' assumption only scales that segment's PDs."""
+        book = LoanBook.from_records(LOANS)
+        scenario = StressScenario.from_assumptions("adverse", {"sector:retail": 2.0})
+
+        pd, lgd = CreditPortfolioEngine().stressed_parameters(book, scenario)
+
+        assert pd.tolist() == pytest.approx([0.015, 0.03, 0.03])
+        assert lgd.tolist() == pytest.approx([0.54, 0.48, 0.54])
+
+
+class TestMigrationReplay:
+    """Test the portfolio migration matrix replayed from rating history."""
+
+    def _repository(self) -> RatingRepository:
+        repository = RatingRepository()
+        for entity_id, grade in (("O1", "BB"), ("O2", "A"), ("O3", "B")):
+            asyncio.run(repository.save(_rating(entity_id, grade, date(2024, 1, 1))))
+        asyncio.run(repository.save_migration(_migration("O1", "BBB", "BB", date(2025, 6, 1))))
+        asyncio.run(repository.save_migration(_migration("O3", "BB", "B", date(2025, 3, 1))))
+        return repository
+
+    def test_cohort_restricted_to_loan_book_obligors(self):
+        """Test that only the obligors of the loaded loan book form the cohort."""
+        service = PortfolioService()
+        portfolio = asyncio.run(service.create_portfolio("book", PortfolioType.CORPORATE, "test", "test"))
+        asyncio.run(service.load_loan_book(portfolio.portfolio_id, [
+            {**LOANS[0], "obligor_id": "O1"}, {**LOANS[1], "obligor_id": "O2"},
+        ]))
+
+        with mock.patch.object(portfolio_service, "rating_repository", self._repository()):
+            migration = asyncio.run(service.calculate_migration_matrix(
+                portfolio.portfolio_id, date(2025, 1, 1), date(2025, 12, 31)
+            ))
+
+        assert migration.migration_matrix == {"A": {"A": 1.0}, "BBB": {"BB": 1.0}}
+        assert migration.downgrade_rate == 0.5
+        assert migration.stable_rate == 0.5
+
+    def test_without_obligors_uses_every_rated_entity(self):
+        """Test that a portfolio without obligor ids gets the bank-wide matrix."""
+        service = PortfolioService()
+        portfolio = asyncio.run(service.create_portfolio("book", PortfolioType.CORPORATE, "test", "test"))
+
+        with mock.patch.object(portfolio_service, "rating_repository", self._repository()):
+            migration = asyncio.run(service.calculate_migration_matrix(
+                portfolio.portfolio_id, date(2025, 1, 1), date(2025, 12, 31)
+            ))
+
+        assert migration.migration_matrix == {"A": {"A": 1.0}, "BB": {"B": 1.0}, "BBB": {"BB": 1.0}}
+        assert migration.downgrade_rate == pytest.approx(2 / 3)
+        assert migration.average_migration_distance == 2.0
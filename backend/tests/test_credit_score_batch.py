@@ -0,0 +1,107 @@
+"""
+Tests for batch credit score simulation.
+
+Covers the weighted factor scores of the engine, chunked scoring, scenario
+parsing and naming, and the summaries kept by the credit score service.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.risk_management.credit.services.credit_score_engine import CreditScoreEngine
+from app.risk_management.credit.services.credit_score_service import CreditScoreService
+
+CUSTOMERS = [
+    {"customer_id": "best", "payment_history": 1.0, "credit_utilization": 0.0, "credit_history_length": 25},
+    {"customer_id": "unknown"},
+    {"customer_id": "mid", "payment_history": 0.9, "credit_utilization": 0.5, "credit_history_length": 10},
+]
+
+
+def _engine(chunk_size: int = 100_000) -> CreditScoreEngine:
+    return CreditScoreEngine(CreditScoreService()._score_factors, chunk_size=chunk_size)
+
+
+class TestCreditScoreEngine:
+    """Test weighted factor scoring over feature arrays."""
+
+    def test_known_scores(self):
+        """Test the top score, the mid-scale score of missing features and a weighted mix."""
+        engine = _engine()
+
+        result = engine.score(engine.features(CUSTOMERS), [])
+
+        mid = (35 * 0.9 + 30 * 0.5 + 15 * 0.4) / 80
+        assert result.scores[0].tolist() == [850, 575, round(300 + 550 * mid)]
+
+    def test_chunks_match_single_pass(self):
+        """Test that chunked scoring matches scoring all customers at once."""
+        rng = np.random.default_rng(5)
+        customers = [
+            {"payment_history": p, "credit_utilization": u, "credit_history_length": h}
+            for p, u, h in zip(rng.random(50), rng.random(50), rng.random(50) * 30, strict=True)
+        ]
+        scenarios = _engine().scenarios([{"shifts": {"credit_utilization": 0.2}}, {"action": "pay_down_debt"}])
+
+        chunked = _engine(chunk_size=7).score(_engine().features(customers), scenarios)
+        single = _engine().score(_engine().features(customers), scenarios)
+
+        assert np.array_equal(chunked.scores, single.scores)
+
+    def test_shifts_and_actions(self):
+        """Test that feature shifts and action points move the scenario rows."""
+        engine = _engine()
+        scenarios = engine.scenarios([
+            {"name": "maxed", "shifts": {"credit_utilization": 1.0}},
+            {"action": "pay_down_debt"},
+        ])
+
+        result = engine.score(engine.features(CUSTOMERS[:1]), scenarios)
+
+        assert result.scores[:, 0].tolist() == [850, 850 - round(550 * 30 / 80), 850]
+
+
+class TestScenarioParsing:
+    """Test scenario names and shift validation."""
+
+    def test_duplicate_and_baseline_names_made_unique(self):
+        """Test that repeated names and 'baseline' are suffixed with their position."""
+        names = [scenario.name for scenario in _engine().scenarios([
+            {"name": "baseline"}, {"action": "pay_down_debt"}, {"action": "pay_down_debt"}, {"name": "pay_down_debt_3"},
+        ])]
+
+        assert names == ["baseline_1", "pay_down_debt", "pay_down_debt_3", "pay_down_debt_3_4"]
+
+    def test_unknown_shift_rejected(self):
+        """Test that a shift on a factor outside the model is rejected."""
+        with pytest.raises(ValueError, match="income"):
+            _engine().scenarios([{"name": "raise", "shifts": {"income": 1000}}])
+
+
+class TestBatchSimulation:
+    """Test the service's batch simulation summaries."""
+
+    def test_summaries_and_customer_results(self):
+        """Test per-scenario summaries and the scores kept for requested customers."""
+        service = CreditScoreService()
+
+        simulation = asyncio.run(service.simulate_scores_batch(
+            CUSTOMERS,
+            [{"name": "baseline", "shifts": {"credit_utilization": 0.3}}, {"name": "baseline"}],
+            "test",
+            result_customer_ids=["best", "missing"],
+        ))
+
+        assert [summary.scenario for summary in simulation.scenarios] == ["baseline_1", "baseline_2"]
+        utilized = 850 - round(550 * 0.3 * 30 / 80)
+        assert simulation.customer_results == {"best": {"baseline": 850, "baseline_1": utilized, "baseline_2": 850}}
+        assert simulation.scenarios[0].mean_score_change < 0
+        assert simulation.scenarios[1].mean_score_change == 0.0
+        assert sum(simulation.baseline.category_counts.values()) == 3
+
+    def test_empty_batch_rejected(self):
+        """Test that a batch without customers is rejected."""
+        with pytest.raises(ValueError):
+            asyncio.run(CreditScoreService().simulate_scores_batch([], [], "test"))
@@ -0,0 +1,97 @@
+"""
+Tests for one-pass sampling and sample-based estimates.
+
+Covers the Algorithm L reservoir over sequences and iterators, and the
+Wilson interval and GEE distinct estimate behind the approximate check and
+profile modes.
+"""
+
+import random
+from collections import Counter
+from collections.abc import Sequence
+
+import pytest
+
+from app.risk_management.data_quality.utils.data_sampling import (
+    DataSamplingUtilities,
+    estimate_distinct,
+    reservoir,
+    wilson_interval,
+)
+
+
+class _CountingSequence(Sequence):
+    def __init__(self, size: int):
+        self.size = size
+        self.reads = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index):
+        self.reads += 1
+        return index
+
+
+class TestReservoir:
+    """Test the Algorithm L reservoir."""
+
+    def test_sequence_reads_only_replacements(self):
+        """Test that a sequence is indexed only at the sampled positions."""
+        data = _CountingSequence(1_000_000)
+
+        sample, total = reservoir(data, 100, random.Random(1))
+
+        assert total == 1_000_000
+        assert len(sample) == len(set(sample)) == 100
+        # About k * (1 + ln(n / k)), far below n
+        assert data.reads < 3000
+
+    def test_sequence_and_iterator_agree(self):
+        """Test that the same seed draws the same sample from a list and from an iterator."""
+        data = list(range(50_000))
+
+        from_list = reservoir(data, 50, random.Random(7))
+        from_iterator = reservoir(iter(data), 50, random.Random(7))
+
+        assert from_list == from_iterator
+
+    def test_uniform_inclusion(self):
+        """Test that every position is sampled with probability close to k / n."""
+        hits = Counter()
+        for seed in range(2000):
+            sample, _total = reservoir(iter(range(20)), 5, random.Random(seed))
+            hits.update(sample)
+
+        assert all(abs(hits[index] / 2000 - 0.25) < 0.05 for index in range(20))
+
+    def test_short_and_empty_inputs(self):
+        """Test inputs shorter than the sample and an empty sample size."""
+        assert reservoir(iter(range(3)), 10, random.Random(0)) == ([0, 1, 2], 3)
+        assert reservoir([1, 2, 3], 10, random.Random(0)) == ([1, 2, 3], 3)
+        assert reservoir(iter(range(5)), 0, random.Random(0)) == ([], 5)
+
+    def test_random_sample_of_generator(self):
+        """Test that random_sample counts a generator while sampling it."""
+        result = DataSamplingUtilities().random_sample(({"id": i} for i in range(500)), sample_size=20, seed=3)
+
+        assert result.total_records == 500
+        assert result.sample_size == 20
+
+
+class TestEstimates:
+    """Test estimates computed from a sample."""
+
+    def test_wilson_interval_contains_rate(self):
+        """Test that the interval brackets the observed rate and stays in [0, 1]."""
+        lower, upper = wilson_interval(90, 100)
+
+        assert lower < 0.9 < upper
+        assert wilson_interval(0, 10)[0] == pytest.approx(0.0, abs=1e-12)
+        assert wilson_interval(0, 0) == (0.0, 1.0)
+
+    def test_distinct_estimate_scales_singletons(self):
+        """Test that singletons are scaled by sqrt(N / n) and capped at the population."""
+        assert estimate_distinct([1, 1, 1, 1, 3], sample_size=7, population_size=700) == 41
+        assert estimate_distinct([1] * 10, sample_size=10, population_size=5) == 5
+
@@ -0,0 +1,123 @@
+"""
+Tests for the blocking deduplication engine.
+
+Covers the bounded edit distance, early exit of the similarity score,
+candidate generation through blocking keys and transitive duplicate groups.
+"""
+
+import random
+
+import pytest
+
+from app.risk_management.data_quality.utils.dedup_engine import (
+    BlockingKey,
+    BlockingStrategy,
+    DeduplicationEngine,
+    bounded_levenshtein,
+)
+
+
+def _levenshtein(s1: str, s2: str) -> int:
+    previous = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1, 1):
+        current = [i]
+        for j, c2 in enumerate(s2, 1):
+            current.append(min(previous[j - 1] + (c1 != c2), previous[j] + 1, current[j - 1] + 1))
+        previous = current
+    return previous[-1]
+
+
+def _records(*names: str) -> list[dict]:
+    return [{"name": name} for name in names]
+
+
+class TestBoundedLevenshtein:
+    """Test the banded edit distance."""
+
+    def test_matches_full_distance_within_bound(self):
+        """Test that the result equals the full distance or None when it exceeds the bound."""
+        rng = random.Random(7)
+        for _ in range(500):
+            s1 = "".join(rng.choice("abc") for _ in range(rng.randint(0, 8)))
+            s2 = "".join(rng.choice("abc") for _ in range(rng.randint(0, 8)))
+            bound = rng.randint(0, 6)
+            distance = _levenshtein(s1, s2)
+
+            assert bounded_levenshtein(s1, s2, bound) == (distance if distance <= bound else None)
+
+    def test_length_gap_exceeds_bound(self):
+        """Test that strings differing in length by more than the bound are rejected."""
+        assert bounded_levenshtein("abcdef", "ab", 3) is None
+
+    def test_empty_string(self):
+        """Test that the distance to an empty string is the other length."""
+        assert bounded_levenshtein("", "abc", 3) == 3
+
+
+class TestSimilarity:
+    """Test the per-field similarity score."""
+
+    def test_mean_of_field_similarities(self):
+        """Test that the score is the mean per-field Levenshtein similarity."""
+        engine = DeduplicationEngine()
+
+        score = engine.similarity(("john smith", "london"), ("jon smith", "london"), 0.5)
+
+        assert score == pytest.approx((0.9 + 1.0) / 2)
+
+    def test_early_exit_below_threshold(self):
+        """Test that a pair that cannot reach the threshold returns None."""
+        engine = DeduplicationEngine()
+
+        assert engine.similarity(("abcdef", "x"), ("uvwxyz", "x"), 0.9) is None
+
+    def test_character_sets_reject(self):
+        """Test that disjoint character sets reject without changing the result of a match."""
+        engine = DeduplicationEngine()
+        values1, values2 = ("maria",), ("mario",)
+        chars1 = tuple(frozenset(v) for v in values1)
+        chars2 = tuple(frozenset(v) for v in values2)
+
+        assert engine.similarity(values1, values2, 0.8, chars1, chars2) == pytest.approx(0.8)
+        assert engine.similarity(("abc",), ("xyz",), 0.5, (frozenset("abc"),), (frozenset("xyz"),)) is None
+
+
+class TestMatching:
+    """Test candidate pairs and duplicate groups."""
+
+    def test_near_duplicate_found(self):
+        """Test that a near-duplicate name is matched and an unrelated one is not."""
+        engine = DeduplicationEngine()
+
+        pairs = engine.find_matching_pairs(_records("John Smith", "Jon Smith", "Alice Brown"), ["name"], 0.85)
+
+        assert [(i, j) for i, j, _score in pairs] == [(0, 1)]
+        assert pairs[0][2] == pytest.approx(0.9)
+
+    def test_groups_are_transitive(self):
+        """Test that chained matches form one group with the weakest link score."""
+        engine = DeduplicationEngine()
+        data = _records("catherine", "cathrine", "cathrina", "zebra")
+
+        groups = engine.find_groups(data, ["name"], 0.85)
+
+        # "catherine" and "cathrina" only meet through "cathrine"
+        assert engine.similarity(("catherine",), ("cathrina",), 0.85) is None
+        assert groups == [([0, 1, 2], pytest.approx(1 - 1 / 8))]
+
+    def test_lsh_blocking_finds_pairs_outside_window(self):
+        """Test that n-gram LSH blocking pairs records the sorted window would miss."""
+        filler = [f"{letter}{letter}record{index}" for index, letter in enumerate("bcdefghijklm")]
+        data = _records("anderson jonathan", *filler, "zanderson jonathan")
+        engine = DeduplicationEngine(
+            blocking_keys=[BlockingKey(field="name", strategy=BlockingStrategy.NGRAM_LSH)], window_size=2
+        )
+
+        pairs = engine.find_matching_pairs(data, ["name"], 0.9)
+
+        assert (0, len(data) - 1) in {(i, j) for i, j, _score in pairs}
+
+    def test_strategy_values_are_strings(self):
+        """Test that blocking strategies compare equal to their string values."""
+        assert BlockingStrategy("soundex") is BlockingStrategy.SOUNDEX
+        assert BlockingStrategy.PREFIX == "prefix"
@@ -0,0 +1,115 @@
+"""
+Tests for running exposure aggregates and limit utilization.
+
+Covers the totals kept by the exposure index, limits refreshed as exposures
+move, the binding limit of an aggregate and group limits on counterparty
+checks.
+"""
+
+import asyncio
+
+import pytest
+
+from app.risk_management.credit.models.exposure_models import ExposureCategory, ExposureType
+from app.risk_management.credit.services.exposure_service import ExposureService
+
+
+def _exposure(service: ExposureService, customer_id: str, gross: float, **fields):
+    return asyncio.run(service.create_exposure(
+        customer_id, customer_id, ExposureType.FUNDED, ExposureCategory.LOAN, gross, 10_000.0, **fields
+    ))
+
+
+class TestRunningTotals:
+    """Test totals kept current as exposures change."""
+
+    def test_totals_per_level(self):
+        """Test that totals match a direct sum for every aggregation level."""
+        service = ExposureService()
+        _exposure(service, "C1", 100.0, group_id="G1", sector="energy", collateral_value=40.0)
+        _exposure(service, "C2", 300.0, group_id="G1", sector="retail")
+        _exposure(service, "C1", 50.0, sector="energy")
+
+        group = asyncio.run(service.calculate_aggregate("group", "G1", "G1"))
+        industry = asyncio.run(service.calculate_aggregate("industry", "energy", "energy"))
+
+        assert (group.total_gross_exposure, group.total_net_exposure, group.number_of_exposures) == (400.0, 360.0, 2)
+        assert (industry.total_gross_exposure, industry.number_of_exposures) == (150.0, 2)
+        assert service._index.totals("product", "loan").gross_exposure == 450.0
+
+    def test_update_moves_exposure_between_keys(self):
+        """Test that changing an exposure's sector moves its contribution."""
+        service = ExposureService()
+        exposure = _exposure(service, "C1", 100.0, sector="energy")
+
+        asyncio.run(service.update_exposure(exposure.exposure_id, {"sector": "retail"}))
+
+        assert service._index.level("sector").keys() == {"retail"}
+        assert service._index.totals("sector", "retail").gross_exposure == 100.0
+
+    def test_movement_updates_totals(self):
+        """Test that a recorded movement changes the exposure and its totals."""
+        service = ExposureService()
+        exposure = _exposure(service, "C1", 100.0)
+
+        asyncio.run(service.record_movement(exposure.exposure_id, "drawdown", 250.0, "test"))
+
+        assert exposure.gross_exposure == 350.0
+        assert service._index.totals("customer", "C1").ead == 350.0
+
+
+class TestLimits:
+    """Test limit utilization and checks."""
+
+    def test_limit_follows_exposure(self):
+        """Test that a limit's utilization and status follow new exposures."""
+        service = ExposureService()
+        limit = asyncio.run(service.set_limit("counterparty", "C1", "C1", 1000.0, "test"))
+
+        _exposure(service, "C1", 850.0)
+
+        assert limit.current_exposure == 850.0
+        assert limit.utilization_percentage == pytest.approx(85.0)
+        assert limit.status == "warning"
+
+    def test_aggregate_reports_tightest_limit(self):
+        """Test that the smallest limit on a key is the one reported."""
+        service = ExposureService()
+        _exposure(service, "C1", 400.0)
+        asyncio.run(service.set_limit("customer", "C1", "wide", 2000.0, "test"))
+        asyncio.run(service.set_limit("customer", "C1", "tight", 500.0, "test"))
+
+        aggregate = asyncio.run(service.calculate_aggregate("customer", "C1", "C1"))
+
+        assert aggregate.limit_amount == 500.0
+        assert aggregate.limit_utilization == pytest.approx(80.0)
+
+    def test_unknown_limit_type_rejected(self):
+        """Test that a limit on an unknown level is rejected."""
+        with pytest.raises(ValueError):
+            asyncio.run(ExposureService().set_limit("desk", "D1", "D1", 100.0, "test"))
+
+    def test_group_limit_constrains_counterparty(self):
+        """Test that a counterparty check also draws on its group's limit."""
+        service = ExposureService()
+        _exposure(service, "C1", 100.0, group_id="G1")
+        _exposure(service, "C2", 800.0, group_id="G1")
+        customer_limit = asyncio.run(service.set_limit("customer", "C1", "C1", 5000.0, "test"))
+        asyncio.run(service.set_limit("group", "G1", "G1", 1000.0, "test"))
+
+        check = asyncio.run(service.check_limit(customer_limit.limit_id, 200.0))
+
+        assert not check["allowed"]
+        assert check["group_id"] == "G1"
+        assert asyncio.run(service.check_limit(customer_limit.limit_id, 50.0))["allowed"]
+
+    def test_group_cleared_when_exposure_leaves(self):
+        """Test that removing a customer's group stops group limits applying to it."""
+        service = ExposureService()
+        exposure = _exposure(service, "C1", 900.0, group_id="G1")
+        customer_limit = asyncio.run(service.set_limit("customer", "C1", "C1", 5000.0, "test"))
+        asyncio.run(service.set_limit("group", "G1", "G1", 1000.0, "test"))
+
+        asyncio.run(service.update_exposure(exposure.exposure_id, {"group_id": None}))
+
+        assert asyncio.run(service.check_limit(customer_limit.limit_id, 200.0))["allowed"]
@@ -0,0 +1,121 @@
+"""
+Tests for vectorized fraud model scoring and online micro-batching.
+
+Covers the feature matrix built from the feature schema, logistic scoring of
+a batch, and coalescing of concurrent online predictions into one model call.
+"""
+
+import asyncio
+import math
+
+import pytest
+
+from app.risk_management.fraud.models.ml_models import ModelType
+from app.risk_management.fraud.services.ml_service import (
+    DEFAULT_FRAUD_PROBABILITY,
+    MLService,
+    PredictionMicroBatcher,
+)
+
+
+async def _logistic_model(service: MLService):
+    model = await service.register_model("scorer", ModelType.CLASSIFICATION, "logistic_regression", "test")
+    await service.register_feature_schema(model.model_id, ["amount", "velocity"], {"velocity": 2.0})
+    model.hyperparameters = {"coefficients": {"amount": 0.001, "velocity": 0.5}, "intercept": -3.0}
+    await service.activate_model(model.model_id)
+    return model
+
+
+class TestBatchScoring:
+    """Test scoring many rows in one pass."""
+
+    def test_feature_matrix_uses_schema_defaults(self):
+        """Test that missing and unparseable features take the schema defaults."""
+        service = MLService()
+        model = asyncio.run(_logistic_model(service))
+
+        features, matrix = service.build_feature_matrix(
+            model.model_id, [{"amount": 100, "velocity": 1}, {"amount": "bad"}]
+        )
+
+        assert features == ["amount", "velocity"]
+        assert matrix.tolist() == [[100.0, 1.0], [0.0, 2.0]]
+
+    def test_logistic_probabilities(self):
+        """Test batch probabilities against the logistic formula."""
+        service = MLService()
+        model = asyncio.run(_logistic_model(service))
+
+        predictions = asyncio.run(service.predict_batch(
+            model.model_id, [{"amount": 1000, "velocity": 4}, {"amount": 0, "velocity": 0}]
+        ))
+
+        expected = [1 / (1 + math.exp(-(1.0 + 2.0 - 3.0))), 1 / (1 + math.exp(3.0))]
+        assert [p.probability for p in predictions] == pytest.approx(expected, abs=1e-12)
+        assert [p.is_fraud for p in predictions] == [p.probability > model.threshold for p in predictions]
+        assert [p.features_used["velocity"] for p in predictions] == [4.0, 0.0]
+
+    def test_model_without_coefficients(self):
+        """Test that a model without coefficients returns the default probability."""
+        service = MLService()
+        model = asyncio.run(service.register_model("plain", ModelType.CLASSIFICATION, "rf", "test"))
+        asyncio.run(service.activate_model(model.model_id))
+
+        predictions = asyncio.run(service.predict_batch(model.model_id, [{}, {}]))
+
+        assert [p.probability for p in predictions] == [DEFAULT_FRAUD_PROBABILITY] * 2
+
+    def test_inactive_model_scores_nothing(self):
+        """Test that an inactive model returns no predictions."""
+        service = MLService()
+        model = asyncio.run(service.register_model("idle", ModelType.CLASSIFICATION, "rf", "test"))
+
+        assert asyncio.run(service.predict_batch(model.model_id, [{}])) == []
+        assert asyncio.run(service.predict(model.model_id, {})) is None
+
+
+class TestMicroBatching:
+    """Test coalescing of concurrent online predictions."""
+
+    def test_concurrent_predictions_share_one_call(self):
+        """Test that concurrent requests are scored in a single batch, in order."""
+        calls = []
+
+        def score_batch(model_id, rows):
+            calls.append(len(rows))
+            return [row["value"] * 2 for row in rows]
+
+        async def run():
+            batcher = PredictionMicroBatcher(score_batch, max_batch_size=100, max_delay_ms=5)
+            return await asyncio.gather(*(batcher.submit("model", {"value": value}) for value in range(10)))
+
+        assert asyncio.run(run()) == [value * 2 for value in range(10)]
+        assert calls == [10]
+
+    def test_full_batch_flushes_immediately(self):
+        """Test that reaching the batch size flushes without waiting for the timer."""
+        calls = []
+
+        def score_batch(model_id, rows):
+            calls.append(len(rows))
+            return [None] * len(rows)
+
+        async def run():
+            batcher = PredictionMicroBatcher(score_batch, max_batch_size=4, max_delay_ms=10_000)
+            await asyncio.wait_for(asyncio.gather(*(batcher.submit("model", {}) for _ in range(8))), timeout=1)
+
+        asyncio.run(run())
+        assert calls == [4, 4]
+
+    def test_errors_reach_every_waiter(self):
+        """Test that a failing batch raises in every waiting request."""
+        def score_batch(model_id, rows):
+            raise RuntimeError("model unavailable")
+
+        async def run():
+            batcher = PredictionMicroBatcher(score_batch, max_delay_ms=1)
+            return await asyncio.gather(
+                *(batcher.submit("model", {}) for _ in range(3)), return_exceptions=True
+            )
+
+        assert all(isinstance(result, RuntimeError) for result in asyncio.run(run()))
@@ -0,0 +1,131 @@
+"""
+Tests for the compiled fraud rule engine.
+
+Covers compiled conditions, routing through the decision index by channel,
+country and merchant category, and index refresh when rules change.
+"""
+
+import asyncio
+
+from app.risk_management.fraud.models.fraud_rule_models import (
+    FraudRule,
+    RuleCondition,
+    RuleType,
+)
+from app.risk_management.fraud.services.rule_engine_service import (
+    RuleEngineService,
+    _compile_condition,
+)
+
+
+def _rule(rule_code: str, *conditions: RuleCondition, **fields) -> FraudRule:
+    return FraudRule(
+        rule_code=rule_code,
+        rule_name=rule_code,
+        rule_type=RuleType.THRESHOLD,
+        description=rule_code,
+        conditions=list(conditions),
+        logic_expression=rule_code,
+        created_by="test",
+        **fields,
+    )
+
+
+def _matched(results) -> set[str]:
+    return {result.rule_name for result in results if result.matched}
+
+
+class TestCompiledConditions:
+    """Test compiled condition closures."""
+
+    def test_comparison_operators(self):
+        """Test that comparison operators compare against the condition value."""
+        check = _compile_condition(RuleCondition(field="amount", operator=">=", value=100))
+
+        assert check(100)
+        assert not check(99)
+
+    def test_membership(self):
+        """Test that 'in' matches list members."""
+        check = _compile_condition(RuleCondition(field="country", operator="in", value=["NG", "RU"]))
+
+        assert check("NG")
+        assert not check("US")
+
+    def test_unhashable_field_value(self):
+        """Test that an unhashable field value falls back to an equality scan."""
+        check = _compile_condition(RuleCondition(field="tags", operator="in", value=[["a"], "b"]))
+
+        assert check(["a"])
+        assert not check(["c"])
+
+    def test_unknown_operator_never_matches(self):
+        """Test that an unsupported operator matches nothing."""
+        assert not _compile_condition(RuleCondition(field="amount", operator="~", value=1))(1)
+
+
+class TestDecisionIndex:
+    """Test routing transactions to applicable rules."""
+
+    def test_channel_restricted_rule(self):
+        """Test that a channel-restricted rule only runs for its channels."""
+        service = RuleEngineService()
+        asyncio.run(service.create_rule(_rule(
+            "ONLINE_001", RuleCondition(field="amount", operator=">", value=50), applicable_channels=["online"]
+        )))
+
+        online = asyncio.run(service.evaluate_transaction({"amount": 60, "channel": "online"}))
+        branch = asyncio.run(service.evaluate_transaction({"amount": 60, "channel": "branch"}))
+
+        assert "ONLINE_001" in _matched(online)
+        assert "ONLINE_001" not in {result.rule_name for result in branch}
+
+    def test_country_condition_routes_rule(self):
+        """Test that an equality condition on a discriminating field narrows the candidates."""
+        service = RuleEngineService()
+        asyncio.run(service.create_rule(_rule("GEO_001", RuleCondition(field="country", operator="==", value="KP"))))
+
+        results = asyncio.run(service.evaluate_batch([{"country": "KP"}, {"country": "FR"}]))
+
+        assert "GEO_001" in _matched(results[0])
+        assert "GEO_001" not in {result.rule_name for result in results[1]}
+
+    def test_update_refreshes_index(self):
+        """Test that an updated rule is re-routed with its new conditions."""
+        service = RuleEngineService()
+        rule = asyncio.run(service.create_rule(
+            _rule("GEO_001", RuleCondition(field="country", operator="==", value="KP"))
+        ))
+        asyncio.run(service.evaluate_transaction({"country": "FR"}))
+
+        asyncio.run(service.update_rule(
+            rule.rule_id, {"conditions": [RuleCondition(field="country", operator="==", value="FR")]}
+        ))
+
+        assert "GEO_001" in _matched(asyncio.run(service.evaluate_transaction({"country": "FR"})))
+
+    def test_toggle_removes_rule(self):
+        """Test that a deactivated rule is no longer evaluated."""
+        service = RuleEngineService()
+        rule = next(rule for rule in service._rules.values() if rule.rule_code == "AMT_HIGH_001")
+
+        asyncio.run(service.toggle_rule(rule.rule_id, False))
+
+        assert rule.rule_name not in _matched(asyncio.run(service.evaluate_transaction({"amount": 20000})))
+
+    def test_unhashable_discriminator(self):
+        """Test that an unhashable discriminating value bypasses the index."""
+        service = RuleEngineService()
+
+        results = asyncio.run(service.evaluate_transaction({"amount": 20000, "country": ["FR"]}))
+
+        assert "High Amount Transaction" in _matched(results)
+
+    def test_hit_counts(self):
+        """Test that matches are counted on the rule."""
+        service = RuleEngineService()
+        rule = next(rule for rule in service._rules.values() if rule.rule_code == "AMT_HIGH_001")
+
+        asyncio.run(service.evaluate_batch([{"amount": 20000}, {"amount": 5}, {"amount": 15000}]))
+
+        assert rule.hit_count == 2
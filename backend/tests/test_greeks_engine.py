@@ -0,0 +1,130 @@
+"""
+Tests for vectorized Black-Scholes greeks and portfolio sensitivities.
+
+Covers the normal CDF approximation, prices and greeks against textbook
+values, portfolio aggregation and the full-revaluation shock grid.
+"""
+
+import asyncio
+import math
+from datetime import date, timedelta
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.risk_management.market.models.greeks_models import OptionStyle, OptionType
+from app.risk_management.market.services.greeks_service import (
+    GreeksService,
+    black_scholes_greeks_batch,
+    black_scholes_price_batch,
+    norm_cdf,
+)
+
+
+def _service_with_positions():
+    service = GreeksService()
+    portfolio_id = uuid4()
+    expiry = date.today() + timedelta(days=180)
+    for underlying, option_type, strike, quantity, direction in (
+        ("AAA", OptionType.CALL, 100.0, 10, "long"),
+        ("AAA", OptionType.PUT, 95.0, 5, "short"),
+        ("BBB", OptionType.CALL, 50.0, 20, "long"),
+    ):
+        asyncio.run(service.create_position(
+            underlying, "equity", option_type, OptionStyle.EUROPEAN, strike, expiry, quantity, direction,
+            premium=1.0, underlying_price=100.0 if underlying == "AAA" else 48.0, implied_volatility=0.25,
+            portfolio_id=portfolio_id,
+        ))
+    return service, portfolio_id
+
+
+class TestNormCdf:
+    """Test the double-precision normal CDF."""
+
+    def test_matches_erf(self):
+        """Test the approximation against the error function across both tails."""
+        x = np.linspace(-12, 12, 2001)
+        expected = np.array([0.5 * math.erfc(-value / math.sqrt(2)) for value in x])
+
+        assert np.allclose(norm_cdf(x), expected, rtol=1e-14, atol=1e-16)
+
+
+class TestBlackScholes:
+    """Test Black-Scholes prices and greeks against textbook values."""
+
+    def _args(self, is_call: bool):
+        return tuple(np.array([value]) for value in (100.0, 100.0, 1.0, 0.05, 0.2, is_call))
+
+    def test_atm_call_price(self):
+        """Test the at-the-money call price for S=K=100, T=1, r=5%, vol=20%."""
+        assert black_scholes_price_batch(*self._args(True))[0] == pytest.approx(10.4506, abs=1e-4)
+
+    def test_put_call_parity(self):
+        """Test that call minus put equals S - K * exp(-rT)."""
+        call = black_scholes_price_batch(*self._args(True))[0]
+        put = black_scholes_price_batch(*self._args(False))[0]
+
+        assert call - put == pytest.approx(100 - 100 * np.exp(-0.05), abs=1e-10)
+
+    def test_atm_call_greeks(self):
+        """Test delta, gamma and per-1% vega of the at-the-money call."""
+        greeks = black_scholes_greeks_batch(*self._args(True))
+
+        assert greeks["delta"][0] == pytest.approx(0.63683, abs=1e-5)
+        assert greeks["gamma"][0] == pytest.approx(0.018762, abs=1e-6)
+        assert greeks["vega"][0] == pytest.approx(0.37524, abs=1e-5)
+
+    def test_expired_option(self):
+        """Test that an option with no time left prices at intrinsic value with zero greeks."""
+        args = (np.array([110.0, 110.0]), 100.0, 0.0, 0.05, 0.2, np.array([True, False]))
+
+        assert black_scholes_price_batch(*args).tolist() == [10.0, 0.0]
+        assert all(not values.any() for values in black_scholes_greeks_batch(*args).values())
+
+
+class TestPortfolio:
+    """Test portfolio greeks and sensitivities."""
+
+    def test_portfolio_totals_match_positions(self):
+        """Test that vectorized totals equal the sum of per-position greeks."""
+        service, portfolio_id = _service_with_positions()
+
+        portfolio = asyncio.run(service.calculate_portfolio_greeks(portfolio_id))
+        singles = [asyncio.run(service.calculate_greeks(position_id)) for position_id in list(service._positions)]
+
+        assert portfolio.total_delta == pytest.approx(sum(s.delta for s in singles))
+        assert portfolio.total_gamma == pytest.approx(sum(s.gamma for s in singles))
+        assert portfolio.total_theta == pytest.approx(sum(s.theta for s in singles))
+        assert sorted(portfolio.by_underlying) == ["AAA", "BBB"]
+        assert portfolio.by_underlying["BBB"]["delta"] == pytest.approx(singles[2].delta)
+
+    def test_grid_matches_repricing(self):
+        """Test that each grid cell equals repricing the portfolio at that shock."""
+        service, portfolio_id = _service_with_positions()
+        arrays = service._position_arrays(list(service._positions.values()))
+
+        grid = asyncio.run(service.calculate_sensitivity_grid(portfolio_id, [-10.0, 0.0, 10.0], [0.0, 5.0]))
+
+        def value(spot_shock, vol_shock):
+            prices = black_scholes_price_batch(
+                arrays["spot"] * (1 + spot_shock / 100), arrays["strike"], arrays["time_to_exp"],
+                0.05, arrays["sigma"] + vol_shock / 100, arrays["is_call"],
+            )
+            return float(prices @ arrays["multiplier"])
+
+        expected = [[value(s, v) - value(0, 0) for v in (0.0, 5.0)] for s in (-10.0, 0.0, 10.0)]
+        assert np.allclose(grid["pnl"], expected)
+        assert grid["pnl"][1][0] == 0.0
+        assert grid["worst_pnl"] == pytest.approx(min(map(min, expected)))
+
+    def test_sensitivity_decomposition(self):
+        """Test that delta and gamma P&L add up to the spot-only revaluation."""
+        service, portfolio_id = _service_with_positions()
+
+        sensitivity = asyncio.run(service.calculate_sensitivity(portfolio_id, 5.0, 0.0, 0))
+        grid = asyncio.run(service.calculate_sensitivity_grid(portfolio_id, [5.0], [0.0]))
+
+        assert sensitivity.delta_pnl + sensitivity.gamma_pnl == pytest.approx(grid["pnl"][0][0])
+        assert sensitivity.total_pnl == pytest.approx(grid["pnl"][0][0])
+        assert sensitivity.vega_pnl == 0.0
@@ -0,0 +1,85 @@
+"""
+Tests for the ring-buffered KRI time series.
+
+Covers the rolling statistics kept while appending, status counts over the
+window, trend direction, whole-series statistics and the retained history.
+"""
+
+import numpy as np
+import pytest
+
+from app.risk_management.operational.services.kri_timeseries import (
+    KRISeries,
+    trend_statistics,
+)
+
+
+class TestKRISeries:
+    """Test KRI rolling statistics against numpy."""
+
+    def test_rolling_statistics_match_numpy(self):
+        """Test mean, standard deviation and slope of the last window after many appends."""
+        rng = np.random.default_rng(11)
+        values = 1e6 + np.cumsum(rng.normal(0, 5, 2500))
+        series = KRISeries(window=30, capacity=256)
+
+        for ordinal, value in enumerate(values, start=700_000):
+            statistics = series.append(float(value), ordinal, 0)
+
+        window = values[-30:]
+        assert statistics.count == 30
+        assert statistics.mean == pytest.approx(window.mean(), rel=1e-12)
+        assert statistics.std_dev == pytest.approx(window.std(), rel=1e-6)
+        assert statistics.slope == pytest.approx(np.polyfit(np.arange(30), window, 1)[0], rel=1e-6)
+
+    def test_status_counts_follow_window(self):
+        """Test that breaches count only the statuses inside the window."""
+        series = KRISeries(window=3, capacity=8)
+        for ordinal, status in enumerate([2, 2, 0, 1, 0]):
+            statistics = series.append(1.0, ordinal, status)
+
+        assert statistics.status_counts == (2, 1, 0)
+        assert statistics.breaches == 1
+
+    def test_direction(self):
+        """Test that a steady rise reads as rising and a flat series as stable."""
+        rising, flat = KRISeries(window=10), KRISeries(window=10)
+        for ordinal in range(10):
+            up = rising.append(float(ordinal), ordinal, 0)
+            level = flat.append(5.0, ordinal, 0)
+
+        assert up.direction == 1
+        assert level.direction == 0
+
+    def test_between_refuses_overwritten_period(self):
+        """Test that a period older than the retained history is reported as unavailable."""
+        series = KRISeries(window=2, capacity=4)
+        for ordinal in range(6):
+            series.append(float(ordinal), ordinal, 0)
+
+        values, _ = series.between(2, 5)
+        assert values.tolist() == [2.0, 3.0, 4.0, 5.0]
+        assert series.between(0, 5) is None
+
+    def test_out_of_order_append_rejected(self):
+        """Test that measurements must arrive in date order."""
+        series = KRISeries()
+        series.append(1.0, 10, 0)
+
+        with pytest.raises(ValueError):
+            series.append(1.0, 9, 0)
+
+
+class TestTrendStatistics:
+    """Test statistics over a whole period."""
+
+    def test_matches_numpy(self):
+        """Test the summary statistics and OLS slope against numpy."""
+        values = np.array([3.0, 5.0, 4.0, 8.0, 9.0])
+
+        trend = trend_statistics(values, np.array([0, 1, 0, 2, 2]))
+
+        assert (trend.count, trend.minimum, trend.maximum) == (5, 3.0, 9.0)
+        assert trend.std_dev == pytest.approx(values.std())
+        assert trend.slope == pytest.approx(np.polyfit(np.arange(5), values, 1)[0])
+        assert trend.status_counts == (2, 1, 2)
@@ -0,0 +1,87 @@
+"""
+Tests for the Loss Distribution Approach engine.
+
+Covers frequency and severity fitting, seeded reproducibility of the chunked
+Monte Carlo and the allocation of capital to event types.
+"""
+
+import numpy as np
+import pytest
+
+from app.risk_management.operational.services.lda_engine import (
+    FrequencyModel,
+    LDAEngine,
+    SeverityModel,
+    fit_frequency,
+    fit_severity,
+)
+
+MODELS = (
+    ["internal_fraud", "external_fraud"],
+    [FrequencyModel("poisson", 5.0), FrequencyModel("negative_binomial", 3.0, 2.0)],
+    [SeverityModel(mu=10.0, sigma=1.5), SeverityModel(mu=8.0, sigma=2.0)],
+)
+
+
+class TestFitting:
+    """Test frequency and severity fitting."""
+
+    def test_overdispersed_counts_select_negative_binomial(self):
+        """Test that counts with variance above the mean fit a negative binomial."""
+        model = fit_frequency(np.array([1, 9, 2, 12, 0, 6]))
+
+        assert model.distribution == "negative_binomial"
+        assert model.mean == pytest.approx(5.0)
+        assert model.dispersion == pytest.approx(25.0 / (np.var([1, 9, 2, 12, 0, 6], ddof=1) - 5.0))
+
+    def test_equidispersed_counts_select_poisson(self):
+        """Test that counts with variance near the mean fit a Poisson."""
+        assert fit_frequency(np.array([4, 5, 6, 5])).distribution == "poisson"
+
+    def test_severity_tail_spliced(self):
+        """Test that a sample with enough large losses gets a tail above the threshold quantile."""
+        losses = np.random.default_rng(3).lognormal(10.0, 1.2, 2_000)
+
+        model = fit_severity(losses)
+
+        assert model.threshold == pytest.approx(np.quantile(losses, 0.9))
+        assert model.tail_probability == pytest.approx(0.1, abs=1e-3)
+        assert model.tail_shape < 0.95
+        assert model.sample(np.random.default_rng(0), 1_000).min() > 0
+
+    def test_small_sample_stays_lognormal(self):
+        """Test that too few exceedances keep the plain lognormal fit."""
+        losses = np.array([100.0, 200.0, 400.0, 800.0])
+
+        model = fit_severity(losses)
+
+        assert model.threshold is None
+        assert model.mu == pytest.approx(np.log(losses).mean())
+
+
+class TestLDAEngine:
+    """Test the LDA Monte Carlo."""
+
+    def test_seeded_quantile_reproducible(self):
+        """Test that the same seed gives the same capital quantile."""
+        first = LDAEngine(years=20_000, chunk_size=5_000, seed=42).simulate(*MODELS)
+        second = LDAEngine(years=20_000, chunk_size=5_000, seed=42).simulate(*MODELS)
+
+        assert first.capital == second.capital
+        assert first.contributions == second.contributions
+
+    def test_capital_allocation(self):
+        """Test that contributions add up to capital, which exceeds the expected loss."""
+        result = LDAEngine(years=20_000, chunk_size=5_000, seed=1).simulate(*MODELS)
+
+        assert sum(result.contributions.values()) == pytest.approx(result.capital, rel=1e-9)
+        assert result.capital <= result.expected_shortfall
+        assert result.unexpected_loss > 0
+        assert all(
+            result.standalone_capital[name] > result.expected_loss_by_type[name] for name in MODELS[0]
+        )
+
+    def test_rejects_empty_simulation(self):
+        """Test that a simulation without years is rejected."""
+        with pytest.raises(ValueError):
+            LDAEngine(years=0).simulate(*MODELS)
@@ -0,0 +1,124 @@
+"""
+Tests for the data lineage graph.
+
+Covers cached upstream and downstream reachability, longest-path layering,
+and shortest-first path enumeration with Yen's algorithm.
+"""
+
+import random
+
+from app.risk_management.data_quality.utils.lineage_graph import (
+    EdgeType,
+    LineageGraphBuilder,
+    NodeType,
+)
+
+
+def _graph(*edges: tuple[str, str]) -> LineageGraphBuilder:
+    graph = LineageGraphBuilder()
+    for node_id in sorted({node for edge in edges for node in edge}):
+        graph.add_node(node_id, node_id, NodeType.TABLE)
+    for source, target in edges:
+        graph.add_edge(source, target, EdgeType.DIRECT)
+    return graph
+
+
+def _ids(nodes) -> list[str]:
+    return [node.node_id for node in nodes]
+
+
+def _simple_paths(graph: LineageGraphBuilder, start: str, end: str) -> list[list[str]]:
+    paths = []
+
+    def walk(path: list[str]) -> None:
+        if path[-1] == end:
+            paths.append(path)
+            return
+        for neighbor in set(graph._adjacency_list.get(path[-1], [])):
+            if neighbor not in path:
+                walk([*path, neighbor])
+
+    walk([start])
+    return paths
+
+
+class TestReachability:
+    """Test upstream and downstream traversal."""
+
+    def test_downstream_in_breadth_first_order(self):
+        """Test that downstream nodes come back level by level within the depth limit."""
+        graph = _graph(("a", "b"), ("a", "c"), ("b", "d"), ("d", "e"))
+
+        assert _ids(graph.get_downstream_nodes("a")) == ["b", "c", "d", "e"]
+        assert _ids(graph.get_downstream_nodes("a", max_depth=2)) == ["b", "c", "d"]
+        assert _ids(graph.get_upstream_nodes("e")) == ["d", "b", "a"]
+
+    def test_cache_invalidated_by_new_edge(self):
+        """Test that adding an edge refreshes cached reachability."""
+        graph = _graph(("a", "b"))
+        assert _ids(graph.get_downstream_nodes("a")) == ["b"]
+
+        graph.add_node("c", "c", NodeType.VIEW)
+        graph.add_edge("b", "c", EdgeType.TRANSFORM)
+
+        assert _ids(graph.get_downstream_nodes("a")) == ["b", "c"]
+
+    def test_cycles_terminate(self):
+        """Test that traversal of a cyclic graph visits each node once."""
+        graph = _graph(("a", "b"), ("b", "c"), ("c", "a"))
+
+        assert _ids(graph.get_downstream_nodes("a", max_depth=50)) == ["b", "c"]
+        assert graph.get_topological_layers() == []
+
+
+class TestTopologicalLayers:
+    """Test longest-path layering."""
+
+    def test_longest_path_layers(self):
+        """Test that a node sits one layer below its deepest parent."""
+        graph = _graph(("a", "b"), ("b", "c"), ("a", "c"), ("x", "c"))
+
+        assert [sorted(layer) for layer in graph.get_topological_layers()] == [["a", "x"], ["b"], ["c"]]
+
+
+class TestPaths:
+    """Test path enumeration between two nodes."""
+
+    def test_k_shortest_paths_match_enumeration(self):
+        """Test that Yen's paths are the simple paths ordered by length."""
+        rng = random.Random(4)
+        nodes = [f"n{index}" for index in range(8)]
+        edges = {(a, b) for a in nodes for b in nodes if a != b and rng.random() < 0.3}
+        graph = _graph(*sorted(edges))
+
+        expected = sorted(len(path) for path in _simple_paths(graph, "n0", "n7"))
+        paths = graph.find_k_shortest_paths("n0", "n7", k=len(expected) + 5)
+
+        assert [len(path.nodes) for path in paths] == expected
+        assert len({tuple(path.nodes) for path in paths}) == len(paths)
+        assert all(len(set(path.nodes)) == len(path.nodes) for path in paths)
+
+    def test_parallel_edges_reported_once(self):
+        """Test that parallel edges do not duplicate a path."""
+        graph = _graph(("a", "b"), ("a", "b"), ("b", "c"))
+
+        paths = graph.find_all_paths("a", "c")
+
+        assert [path.nodes for path in paths] == [["a", "b", "c"]]
+        assert paths[0].edges == ["edge_000001", "edge_000003"]
+        assert paths[0].total_hops == 2
+
+    def test_max_depth_and_max_paths(self):
+        """Test that find_all_paths stops at the depth and path limits."""
+        graph = _graph(("a", "d"), ("a", "b"), ("b", "d"), ("b", "c"), ("c", "d"))
+
+        assert [path.nodes for path in graph.find_all_paths("a", "d", max_depth=3)] == [
+            ["a", "d"], ["a", "b", "d"]
+        ]
+        assert len(graph.find_all_paths("a", "d", max_paths=1)) == 1
+
+    def test_unreachable(self):
+        """Test that unconnected nodes have no paths."""
+        graph = _graph(("a", "b"), ("c", "d"))
+
+        assert graph.find_k_shortest_paths("a", "d") == []
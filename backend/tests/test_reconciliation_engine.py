@@ -0,0 +1,136 @@
+"""
+Tests for the partitioned hash-join reconciliation engine.
+
+Covers break detection with tolerances, disk spilling of hash buckets,
+bucket joins in a process pool, and capped break rows with exact counts.
+"""
+
+from decimal import Decimal
+
+from app.risk_management.data_quality.utils.data_reconciliation import (
+    DataReconciliationUtilities,
+    ReconciliationStatus,
+)
+from app.risk_management.data_quality.utils.reconciliation_engine import (
+    ReconciliationEngine,
+    _load_partition,
+    _SpillableBuckets,
+    values_match,
+)
+
+
+def _sides(size: int = 200) -> tuple[list[dict], list[dict]]:
+    source = [{"id": index, "amount": index * 10.0, "ccy": "EUR"} for index in range(size)]
+    target = [{"id": index, "amount": index * 10.0, "ccy": "EUR"} for index in range(5, size + 5)]
+    target[20]["amount"] += 1
+    target[30]["ccy"] = "USD"
+    return source, target
+
+
+def _summary(outcome) -> tuple:
+    return (
+        outcome.source_count,
+        outcome.target_count,
+        outcome.matched_count,
+        dict(outcome.break_counts),
+        sorted(map(repr, outcome.breaks)),
+    )
+
+
+class TestValuesMatch:
+    """Test the field comparison."""
+
+    def test_numeric_tolerance(self):
+        """Test that numbers match within the larger of the absolute and relative tolerance."""
+        assert values_match(100, 100.5, Decimal("1"), Decimal("0"))
+        assert not values_match(100, 102, Decimal("1"), Decimal("0"))
+        assert values_match(1, 1.4, Decimal("0"), Decimal("0.5"))
+
+    def test_non_numeric_must_be_equal(self):
+        """Test that booleans, strings and non-finite numbers need equality."""
+        assert not values_match(True, 1.0001, Decimal("1"), Decimal("1"))
+        assert not values_match("1", 1, Decimal("1"), Decimal("1"))
+        assert not values_match(float("inf"), 1e308, Decimal("100"), Decimal("1"))
+
+
+class TestSpilling:
+    """Test buckets spilled to disk."""
+
+    def test_spilled_partition_reads_back(self, tmp_path):
+        """Test that spilled and buffered records of a bucket are read back in order."""
+        buckets = _SpillableBuckets("source", 1, str(tmp_path), memory_limit=3)
+        records = [((str(index),), {"id": index}) for index in range(7)]
+        for key, record in records:
+            buckets.add(key, record)
+
+        path, buffered = buckets.partition(0)
+
+        assert path is not None
+        assert len(buffered) == 1
+        assert list(_load_partition(path, buffered)) == records
+
+    def test_spilling_does_not_change_outcome(self, tmp_path):
+        """Test that a tiny memory limit gives the same outcome as an in-memory join."""
+        source, target = _sides()
+        in_memory = ReconciliationEngine(["id"], bucket_count=8, memory_limit=None, max_breaks=None)
+        spilling = ReconciliationEngine(
+            ["id"], bucket_count=8, memory_limit=10, max_breaks=None, spill_dir=str(tmp_path)
+        )
+
+        assert _summary(spilling.reconcile(iter(source), iter(target))) == _summary(
+            in_memory.reconcile(source, target)
+        )
+        assert list(tmp_path.iterdir()) == []
+
+    def test_process_pool_matches_serial(self, tmp_path):
+        """Test that joining buckets in a process pool gives the serial outcome."""
+        source, target = _sides()
+        serial = ReconciliationEngine(["id"], bucket_count=4, max_breaks=None)
+        pooled = ReconciliationEngine(
+            ["id"], bucket_count=4, memory_limit=25, max_breaks=None, max_workers=2, spill_dir=str(tmp_path)
+        )
+
+        assert _summary(pooled.reconcile(source, target)) == _summary(serial.reconcile(source, target))
+
+
+class TestReconcileRecords:
+    """Test record reconciliation results."""
+
+    def test_break_counts(self):
+        """Test missing, extra and mismatched records are counted."""
+        source, target = _sides()
+
+        result = DataReconciliationUtilities().reconcile_records(source, target, ["id"])
+
+        assert result.break_summary == {
+            "missing_in_target": 5,
+            "missing_in_source": 5,
+            "value_mismatch.amount": 1,
+            "value_mismatch.ccy": 1,
+            "mismatched_records": 2,
+        }
+        assert result.matched_count == 193
+        assert result.status == ReconciliationStatus.PARTIAL_MATCH
+        assert not result.breaks_truncated
+
+    def test_partitioned_caps_break_rows(self):
+        """Test that break rows are capped while the counts stay exact."""
+        source, target = _sides()
+
+        result = DataReconciliationUtilities().reconcile_records_partitioned(
+            source, target, ["id"], bucket_count=16, memory_limit=50, max_breaks=3
+        )
+
+        assert len(result.breaks) == 3
+        assert result.breaks_truncated
+        assert result.break_summary["missing_in_target"] == 5
+        assert result.unmatched_count == 7
+
+    def test_identical_sides_match(self):
+        """Test that identical sides reconcile fully."""
+        source, _target = _sides()
+
+        result = DataReconciliationUtilities().reconcile_records(source, list(source), ["id"])
+
+        assert result.status == ReconciliationStatus.MATCHED
+        assert result.match_rate == Decimal("100.0")
@@ -0,0 +1,129 @@
+"""
+Tests for fingerprint-based schema drift detection.
+
+Covers column and schema fingerprints, the precomputed fingerprint fast
+path, per-column drift items, and history rebuilt from stored deltas.
+"""
+
+from unittest import mock
+
+from app.risk_management.data_quality.utils import schema_drift_detector as drift_module
+from app.risk_management.data_quality.utils.schema_drift_detector import (
+    ColumnDefinition,
+    DriftType,
+    SchemaDriftDetector,
+    column_fingerprint,
+    schema_fingerprint,
+)
+
+
+def _columns(**overrides) -> list[ColumnDefinition]:
+    columns = {
+        "id": ColumnDefinition("id", "bigint", is_nullable=False, is_primary_key=True),
+        "name": ColumnDefinition("name", "varchar", max_length=100),
+        "balance": ColumnDefinition("balance", "decimal", precision=18, scale=2),
+    }
+    columns.update(overrides)
+    return [column for column in columns.values() if column is not None]
+
+
+def _fingerprint(columns: list[ColumnDefinition]) -> str:
+    return schema_fingerprint({column.column_name: column_fingerprint(column) for column in columns})
+
+
+class TestFingerprints:
+    """Test column and schema fingerprints."""
+
+    def test_constraint_order_ignored(self):
+        """Test that constraint order does not change a column fingerprint."""
+        assert column_fingerprint(ColumnDefinition("c", "int", constraints=["a", "b"])) == column_fingerprint(
+            ColumnDefinition("c", "int", constraints=["b", "a"])
+        )
+
+    def test_column_order_ignored(self):
+        """Test that the schema fingerprint does not depend on column order."""
+        columns = _columns()
+
+        assert _fingerprint(columns) == _fingerprint(columns[::-1])
+
+
+class TestDetectDrift:
+    """Test drift reports against the latest registered schema."""
+
+    def test_unchanged_schema(self):
+        """Test that an identical schema reports no drift."""
+        detector = SchemaDriftDetector()
+        detector.register_schema("accounts", _columns())
+
+        assert detector.detect_drift("accounts", _columns()) is None
+        assert not detector.has_drifted("accounts", _fingerprint(_columns()))
+
+    def test_precomputed_fingerprint_skips_column_hashing(self):
+        """Test that a matching precomputed fingerprint returns without hashing columns."""
+        detector = SchemaDriftDetector()
+        detector.register_schema("accounts", _columns())
+        fingerprint = _fingerprint(_columns())
+
+        with mock.patch.object(drift_module, "column_fingerprint") as hashed:
+            assert detector.detect_drift("accounts", _columns(), fingerprint=fingerprint) is None
+
+        hashed.assert_not_called()
+
+    def test_drift_items(self):
+        """Test added, removed and changed columns with their severities."""
+        detector = SchemaDriftDetector()
+        detector.register_schema("accounts", _columns())
+        current = _columns(
+            name=ColumnDefinition("name", "text", is_nullable=False, max_length=100),
+            balance=None,
+            opened=ColumnDefinition("opened", "date"),
+        )
+
+        report = detector.detect_drift("accounts", current, fingerprint=_fingerprint(current))
+
+        assert sorted((item.drift_type, item.column_name) for item in report.drift_items) == sorted([
+            (DriftType.COLUMN_REMOVED, "balance"),
+            (DriftType.TYPE_CHANGED, "name"),
+            (DriftType.NULLABLE_CHANGED, "name"),
+            (DriftType.COLUMN_ADDED, "opened"),
+        ])
+        assert report.has_breaking_changes
+        assert (report.critical_count, report.high_count, report.medium_count, report.low_count) == (1, 1, 1, 1)
+
+    def test_constraint_changes(self):
+        """Test that constraint and key changes are reported per constraint."""
+        detector = SchemaDriftDetector()
+        detector.register_schema("accounts", _columns())
+
+        report = detector.detect_drift("accounts", _columns(
+            id=ColumnDefinition("id", "bigint", is_nullable=False, constraints=["UNIQUE"])
+        ))
+
+        assert [(item.drift_type, item.current_value or item.previous_value) for item in report.drift_items] == [
+            (DriftType.CONSTRAINT_ADDED, "UNIQUE"),
+            (DriftType.CONSTRAINT_REMOVED, "PRIMARY KEY"),
+        ]
+
+    def test_unknown_table(self):
+        """Test that a table without a registered schema reports nothing."""
+        assert SchemaDriftDetector().detect_drift("missing", _columns()) is None
+
+
+class TestHistory:
+    """Test versions stored as deltas."""
+
+    def test_history_rebuilds_full_versions(self):
+        """Test that replaying the deltas rebuilds each registered version."""
+        detector = SchemaDriftDetector()
+        versions = [_columns(), _columns(balance=None), _columns(opened=ColumnDefinition("opened", "date"))]
+        for columns in versions:
+            detector.register_schema("accounts", columns)
+
+        history = detector.get_schema_history("accounts")
+
+        assert [schema.version for schema in history] == [1, 2, 3]
+        assert [sorted(schema.columns) for schema in history] == [
+            sorted(column.column_name for column in columns) for columns in versions
+        ]
+        assert [schema.fingerprint for schema in history] == [_fingerprint(columns) for columns in versions]
+        assert detector._schema_history["accounts"][1].changed_columns == {}
@@ -0,0 +1,130 @@
+"""
+Tests for time-bucketed SLA rollups.
+
+Covers ring slot reuse, window aggregation across day, hour and minute
+resolutions, and the SLA reports and status sets read from the rollups.
+"""
+
+import random
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+from app.risk_management.data_quality.utils.sla_monitoring import (
+    SLAMetricType,
+    SLAMonitoringUtilities,
+    SLAStatus,
+)
+from app.risk_management.data_quality.utils.sla_rollup_store import (
+    RollupRing,
+    SLARollupStore,
+)
+
+NOW = 1_800_000_000 - 1_800_000_000 % 86400 + 12 * 3600
+
+
+class TestRollupRing:
+    """Test a single fixed-resolution ring."""
+
+    def test_slot_reused_after_capacity(self):
+        """Test that a newer bucket replaces the aged-out bucket in its slot."""
+        ring = RollupRing(resolution=60, capacity=3)
+        ring.add(0, Decimal("1"), True, False)
+        ring.add(180, Decimal("2"), True, False)
+
+        assert ring.bucket(0) is None
+        assert ring.bucket(180).total == Decimal("2")
+
+    def test_late_value_for_evicted_bucket_dropped(self):
+        """Test that a late value for a bucket already overwritten is ignored."""
+        ring = RollupRing(resolution=60, capacity=3)
+        ring.add(180, Decimal("2"), True, False)
+        ring.add(5, Decimal("7"), True, False)
+
+        assert ring.bucket(0) is None
+        assert ring.bucket(180).count == 1
+
+
+class TestAggregate:
+    """Test window aggregation across resolutions."""
+
+    def test_recent_window_matches_raw_measurements(self):
+        """Test that a minute-aligned window in the last day is exact."""
+        rng = random.Random(3)
+        store = SLARollupStore()
+        raw = []
+        for _ in range(2000):
+            timestamp = NOW - rng.randrange(20 * 3600)
+            value = Decimal(rng.randrange(90, 101))
+            raw.append((timestamp, value))
+            store.add("sla", timestamp, value, met=value >= 95, breached=value < 92)
+
+        start, end = NOW - 17 * 3600 - 23 * 60, NOW - 2 * 3600 - 7 * 60
+        bucket = store.aggregate("sla", start, end, NOW)
+        inside = [value for timestamp, value in raw if start <= timestamp < end]
+
+        assert bucket.count == len(inside)
+        assert bucket.total == sum(inside)
+        assert (bucket.minimum, bucket.maximum) == (min(inside), max(inside))
+        assert bucket.met_count == sum(value >= 95 for value in inside)
+        assert bucket.breach_count == sum(value < 92 for value in inside)
+
+    def test_old_edges_fall_back_to_coarser_buckets(self):
+        """Test that edges older than the minute ring resolve to whole hours."""
+        store = SLARollupStore()
+        ten_days_ago = NOW - 10 * 86400
+        store.add("sla", ten_days_ago + 10, Decimal("1"), True, False)
+        store.add("sla", ten_days_ago + 50 * 60, Decimal("2"), True, False)
+
+        # The window starts mid-hour but the hour ring is the finest still retained
+        bucket = store.aggregate("sla", ten_days_ago + 30 * 60, ten_days_ago + 3600, NOW)
+
+        assert bucket.count == 2
+
+    def test_series_splits_window(self):
+        """Test that a series returns one aggregate per step."""
+        store = SLARollupStore()
+        for hour in range(6):
+            store.add("sla", NOW - 6 * 3600 + hour * 3600, Decimal(hour), True, False)
+
+        series = store.series("sla", NOW - 6 * 3600, 2 * 3600, 3, NOW)
+
+        assert [bucket.total for bucket in series] == [Decimal("1"), Decimal("5"), Decimal("9")]
+
+    def test_unknown_sla_is_empty(self):
+        """Test that an SLA without measurements aggregates to an empty bucket."""
+        assert SLARollupStore().aggregate("missing", 0, NOW, NOW).count == 0
+
+
+class TestSLAMonitoring:
+    """Test reports and status sets read from the rollups."""
+
+    def test_report_and_status_sets(self):
+        """Test that a report counts measurements and the status sets follow the latest one."""
+        monitoring = SLAMonitoringUtilities()
+        sla = monitoring.create_sla("feed", SLAMetricType.COMPLETENESS, Decimal("99"), Decimal("95"))
+        for value in ("99.5", "96", "90"):
+            monitoring.record_measurement(sla.sla_id, Decimal(value))
+
+        report = monitoring.generate_report(sla.sla_id)
+
+        assert (report.measurements_count, report.met_count, report.breached_count) == (3, 1, 1)
+        assert (report.min_value, report.max_value) == (Decimal("90"), Decimal("99.5"))
+        assert monitoring.get_breached_slas() == [sla]
+
+        monitoring.record_measurement(sla.sla_id, Decimal("97"))
+
+        assert monitoring.get_breached_slas() == []
+        assert monitoring.get_at_risk_slas() == [sla]
+        assert monitoring.get_current_status(sla.sla_id) == SLAStatus.AT_RISK
+
+    def test_report_outside_window_is_unknown(self):
+        """Test that a period without measurements reports an unknown status."""
+        monitoring = SLAMonitoringUtilities()
+        sla = monitoring.create_sla("feed", SLAMetricType.TIMELINESS, Decimal("99"))
+        monitoring.record_measurement(sla.sla_id, Decimal("100"))
+        period_end = datetime.now(UTC) - timedelta(days=2)
+
+        report = monitoring.generate_report(sla.sla_id, period_end - timedelta(hours=1), period_end)
+
+        assert report.status == SLAStatus.UNKNOWN
+        assert report.measurements_count == 0
@@ -0,0 +1,142 @@
+"""
+Tests for the stress matrix engine.
+
+Covers factor resolution and fallbacks, the cached shock matrix and its
+refresh when scenario shocks change, the batched stress run and the
+minimum-norm reverse stress test.
+"""
+
+import asyncio
+from unittest import mock
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.risk_management.market.models.stress_test_models import (
+    ScenarioSeverity,
+    ScenarioType,
+    StressScenario,
+)
+from app.risk_management.market.services import stress_engine
+from app.risk_management.market.services.stress_engine import StressMatrixEngine
+from app.risk_management.market.services.stress_test_service import StressTestService
+
+POSITIONS = [
+    {"id": "p1", "asset_class": "equity", "ticker": "SPX", "value": 1000.0},
+    {"id": "p2", "asset_class": "equity", "ticker": "ACME", "value": 500.0},
+    {"id": "p3", "asset_class": "fx", "currency_pair": "EURUSD", "value": 2000.0},
+    {"id": "p4", "asset_class": "rates", "tenor": "10Y", "value": -300.0},
+    {"id": "p5", "asset_class": "commodity", "value": 700.0},
+]
+
+
+def _scenario(**shocks) -> StressScenario:
+    return StressScenario(
+        scenario_name="test", scenario_type=ScenarioType.HYPOTHETICAL, severity=ScenarioSeverity.SEVERE,
+        description="test", created_by="test", **shocks,
+    )
+
+
+class TestStressRun:
+    """Test batched scenario runs."""
+
+    def test_pnl_with_fallback_shocks(self):
+        """Test P&L using the equity default and the rates 'all' shocks."""
+        engine = StressMatrixEngine()
+        scenario = _scenario(
+            equity_shocks={"SPX": -0.4, "default": -0.2}, fx_shocks={"EURUSD": 0.1}, ir_shocks={"all": 0.01}
+        )
+
+        run = engine.run([scenario], engine.exposures(POSITIONS))
+
+        expected = [-400.0, -100.0, 200.0, -3.0, 0.0]
+        assert run.position_pnl[0].tolist() == pytest.approx(expected)
+        assert run.pnl[0] == pytest.approx(sum(expected))
+        assert dict(zip(run.class_names, run.class_contributions[0].tolist(), strict=True)) == pytest.approx(
+            {"commodity": 0.0, "equity": 500.0, "fx": 200.0, "rates": 3.0}
+        )
+
+    def test_service_runs_all_active_scenarios(self):
+        """Test that every active scenario is run against the book."""
+        service = StressTestService()
+
+        results = asyncio.run(service.run_all_active_scenarios(uuid4(), 10_000.0, POSITIONS))
+
+        assert len(results) == len(service._scenarios)
+        assert all(len(result.position_level_impacts) == len(POSITIONS) for result in results)
+
+
+class TestShockMatrixCache:
+    """Test reuse and refresh of compiled shock vectors."""
+
+    def test_unchanged_scenario_reused(self):
+        """Test that a second run over the same factors does not recompile."""
+        engine = StressMatrixEngine()
+        scenario = _scenario(equity_shocks={"default": -0.1})
+        factors = engine.exposures(POSITIONS).factors
+        engine.shock_matrix([scenario], factors)
+
+        with mock.patch.object(stress_engine, "resolve_shock") as resolve:
+            engine.shock_matrix([scenario], factors)
+
+        resolve.assert_not_called()
+
+    def test_edited_shocks_recompiled(self):
+        """Test that mutating a scenario's shocks in place refreshes its vector."""
+        engine = StressMatrixEngine()
+        scenario = _scenario(equity_shocks={"default": -0.1})
+        factors = engine.exposures(POSITIONS).factors
+        before = engine.shock_matrix([scenario], factors)
+
+        scenario.equity_shocks["ACME"] = -0.5
+
+        after = engine.shock_matrix([scenario], factors)
+        assert before[0, factors.index(("equity", "ACME"))] == -0.1
+        assert after[0, factors.index(("equity", "ACME"))] == -0.5
+
+    def test_replaced_scenario_with_same_id(self):
+        """Test that a replacement scenario keeping the id is compiled from its own shocks."""
+        engine = StressMatrixEngine()
+        original = _scenario(fx_shocks={"EURUSD": 0.1})
+        replacement = original.model_copy(update={"fx_shocks": {"EURUSD": -0.2}})
+        factors = engine.exposures(POSITIONS).factors
+        engine.shock_matrix([original], factors)
+
+        matrix = engine.shock_matrix([replacement], factors)
+
+        assert matrix[0, factors.index(("fx", "EURUSD"))] == -0.2
+
+    def test_new_factor_universe(self):
+        """Test that a different factor universe recompiles the vector."""
+        engine = StressMatrixEngine()
+        scenario = _scenario(equity_shocks={"default": -0.1})
+        engine.shock_matrix([scenario], [("equity", "SPX")])
+
+        assert engine.shock_matrix([scenario], [("equity", "SPX"), ("fx", "EURUSD")]).tolist() == [[-0.1, 0.0]]
+
+
+class TestReverseStress:
+    """Test the minimum-norm reverse stress shock."""
+
+    def test_solution_reaches_target_loss(self):
+        """Test that the solved shocks produce exactly the target loss."""
+        engine = StressMatrixEngine()
+        exposures = engine.exposures(POSITIONS)
+        scenarios = [
+            _scenario(equity_shocks={"default": -0.3}, fx_shocks={"EURUSD": -0.1}),
+            _scenario(equity_shocks={"SPX": -0.1}, ir_shocks={"10Y": 0.02}),
+        ]
+
+        solution = engine.reverse(scenarios, exposures, target_loss=1000.0)
+
+        shocks = np.array([solution.shocks.get(factor, 0.0) for factor in exposures.factors])
+        assert float(shocks @ exposures.factor_exposures) == pytest.approx(-1000.0)
+        assert ("none", "commodity") not in solution.shocks
+        assert 0 < solution.plausibility <= 100
+
+    def test_no_shockable_exposure(self):
+        """Test that a book with only unshocked asset classes has no solution."""
+        engine = StressMatrixEngine()
+
+        assert engine.reverse([_scenario()], engine.exposures(POSITIONS[-1:]), 100.0) is None
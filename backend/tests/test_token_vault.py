@@ -0,0 +1,131 @@
+"""
+Tests for the persistent keyed token vault.
+
+Covers keyed and format-preserving token derivation, including values in
+non-Latin scripts, persistence and file permissions of the vault, and
+collision handling.
+"""
+
+import os
+import stat
+
+import pytest
+
+from app.risk_management.data_quality.utils.token_vault import (
+    TOKEN_PREFIX,
+    TokenVault,
+    derive_token,
+)
+
+KEY = b"k" * 32
+
+
+class TestDeriveToken:
+    """Test token derivation."""
+
+    def test_keyed_and_deterministic(self):
+        """Test that tokens depend on the key, the value and the tweak only."""
+        token = derive_token(KEY, "4111-1111")
+
+        assert token.startswith(TOKEN_PREFIX)
+        assert token == derive_token(KEY, "4111-1111")
+        assert token != derive_token(b"x" * 32, "4111-1111")
+        assert token != derive_token(KEY, "4111-1111", tweak=1)
+
+    def test_format_preserving_keeps_shape(self):
+        """Test that digits, letter case and punctuation positions are kept."""
+        token = derive_token(KEY, "Ab-12 cD", format_preserving=True)
+
+        assert len(token) == 8
+        assert token[0].isupper() and token[1].islower()
+        assert token[2] == "-" and token[5] == " "
+        assert token[3:5].isdigit()
+        assert token[6].islower() and token[7].isupper()
+        assert token != "Ab-12 cD"
+
+    @pytest.mark.parametrize("value", ["José Álvarez", "Müller", "Łódź 42", "Ольга"])
+    def test_cased_letters_of_any_script_replaced(self, value):
+        """Test that accented and non-Latin cased letters do not leak into the token."""
+        token = derive_token(KEY, value, format_preserving=True)
+
+        assert len(token) == len(value)
+        assert token.isascii()
+        assert [char.isupper() for char in token] == [char.isupper() for char in value]
+        assert [char.isdecimal() for char in token] == [char.isdecimal() for char in value]
+
+    @pytest.mark.parametrize("value", ["王小明", "Jose\u0301", "Zoë Ⅻ"])
+    def test_unsubstitutable_characters_fall_back(self, value):
+        """Test that values with uncased alphanumerics or combining marks (decomposed é) get plain tokens."""
+        token = derive_token(KEY, value, format_preserving=True)
+
+        assert token == derive_token(KEY, value)
+        assert not set(token) & set(value) - set("0123456789ABCDEF")
+
+    def test_non_decimal_digits_fall_back(self):
+        """Test that superscript digits are not copied into a format-preserving token."""
+        assert derive_token(KEY, "x²", format_preserving=True).startswith(TOKEN_PREFIX)
+
+
+class TestTokenVault:
+    """Test the append-only vault."""
+
+    def test_detokenize_round_trip(self):
+        """Test that tokens map back to their values, including non-ASCII ones."""
+        vault = TokenVault(key=KEY)
+        tokens = vault.tokenize_many(["alice", "王小明", "alice"], format_preserving=True)
+
+        assert len(vault) == 2
+        assert {vault.detokenize(token) for token in tokens.values()} == {"alice", "王小明"}
+        assert vault.detokenize("TKN_UNKNOWN") is None
+
+    def test_persists_across_reopen(self, tmp_path):
+        """Test that a reopened vault with the same key resolves earlier tokens."""
+        path = str(tmp_path / "vault.bin")
+        vault = TokenVault(path, KEY)
+        token = vault.tokenize("Müller", format_preserving=True)
+        vault.close()
+
+        reopened = TokenVault(path, KEY)
+
+        assert reopened.detokenize(token) == "Müller"
+        assert reopened.tokenize("Müller", format_preserving=True) == token
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+    def test_refuses_shared_vault_file(self, tmp_path):
+        """Test that a vault readable by group or others is refused."""
+        path = tmp_path / "vault.bin"
+        path.write_bytes(b"")
+        path.chmod(0o644)
+
+        with pytest.raises(PermissionError):
+            TokenVault(str(path), KEY)
+
+    def test_requires_key_for_path(self, tmp_path):
+        """Test that a persistent vault needs a fixed key."""
+        with pytest.raises(ValueError):
+            TokenVault(str(tmp_path / "vault.bin"))
+
+    def test_collision_resolved_with_tweak(self):
+        """Test that a value whose token is taken by another value is re-derived."""
+        vault = TokenVault(key=KEY)
+        first = vault.tokenize("11", format_preserving=True)
+
+        tokens = vault.tokenize_many(["99"], format_preserving=True, derived=[first])
+
+        assert tokens["99"] == derive_token(KEY, "99", 1, format_preserving=True)
+        assert vault.detokenize(first) == "11"
+        assert vault.detokenize(tokens["99"]) == "99"
+
+    def test_partial_trailing_record_dropped(self, tmp_path):
+        """Test that a torn final write is discarded on reopen."""
+        path = str(tmp_path / "vault.bin")
+        vault = TokenVault(path, KEY)
+        token = vault.tokenize("alice")
+        vault.close()
+        with open(path, "ab") as handle:
+            handle.write(b"\x00\x10")
+
+        reopened = TokenVault(path, KEY)
+
+        assert reopened.detokenize(token) == "alice"
+        assert os.path.getsize(path) == reopened._size
@@ -0,0 +1,127 @@
+"""
+Tests for streaming transaction monitoring.
+
+Covers the rule-driven settings of the customer profile store, their refresh
+when rules change, and the bounded transaction log.
+"""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+from app.risk_management.aml.services.transaction_monitoring_service import (
+    MAINTENANCE_INTERVAL,
+    CustomerProfileStore,
+    TransactionMonitoringService,
+)
+
+START = datetime(2026, 3, 2, 9, 0, tzinfo=UTC)
+
+
+def _txn(transaction_id: str, amount: float, hours: float, **fields) -> dict:
+    return {
+        "transaction_id": transaction_id,
+        "customer_id": "C1",
+        "amount": amount,
+        "timestamp": START + timedelta(hours=hours),
+        **fields,
+    }
+
+
+def _rule(service: TransactionMonitoringService, rule_code: str):
+    return next(rule for rule in service._rules.values() if rule.rule_code == rule_code)
+
+
+class TestProfileStoreSettings:
+    """Test that the profile store follows the rule parameters."""
+
+    def test_store_built_from_default_rules(self):
+        """Test that the store settings come from the default rules."""
+        store = TransactionMonitoringService()._profile_store
+
+        assert store.reporting_threshold == 10000
+        assert store.large_credit_threshold == 5000
+        assert store.current_tau == 7 * 86400
+        assert store.baseline_tau == 90 * 86400
+
+    def test_from_rules_reads_parameters(self):
+        """Test that edited rule parameters are picked up by a new store."""
+        service = TransactionMonitoringService()
+        _rule(service, "STRUCT_001").parameters = {"threshold": 3000, "time_window_days": 2}
+        _rule(service, "RAP_001").thresholds = {"ratio_threshold": 0.9, "min_amount": 1000}
+
+        store = CustomerProfileStore.from_rules(service._active_rules())
+
+        assert store.reporting_threshold == 3000
+        assert store.structuring_window == timedelta(days=2)
+        assert store.large_credit_threshold == 1000
+
+    def test_update_rule_recounts_below_threshold(self):
+        """Test that lowering the structuring threshold recounts recent transactions."""
+        service = TransactionMonitoringService()
+        for index in range(3):
+            asyncio.run(service.monitor_transaction(_txn(f"t{index}", 2800, index)))
+        assert service._profile_store.snapshot("C1", START + timedelta(hours=3))["recent_below_threshold_count"] == 0
+
+        asyncio.run(service.update_rule(
+            _rule(service, "STRUCT_001").rule_id, {"parameters": {"threshold": 3000, "time_window_days": 1}}
+        ))
+
+        snapshot = service._profile_store.snapshot("C1", START + timedelta(hours=3))
+        assert snapshot["recent_below_threshold_count"] == 3
+        assert snapshot["transaction_count"] == 3
+
+    def test_update_rule_keeps_large_credits_current(self):
+        """Test that raising the rapid movement minimum drops smaller large credits."""
+        service = TransactionMonitoringService()
+        asyncio.run(service.monitor_transaction(_txn("c1", 6000, 0, direction="credit")))
+        assert service._profile_store.get_profile("C1").large_credits
+
+        asyncio.run(service.update_rule(
+            _rule(service, "RAP_001").rule_id, {"thresholds": {"ratio_threshold": 0.9, "min_amount": 8000}}
+        ))
+
+        assert service._profile_store.large_credit_threshold == 8000
+        assert not service._profile_store.get_profile("C1").large_credits
+
+    def test_velocity_counters_rebuilt(self):
+        """Test that rebuilt velocity counters match a store fed under the new periods."""
+        service = TransactionMonitoringService()
+        transactions = [_txn(f"t{index}", 100, index * 12) for index in range(20)]
+        asyncio.run(service.ingest_transactions(transactions))
+
+        asyncio.run(service.update_rule(
+            _rule(service, "VEL_001").rule_id, {"parameters": {"baseline_period_days": 30, "current_period_days": 3}}
+        ))
+
+        expected = CustomerProfileStore(current_period_days=3, baseline_period_days=30)
+        for transaction in transactions:
+            expected.update(transaction)
+        at = START + timedelta(days=11)
+        rebuilt = service._profile_store.snapshot("C1", at)
+        fresh = expected.snapshot("C1", at)
+        assert abs(rebuilt["current_transaction_velocity"] - fresh["current_transaction_velocity"]) < 1e-9
+        assert abs(rebuilt["baseline_transaction_velocity"] - fresh["baseline_transaction_velocity"]) < 1e-9
+
+    def test_unchanged_rules_leave_store_alone(self):
+        """Test that a rule edit not touching store settings does not rebuild profiles."""
+        service = TransactionMonitoringService()
+        asyncio.run(service.monitor_transaction(_txn("c1", 6000, 0, direction="credit")))
+        geographic = _rule(service, "GEO_001")
+        asyncio.run(service.update_rule(geographic.rule_id, {"parameters": {"high_risk_countries": ["KP"]}}))
+
+        assert not service._profile_store.reconfigure(service._active_rules(), service._transaction_log)
+        assert service._profile_store.get_profile("C1").current_decayed_count == 1.0
+
+
+class TestTransactionLog:
+    """Test the retained transaction history."""
+
+    def test_log_trimmed_to_longest_rule_window(self):
+        """Test that the log keeps only the longest active rule window."""
+        service = TransactionMonitoringService()
+        transactions = [_txn(f"t{index}", 100, index * 24) for index in range(MAINTENANCE_INTERVAL)]
+
+        asyncio.run(service.ingest_transactions(transactions))
+
+        # DOR_001 looks back 180 days, the longest default window
+        assert len(service._transaction_log) == 181
@@ -0,0 +1,113 @@
+"""
+Tests for column-wise dataset validation.
+
+Covers agreement between validate_dataset and per-record validation for the
+built-in rule types, edge-case parameters, and chunked validation on an
+executor.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from app.risk_management.data_quality.utils.validation_engine import ValidationEngine
+
+RECORDS = [
+    {"id": 1, "amount": 10, "code": "AB", "email": "a@example.com", "date": "2026-01-31"},
+    {"id": 2, "amount": -5, "code": "", "email": "broken", "date": "31/01/2026"},
+    {"id": 3, "amount": "abc", "code": None, "email": None, "date": None},
+    {"id": 4, "amount": 250.5, "code": "ABCDEFG", "email": "b@example.org", "date": "2026-02-30"},
+    {"id": 5, "amount": None, "code": "XY", "email": "c@example.net", "date": "2026-03-01"},
+]
+
+
+def _rules(engine: ValidationEngine, *specs: tuple[str, str, dict]) -> list:
+    return [
+        engine.register_rule(f"{rule_type}-{field}", rule_type, field, "invalid", parameters=parameters)
+        for rule_type, field, parameters in specs
+    ]
+
+
+def _per_record(engine: ValidationEngine, data: list[dict], rules: list) -> list[tuple[str, str, str]]:
+    return [
+        (str(record["id"]), error.rule_id, error.error_message)
+        for record in data
+        for error in engine.validate_record(record, rules)
+    ]
+
+
+def _dataset(engine: ValidationEngine, data: list[dict], rules: list, **options) -> list[tuple[str, str, str]]:
+    result = engine.validate_dataset(data, rules, **options)
+    return [(error.record_id, error.rule_id, error.error_message) for error in result.errors]
+
+
+class TestDatasetMatchesRecords:
+    """Test that column-wise validation reports what per-record validation reports."""
+
+    def test_builtin_rules(self):
+        """Test every built-in rule type against the scalar validators."""
+        engine = ValidationEngine()
+        rules = _rules(
+            engine,
+            ("not_null", "code", {}),
+            ("not_empty", "code", {}),
+            ("min_length", "code", {"min_length": 2}),
+            ("max_length", "code", {"max_length": 5}),
+            ("regex", "code", {"pattern": "^[A-Z]+$"}),
+            ("email", "email", {}),
+            ("numeric", "amount", {}),
+            ("integer", "amount", {}),
+            ("positive", "amount", {}),
+            ("range", "amount", {"min": 0, "max": 100}),
+            ("date_format", "date", {}),
+            ("in_list", "code", {"values": ["AB", "XY"]}),
+            ("unique", "code", {"existing_values": {"XY"}}),
+            ("referential", "code", {"reference_values": {"AB"}, "allow_null": False}),
+        )
+
+        assert _dataset(engine, RECORDS, rules) == _per_record(engine, RECORDS, rules)
+
+    def test_non_numeric_range_bounds(self):
+        """Test that a non-numeric bound fails every row instead of raising."""
+        engine = ValidationEngine()
+        rules = _rules(engine, ("range", "amount", {"min": "low"}), ("range", "amount", {"min": 0, "max": "n/a"}))
+
+        errors = _dataset(engine, RECORDS, rules)
+
+        assert errors == _per_record(engine, RECORDS, rules)
+        assert len(errors) == 2 * len(RECORDS)
+
+    def test_string_values_use_substring_membership(self):
+        """Test that a string list of values matches substrings like the scalar validator."""
+        engine = ValidationEngine()
+        data = [{"id": 1, "code": "AB"}, {"id": 2, "code": "ZZ"}, {"id": 3, "code": "BC"}]
+        rules = _rules(
+            engine,
+            ("in_list", "code", {"values": "ABC"}),
+            ("referential", "code", {"reference_values": "ABC"}),
+        )
+
+        errors = _dataset(engine, data, rules)
+
+        assert errors == _per_record(engine, data, rules)
+        assert {record_id for record_id, _rule, _message in errors} == {"2"}
+
+    def test_chunked_on_executor(self):
+        """Test that chunked validation on an executor keeps record order."""
+        engine = ValidationEngine()
+        data = [{**record, "id": index} for index, record in enumerate(RECORDS * 20)]
+        rules = _rules(engine, ("positive", "amount", {}), ("not_empty", "code", {}))
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            errors = _dataset(engine, data, rules, chunk_size=7, executor=executor)
+
+        assert errors == _per_record(engine, data, rules)
+
+    def test_inactive_rules_skipped(self):
+        """Test that inactive rules are not evaluated."""
+        engine = ValidationEngine()
+        rules = _rules(engine, ("not_null", "code", {}))
+        rules[0].is_active = False
+
+        result = engine.validate_dataset(RECORDS, rules)
+
+        assert result.records_failed == 0
+        assert result.records_passed == len(RECORDS)
@@ -0,0 +1,54 @@
+"""
+Tests for the vectorized VaR backtest engine.
+
+Covers the Basel traffic-light thresholds, the Kupiec proportion of failures
+test and the rolling exception counts and zones.
+"""
+
+import numpy as np
+import pytest
+
+from app.risk_management.market.services.var_backtest_engine import (
+    VaRBacktestEngine,
+    kupiec_pof,
+    traffic_light_thresholds,
+)
+
+
+class TestVaRBacktest:
+    """Test Basel traffic lights and the Kupiec test."""
+
+    def test_traffic_light_thresholds_basel(self):
+        """Test the Basel 250-day, 99% zones: yellow from 5 and red from 10 exceptions."""
+        assert traffic_light_thresholds(250, 0.01) == (5, 10)
+
+    def test_kupiec_known_value(self):
+        """Test the Kupiec statistic for 5 exceptions in 250 days at 1%."""
+        assert kupiec_pof(np.array([5]), 250, 0.01)[0] == pytest.approx(1.9568, abs=1e-4)
+
+    def test_kupiec_zero_at_expected_rate(self):
+        """Test that the observed rate matching the expected rate gives zero."""
+        assert kupiec_pof(np.array([2.5]), 250, 0.01)[0] == pytest.approx(0.0, abs=1e-12)
+
+    def test_rolling_exceptions_match_direct_count(self):
+        """Test rolling exception counts against a direct count per window."""
+        rng = np.random.default_rng(7)
+        pnl = rng.normal(0, 1, 600)
+        var_forecasts = np.full(600, 2.326)
+
+        windows = VaRBacktestEngine(window=250).rolling(var_forecasts, pnl)
+        flags = -pnl > var_forecasts
+        expected = [flags[end - 249:end + 1].sum() for end in windows.end_index]
+
+        assert windows.exceptions.tolist() == expected
+        assert windows.end_index[0] == 249
+
+    def test_zones_follow_exception_counts(self):
+        """Test that windows move from green to yellow to red as exceptions accumulate."""
+        pnl = np.zeros(260)
+        pnl[250:260] = -10.0
+
+        windows = VaRBacktestEngine(window=250).rolling(np.ones(260), pnl)
+
+        assert windows.exceptions[[1, 5, 10]].tolist() == [1, 5, 10]
+        assert windows.zones[[1, 5, 10]].tolist() == ["green", "yellow", "red"]
@@ -0,0 +1,159 @@
+"""
+Tests for the multi-asset VaR engine.
+
+Covers delta-normal VaR/ES with Euler components, historical simulation,
+block-wise Monte Carlo in a process pool, and VaR calculation from positions.
+"""
+
+import asyncio
+import math
+from datetime import date
+from statistics import NormalDist
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.risk_management.market.models.position_models import AssetClass, TradingPosition
+from app.risk_management.market.models.var_models import ConfidenceLevel, VaRMethod
+from app.risk_management.market.services.var_engine import (
+    PortfolioExposure,
+    VaREngine,
+    ewma_covariance,
+    factorize_covariance,
+    tail_size,
+)
+from app.risk_management.market.services.var_service import VaRService
+
+COVARIANCE = np.array([[0.0004, 0.0001], [0.0001, 0.0009]])
+PORTFOLIO = PortfolioExposure(
+    keys=["eq", "fx", "eq_short"],
+    factor_index=np.array([0, 1, 0], dtype=np.intp),
+    exposures=np.array([1_000_000.0, 500_000.0, -200_000.0]),
+)
+
+
+def _position(reference: str, instrument_id: str, market_value: float, direction: str = "long") -> TradingPosition:
+    return TradingPosition(
+        position_reference=reference, asset_class=AssetClass.EQUITY, instrument_id=instrument_id,
+        instrument_name=instrument_id, portfolio_id=uuid4(), book_id="B", trader_id="T", quantity=1,
+        direction=direction, entry_date=date(2026, 1, 2), entry_price=market_value,
+        current_price=market_value, market_value=market_value, cost_basis=market_value,
+        unrealized_pnl=0, total_pnl=0, currency="USD",
+    )
+
+
+class TestParametric:
+    """Test delta-normal VaR."""
+
+    def test_single_position_closed_form(self):
+        """Test VaR and ES of one position against the normal formulas."""
+        portfolio = PortfolioExposure(["p"], np.zeros(1, dtype=np.intp), np.array([100.0]))
+        z = NormalDist().inv_cdf(0.99)
+
+        result = VaREngine().parametric(np.array([[0.0004]]), portfolio, 0.99, horizon=4)
+
+        assert result.var == pytest.approx(z * 0.02 * 100 * 2)
+        assert result.expected_shortfall == pytest.approx(0.02 * 100 * 2 * NormalDist().pdf(z) / 0.01)
+
+    def test_components_add_up(self):
+        """Test that Euler components sum to VaR and undiversified VaR bounds it."""
+        result = VaREngine().parametric(COVARIANCE, PORTFOLIO, 0.99)
+
+        assert sum(result.component_var.values()) == pytest.approx(result.var)
+        assert sum(result.component_es.values()) == pytest.approx(result.expected_shortfall)
+        assert result.undiversified_var > result.var
+        assert result.marginal_var["eq_short"] == pytest.approx(result.marginal_var["eq"])
+
+
+class TestSimulation:
+    """Test historical and Monte Carlo VaR."""
+
+    def test_historical_order_statistic(self):
+        """Test that single-series historical VaR is the tail order statistic."""
+        returns = np.random.default_rng(1).normal(0, 0.01, 500)
+        portfolio = PortfolioExposure(["p"], np.zeros(1, dtype=np.intp), np.array([1000.0]))
+
+        result = VaREngine().historical(returns[:, None], portfolio, 0.99)
+
+        losses = np.sort(-1000.0 * np.expm1(returns))[::-1]
+        keep = tail_size(500, 0.99)
+        assert result.var == pytest.approx(losses[keep - 1])
+        assert result.expected_shortfall == pytest.approx(losses[:keep].mean())
+        assert result.scenario_count == 500
+
+    def test_monte_carlo_close_to_parametric(self):
+        """Test that Monte Carlo VaR converges on delta-normal VaR for small shocks."""
+        engine = VaREngine(scenario_count=200_000, block_size=50_000, seed=7)
+
+        simulated = engine.monte_carlo(COVARIANCE, PORTFOLIO, 0.99)
+        analytic = engine.parametric(COVARIANCE, PORTFOLIO, 0.99)
+
+        assert simulated.var == pytest.approx(analytic.var, rel=0.03)
+        assert sum(simulated.component_var.values()) == pytest.approx(simulated.var)
+        assert simulated.scenario_count == 200_000
+
+    def test_monte_carlo_independent_of_workers(self):
+        """Test that the process pool gives the same result as serial blocks."""
+        serial = VaREngine(scenario_count=20_000, block_size=5_000, seed=3)
+        pooled = VaREngine(scenario_count=20_000, block_size=5_000, seed=3, max_workers=2)
+
+        assert pooled.monte_carlo(COVARIANCE, PORTFOLIO, 0.99) == serial.monte_carlo(COVARIANCE, PORTFOLIO, 0.99)
+
+
+class TestCovariance:
+    """Test covariance estimation and factorisation."""
+
+    def test_ewma_weights_recent_observations(self):
+        """Test that EWMA covariance weights the newest observation most."""
+        returns = np.array([[0.1], [0.0], [0.0]])
+
+        assert ewma_covariance(returns, 0.5)[0, 0] == pytest.approx(0.01 * 0.25 / 1.75)
+        assert ewma_covariance(returns[::-1], 0.5)[0, 0] == pytest.approx(0.01 * 1 / 1.75)
+
+    def test_factor_of_singular_matrix(self):
+        """Test that a singular covariance still factors into a valid square root."""
+        singular = np.array([[1.0, 1.0], [1.0, 1.0]])
+
+        factor = factorize_covariance(singular)
+
+        assert np.allclose(factor @ factor.T, singular)
+
+
+class TestVaRService:
+    """Test VaR calculations from positions."""
+
+    def test_positions_on_factor_returns(self):
+        """Test that positions sharing an instrument are revalued on one return column."""
+        rng = np.random.default_rng(5)
+        factor_returns = {"AAA": rng.normal(0, 0.01, 250).tolist(), "BBB": rng.normal(0, 0.02, 300).tolist()}
+        positions = [_position("P1", "AAA", 1000), _position("P2", "BBB", 500), _position("P3", "AAA", 300, "short")]
+
+        calculation = asyncio.run(VaRService().calculate_var(
+            uuid4(), 1200, VaRMethod.HISTORICAL, ConfidenceLevel.CL_99,
+            positions=positions, factor_returns=factor_returns,
+        ))
+
+        assert set(calculation.component_var) == {"P1", "P2", "P3"}
+        assert calculation.model_parameters["observations"] == 250
+        assert calculation.model_parameters["risk_factors"] == 2
+        assert calculation.diversification_benefit == pytest.approx(
+            calculation.undiversified_var - calculation.var_amount
+        )
+
+    def test_missing_history_rejected(self):
+        """Test that a position without return history is rejected."""
+        with pytest.raises(ValueError):
+            asyncio.run(VaRService().calculate_var(
+                uuid4(), 1000, VaRMethod.PARAMETRIC, ConfidenceLevel.CL_95,
+                positions=[_position("P1", "AAA", 1000)], factor_returns={"BBB": [0.01, 0.02]},
+            ))
+
+    def test_default_volatility_without_history(self):
+        """Test that parametric VaR without history uses the 2% daily volatility."""
+        calculation = asyncio.run(VaRService().calculate_var(
+            uuid4(), 1000, VaRMethod.PARAMETRIC, ConfidenceLevel.CL_95
+        ))
+
+        assert calculation.var_amount == pytest.approx(1000 * 0.02 * NormalDist().inv_cdf(0.95))
+        assert not math.isnan(calculation.expected_shortfall)
@@ -0,0 +1,119 @@
+"""
+Tests for the indexed watchlist search and screening.
+
+Covers n-gram substring search, token and identifier candidates for
+screening, and reindexing when an entry changes.
+"""
+
+import asyncio
+
+from app.risk_management.aml.models.watchlist_models import (
+    EntityIdentifier,
+    WatchlistScreeningRequest,
+)
+from app.risk_management.aml.services.watchlist_service import WatchlistService
+
+
+def _service_with_entries():
+    service = WatchlistService()
+    watchlist = asyncio.run(service.get_watchlist_by_code("HIGH_RISK"))
+    asyncio.run(service.import_entries(watchlist.watchlist_id, [
+        {"primary_name": "Viktor Petrov", "aliases": ["Victor Petroff"], "reason": "test",
+         "identifiers": [{"identifier_type": "passport", "identifier_value": "P1234567"}]},
+        {"primary_name": "Maria Gonzalez", "reason": "test"},
+        {"primary_name": "John Smith", "reason": "test"},
+    ], "test"))
+    return service, watchlist
+
+
+def _names(entries) -> list[str]:
+    return [entry.primary_name for entry in entries]
+
+
+class TestSearch:
+    """Test substring search over names, aliases and identifiers."""
+
+    def test_name_substring(self):
+        """Test that a substring of a primary name finds the entry."""
+        service, _ = _service_with_entries()
+
+        assert _names(asyncio.run(service.search_entries("gonz"))) == ["Maria Gonzalez"]
+
+    def test_alias_and_identifier_substring(self):
+        """Test that aliases and identifier values are searchable."""
+        service, _ = _service_with_entries()
+
+        assert _names(asyncio.run(service.search_entries("petroff"))) == ["Viktor Petrov"]
+        assert _names(asyncio.run(service.search_entries("234"))) == ["Viktor Petrov"]
+
+    def test_short_query_scans_partition(self):
+        """Test that queries shorter than an n-gram still match."""
+        service, _ = _service_with_entries()
+
+        assert _names(asyncio.run(service.search_entries("sm"))) == ["John Smith"]
+
+    def test_no_false_positive_from_ngrams(self):
+        """Test that sharing n-grams without containing the query is not a match."""
+        service, _ = _service_with_entries()
+
+        assert asyncio.run(service.search_entries("petrovich")) == []
+
+    def test_inactive_entries_hidden(self):
+        """Test that deactivated entries are excluded by default."""
+        service, _ = _service_with_entries()
+        entry = asyncio.run(service.search_entries("smith"))[0]
+        asyncio.run(service.deactivate_entry(entry.entry_id, "cleared", "test"))
+
+        assert asyncio.run(service.search_entries("smith")) == []
+        assert _names(asyncio.run(service.search_entries("smith", active_only=False))) == ["John Smith"]
+
+
+class TestScreening:
+    """Test screening against indexed candidates."""
+
+    def test_name_token_match(self):
+        """Test that a request sharing name tokens is matched."""
+        service, _ = _service_with_entries()
+
+        result = asyncio.run(service.screen_entity(WatchlistScreeningRequest(
+            entity_type="individual", requested_by="test", entity_name="Maria Gonzalez", match_threshold=0.5
+        )))
+
+        assert _names_of_matches(result) == ["Maria Gonzalez"]
+        assert result.entries_screened == 3
+
+    def test_identifier_match(self):
+        """Test that an identifier matched case-insensitively adds to the score."""
+        service, _ = _service_with_entries()
+
+        result = asyncio.run(service.screen_entity(WatchlistScreeningRequest(
+            entity_type="individual", requested_by="test", entity_name="Viktor Petrov",
+            identifiers=[EntityIdentifier(identifier_type="passport", identifier_value="p1234567")],
+        )))
+
+        assert _names_of_matches(result) == ["Viktor Petrov"]
+        assert result.matches[0].identifier_score == 1.0
+
+    def test_unrelated_name_not_matched(self):
+        """Test that an unrelated name produces no matches."""
+        service, _ = _service_with_entries()
+
+        result = asyncio.run(service.screen_entity(WatchlistScreeningRequest(
+            entity_type="individual", requested_by="test", entity_name="Akira Tanaka", match_threshold=0.5
+        )))
+
+        assert not result.has_matches
+
+    def test_update_entry_reindexes(self):
+        """Test that renaming an entry moves it to its new name's postings."""
+        service, _ = _service_with_entries()
+        entry = asyncio.run(service.search_entries("smith"))[0]
+
+        asyncio.run(service.update_entry(entry.entry_id, {"primary_name": "Jonathan Smythe"}, "test"))
+
+        assert asyncio.run(service.search_entries("smith")) == []
+        assert _names(asyncio.run(service.search_entries("smythe"))) == ["Jonathan Smythe"]
+
+
+def _names_of_matches(result) -> list[str]:
+    return [match.entry_name for match in result.matches]